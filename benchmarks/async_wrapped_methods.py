@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compares wrapping async RPCs per call with the precomputed wrappers.
+
+Before the asyncio transport precomputed its wrapped methods, every async
+client call rebuilt the retry/timeout wrapper with
+``gapic_v1.method_async.wrap_method``. This measures the cost of that
+wrapper construction against the dictionary lookup that replaced it.
+
+Usage::
+
+    python benchmarks/async_wrapped_methods.py [--iterations N]
+"""
+import argparse
+import asyncio
+import timeit
+import tracemalloc
+
+from google.api_core import gapic_v1
+from google.auth import credentials as ga_credentials
+
+from google.cloud.secretmanager_v1.services.secret_manager_service.transports import (
+    SecretManagerServiceGrpcAsyncIOTransport,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.transports.base import (
+    DEFAULT_CLIENT_INFO,
+)
+
+
+def _per_call(transport):
+    return gapic_v1.method_async.wrap_method(
+        transport.access_secret_version,
+        default_timeout=60.0,
+        client_info=DEFAULT_CLIENT_INFO,
+    )
+
+
+def _precomputed(transport):
+    return transport._wrapped_methods[transport.access_secret_version]
+
+
+def _allocated(func, transport, iterations):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(iterations):
+            func(transport)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+
+
+async def _run(iterations):
+    transport = SecretManagerServiceGrpcAsyncIOTransport(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    try:
+        for label, func in (("per-call", _per_call), ("precomputed", _precomputed)):
+            seconds = timeit.timeit(lambda: func(transport), number=iterations)
+            retained = _allocated(func, transport, iterations)
+            print(
+                "{:<12} {:>10.3f} us/call {:>12} bytes retained".format(
+                    label, seconds / iterations * 1e6, retained
+                )
+            )
+    finally:
+        await transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures the cold-start import time of the Secret Manager packages.
+
+Each statement is run in a fresh interpreter with ``python -X importtime``
+and the cumulative time of every top-level import is summed. The median
+of several runs is reported, along with the number of modules loaded and
+whether a sync-only import loaded a module it should not need
+(``pkg_resources``, the async client or the asyncio transport).
+
+Usage::
+
+    python benchmarks/import_time.py [--runs N] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = (
+    "import google.cloud.secretmanager",
+    "import google.cloud.secretmanager_v1",
+    "import google.cloud.secretmanager_v1beta1",
+    "from google.cloud.secretmanager import SecretManagerServiceClient",
+    "from google.cloud.secretmanager import SecretManagerServiceAsyncClient",
+    "from google.cloud.secretmanager_v1beta1 import SecretManagerServiceClient",
+)
+
+# Modules which statements that do not mention the async client should
+# never load.
+UNWANTED_MODULES = (
+    "pkg_resources",
+    "google.cloud.secretmanager_v1.services.secret_manager_service.async_client",
+    "google.cloud.secretmanager_v1.services.secret_manager_service.transports.grpc_asyncio",
+    "google.cloud.secretmanager_v1beta1.services.secret_manager_service.async_client",
+    "google.cloud.secretmanager_v1beta1.services.secret_manager_service.transports.grpc_asyncio",
+)
+
+
+def _parse(stderr):
+    """Returns the top-level cumulative time in us and the imported modules."""
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.append(name.strip())
+        # Nested imports are indented below their parent, and their time is
+        # already included in the parent's cumulative time.
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, modules
+
+
+def measure(statement, runs):
+    """Runs ``statement`` ``runs`` times in fresh interpreters."""
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    timings = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            env=env,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        total, modules = _parse(proc.stderr)
+        timings.append(total)
+    return {
+        "statement": statement,
+        "median_ms": statistics.median(timings) / 1000.0,
+        "min_ms": min(timings) / 1000.0,
+        "modules": len(modules),
+        "unwanted": []
+        if "Async" in statement
+        else sorted(set(UNWANTED_MODULES) & set(modules)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print JSON results.")
+    args = parser.parse_args()
+
+    results = [measure(statement, args.runs) for statement in STATEMENTS]
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    for result in results:
+        print(
+            "{median_ms:8.1f} ms (min {min_ms:6.1f}) {modules:5} modules  "
+            "{statement}".format(**result)
+        )
+        for name in result["unwanted"]:
+            print("    unexpectedly imported {}".format(name))
+
+
+if __name__ == "__main__":
+    main()
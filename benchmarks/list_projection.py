@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compares ListSecretsPager iteration with its projection mode.
+
+Pages are served from serialized responses, so each page is parsed as it
+would be off the wire. Each mode keeps the name and labels of every
+secret and runs in a fresh interpreter. The throughput and the growth of
+the peak resident set size are reported; RSS is used rather than
+tracemalloc because parsed protobuf messages live outside the Python
+allocator.
+
+Usage::
+
+    python benchmarks/list_projection.py [--secrets N] [--page-size N]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from google.protobuf import duration_pb2, timestamp_pb2
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import pagers
+from google.cloud.secretmanager_v1.types import resources, service
+
+
+def _serialized_pages(secrets, page_size):
+    pages = []
+    for start in range(0, secrets, page_size):
+        stop = min(start + page_size, secrets)
+        response = service.ListSecretsResponse(
+            secrets=[
+                resources.Secret(
+                    name="projects/bench/secrets/secret-{}".format(i),
+                    replication=resources.Replication(
+                        user_managed=resources.Replication.UserManaged(
+                            replicas=[
+                                resources.Replication.UserManaged.Replica(
+                                    location=location
+                                )
+                                for location in ("us-east1", "europe-west1")
+                            ]
+                        )
+                    ),
+                    create_time=timestamp_pb2.Timestamp(seconds=1600000000 + i),
+                    labels={"team": "team-{}".format(i % 50), "env": "prod"},
+                    topics=[resources.Topic(name="projects/bench/topics/rotate")],
+                    rotation=resources.Rotation(
+                        rotation_period=duration_pb2.Duration(seconds=86400),
+                    ),
+                    etag='"{}"'.format(i),
+                )
+                for i in range(start, stop)
+            ],
+            next_page_token=str(stop) if stop < secrets else "",
+        )
+        pages.append(service.ListSecretsResponse.serialize(response))
+    return pages
+
+
+def _pager(pages):
+    def method(request, metadata=()):
+        return service.ListSecretsResponse.deserialize(
+            pages[int(request.page_token) // page_size]
+        )
+
+    page_size = len(service.ListSecretsResponse.deserialize(pages[0]).secrets)
+    return pagers.ListSecretsPager(
+        method,
+        service.ListSecretsRequest(parent="projects/bench"),
+        service.ListSecretsResponse.deserialize(pages[0]),
+    )
+
+
+def _wrappers(pager):
+    return list(pager)
+
+
+def _full(pager):
+    return [(secret.name, dict(secret.labels)) for secret in pager]
+
+
+def _projected(pager):
+    return list(pager.project(["name", "labels"]))
+
+
+def _raw(pager):
+    return [(secret.name, dict(secret.labels)) for secret in pager.project()]
+
+
+MODES = {
+    "pager": _wrappers,
+    "pager(name, labels)": _full,
+    "project(fields)": _projected,
+    "project(raw)": _raw,
+}
+
+
+def _run_mode(mode, secrets, page_size):
+    pages = _serialized_pages(secrets, page_size)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = MODES[mode](_pager(pages))
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux.
+    print(
+        "{:<20} {:>9.0f} items/s {:>8.1f} MiB peak RSS growth".format(
+            mode, len(result) / elapsed, (after - before) / 1024
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--secrets", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=25000)
+    parser.add_argument("--mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run_mode(args.mode, args.secrets, args.page_size)
+        return
+    for mode in MODES:
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--secrets",
+                str(args.secrets),
+                "--page-size",
+                str(args.page_size),
+                "--mode",
+                mode,
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
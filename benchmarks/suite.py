@@ -0,0 +1,777 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Runs the client hot-path benchmarks and compares them to a baseline.
+
+Every benchmark runs against both ``secretmanager_v1`` and
+``secretmanager_v1beta1``, with the sync client and, where it applies,
+the async client:
+
+* ``request.*``: building a request from a dict, from keyword arguments
+  and from an existing request.
+* ``access_secret_version``: a full call through the gRPC transport to a
+  server on localhost. ``v1`` uses :class:`FakeSecretManagerServer`;
+  ``v1beta1`` uses a server returning a canned response.
+* ``pager.*``: iterating over 10k and 100k secrets, in pages of 1000.
+* ``parse_secret_version_path``: the path helper.
+* ``client_construction``: creating a client and its transport.
+* ``import.*``: cold import time, in a fresh interpreter.
+
+``v1`` also benchmarks the client features which ``v1beta1`` lacks:
+
+* ``payload.*``: reading a 64 KiB payload through proto-plus and through
+  :class:`SecretPayloadView`, as bytes, text and JSON.
+* ``crc32c.*``: the CRC32C implementations, and verifying a batch of
+  access results.
+* ``cache.*``: puts and hits of the in-memory, shared and on-disk caches,
+  and a hit on a shared entry this process has not decoded yet.
+* ``render_prometheus``: rendering a :class:`MetricsRecorder`.
+* ``fake_access.*``: ``access_secret_version`` through the in-process
+  fake service, without client options and with each of metrics, a
+  rate limiter, hedging, a circuit breaker and a retry policy.
+* ``circuit_breaker.open``: a call failing fast on an open circuit.
+* ``resolver.*``, ``bulk_destroy.*``, ``reconcile.*``: resolving ``sm://``
+  references, destroying versions and applying a secret manifest against
+  a fake service with a fixed latency per RPC, one RPC at a time and
+  with the concurrent helpers.
+
+Results are the best time per operation over several repeats, in
+microseconds. With ``--compare``, the run fails if any benchmark is
+slower than the baseline by more than ``--tolerance``. Baselines depend
+on the machine; regenerate them with ``--save`` when that changes.
+
+Usage::
+
+    python benchmarks/suite.py [--compare baseline.json] [--save baseline.json]
+        [--filter REGEX] [--tolerance 0.5] [--quick]
+"""
+import argparse
+import asyncio
+from concurrent import futures
+import importlib
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+
+from google.api_core import exceptions as core_exceptions
+from google.auth import credentials as ga_credentials
+import grpc
+
+import import_time
+
+VERSIONS = ("v1", "v1beta1")
+
+_SECRET = "projects/bench/secrets/secret"
+_VERSION = _SECRET + "/versions/1"
+_PAYLOAD = b"x" * 1024
+_PAGE_SIZE = 1000
+_PAGER_SIZES = (("10k", 10000), ("100k", 100000))
+
+
+class _Package:
+    """The modules of one API version."""
+
+    def __init__(self, version):
+        self.version = version
+        base = "google.cloud.secretmanager_" + version
+        self.package = base
+        self.service = importlib.import_module(base + ".types.service")
+        self.resources = importlib.import_module(base + ".types.resources")
+        prefix = base + ".services.secret_manager_service"
+        self.client_module = importlib.import_module(prefix + ".client")
+        self.async_client_module = importlib.import_module(prefix + ".async_client")
+        self.pagers = importlib.import_module(prefix + ".pagers")
+        self.transports = importlib.import_module(prefix + ".transports")
+        self._services = prefix
+
+    def feature(self, name):
+        """Returns a module of the client features, such as ``metrics``."""
+        return importlib.import_module(self._services + "." + name)
+
+    @property
+    def client_class(self):
+        return self.client_module.SecretManagerServiceClient
+
+    @property
+    def async_client_class(self):
+        return self.async_client_module.SecretManagerServiceAsyncClient
+
+
+def _best(func, number, repeat):
+    """Returns the best seconds per call of ``func``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+async def _best_async(func, number, repeat):
+    """Returns the best seconds per call of the coroutine function ``func``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def bench_requests(pkg, scale):
+    request_type = pkg.service.AccessSecretVersionRequest
+    list_type = pkg.service.ListSecretsRequest
+    existing = request_type(name=_VERSION)
+    number = int(20000 * scale) or 1
+    yield "request.access.dict", _best(
+        lambda: request_type({"name": _VERSION}), number, 5
+    )
+    yield "request.access.kwargs", _best(lambda: request_type(name=_VERSION), number, 5)
+    yield "request.access.object", _best(lambda: request_type(existing), number, 5)
+    yield "request.list.dict", _best(
+        lambda: list_type(
+            {"parent": "projects/bench", "page_size": 100, "page_token": "abc"}
+        ),
+        number,
+        5,
+    )
+
+
+def _canned_server(pkg):
+    """Serves a fixed ``AccessSecretVersion`` response on a local port."""
+    response_type = pkg.service.AccessSecretVersionResponse
+    response = response_type.serialize(
+        response_type(name=_VERSION, payload={"data": _PAYLOAD})
+    )
+    service_name = {
+        "v1": "google.cloud.secretmanager.v1.SecretManagerService",
+        "v1beta1": "google.cloud.secrets.v1beta1.SecretManagerService",
+    }[pkg.version]
+    handler = grpc.method_handlers_generic_handler(
+        service_name,
+        {
+            "AccessSecretVersion": grpc.unary_unary_rpc_method_handler(
+                lambda request, context: response,
+                request_deserializer=lambda data: data,
+                response_serializer=lambda data: data,
+            )
+        },
+    )
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, "localhost:{}".format(port)
+
+
+class _Server:
+    """Starts the local server used by the end-to-end benchmarks."""
+
+    def __init__(self, pkg):
+        self._pkg = pkg
+        self._fake_server = None
+        self._server = None
+
+    def __enter__(self):
+        if self._pkg.version == "v1":
+            from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+                FakeSecretManagerServer,
+            )
+
+            self._fake_server = FakeSecretManagerServer().start()
+            fake = self._fake_server.fake
+            fake.create_secret(
+                {
+                    "parent": "projects/bench",
+                    "secret_id": "secret",
+                    "secret": {"replication": {"automatic": {}}},
+                }
+            )
+            fake.add_secret_version({"parent": _SECRET, "payload": {"data": _PAYLOAD}})
+            return self._fake_server.target
+        self._server, target = _canned_server(self._pkg)
+        return target
+
+    def __exit__(self, *exc_info):
+        if self._fake_server is not None:
+            self._fake_server.stop()
+        if self._server is not None:
+            self._server.stop(None).wait()
+
+
+def bench_access_sync(pkg, scale):
+    with _Server(pkg) as target:
+        transport = pkg.transports.SecretManagerServiceGrpcTransport(
+            channel=grpc.insecure_channel(target)
+        )
+        client = pkg.client_class(transport=transport)
+        try:
+            client.access_secret_version(name=_VERSION)
+            yield "access_secret_version", _best(
+                lambda: client.access_secret_version(name=_VERSION),
+                int(1000 * scale) or 1,
+                3,
+            )
+        finally:
+            transport.grpc_channel.close()
+
+
+def bench_access_async(pkg, scale):
+    async def run():
+        client = pkg.async_client_class(
+            transport=pkg.transports.SecretManagerServiceGrpcAsyncIOTransport(
+                channel=grpc.aio.insecure_channel(target)
+            )
+        )
+        try:
+            await client.access_secret_version(name=_VERSION)
+            return await _best_async(
+                lambda: client.access_secret_version(name=_VERSION),
+                int(1000 * scale) or 1,
+                3,
+            )
+        finally:
+            await client.transport.grpc_channel.close()
+
+    with _Server(pkg) as target:
+        yield "access_secret_version", asyncio.run(run())
+
+
+def _pages(pkg, total):
+    pages = {}
+    secrets = [
+        pkg.resources.Secret(name="projects/bench/secrets/s{}".format(i))
+        for i in range(total)
+    ]
+    for start in range(0, total, _PAGE_SIZE):
+        token = str(start) if start else ""
+        end = start + _PAGE_SIZE
+        pages[token] = pkg.service.ListSecretsResponse(
+            secrets=secrets[start:end],
+            next_page_token=str(end) if end < total else "",
+        )
+    return pages
+
+
+def bench_pager_sync(pkg, scale):
+    for label, total in _PAGER_SIZES:
+        pages = _pages(pkg, int(total * scale) or 1)
+
+        def iterate():
+            pager = pkg.pagers.ListSecretsPager(
+                lambda request, metadata: pages[request.page_token],
+                pkg.service.ListSecretsRequest(parent="projects/bench"),
+                pages[""],
+            )
+            for _ in pager:
+                pass
+
+        yield "pager." + label, _best(iterate, 1, 3)
+
+
+def bench_pager_async(pkg, scale):
+    async def iterate_all(pages):
+        async def method(request, metadata):
+            return pages[request.page_token]
+
+        async def iterate():
+            pager = pkg.pagers.ListSecretsAsyncPager(
+                method,
+                pkg.service.ListSecretsRequest(parent="projects/bench"),
+                pages[""],
+            )
+            async for _ in pager:
+                pass
+
+        return await _best_async(iterate, 1, 3)
+
+    for label, total in _PAGER_SIZES:
+        pages = _pages(pkg, int(total * scale) or 1)
+        yield "pager." + label, asyncio.run(iterate_all(pages))
+
+
+def bench_parse_path(pkg, scale):
+    parse = pkg.client_class.parse_secret_version_path
+    yield "parse_secret_version_path", _best(
+        lambda: parse(_VERSION), int(50000 * scale) or 1, 5
+    )
+
+
+def bench_client_construction_sync(pkg, scale):
+    credentials = ga_credentials.AnonymousCredentials()
+
+    def construct():
+        pkg.client_class(credentials=credentials).transport.grpc_channel.close()
+
+    yield "client_construction", _best(construct, int(200 * scale) or 1, 3)
+
+
+def bench_client_construction_async(pkg, scale):
+    credentials = ga_credentials.AnonymousCredentials()
+
+    async def run():
+        async def construct():
+            client = pkg.async_client_class(credentials=credentials)
+            await client.transport.grpc_channel.close()
+
+        return await _best_async(construct, int(200 * scale) or 1, 3)
+
+    yield "client_construction", asyncio.run(run())
+
+
+def bench_import(pkg, scale):
+    runs = 3 if scale < 1 else 7
+    statements = (
+        ("import.package", "import {}".format(pkg.package)),
+        (
+            "import.client",
+            "from {} import SecretManagerServiceClient".format(pkg.package),
+        ),
+        (
+            "import.async_client",
+            # v1beta1 only exports the async client from its services package.
+            "from {}.services.secret_manager_service "
+            "import SecretManagerServiceAsyncClient".format(pkg.package),
+        ),
+    )
+    for label, statement in statements:
+        yield label, import_time.measure(statement, runs)["median_ms"] / 1000.0
+
+
+def _fake(pkg, latency=0.0, versions=1):
+    """Returns a fake service holding ``_SECRET`` with ``versions`` versions."""
+    fake = pkg.feature("fake").FakeSecretManagerService(latency=latency)
+    fake.create_secret(
+        {
+            "parent": "projects/bench",
+            "secret_id": "secret",
+            "secret": {"replication": {"automatic": {}}},
+        }
+    )
+    for _ in range(versions):
+        fake.add_secret_version({"parent": _SECRET, "payload": {"data": _PAYLOAD}})
+    return fake
+
+
+def bench_payload(pkg, scale):
+    payload = pkg.feature("payload")
+    # A JSON document, so that every access pattern can decode it.
+    document = json.dumps({"key": "x" * (64 * 1024 - 11)}).encode("ascii")
+    response = pkg.service.AccessSecretVersionResponse(
+        name=_VERSION, payload={"data": document}
+    )
+    view = payload.SecretPayloadView.of
+    number = int(20000 * scale) or 1
+    for label, func in (
+        ("bytes.proto_plus", lambda: response.payload.data),
+        ("bytes.view", lambda: view(response).data),
+        ("text.proto_plus", lambda: response.payload.data.decode()),
+        ("text.view", lambda: view(response).text()),
+        ("json.proto_plus", lambda: json.loads(response.payload.data)),
+        ("json.view", lambda: view(response).json()),
+    ):
+        yield "payload." + label, _best(func, number, 5)
+
+
+def bench_crc32c(pkg, scale):
+    checksum = pkg.feature("checksum")
+    batch = pkg.feature("batch")
+    data = os.urandom(4096)
+    number = int(200 * scale) or 1
+    yield "crc32c.python.4KiB", _best(lambda: checksum.python_crc32c(data), number, 3)
+    if checksum.IMPLEMENTATION == "c":
+        yield "crc32c.c.4KiB", _best(lambda: checksum.crc32c(data), number * 100, 3)
+    response = pkg.service.AccessSecretVersionResponse(
+        payload={"data": data, "data_crc32c": checksum.crc32c(data)}
+    )
+    results = [
+        batch.AccessSecretVersionResult(name=str(i), response=response)
+        for i in range(1000)
+    ]
+    yield "crc32c.verify_results.1000", _best(
+        lambda: checksum.verify_results(results), 1, 3
+    )
+
+
+def bench_caches(pkg, scale):
+    response = pkg.service.AccessSecretVersionResponse(
+        name=_VERSION, payload={"data": _PAYLOAD}
+    )
+    memory = pkg.feature("cache").SecretCache()
+    shared = pkg.feature("shared_cache").SharedSecretCache()
+    disk_cache = pkg.feature("disk_cache").DiskSecretCache
+    number = int(2000 * scale) or 1
+
+    def cold_get():
+        # As if another process had replaced the entry since the last read.
+        shared._decoded.clear()
+        return shared.get(_VERSION)
+
+    with tempfile.TemporaryDirectory() as directory:
+        disk = disk_cache(directory, disk_cache.generate_key())
+        for label, cache, puts in (
+            ("memory", memory, number),
+            ("shared", shared, number),
+            # Each put is written to disk and synced.
+            ("disk", disk, number // 100 or 1),
+        ):
+            yield "cache.{}.put".format(label), _best(
+                lambda: cache.put(_VERSION, response), puts, 3
+            )
+            yield "cache.{}.get".format(label), _best(
+                lambda: cache.get(_VERSION), number, 3
+            )
+        yield "cache.shared.cold_get", _best(cold_get, number, 3)
+        disk.close()
+    shared.close()
+
+
+def _time_fake_access(client, scale):
+    client.access_secret_version(name=_VERSION)
+    return _best(
+        lambda: client.access_secret_version(name=_VERSION), int(2000 * scale) or 1, 3
+    )
+
+
+def bench_fake_access(pkg, scale):
+    metrics = pkg.feature("metrics")
+    policy = pkg.feature("policy")
+    hedging = pkg.feature("hedging").HedgingPolicy()
+    options = (
+        ("plain", None),
+        ("metrics_hook", {"metrics": metrics.MetricsHook()}),
+        ("metrics_recorder", {"metrics": metrics.MetricsRecorder()}),
+        # A rate this loop does not reach, so that only the overhead of
+        # the limiter is timed.
+        (
+            "rate_limiter",
+            {"rate_limiter": pkg.feature("ratelimit").AdaptiveRateLimiter(rate=1e6)},
+        ),
+        ("hedging", {"hedging": hedging}),
+        (
+            "circuit_breaker",
+            {"circuit_breaker": pkg.feature("breaker").CircuitBreaker()},
+        ),
+        (
+            "retry_policy",
+            {
+                "retry_policy": policy.RetryPolicy(
+                    {"access_secret_version": policy.MethodPolicy(timeout=5.0)},
+                    budget=policy.RetryBudget(0.1),
+                )
+            },
+        ),
+    )
+    for label, client_options in options:
+        client = pkg.client_class(
+            transport=_fake(pkg).transport(), client_options=client_options
+        )
+        yield "fake_access." + label, _time_fake_access(client, scale)
+    hedging.close()
+
+
+def bench_circuit_open(pkg, scale):
+    breaker = pkg.feature("breaker").CircuitBreaker(min_calls=1)
+    fake = _fake(pkg)
+    client = pkg.client_class(
+        transport=fake.transport(), client_options={"circuit_breaker": breaker}
+    )
+    fake.inject_error(
+        "access_secret_version",
+        core_exceptions.ServiceUnavailable("Regional outage."),
+        times=None,
+    )
+
+    def fail():
+        try:
+            client.access_secret_version(name=_VERSION, retry=None)
+        except core_exceptions.GoogleAPICallError:
+            pass
+
+    fail()
+    assert breaker.stats().trips == 1
+    yield "circuit_breaker.open", _best(fail, int(2000 * scale) or 1, 3)
+
+
+def bench_render_prometheus(pkg, scale):
+    metrics = pkg.feature("metrics")
+    recorder = metrics.MetricsRecorder()
+    client = pkg.client_class(
+        transport=_fake(pkg).transport(), client_options={"metrics": recorder}
+    )
+    for _ in range(100):
+        client.access_secret_version(name=_VERSION)
+        client.get_secret(name=_SECRET)
+    yield "render_prometheus", _best(
+        lambda: metrics.render_prometheus(recorder), int(2000 * scale) or 1, 3
+    )
+
+
+def bench_resolver(pkg, scale):
+    resolver = pkg.feature("resolver")
+    count = int(48 * scale) or 1
+    # A quarter of the references repeat another one.
+    distinct = count - count // 4
+    fake = pkg.feature("fake").FakeSecretManagerService()
+    for i in range(distinct):
+        secret = "secret-{}".format(i)
+        fake.create_secret(
+            {
+                "parent": "projects/bench",
+                "secret_id": secret,
+                "secret": {"replication": {"automatic": {}}},
+            }
+        )
+        fake.add_secret_version(
+            {"parent": "projects/bench/secrets/" + secret, "payload": {"data": b"x"}}
+        )
+    fake.latency = 0.005
+    environ = {
+        "VAR_{}".format(i): "sm://bench/secret-{}".format(i % distinct)
+        for i in range(count)
+    }
+    client = pkg.client_class(transport=fake.transport())
+    secret_resolver = resolver.SecretResolver(client, max_concurrency=16)
+
+    def sequential():
+        for value in environ.values():
+            name = resolver.SecretReference.parse(value).name
+            client.access_secret_version(name=name).payload.data.decode()
+
+    yield "resolver.sequential", _best(sequential, 1, 3)
+    yield "resolver.resolve_mapping", _best(
+        lambda: secret_resolver.resolve_mapping(environ), 1, 3
+    )
+
+
+def bench_bulk_destroy(pkg, scale):
+    bulk = pkg.feature("bulk")
+    count = int(100 * scale) or 1
+
+    def client():
+        fake = _fake(pkg, latency=0.002, versions=count)
+        return pkg.client_class(transport=fake.transport())
+
+    def sequential():
+        destroying = client()
+        request = {"parent": _SECRET, "filter": "state:ENABLED"}
+        for version in destroying.list_secret_versions(request=request):
+            destroying.destroy_secret_version(
+                request={"name": version.name, "etag": version.etag}
+            )
+
+    def updater():
+        destroying = bulk.BulkVersionUpdater(client(), max_concurrency=32)
+        for result in destroying.destroy(parent=_SECRET, filter="state:ENABLED"):
+            assert result.changed, result
+
+    yield "bulk_destroy.sequential", _best(sequential, 1, 3)
+    yield "bulk_destroy.updater", _best(updater, 1, 3)
+
+
+def bench_reconcile(pkg, scale):
+    reconcile = pkg.feature("reconcile")
+    count = int(200 * scale) or 1
+    mask = ["labels", "topics", "rotation", "version_aliases"]
+    replication = {"automatic": {}}
+
+    def setup():
+        # Two in a hundred secrets are missing and two have drifted.
+        fake = pkg.feature("fake").FakeSecretManagerService(latency=0.001)
+        manifest = {}
+        for index in range(count):
+            secret_id = "secret-{:05d}".format(index)
+            labels = {"team": "payments", "index": str(index)}
+            manifest[secret_id] = {"replication": replication, "labels": labels}
+            if index % 50 == 0:
+                continue
+            if index % 50 == 1:
+                labels = dict(labels, team="billing")
+            fake.create_secret(
+                {
+                    "parent": "projects/bench",
+                    "secret_id": secret_id,
+                    "secret": {"replication": replication, "labels": labels},
+                }
+            )
+        return pkg.client_class(transport=fake.transport()), manifest
+
+    def one_by_one():
+        client, manifest = setup()
+        for secret_id, secret in manifest.items():
+            name = "projects/bench/secrets/" + secret_id
+            try:
+                current = client.get_secret(name=name)
+            except core_exceptions.NotFound:
+                client.create_secret(
+                    parent="projects/bench", secret_id=secret_id, secret=secret
+                )
+                continue
+            client.update_secret(
+                request={
+                    "secret": dict(secret, name=name, etag=current.etag),
+                    "update_mask": {"paths": mask},
+                }
+            )
+
+    def reconciler():
+        client, manifest = setup()
+        secret_reconciler = reconcile.SecretReconciler(
+            client, "projects/bench", max_concurrency=16
+        )
+        report = secret_reconciler.apply(secret_reconciler.plan(manifest))
+        assert not report.failed, report.summary()
+
+    yield "reconcile.one_by_one", _best(one_by_one, 1, 3)
+    yield "reconcile.reconciler", _best(reconciler, 1, 3)
+
+
+# Benchmarks by the client flavour they exercise and the group their
+# names start with. Benchmarks which do not involve a client instance are
+# reported under "common".
+BENCHMARKS = (
+    ("common", "request", bench_requests),
+    ("common", "parse_secret_version_path", bench_parse_path),
+    ("common", "import", bench_import),
+    ("sync", "access_secret_version", bench_access_sync),
+    ("sync", "pager", bench_pager_sync),
+    ("sync", "client_construction", bench_client_construction_sync),
+    ("async", "access_secret_version", bench_access_async),
+    ("async", "pager", bench_pager_async),
+    ("async", "client_construction", bench_client_construction_async),
+)
+
+# Benchmarks of the client features only ``v1`` has, in the same format.
+# They use the sync client on the in-process fake service, so that only
+# the client's own work is timed, or a fixed latency per RPC.
+V1_BENCHMARKS = (
+    ("common", "payload", bench_payload),
+    ("common", "crc32c", bench_crc32c),
+    ("common", "cache", bench_caches),
+    ("common", "render_prometheus", bench_render_prometheus),
+    ("sync", "fake_access", bench_fake_access),
+    ("sync", "circuit_breaker", bench_circuit_open),
+    ("sync", "resolver", bench_resolver),
+    ("sync", "bulk_destroy", bench_bulk_destroy),
+    ("sync", "reconcile", bench_reconcile),
+)
+
+
+def run(pattern=None, scale=1.0):
+    """Runs the benchmark groups whose names match ``pattern``.
+
+    Args:
+        pattern (Optional[str]): A regular expression searched for in
+            ``<version>.<flavour>.<group>``, such as ``v1.sync.pager``.
+        scale (float): Scales iteration counts and pager sizes.
+
+    Returns:
+        Dict[str, float]: Microseconds per operation, by benchmark name.
+    """
+    matcher = re.compile(pattern or "")
+    results = {}
+    for version in VERSIONS:
+        pkg = None
+        benchmarks = BENCHMARKS + (V1_BENCHMARKS if version == "v1" else ())
+        for flavour, group, bench in benchmarks:
+            prefix = "{}.{}.".format(version, flavour)
+            if not matcher.search(prefix + group):
+                continue
+            pkg = pkg or _Package(version)
+            for name, seconds in bench(pkg, scale):
+                name = prefix + name
+                results[name] = round(seconds * 1e6, 3)
+                print("{:<48} {:>14.3f} us".format(name, results[name]), flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the benchmarks which regressed against ``baseline``.
+
+    Args:
+        results (Dict[str, float]): The current results.
+        baseline (Dict[str, float]): The baseline results.
+        tolerance (float): The allowed slowdown, as a fraction.
+
+    Returns:
+        List[Tuple[str, float, float]]: The name, baseline and current
+            time of each regressed benchmark.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is not None and current > previous * (1 + tolerance):
+            regressions.append((name, previous, current))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--compare", metavar="PATH", help="Baseline JSON file.")
+    parser.add_argument("--save", metavar="PATH", help="Write results as JSON.")
+    parser.add_argument(
+        "--filter",
+        metavar="REGEX",
+        help="Run only the groups matching REGEX, such as v1.sync.pager.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed slowdown against the baseline, as a fraction.",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Run a tenth of the iterations; for smoke tests, not baselines.",
+    )
+    args = parser.parse_args()
+
+    results = run(args.filter, 0.1 if args.quick else 1.0)
+
+    if args.save:
+        document = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "unit": "us",
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.compare:
+        if not os.path.exists(args.compare):
+            sys.exit("Baseline {} does not exist".format(args.compare))
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, previous, current in regressions:
+            print(
+                "REGRESSION {}: {:.3f} us -> {:.3f} us ({:+.0%})".format(
+                    name, previous, current, current / previous - 1
+                )
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,44 +14,199 @@
 # limitations under the License.
 #
 
-from google.cloud.secretmanager_v1.services.secret_manager_service.async_client import (
-    SecretManagerServiceAsyncClient,
-)
-from google.cloud.secretmanager_v1.services.secret_manager_service.client import (
-    SecretManagerServiceClient,
-)
-from google.cloud.secretmanager_v1.types.resources import (
-    CustomerManagedEncryption,
-    CustomerManagedEncryptionStatus,
-    Replication,
-    ReplicationStatus,
-    Rotation,
-    Secret,
-    SecretPayload,
-    SecretVersion,
-    Topic,
-)
-from google.cloud.secretmanager_v1.types.service import (
-    AccessSecretVersionRequest,
-    AccessSecretVersionResponse,
-    AddSecretVersionRequest,
-    CreateSecretRequest,
-    DeleteSecretRequest,
-    DestroySecretVersionRequest,
-    DisableSecretVersionRequest,
-    EnableSecretVersionRequest,
-    GetSecretRequest,
-    GetSecretVersionRequest,
-    ListSecretsRequest,
-    ListSecretsResponse,
-    ListSecretVersionsRequest,
-    ListSecretVersionsResponse,
-    UpdateSecretRequest,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+from google.cloud.secretmanager import gapic_version as package_version
+
+__version__ = package_version.__version__
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from google.cloud.secretmanager_v1.services.secret_manager_service.async_client import (
+        SecretManagerServiceAsyncClient,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.batch import (
+        AccessSecretVersionResult,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.breaker import (
+        CircuitBreaker,
+        CircuitOpenError,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.bulk import (
+        AsyncBulkVersionUpdater,
+        BulkVersionResult,
+        BulkVersionUpdater,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.cache import (
+        CacheStats,
+        SecretCache,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.checksum import (
+        PayloadChecksumError,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.client import (
+        SecretManagerServiceClient,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.disk_cache import (
+        DiskSecretCache,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.hedging import (
+        HedgingPolicy,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.invalidation import (
+        AsyncCacheInvalidator,
+        CacheInvalidator,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.metrics import (
+        MetricsHook,
+        MetricsRecorder,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.payload import (
+        SecretPayloadView,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.policy import (
+        MethodPolicy,
+        RetryBudget,
+        RetryPolicy,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.ratelimit import (
+        AdaptiveRateLimiter,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.reconcile import (
+        AsyncSecretReconciler,
+        SecretReconciler,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.refresh import (
+        AsyncSecretRefresher,
+        SecretRefresher,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.resolver import (
+        AsyncSecretResolver,
+        SecretResolutionError,
+        SecretResolver,
+    )
+    from google.cloud.secretmanager_v1.services.secret_manager_service.shared_cache import (
+        SharedSecretCache,
+    )
+    from google.cloud.secretmanager_v1.types.resources import (
+        CustomerManagedEncryption,
+        CustomerManagedEncryptionStatus,
+        Replication,
+        ReplicationStatus,
+        Rotation,
+        Secret,
+        SecretPayload,
+        SecretVersion,
+        Topic,
+    )
+    from google.cloud.secretmanager_v1.types.service import (
+        AccessSecretVersionRequest,
+        AccessSecretVersionResponse,
+        AddSecretVersionRequest,
+        CreateSecretRequest,
+        DeleteSecretRequest,
+        DestroySecretVersionRequest,
+        DisableSecretVersionRequest,
+        EnableSecretVersionRequest,
+        GetSecretRequest,
+        GetSecretVersionRequest,
+        ListSecretsRequest,
+        ListSecretsResponse,
+        ListSecretVersionsRequest,
+        ListSecretVersionsResponse,
+        UpdateSecretRequest,
+    )
+
+# Maps each public name to the module which defines it. Modules are
+# imported on first attribute access (PEP 562), so importing this package
+# does not load the clients, their transports or the message types until
+# they are used.
+_LAZY_IMPORTS = {
+    "AccessSecretVersionRequest": "google.cloud.secretmanager_v1.types.service",
+    "AccessSecretVersionResponse": "google.cloud.secretmanager_v1.types.service",
+    "AccessSecretVersionResult": "google.cloud.secretmanager_v1.services.secret_manager_service.batch",
+    "AdaptiveRateLimiter": "google.cloud.secretmanager_v1.services.secret_manager_service.ratelimit",
+    "HedgingPolicy": "google.cloud.secretmanager_v1.services.secret_manager_service.hedging",
+    "CircuitBreaker": "google.cloud.secretmanager_v1.services.secret_manager_service.breaker",
+    "CircuitOpenError": "google.cloud.secretmanager_v1.services.secret_manager_service.breaker",
+    "MethodPolicy": "google.cloud.secretmanager_v1.services.secret_manager_service.policy",
+    "RetryBudget": "google.cloud.secretmanager_v1.services.secret_manager_service.policy",
+    "RetryPolicy": "google.cloud.secretmanager_v1.services.secret_manager_service.policy",
+    "AsyncBulkVersionUpdater": "google.cloud.secretmanager_v1.services.secret_manager_service.bulk",
+    "BulkVersionResult": "google.cloud.secretmanager_v1.services.secret_manager_service.bulk",
+    "BulkVersionUpdater": "google.cloud.secretmanager_v1.services.secret_manager_service.bulk",
+    "AsyncSecretReconciler": "google.cloud.secretmanager_v1.services.secret_manager_service.reconcile",
+    "SecretReconciler": "google.cloud.secretmanager_v1.services.secret_manager_service.reconcile",
+    "AddSecretVersionRequest": "google.cloud.secretmanager_v1.types.service",
+    "AsyncCacheInvalidator": "google.cloud.secretmanager_v1.services.secret_manager_service.invalidation",
+    "AsyncSecretRefresher": "google.cloud.secretmanager_v1.services.secret_manager_service.refresh",
+    "AsyncSecretResolver": "google.cloud.secretmanager_v1.services.secret_manager_service.resolver",
+    "CacheInvalidator": "google.cloud.secretmanager_v1.services.secret_manager_service.invalidation",
+    "CacheStats": "google.cloud.secretmanager_v1.services.secret_manager_service.cache",
+    "CreateSecretRequest": "google.cloud.secretmanager_v1.types.service",
+    "CustomerManagedEncryption": "google.cloud.secretmanager_v1.types.resources",
+    "CustomerManagedEncryptionStatus": "google.cloud.secretmanager_v1.types.resources",
+    "DeleteSecretRequest": "google.cloud.secretmanager_v1.types.service",
+    "DestroySecretVersionRequest": "google.cloud.secretmanager_v1.types.service",
+    "DisableSecretVersionRequest": "google.cloud.secretmanager_v1.types.service",
+    "DiskSecretCache": "google.cloud.secretmanager_v1.services.secret_manager_service.disk_cache",
+    "EnableSecretVersionRequest": "google.cloud.secretmanager_v1.types.service",
+    "GetSecretRequest": "google.cloud.secretmanager_v1.types.service",
+    "GetSecretVersionRequest": "google.cloud.secretmanager_v1.types.service",
+    "ListSecretsRequest": "google.cloud.secretmanager_v1.types.service",
+    "ListSecretsResponse": "google.cloud.secretmanager_v1.types.service",
+    "ListSecretVersionsRequest": "google.cloud.secretmanager_v1.types.service",
+    "ListSecretVersionsResponse": "google.cloud.secretmanager_v1.types.service",
+    "MetricsHook": "google.cloud.secretmanager_v1.services.secret_manager_service.metrics",
+    "MetricsRecorder": "google.cloud.secretmanager_v1.services.secret_manager_service.metrics",
+    "PayloadChecksumError": "google.cloud.secretmanager_v1.services.secret_manager_service.checksum",
+    "Replication": "google.cloud.secretmanager_v1.types.resources",
+    "ReplicationStatus": "google.cloud.secretmanager_v1.types.resources",
+    "Rotation": "google.cloud.secretmanager_v1.types.resources",
+    "Secret": "google.cloud.secretmanager_v1.types.resources",
+    "SecretCache": "google.cloud.secretmanager_v1.services.secret_manager_service.cache",
+    "SecretManagerServiceAsyncClient": "google.cloud.secretmanager_v1.services.secret_manager_service.async_client",
+    "SecretManagerServiceClient": "google.cloud.secretmanager_v1.services.secret_manager_service.client",
+    "SecretPayload": "google.cloud.secretmanager_v1.types.resources",
+    "SecretPayloadView": "google.cloud.secretmanager_v1.services.secret_manager_service.payload",
+    "SecretRefresher": "google.cloud.secretmanager_v1.services.secret_manager_service.refresh",
+    "SecretResolutionError": "google.cloud.secretmanager_v1.services.secret_manager_service.resolver",
+    "SecretResolver": "google.cloud.secretmanager_v1.services.secret_manager_service.resolver",
+    "SecretVersion": "google.cloud.secretmanager_v1.types.resources",
+    "SharedSecretCache": "google.cloud.secretmanager_v1.services.secret_manager_service.shared_cache",
+    "Topic": "google.cloud.secretmanager_v1.types.resources",
+    "UpdateSecretRequest": "google.cloud.secretmanager_v1.types.service",
+}
 
 __all__ = (
     "SecretManagerServiceClient",
     "SecretManagerServiceAsyncClient",
+    "AccessSecretVersionResult",
+    "CacheStats",
+    "SecretCache",
+    "AsyncCacheInvalidator",
+    "CacheInvalidator",
+    "SecretPayloadView",
+    "PayloadChecksumError",
+    "MetricsHook",
+    "MetricsRecorder",
+    "AdaptiveRateLimiter",
+    "HedgingPolicy",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "MethodPolicy",
+    "RetryBudget",
+    "RetryPolicy",
+    "AsyncBulkVersionUpdater",
+    "BulkVersionResult",
+    "BulkVersionUpdater",
+    "AsyncSecretReconciler",
+    "SecretReconciler",
+    "AsyncSecretRefresher",
+    "AsyncSecretResolver",
+    "SecretRefresher",
+    "SecretResolutionError",
+    "SecretResolver",
     "CustomerManagedEncryption",
     "CustomerManagedEncryptionStatus",
     "Replication",
@@ -60,6 +215,7 @@ __all__ = (
     "Secret",
     "SecretPayload",
     "SecretVersion",
+    "SharedSecretCache",
     "Topic",
     "AccessSecretVersionRequest",
     "AccessSecretVersionResponse",
@@ -68,6 +224,7 @@ __all__ = (
     "DeleteSecretRequest",
     "DestroySecretVersionRequest",
     "DisableSecretVersionRequest",
+    "DiskSecretCache",
     "EnableSecretVersionRequest",
     "GetSecretRequest",
     "GetSecretVersionRequest",
@@ -77,3 +234,17 @@ __all__ = (
     "ListSecretVersionsResponse",
     "UpdateSecretRequest",
 )
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cache the value so that later lookups do not go through __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
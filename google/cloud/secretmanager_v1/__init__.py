@@ -14,64 +14,221 @@
 # limitations under the License.
 #
 
-from .services.secret_manager_service import (
-    SecretManagerServiceAsyncClient,
-    SecretManagerServiceClient,
-)
-from .types.resources import (
-    CustomerManagedEncryption,
-    CustomerManagedEncryptionStatus,
-    Replication,
-    ReplicationStatus,
-    Rotation,
-    Secret,
-    SecretPayload,
-    SecretVersion,
-    Topic,
-)
-from .types.service import (
-    AccessSecretVersionRequest,
-    AccessSecretVersionResponse,
-    AddSecretVersionRequest,
-    CreateSecretRequest,
-    DeleteSecretRequest,
-    DestroySecretVersionRequest,
-    DisableSecretVersionRequest,
-    EnableSecretVersionRequest,
-    GetSecretRequest,
-    GetSecretVersionRequest,
-    ListSecretsRequest,
-    ListSecretsResponse,
-    ListSecretVersionsRequest,
-    ListSecretVersionsResponse,
-    UpdateSecretRequest,
+import importlib
+from typing import TYPE_CHECKING
+
+from google.cloud.secretmanager_v1 import gapic_version as package_version
+
+__version__ = package_version.__version__
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from .services.secret_manager_service import (
+        SecretManagerServiceAsyncClient,
+        SecretManagerServiceClient,
+    )
+    from .services.secret_manager_service.batch import AccessSecretVersionResult
+    from .services.secret_manager_service.breaker import (
+        CircuitBreaker,
+        CircuitOpenError,
+    )
+    from .services.secret_manager_service.bulk import (
+        AsyncBulkVersionUpdater,
+        BulkVersionResult,
+        BulkVersionUpdater,
+    )
+    from .services.secret_manager_service.cache import CacheStats, SecretCache
+    from .services.secret_manager_service.checksum import PayloadChecksumError
+    from .services.secret_manager_service.disk_cache import DiskSecretCache
+    from .services.secret_manager_service.hedging import HedgingPolicy
+    from .services.secret_manager_service.invalidation import (
+        AsyncCacheInvalidator,
+        CacheInvalidator,
+    )
+    from .services.secret_manager_service.metrics import MetricsHook, MetricsRecorder
+    from .services.secret_manager_service.payload import SecretPayloadView
+    from .services.secret_manager_service.policy import (
+        MethodPolicy,
+        RetryBudget,
+        RetryPolicy,
+    )
+    from .services.secret_manager_service.ratelimit import AdaptiveRateLimiter
+    from .services.secret_manager_service.reconcile import (
+        AsyncSecretReconciler,
+        SecretReconciler,
+    )
+    from .services.secret_manager_service.refresh import (
+        AsyncSecretRefresher,
+        SecretRefresher,
+    )
+    from .services.secret_manager_service.resolver import (
+        AsyncSecretResolver,
+        SecretResolutionError,
+        SecretResolver,
+    )
+    from .services.secret_manager_service.shared_cache import SharedSecretCache
+    from .types.resources import (
+        CustomerManagedEncryption,
+        CustomerManagedEncryptionStatus,
+        Replication,
+        ReplicationStatus,
+        Rotation,
+        Secret,
+        SecretPayload,
+        SecretVersion,
+        Topic,
+    )
+    from .types.service import (
+        AccessSecretVersionRequest,
+        AccessSecretVersionResponse,
+        AddSecretVersionRequest,
+        CreateSecretRequest,
+        DeleteSecretRequest,
+        DestroySecretVersionRequest,
+        DisableSecretVersionRequest,
+        EnableSecretVersionRequest,
+        GetSecretRequest,
+        GetSecretVersionRequest,
+        ListSecretsRequest,
+        ListSecretsResponse,
+        ListSecretVersionsRequest,
+        ListSecretVersionsResponse,
+        UpdateSecretRequest,
+    )
+
+# Maps each public name to the module which defines it. Modules are
+# imported on first attribute access (PEP 562), so importing this package
+# does not load the clients, their transports or the message types until
+# they are used.
+_LAZY_IMPORTS = {
+    "AccessSecretVersionRequest": ".types.service",
+    "AccessSecretVersionResponse": ".types.service",
+    "AccessSecretVersionResult": ".services.secret_manager_service.batch",
+    "AdaptiveRateLimiter": ".services.secret_manager_service.ratelimit",
+    "AddSecretVersionRequest": ".types.service",
+    "AsyncBulkVersionUpdater": ".services.secret_manager_service.bulk",
+    "AsyncCacheInvalidator": ".services.secret_manager_service.invalidation",
+    "AsyncSecretReconciler": ".services.secret_manager_service.reconcile",
+    "AsyncSecretRefresher": ".services.secret_manager_service.refresh",
+    "AsyncSecretResolver": ".services.secret_manager_service.resolver",
+    "BulkVersionResult": ".services.secret_manager_service.bulk",
+    "BulkVersionUpdater": ".services.secret_manager_service.bulk",
+    "CacheInvalidator": ".services.secret_manager_service.invalidation",
+    "CacheStats": ".services.secret_manager_service.cache",
+    "CircuitBreaker": ".services.secret_manager_service.breaker",
+    "CircuitOpenError": ".services.secret_manager_service.breaker",
+    "CreateSecretRequest": ".types.service",
+    "CustomerManagedEncryption": ".types.resources",
+    "CustomerManagedEncryptionStatus": ".types.resources",
+    "DeleteSecretRequest": ".types.service",
+    "DestroySecretVersionRequest": ".types.service",
+    "DisableSecretVersionRequest": ".types.service",
+    "DiskSecretCache": ".services.secret_manager_service.disk_cache",
+    "EnableSecretVersionRequest": ".types.service",
+    "GetSecretRequest": ".types.service",
+    "GetSecretVersionRequest": ".types.service",
+    "HedgingPolicy": ".services.secret_manager_service.hedging",
+    "ListSecretsRequest": ".types.service",
+    "ListSecretsResponse": ".types.service",
+    "ListSecretVersionsRequest": ".types.service",
+    "ListSecretVersionsResponse": ".types.service",
+    "MethodPolicy": ".services.secret_manager_service.policy",
+    "MetricsHook": ".services.secret_manager_service.metrics",
+    "MetricsRecorder": ".services.secret_manager_service.metrics",
+    "PayloadChecksumError": ".services.secret_manager_service.checksum",
+    "Replication": ".types.resources",
+    "ReplicationStatus": ".types.resources",
+    "RetryBudget": ".services.secret_manager_service.policy",
+    "RetryPolicy": ".services.secret_manager_service.policy",
+    "Rotation": ".types.resources",
+    "Secret": ".types.resources",
+    "SecretCache": ".services.secret_manager_service.cache",
+    "SecretManagerServiceAsyncClient": ".services.secret_manager_service",
+    "SecretManagerServiceClient": ".services.secret_manager_service",
+    "SecretPayload": ".types.resources",
+    "SecretPayloadView": ".services.secret_manager_service.payload",
+    "SecretReconciler": ".services.secret_manager_service.reconcile",
+    "SecretRefresher": ".services.secret_manager_service.refresh",
+    "SecretResolutionError": ".services.secret_manager_service.resolver",
+    "SecretResolver": ".services.secret_manager_service.resolver",
+    "SecretVersion": ".types.resources",
+    "SharedSecretCache": ".services.secret_manager_service.shared_cache",
+    "Topic": ".types.resources",
+    "UpdateSecretRequest": ".types.service",
+}
+_LAZY_SUBMODULES = (
+    "services",
+    "types",
 )
 
 __all__ = (
     "SecretManagerServiceAsyncClient",
     "AccessSecretVersionRequest",
     "AccessSecretVersionResponse",
+    "AccessSecretVersionResult",
+    "AdaptiveRateLimiter",
     "AddSecretVersionRequest",
+    "AsyncBulkVersionUpdater",
+    "AsyncCacheInvalidator",
+    "AsyncSecretReconciler",
+    "AsyncSecretRefresher",
+    "AsyncSecretResolver",
+    "BulkVersionResult",
+    "BulkVersionUpdater",
+    "CacheInvalidator",
+    "CacheStats",
+    "CircuitBreaker",
+    "CircuitOpenError",
     "CreateSecretRequest",
     "CustomerManagedEncryption",
     "CustomerManagedEncryptionStatus",
     "DeleteSecretRequest",
     "DestroySecretVersionRequest",
     "DisableSecretVersionRequest",
+    "DiskSecretCache",
     "EnableSecretVersionRequest",
     "GetSecretRequest",
     "GetSecretVersionRequest",
+    "HedgingPolicy",
     "ListSecretVersionsRequest",
     "ListSecretVersionsResponse",
     "ListSecretsRequest",
     "ListSecretsResponse",
+    "MethodPolicy",
+    "MetricsHook",
+    "MetricsRecorder",
+    "PayloadChecksumError",
     "Replication",
     "ReplicationStatus",
+    "RetryBudget",
+    "RetryPolicy",
     "Rotation",
     "Secret",
+    "SecretCache",
     "SecretManagerServiceClient",
     "SecretPayload",
+    "SecretPayloadView",
+    "SecretReconciler",
+    "SecretRefresher",
+    "SecretResolutionError",
+    "SecretResolver",
     "SecretVersion",
+    "SharedSecretCache",
     "Topic",
     "UpdateSecretRequest",
 )
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cache the value so that later lookups do not go through __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -13,10 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import asyncio
 from collections import OrderedDict
 import functools
 import re
-from typing import Dict, Mapping, Optional, Sequence, Tuple, Type, Union
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 from google.api_core import exceptions as core_exceptions
 from google.api_core import gapic_v1
@@ -24,7 +35,6 @@ from google.api_core import retry as retries
 from google.api_core.client_options import ClientOptions
 from google.auth import credentials as ga_credentials  # type: ignore
 from google.oauth2 import service_account  # type: ignore
-import pkg_resources
 
 try:
     OptionalRetry = Union[retries.Retry, gapic_v1.method._MethodDefault]
@@ -37,10 +47,14 @@ from google.protobuf import duration_pb2  # type: ignore
 from google.protobuf import field_mask_pb2  # type: ignore
 from google.protobuf import timestamp_pb2  # type: ignore
 
+from google.cloud.secretmanager_v1 import gapic_version as package_version
 from google.cloud.secretmanager_v1.services.secret_manager_service import pagers
 from google.cloud.secretmanager_v1.types import resources, service
 
+from . import checksum
+from .batch import DEFAULT_MAX_CONCURRENCY, AccessSecretVersionResult
 from .client import SecretManagerServiceClient
+from .singleflight import AsyncSingleFlight, request_key
 from .transports.base import DEFAULT_CLIENT_INFO, SecretManagerServiceTransport
 from .transports.grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
 
@@ -211,6 +225,55 @@ class SecretManagerServiceAsyncClient:
                 not provided, the default SSL client certificate will be used if
                 present. If GOOGLE_API_USE_CLIENT_CERTIFICATE is "false" or not
                 set, no client certificate will be used.
+                (3) The ``secret_cache`` option can be set to a
+                :class:`~.cache.SecretCache` to serve repeated
+                ``access_secret_version`` calls from memory. It takes
+                effect even if a ``transport`` instance is provided.
+                A :class:`~.shared_cache.SharedSecretCache` shares the
+                cached responses between processes.
+                (4) If the ``coalesce_requests`` option is true, concurrent
+                ``access_secret_version`` calls with the same name and
+                metadata share a single RPC and its result or exception.
+                (5) The ``channel_pool_size`` option sets the number of
+                channels opened by the ``grpc_pooled_asyncio`` transport.
+                (6) If the ``payload_checksums`` option is true,
+                ``add_secret_version`` sets the payload's ``data_crc32c``
+                when it is not set, and ``access_secret_version`` raises
+                :class:`~.checksum.PayloadChecksumError` if a payload does
+                not match its checksum.
+                (7) The ``disk_cache`` option can be set to a
+                :class:`~.disk_cache.DiskSecretCache` to keep
+                ``access_secret_version`` responses, encrypted, across
+                process restarts. Numbered versions are served from disk
+                without an RPC; aliases such as ``latest`` are served from
+                disk and revalidated in the background.
+                (8) The ``metrics`` option can be set to a
+                :class:`~.metrics.MetricsHook`, such as a
+                :class:`~.metrics.MetricsRecorder`, to receive the latency,
+                attempts, status codes, message sizes and marshalling time
+                of every RPC. It takes effect even if a ``transport``
+                instance is provided.
+                (9) The ``rate_limiter`` option can be set to an
+                :class:`~.ratelimit.AdaptiveRateLimiter` to pace RPCs on
+                the client, slowing down when the server responds with
+                ``ResourceExhausted``. It takes effect even if a
+                ``transport`` instance is provided.
+                (10) The ``hedging`` option can be set to a
+                :class:`~.hedging.HedgingPolicy` to send a second attempt
+                of reads which are slower than a percentile of recent
+                attempts, and use the first response. It takes effect
+                even if a ``transport`` instance is provided.
+                (11) The ``circuit_breaker`` option can be set to a
+                :class:`~.breaker.CircuitBreaker` to fail RPCs fast while
+                the service is failing, and to have
+                ``access_secret_version`` return the last good response
+                meanwhile. It takes effect even if a ``transport``
+                instance is provided.
+                (12) The ``retry_policy`` option can be set to a
+                :class:`~.policy.RetryPolicy` to set the default timeout,
+                retried errors, backoff and deadline of each method, and
+                to limit retries with a :class:`~.policy.RetryBudget`. It
+                takes effect even if a ``transport`` instance is provided.
 
         Raises:
             google.auth.exceptions.MutualTlsChannelError: If mutual TLS transport
@@ -222,6 +285,9 @@ class SecretManagerServiceAsyncClient:
             client_options=client_options,
             client_info=client_info,
         )
+        self._access_flight = (
+            AsyncSingleFlight() if self._client._coalesce_requests else None
+        )
 
     async def list_secrets(
         self,
@@ -231,6 +297,7 @@ class SecretManagerServiceAsyncClient:
         retry: OptionalRetry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0,
     ) -> pagers.ListSecretsAsyncPager:
         r"""Lists [Secrets][google.cloud.secretmanager.v1.Secret].
 
@@ -272,6 +339,9 @@ class SecretManagerServiceAsyncClient:
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, the pager fetches up to
+                this many pages ahead in the background while the current
+                page is being consumed.
 
         Returns:
             google.cloud.secretmanager_v1.services.secret_manager_service.pagers.ListSecretsAsyncPager:
@@ -301,11 +371,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.list_secrets,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.list_secrets
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -328,6 +396,7 @@ class SecretManagerServiceAsyncClient:
             request=request,
             response=response,
             metadata=metadata,
+            prefetch_pages=prefetch_pages,
         )
 
         # Done; return the response.
@@ -439,11 +508,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.create_secret,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.create_secret
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -548,13 +615,15 @@ class SecretManagerServiceAsyncClient:
         if payload is not None:
             request.payload = payload
 
+        # Let the service detect payloads corrupted in transit.
+        if self._client._payload_checksums:
+            request = checksum.with_checksum(request)
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.add_secret_version,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.add_secret_version
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -652,11 +721,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.get_secret,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.get_secret
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -762,11 +829,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.update_secret,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.update_secret
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -851,11 +916,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.delete_secret,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.delete_secret
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -879,6 +942,7 @@ class SecretManagerServiceAsyncClient:
         retry: OptionalRetry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0,
     ) -> pagers.ListSecretVersionsAsyncPager:
         r"""Lists
         [SecretVersions][google.cloud.secretmanager.v1.SecretVersion].
@@ -923,6 +987,9 @@ class SecretManagerServiceAsyncClient:
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, the pager fetches up to
+                this many pages ahead in the background while the current
+                page is being consumed.
 
         Returns:
             google.cloud.secretmanager_v1.services.secret_manager_service.pagers.ListSecretVersionsAsyncPager:
@@ -952,11 +1019,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.list_secret_versions,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.list_secret_versions
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -979,6 +1044,7 @@ class SecretManagerServiceAsyncClient:
             request=request,
             response=response,
             metadata=metadata,
+            prefetch_pages=prefetch_pages,
         )
 
         # Done; return the response.
@@ -1066,11 +1132,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.get_secret_version,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.get_secret_version
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1170,23 +1234,18 @@ class SecretManagerServiceAsyncClient:
         if name is not None:
             request.name = name
 
+        # Serve the response from the secret cache, if one is configured.
+        cache = self._client._secret_cache
+        if cache is not None:
+            cached = cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.access_secret_version,
-            default_retry=retries.Retry(
-                initial=2.0,
-                maximum=60.0,
-                multiplier=2.0,
-                predicate=retries.if_exception_type(
-                    core_exceptions.ResourceExhausted,
-                    core_exceptions.ServiceUnavailable,
-                ),
-                deadline=60.0,
-            ),
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.access_secret_version
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1194,16 +1253,146 @@ class SecretManagerServiceAsyncClient:
             gapic_v1.routing_header.to_grpc_metadata((("name", request.name),)),
         )
 
-        # Send the request.
-        response = await rpc(
+        # Send the request. Identical concurrent requests share one RPC if
+        # request coalescing is enabled.
+        send = functools.partial(
+            rpc,
             request,
             retry=retry,
             timeout=timeout,
             metadata=metadata,
         )
+        disk_cache = self._client._disk_cache
+
+        async def fetch() -> service.AccessSecretVersionResponse:
+            if self._access_flight is not None:
+                response = await self._access_flight.do(
+                    request_key(request.name, metadata), send
+                )
+            else:
+                response = await send()
+
+            # Cache hits are not verified, so verify before caching.
+            if self._client._payload_checksums:
+                checksum.verify_response(response)
+
+            if cache is not None:
+                cache.put(request.name, response)
+            if disk_cache is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, disk_cache.put, request.name, response
+                )
+            return response
+
+        # Serve the response from the disk cache, if one is configured.
+        # Aliases such as ``latest`` are refreshed in the background once
+        # they are old enough. Disk access runs in the default executor so
+        # that it does not block the event loop.
+        if disk_cache is not None:
+            entry = await asyncio.get_running_loop().run_in_executor(
+                None, disk_cache.get, request.name
+            )
+            if entry is not None:
+                if entry.stale:
+                    disk_cache.revalidate_async(request.name, fetch)
+                if cache is not None:
+                    cache.put(request.name, entry.response)
+                return entry.response
+
+        # While the circuit is open, serve the last good response instead.
+        breaker = self._client._circuit_breaker
+        if breaker is not None:
+            return await breaker.serve_stale_async(request.name, fetch)
 
         # Done; return the response.
-        return response
+        return await fetch()
+
+    async def access_secret_versions(
+        self,
+        names: Iterable[str],
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        retry: OptionalRetry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> List[AccessSecretVersionResult]:
+        r"""Accesses many
+        [SecretVersions][google.cloud.secretmanager.v1.SecretVersion]
+        concurrently.
+
+        Each version is accessed with
+        :meth:`access_secret_version` in its own task; a semaphore keeps
+        at most ``max_concurrency`` requests in flight. A failure to
+        access one version does not affect the others; it is reported in
+        the corresponding result instead of being raised. Names that
+        appear more than once are only accessed once.
+
+        .. code-block:: python
+
+            from google.cloud import secretmanager_v1
+
+            async def sample_access_secret_versions():
+                # Create a client
+                client = secretmanager_v1.SecretManagerServiceAsyncClient()
+
+                # Make the requests
+                results = await client.access_secret_versions(
+                    ["name_value_1", "name_value_2"],
+                    max_concurrency=8,
+                )
+
+                # Handle the responses
+                for result in results:
+                    if result.ok:
+                        print(result.response)
+                    else:
+                        print(result.error)
+
+        Args:
+            names (Iterable[str]):
+                The resource names of the
+                [SecretVersions][google.cloud.secretmanager.v1.SecretVersion]
+                in the format ``projects/*/secrets/*/versions/*``.
+            max_concurrency (int): The maximum number of requests in
+                flight at once.
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            List[google.cloud.secretmanager_v1.services.secret_manager_service.batch.AccessSecretVersionResult]:
+                One result per name, in the order given.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        names = list(names)
+        unique_names = list(dict.fromkeys(names))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def access(name: str) -> AccessSecretVersionResult:
+            async with semaphore:
+                try:
+                    response = await self.access_secret_version(
+                        name=name,
+                        retry=retry,
+                        timeout=timeout,
+                        metadata=metadata,
+                    )
+                except Exception as exc:
+                    return AccessSecretVersionResult(name=name, error=exc)
+            return AccessSecretVersionResult(name=name, response=response)
+
+        results = dict(
+            zip(
+                unique_names,
+                await asyncio.gather(*[access(name) for name in unique_names]),
+            )
+        )
+
+        return [results[name] for name in names]
 
     async def disable_secret_version(
         self,
@@ -1286,11 +1475,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.disable_secret_version,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.disable_secret_version
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1306,6 +1493,9 @@ class SecretManagerServiceAsyncClient:
             metadata=metadata,
         )
 
+        # The version can no longer be accessed; drop any cached payloads.
+        self._client._invalidate_cached_versions(request.name)
+
         # Done; return the response.
         return response
 
@@ -1390,11 +1580,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.enable_secret_version,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.enable_secret_version
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1495,11 +1683,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.destroy_secret_version,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.destroy_secret_version
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1515,6 +1701,9 @@ class SecretManagerServiceAsyncClient:
             metadata=metadata,
         )
 
+        # The version can no longer be accessed; drop any cached payloads.
+        self._client._invalidate_cached_versions(request.name)
+
         # Done; return the response.
         return response
 
@@ -1637,11 +1826,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.set_iam_policy,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.set_iam_policy
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1775,11 +1962,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.get_iam_policy,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.get_iam_policy
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1858,11 +2043,9 @@ class SecretManagerServiceAsyncClient:
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.test_iam_permissions,
-            default_timeout=60.0,
-            client_info=DEFAULT_CLIENT_INFO,
-        )
+        rpc = self._client._transport._wrapped_methods[
+            self._client._transport.test_iam_permissions
+        ]
 
         # Certain fields should be provided within the metadata header;
         # add these here.
@@ -1888,14 +2071,9 @@ class SecretManagerServiceAsyncClient:
         await self.transport.close()
 
 
-try:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
-        gapic_version=pkg_resources.get_distribution(
-            "google-cloud-secret-manager",
-        ).version,
-    )
-except pkg_resources.DistributionNotFound:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo()
+DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
+    gapic_version=package_version.__version__
+)
 
 
 __all__ = ("SecretManagerServiceAsyncClient",)
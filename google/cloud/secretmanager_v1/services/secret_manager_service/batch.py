@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from typing import NamedTuple, Optional
+
+from google.cloud.secretmanager_v1.types import service
+
+# The number of requests a batch keeps in flight unless told otherwise.
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class AccessSecretVersionResult(NamedTuple):
+    """The outcome of accessing one secret version in a batch.
+
+    Exactly one of ``response`` and ``error`` is set.
+
+    Attributes:
+        name (str): The secret version name, as given in the batch.
+        response (Optional[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse]):
+            The response, if the version was accessed successfully.
+        error (Optional[Exception]): The error raised while accessing
+            the version, if any; usually a
+            :class:`google.api_core.exceptions.GoogleAPIError`.
+    """
+
+    name: str
+    response: Optional[service.AccessSecretVersionResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """bool: Whether the version was accessed successfully."""
+        return self.error is None
+
+
+__all__ = (
+    "AccessSecretVersionResult",
+    "DEFAULT_MAX_CONCURRENCY",
+)
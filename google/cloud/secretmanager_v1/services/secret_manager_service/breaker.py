@@ -0,0 +1,565 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""A client-side circuit breaker for Secret Manager RPCs."""
+from collections import OrderedDict, deque
+import http.client
+import logging
+import threading
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from google.api_core import exceptions as core_exceptions
+import grpc  # type: ignore
+from grpc.experimental import aio  # type: ignore
+
+from google.cloud.secretmanager_v1.types import service
+
+from .cache import SecretCache
+from .metrics import status_code
+
+_LOGGER = logging.getLogger(__name__)
+
+# Status codes which suggest that the service, rather than the request, is
+# at fault.
+DEFAULT_FAILURE_CODES = frozenset(
+    ("UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "UNKNOWN")
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(core_exceptions.GoogleAPICallError):
+    """Raised instead of sending an attempt while its circuit is open.
+
+    It is not a :class:`~google.api_core.exceptions.ServiceUnavailable`,
+    so the default retry policies do not retry it and the call fails at
+    once.
+
+    Attributes:
+        method (str): The RPC, such as ``access_secret_version``.
+        endpoint (str): The host the RPC was for.
+        retry_after (float): Seconds until the circuit lets a probe
+            through.
+    """
+
+    code = http.client.SERVICE_UNAVAILABLE
+    grpc_status_code = grpc.StatusCode.UNAVAILABLE
+
+    def __init__(self, method: str, endpoint: str, retry_after: float):
+        super().__init__(
+            "Circuit for {} on {} is open; failing fast for {:.1f} s.".format(
+                method, endpoint or "the transport", retry_after
+            )
+        )
+        self.method = method
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class StaleResponse(NamedTuple):
+    """The last good response for a version name, and its age.
+
+    Attributes:
+        response (google.cloud.secretmanager_v1.types.AccessSecretVersionResponse):
+            The response.
+        age (float): Seconds since it was received.
+    """
+
+    response: service.AccessSecretVersionResponse
+    age: float
+
+
+class CircuitBreakerStats(NamedTuple):
+    """A point-in-time snapshot of :class:`CircuitBreaker` counters."""
+
+    trips: int
+    rejections: int
+    stale_served: int
+
+
+class _Circuit:
+    """The state of one method on one endpoint."""
+
+    __slots__ = ("state", "outcomes", "failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.outcomes = deque()  # type: deque
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """Fails RPCs fast while the service is failing, instead of waiting.
+
+    Each method has a circuit per endpoint. A circuit is closed at first,
+    and every attempt through it is recorded as a success or a failure:
+    an error with one of ``failure_codes``, or a response which took
+    longer than ``slow_call_seconds``. Once at least ``min_calls`` of the
+    last ``window`` attempts in the last ``window_seconds`` are known,
+    and the fraction which failed reaches ``failure_threshold``, the
+    circuit opens.
+
+    While a circuit is open, its attempts raise :class:`CircuitOpenError`
+    without being sent, which ends the call at once instead of retrying
+    until the call's timeout. After ``open_seconds`` the circuit is half
+    open: a single attempt is let through as a probe, and the others
+    still fail fast. The circuit closes if the probe succeeds and opens
+    again if it fails.
+
+    Unless ``serve_stale`` is false, ``access_secret_version`` returns the
+    last good response for the version name instead of raising
+    :class:`CircuitOpenError`, if it has one no older than
+    ``max_stale_age``. Its age is passed to ``on_stale`` and returned by
+    :meth:`last_good`. Clients do this through :meth:`serve_stale`.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        breaker = secretmanager_v1.CircuitBreaker(open_seconds=30.0)
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"circuit_breaker": breaker},
+        )
+
+    One breaker may be shared by several clients, sync or async, so that
+    they share their circuits and last good responses.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: float = 0.5,
+        slow_call_seconds: Optional[float] = 5.0,
+        window: int = 100,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        failure_codes: Iterable[str] = DEFAULT_FAILURE_CODES,
+        serve_stale: bool = True,
+        max_stale_age: Optional[float] = None,
+        max_stale_entries: int = 1024,
+        on_stale: Optional[Callable[[str, StaleResponse], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Instantiate the breaker.
+
+        Args:
+            failure_threshold (float): The fraction of failed attempts, at
+                most 1, at which a circuit opens.
+            slow_call_seconds (Optional[float]): Attempts which take longer
+                than this count as failures, even if they succeed. If
+                ``None``, only errors count.
+            window (int): The number of recent attempts considered.
+            window_seconds (float): Attempts older than this are no longer
+                considered.
+            min_calls (int): The number of recent attempts needed before a
+                circuit may open.
+            open_seconds (float): Seconds a circuit stays open before it
+                lets a probe through.
+            failure_codes (Iterable[str]): The ``grpc.StatusCode`` names of
+                errors which count as failures. Other errors, such as
+                ``NOT_FOUND``, count as successes.
+            serve_stale (bool): Whether ``access_secret_version`` returns
+                the last good response while the circuit is open.
+            max_stale_age (Optional[float]): The oldest response, in
+                seconds, which is served. If ``None``, any age is served.
+            max_stale_entries (int): The number of version names whose last
+                good response is kept.
+            on_stale (Optional[Callable[[str, StaleResponse], None]]):
+                Called with the version name and the response whenever a
+                stale response is served.
+            clock (Callable[[], float]): A monotonic clock, in seconds.
+        """
+        if not 0 < failure_threshold <= 1:
+            raise ValueError("failure_threshold must be between 0 and 1")
+        if window <= 0 or min_calls <= 0:
+            raise ValueError("window and min_calls must be positive")
+        if max_stale_entries <= 0:
+            raise ValueError("max_stale_entries must be positive")
+        self._failure_threshold = failure_threshold
+        self._slow_call_seconds = slow_call_seconds
+        self._window = window
+        self._window_seconds = window_seconds
+        self._min_calls = min(min_calls, window)
+        self._open_seconds = open_seconds
+        self._failure_codes = frozenset(failure_codes)
+        self._serve_stale = serve_stale
+        self._max_stale_age = max_stale_age
+        self._max_stale_entries = max_stale_entries
+        self._on_stale = on_stale
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._circuits = {}  # type: Dict[Tuple[str, str], _Circuit]
+        self._last_good = OrderedDict()  # type: OrderedDict[str, Tuple[object, float]]
+        self._trips = 0
+        self._rejections = 0
+        self._stale_served = 0
+
+    def state(self, method: str, endpoint: str = "") -> str:
+        """Returns the state of a circuit: ``"closed"``, ``"open"`` or
+        ``"half_open"``.
+
+        Args:
+            method (str): The RPC, such as ``access_secret_version``.
+            endpoint (str): The host the RPC is for.
+        """
+        with self._lock:
+            circuit = self._circuits.get((endpoint, method))
+            if circuit is None:
+                return CLOSED
+            if (
+                circuit.state == OPEN
+                and self._clock() - circuit.opened_at >= self._open_seconds
+            ):
+                return HALF_OPEN
+            return circuit.state
+
+    def last_good(self, name: str) -> Optional[StaleResponse]:
+        """Returns the last good response for a version name.
+
+        Args:
+            name (str): The secret version name used in the request.
+
+        Returns:
+            Optional[StaleResponse]: The response and its age, or ``None``
+            if there is none, or it is older than ``max_stale_age``.
+        """
+        with self._lock:
+            entry = self._last_good.get(name)
+            if entry is None:
+                return None
+            response, received = entry
+            age = self._clock() - received
+        if self._max_stale_age is not None and age > self._max_stale_age:
+            return None
+        return StaleResponse(response, age)
+
+    def invalidate(self, name: str) -> None:
+        """Forgets the last good response for ``name``, if any."""
+        with self._lock:
+            self._last_good.pop(name, None)
+
+    def invalidate_secret(self, secret: str) -> None:
+        """Forgets the last good responses of every version of a secret.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+        """
+        prefix = secret.rstrip("/") + "/versions/"
+        with self._lock:
+            for name in [n for n in self._last_good if n.startswith(prefix)]:
+                del self._last_good[name]
+
+    def invalidate_aliases(self, secret: str) -> List[str]:
+        """Forgets the last good responses of a secret's aliases, such as
+        ``latest``.
+
+        Numbered versions are kept.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+
+        Returns:
+            List[str]: The names which were forgotten.
+        """
+        prefix = secret.rstrip("/") + "/versions/"
+        with self._lock:
+            names = [
+                n
+                for n in self._last_good
+                if n.startswith(prefix) and not SecretCache.is_pinned(n)
+            ]
+            for name in names:
+                del self._last_good[name]
+        return names
+
+    def stats(self) -> CircuitBreakerStats:
+        """Returns a snapshot of the breaker's counters."""
+        with self._lock:
+            return CircuitBreakerStats(
+                self._trips, self._rejections, self._stale_served
+            )
+
+    def _allow(self, method: str, endpoint: str) -> Tuple[_Circuit, bool]:
+        """Returns the circuit an attempt may go through, and whether the
+        attempt is the probe of a half-open circuit."""
+        with self._lock:
+            key = (endpoint, method)
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                circuit = self._circuits[key] = _Circuit()
+            if circuit.state == CLOSED:
+                return circuit, False
+            retry_after = circuit.opened_at + self._open_seconds - self._clock()
+            if circuit.state == OPEN and retry_after <= 0:
+                circuit.state = HALF_OPEN
+            if circuit.state == HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+                return circuit, True
+            self._rejections += 1
+        raise CircuitOpenError(method, endpoint, max(0.0, retry_after))
+
+    def _record(
+        self,
+        circuit: _Circuit,
+        method: str,
+        endpoint: str,
+        failed: Optional[bool],
+        probe: bool = False,
+    ) -> None:
+        """Records the outcome of an attempt, or ``None`` if it was
+        cancelled before it had one.
+
+        Only the outcome of the probe decides whether a half-open circuit
+        closes or opens again.
+        """
+        with self._lock:
+            now = self._clock()
+            if probe:
+                circuit.probing = False
+                if failed is None:
+                    return
+                if failed:
+                    self._open(circuit, now)
+                    _LOGGER.warning(
+                        "Probe of %s on %s failed; circuit reopened.",
+                        method,
+                        endpoint,
+                    )
+                else:
+                    circuit.state = CLOSED
+                    circuit.outcomes.clear()
+                    circuit.failures = 0
+                    _LOGGER.info("Circuit for %s on %s closed.", method, endpoint)
+                return
+            if circuit.state != CLOSED or failed is None:
+                # Attempts sent before the circuit opened.
+                return
+            outcomes = circuit.outcomes
+            outcomes.append((now, failed))
+            circuit.failures += failed
+            while outcomes and (
+                len(outcomes) > self._window
+                or now - outcomes[0][0] > self._window_seconds
+            ):
+                circuit.failures -= outcomes.popleft()[1]
+            failures, total = circuit.failures, len(outcomes)
+            if total >= self._min_calls and failures >= self._failure_threshold * total:
+                self._open(circuit, now)
+                _LOGGER.warning(
+                    "Circuit for %s on %s opened after %d of %d attempts failed.",
+                    method,
+                    endpoint,
+                    failures,
+                    total,
+                )
+
+    def _open(self, circuit: _Circuit, now: float) -> None:
+        circuit.state = OPEN
+        circuit.opened_at = now
+        circuit.outcomes.clear()
+        circuit.failures = 0
+        self._trips += 1
+
+    def _failed(self, exc: Optional[BaseException], latency: float) -> bool:
+        if exc is not None:
+            return status_code(exc) in self._failure_codes
+        return self._slow_call_seconds is not None and latency > self._slow_call_seconds
+
+    def _remember(self, name: str, response) -> None:
+        with self._lock:
+            self._last_good[name] = (response, self._clock())
+            self._last_good.move_to_end(name)
+            while len(self._last_good) > self._max_stale_entries:
+                self._last_good.popitem(last=False)
+
+    def _stale(self, name: str, error: CircuitOpenError):
+        stale = self.last_good(name) if self._serve_stale else None
+        if stale is None:
+            raise error
+        with self._lock:
+            self._stale_served += 1
+        if self._on_stale is not None:
+            self._on_stale(name, stale)
+        return stale.response
+
+    def serve_stale(
+        self, name: str, fetch: Callable[[], service.AccessSecretVersionResponse]
+    ) -> service.AccessSecretVersionResponse:
+        """Calls ``fetch``, serving the last good response for ``name``
+        instead if its circuit is open.
+
+        Clients configured with this breaker call this for
+        ``access_secret_version``; it is public so that other callers of
+        a guarded transport can do the same.
+
+        Args:
+            name (str): The secret version name used in the request.
+            fetch (Callable[[], google.cloud.secretmanager_v1.types.AccessSecretVersionResponse]):
+                Accesses the version through a guarded transport.
+
+        Returns:
+            google.cloud.secretmanager_v1.types.AccessSecretVersionResponse:
+                The response of ``fetch``, which is remembered as the last
+                good response, or the last good response if the circuit
+                is open.
+
+        Raises:
+            CircuitOpenError: If the circuit is open and there is no last
+                good response to serve, or the breaker was created with
+                ``serve_stale=False``.
+        """
+        try:
+            response = fetch()
+        except CircuitOpenError as exc:
+            return self._stale(name, exc)
+        self._remember(name, response)
+        return response
+
+    async def serve_stale_async(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[service.AccessSecretVersionResponse]],
+    ) -> service.AccessSecretVersionResponse:
+        """The asyncio counterpart of :meth:`serve_stale`."""
+        try:
+            response = await fetch()
+        except CircuitOpenError as exc:
+            return self._stale(name, exc)
+        self._remember(name, response)
+        return response
+
+
+class _GuardedStub:
+    def __init__(
+        self, method: str, endpoint: str, stub: Callable, breaker: CircuitBreaker
+    ):
+        self._method = method
+        self._endpoint = endpoint
+        self._stub = stub
+        self._breaker = breaker
+
+    def __call__(self, request, *args, **kwargs):
+        breaker = self._breaker
+        circuit, probe = breaker._allow(self._method, self._endpoint)
+        start = breaker._clock()
+        failed = None
+        try:
+            response = self._stub(request, *args, **kwargs)
+        except Exception as exc:
+            failed = breaker._failed(exc, 0.0)
+            raise
+        else:
+            failed = breaker._failed(None, breaker._clock() - start)
+            return response
+        finally:
+            breaker._record(circuit, self._method, self._endpoint, failed, probe)
+
+
+class _AsyncGuardedStub(aio.UnaryUnaryMultiCallable):
+    def __init__(
+        self, method: str, endpoint: str, stub: Callable, breaker: CircuitBreaker
+    ):
+        self._method = method
+        self._endpoint = endpoint
+        self._stub = stub
+        self._breaker = breaker
+
+    def __call__(self, request, **kwargs):
+        # Check now, so that a rejection is raised by the call itself.
+        circuit, probe = self._breaker._allow(self._method, self._endpoint)
+        return self._attempt(request, kwargs, circuit, probe)
+
+    async def _attempt(self, request, kwargs, circuit: _Circuit, probe: bool):
+        breaker = self._breaker
+        start = breaker._clock()
+        failed = None
+        try:
+            response = await self._stub(request, **kwargs)
+        except Exception as exc:
+            failed = breaker._failed(exc, 0.0)
+            raise
+        else:
+            failed = breaker._failed(None, breaker._clock() - start)
+            return response
+        finally:
+            breaker._record(circuit, self._method, self._endpoint, failed, probe)
+
+
+def guard_transport(transport, breaker: CircuitBreaker) -> None:
+    """Guards the RPCs sent through a transport with a circuit breaker.
+
+    Every RPC stub is wrapped, so that each attempt, including retries,
+    is recorded and fails fast while its circuit is open. The circuits
+    are keyed by the transport's host. Adding the same breaker again does
+    nothing.
+
+    Args:
+        transport (google.cloud.secretmanager_v1.services.secret_manager_service.transports.SecretManagerServiceTransport):
+            The transport to guard, sync or asyncio.
+        breaker (CircuitBreaker): The breaker to use.
+
+    Raises:
+        ValueError: If the transport already has another breaker, or does
+            not keep its stubs in ``_stubs``.
+    """
+    current = getattr(transport, "_circuit_breaker", None)
+    if current is breaker:
+        return
+    if current is not None:
+        raise ValueError("The transport already has another circuit breaker.")
+    if not isinstance(getattr(transport, "_stubs", None), dict):
+        raise ValueError(
+            "Cannot guard {}: it has no RPC stubs.".format(type(transport).__name__)
+        )
+    endpoint = getattr(transport, "_host", "")
+
+    def wrap(rpc, stub):
+        if isinstance(stub, aio.UnaryUnaryMultiCallable):
+            return _AsyncGuardedStub(rpc, endpoint, stub, breaker)
+        return _GuardedStub(rpc, endpoint, stub, breaker)
+
+    transport._wrap_stubs(wrap)
+    transport._circuit_breaker = breaker
+
+
+__all__ = (
+    "CLOSED",
+    "DEFAULT_FAILURE_CODES",
+    "HALF_OPEN",
+    "OPEN",
+    "CircuitBreaker",
+    "CircuitBreakerStats",
+    "CircuitOpenError",
+    "StaleResponse",
+    "guard_transport",
+)
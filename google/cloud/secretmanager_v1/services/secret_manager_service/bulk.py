@@ -0,0 +1,528 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Bulk changes to the state of secret versions.
+
+The updaters disable, enable or destroy many secret versions at once,
+either listed explicitly or matching a ``list_secret_versions`` filter.
+Each change is made with the version's etag, so that a version changed
+by someone else in the meantime is read again rather than overwritten,
+and the results are yielded one by one as the changes complete.
+"""
+import asyncio
+from concurrent import futures
+import math
+import time
+from typing import AsyncIterator, Iterable, Iterator, NamedTuple, Optional, Union
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import gapic_v1
+from google.api_core import retry as retries
+
+from google.cloud.secretmanager_v1.types import resources, service
+
+from .batch import DEFAULT_MAX_CONCURRENCY
+from .ratelimit import AdaptiveRateLimiter, request_project
+
+try:
+    OptionalRetry = Union[retries.Retry, gapic_v1.method._MethodDefault]
+except AttributeError:  # pragma: NO COVER
+    OptionalRetry = Union[retries.Retry, object]  # type: ignore
+
+_State = resources.SecretVersion.State
+
+DISABLE = "disable"
+ENABLE = "enable"
+DESTROY = "destroy"
+
+# The method, request type and resulting state of each action.
+_ACTIONS = {
+    DISABLE: (
+        "disable_secret_version",
+        service.DisableSecretVersionRequest,
+        _State.DISABLED,
+    ),
+    ENABLE: (
+        "enable_secret_version",
+        service.EnableSecretVersionRequest,
+        _State.ENABLED,
+    ),
+    DESTROY: (
+        "destroy_secret_version",
+        service.DestroySecretVersionRequest,
+        _State.DESTROYED,
+    ),
+}
+
+VersionItem = Union[str, resources.SecretVersion]
+
+
+class BulkVersionResult(NamedTuple):
+    """The outcome of changing the state of one secret version.
+
+    Attributes:
+        name (str): The secret version name, as given or listed.
+        action (str): ``"disable"``, ``"enable"`` or ``"destroy"``.
+        version (Optional[google.cloud.secretmanager_v1.types.SecretVersion]):
+            The version after the change or, if it was not changed, as it
+            was last read. ``None`` if it could not be read.
+        error (Optional[Exception]): The error which prevented the
+            change, if any; usually a
+            :class:`google.api_core.exceptions.GoogleAPIError`.
+        attempts (int): The number of change requests sent.
+        skipped (bool): Whether the version was already in the state the
+            action leads to, so no request was needed.
+        dry_run (bool): Whether the version would have been changed, but
+            the updater is in dry-run mode.
+    """
+
+    name: str
+    action: str
+    version: Optional[resources.SecretVersion] = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+    skipped: bool = False
+    dry_run: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """bool: Whether the version is, or would be, in the intended
+        state."""
+        return self.error is None
+
+    @property
+    def changed(self) -> bool:
+        """bool: Whether the version was changed by this result's request."""
+        return self.ok and not (self.skipped or self.dry_run)
+
+
+class _BaseBulkVersionUpdater:
+    def __init__(
+        self,
+        client,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate: Optional[float] = None,
+        max_attempts: int = 5,
+        dry_run: bool = False,
+        retry: OptionalRetry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+    ):
+        """Instantiate the updater.
+
+        Args:
+            client: The client used to list, read and change versions.
+            max_concurrency (int): The maximum number of versions being
+                changed at once.
+            rate (Optional[float]): The most change requests per second
+                sent for each project. The rate is halved while the server
+                rejects requests with ``ResourceExhausted``, and those
+                requests are sent again. Not limited if ``None``.
+            max_attempts (int): The most change requests sent for one
+                version, when its etag changes or, with a ``rate``, the
+                server rejects them with ``ResourceExhausted``.
+            dry_run (bool): Read the versions and report what would be
+                changed, without changing anything.
+            retry (google.api_core.retry.Retry): Designation of what errors,
+                if any, should be retried.
+            timeout (float): The timeout for each request.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self._client = client
+        self._max_concurrency = max_concurrency
+        self._limiter = None  # type: Optional[AdaptiveRateLimiter]
+        if rate is not None:
+            # Changes wait for their turn however long it takes.
+            self._limiter = AdaptiveRateLimiter(
+                rate, min_rate=min(1.0, rate), max_wait=math.inf
+            )
+        self._max_attempts = max_attempts
+        self._dry_run = dry_run
+        self._retry = retry
+        self._timeout = timeout
+
+    @property
+    def dry_run(self) -> bool:
+        """bool: Whether versions are only read, not changed."""
+        return self._dry_run
+
+    @staticmethod
+    def _check_args(action: str, versions, parent) -> None:
+        if action not in _ACTIONS:
+            raise ValueError(
+                "Unknown action {!r}; expected one of {}.".format(
+                    action, ", ".join(sorted(_ACTIONS))
+                )
+            )
+        if (versions is None) == (parent is None):
+            raise ValueError("Exactly one of versions and parent must be given.")
+
+    def _list_request(
+        self, parent: str, filter: str
+    ) -> service.ListSecretVersionsRequest:
+        return service.ListSecretVersionsRequest(parent=parent, filter=filter)
+
+    def _plan(
+        self, action: str, name: str, version: resources.SecretVersion, attempts: int
+    ):
+        """Returns the final result for a version which needs no request,
+        or the request to send."""
+        method, request_type, state = _ACTIONS[action]
+        if version.state == state:
+            return BulkVersionResult(
+                name, action, version, attempts=attempts, skipped=True
+            )
+        if version.state == _State.DESTROYED:
+            error = core_exceptions.FailedPrecondition(
+                "Secret Version [{}] is destroyed.".format(version.name)
+            )
+            return BulkVersionResult(
+                name, action, version, error=error, attempts=attempts
+            )
+        if self._dry_run:
+            return BulkVersionResult(
+                name, action, version, attempts=attempts, dry_run=True
+            )
+        return request_type(name=version.name, etag=version.etag)
+
+    @staticmethod
+    def _conflict(exc: Exception, request) -> bool:
+        # A mismatched etag is reported as ``Aborted`` or, by some
+        # backends, ``FailedPrecondition``; either way the version is read
+        # again, and the error is only kept if its etag has not changed.
+        return bool(request.etag) and isinstance(
+            exc, (core_exceptions.Aborted, core_exceptions.FailedPrecondition)
+        )
+
+    def _throttled(self, method: str, request, exc: Exception) -> bool:
+        if self._limiter is None or not isinstance(
+            exc, core_exceptions.ResourceExhausted
+        ):
+            return False
+        self._limiter.throttled(method, request_project(request))
+        return True
+
+
+class BulkVersionUpdater(_BaseBulkVersionUpdater):
+    """Changes the state of many secret versions with a
+    :class:`SecretManagerServiceClient`.
+
+    Changes are made on a pool of at most ``max_concurrency`` threads
+    sharing the client's channel, and their results are yielded in the
+    order they complete. Versions given by name are read first, to learn
+    their state and etag; listed versions already include them. A failure
+    to change one version does not affect the others; it is reported in
+    its result instead of being raised.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        updater = secretmanager_v1.BulkVersionUpdater(
+            secretmanager_v1.SecretManagerServiceClient(),
+            max_concurrency=32,
+            rate=50.0,
+        )
+        for result in updater.destroy(
+            parent="projects/my-project/secrets/my-secret",
+            filter="state:DISABLED",
+        ):
+            if not result.ok:
+                print(result.name, result.error)
+    """
+
+    def run(
+        self,
+        action: str,
+        versions: Optional[Iterable[VersionItem]] = None,
+        *,
+        parent: Optional[str] = None,
+        filter: str = "",
+    ) -> Iterator[BulkVersionResult]:
+        """Applies an action to many secret versions.
+
+        Args:
+            action (str): ``"disable"``, ``"enable"`` or ``"destroy"``.
+            versions (Optional[Iterable[Union[str, google.cloud.secretmanager_v1.types.SecretVersion]]]):
+                The versions to change, as names in the format
+                ``projects/*/secrets/*/versions/*`` or as read from the
+                service. Versions given twice are changed once.
+            parent (Optional[str]): Instead of ``versions``, change the
+                versions of this secret, in the format
+                ``projects/*/secrets/*``, which match ``filter``.
+            filter (str): The ``list_secret_versions`` filter selecting
+                the versions of ``parent`` to change.
+
+        Returns:
+            Iterator[BulkVersionResult]: One result per version, as the
+            changes complete. Listing the versions, if it fails, raises
+            while iterating.
+
+        Raises:
+            ValueError: If the action is unknown, or not exactly one of
+                ``versions`` and ``parent`` is given.
+        """
+        self._check_args(action, versions, parent)
+        return self._run(action, versions, parent, filter)
+
+    def disable(self, versions=None, **kwargs) -> Iterator[BulkVersionResult]:
+        """Disables many secret versions; see :meth:`run`."""
+        return self.run(DISABLE, versions, **kwargs)
+
+    def enable(self, versions=None, **kwargs) -> Iterator[BulkVersionResult]:
+        """Enables many secret versions; see :meth:`run`."""
+        return self.run(ENABLE, versions, **kwargs)
+
+    def destroy(self, versions=None, **kwargs) -> Iterator[BulkVersionResult]:
+        """Destroys many secret versions; see :meth:`run`."""
+        return self.run(DESTROY, versions, **kwargs)
+
+    def _run(
+        self,
+        action: str,
+        versions: Optional[Iterable[VersionItem]],
+        parent: Optional[str],
+        filter: str,
+    ) -> Iterator[BulkVersionResult]:
+        if versions is None:
+            # Listed here, so that listing errors are raised while
+            # iterating, as they are by the async updater.
+            versions = self._client.list_secret_versions(
+                request=self._list_request(parent, filter),
+                retry=self._retry,
+                timeout=self._timeout,
+            )
+        seen = set()
+        with futures.ThreadPoolExecutor(self._max_concurrency) as executor:
+            pending = set()  # type: set
+            for item in versions:
+                name = item if isinstance(item, str) else item.name
+                if name in seen:
+                    continue
+                seen.add(name)
+                # Only read further versions as earlier ones complete, so
+                # that listing is paced by the changes.
+                if len(pending) >= self._max_concurrency:
+                    done, pending = futures.wait(
+                        pending, return_when=futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(self._apply, action, name, item))
+            for future in futures.as_completed(pending):
+                yield future.result()
+
+    def _get(self, name: str) -> resources.SecretVersion:
+        return self._client.get_secret_version(
+            name=name, retry=self._retry, timeout=self._timeout
+        )
+
+    def _apply(self, action: str, name: str, item: VersionItem) -> BulkVersionResult:
+        method = _ACTIONS[action][0]
+        version = None if isinstance(item, str) else item
+        attempts = 0
+        try:
+            if version is None:
+                version = self._get(name)
+            while True:
+                plan = self._plan(action, name, version, attempts)
+                if isinstance(plan, BulkVersionResult):
+                    return plan
+                if self._limiter is not None:
+                    wait = self._limiter.reserve(method, request_project(plan))
+                    if wait:
+                        time.sleep(wait)
+                attempts += 1
+                try:
+                    updated = getattr(self._client, method)(
+                        request=plan, retry=self._retry, timeout=self._timeout
+                    )
+                except core_exceptions.GoogleAPIError as exc:
+                    if attempts >= self._max_attempts:
+                        raise
+                    if self._throttled(method, plan, exc):
+                        continue
+                    if not self._conflict(exc, plan):
+                        raise
+                    version = self._get(name)
+                    if version.etag == plan.etag:
+                        raise
+                    continue
+                return BulkVersionResult(name, action, updated, attempts=attempts)
+        except Exception as exc:
+            return BulkVersionResult(
+                name, action, version, error=exc, attempts=attempts
+            )
+
+
+class AsyncBulkVersionUpdater(_BaseBulkVersionUpdater):
+    """Changes the state of many secret versions with a
+    :class:`SecretManagerServiceAsyncClient`.
+
+    At most ``max_concurrency`` versions are changed at once; otherwise
+    it behaves as :class:`BulkVersionUpdater`.
+    """
+
+    def run(
+        self,
+        action: str,
+        versions: Optional[Iterable[VersionItem]] = None,
+        *,
+        parent: Optional[str] = None,
+        filter: str = "",
+    ) -> AsyncIterator[BulkVersionResult]:
+        """Applies an action to many secret versions.
+
+        Args:
+            action (str): ``"disable"``, ``"enable"`` or ``"destroy"``.
+            versions (Optional[Iterable[Union[str, google.cloud.secretmanager_v1.types.SecretVersion]]]):
+                The versions to change, as names in the format
+                ``projects/*/secrets/*/versions/*`` or as read from the
+                service. Versions given twice are changed once.
+            parent (Optional[str]): Instead of ``versions``, change the
+                versions of this secret, in the format
+                ``projects/*/secrets/*``, which match ``filter``.
+            filter (str): The ``list_secret_versions`` filter selecting
+                the versions of ``parent`` to change.
+
+        Returns:
+            AsyncIterator[BulkVersionResult]: One result per version, as
+            the changes complete. Listing the versions, if it fails,
+            raises while iterating.
+
+        Raises:
+            ValueError: If the action is unknown, or not exactly one of
+                ``versions`` and ``parent`` is given.
+        """
+        self._check_args(action, versions, parent)
+        return self._run(action, versions, parent, filter)
+
+    def disable(self, versions=None, **kwargs) -> AsyncIterator[BulkVersionResult]:
+        """Disables many secret versions; see :meth:`run`."""
+        return self.run(DISABLE, versions, **kwargs)
+
+    def enable(self, versions=None, **kwargs) -> AsyncIterator[BulkVersionResult]:
+        """Enables many secret versions; see :meth:`run`."""
+        return self.run(ENABLE, versions, **kwargs)
+
+    def destroy(self, versions=None, **kwargs) -> AsyncIterator[BulkVersionResult]:
+        """Destroys many secret versions; see :meth:`run`."""
+        return self.run(DESTROY, versions, **kwargs)
+
+    async def _versions(
+        self, versions: Optional[Iterable[VersionItem]], parent: str, filter: str
+    ) -> AsyncIterator[VersionItem]:
+        if versions is not None:
+            for item in versions:
+                yield item
+            return
+        pager = await self._client.list_secret_versions(
+            request=self._list_request(parent, filter),
+            retry=self._retry,
+            timeout=self._timeout,
+        )
+        async for item in pager:
+            yield item
+
+    async def _run(
+        self,
+        action: str,
+        versions: Optional[Iterable[VersionItem]],
+        parent: Optional[str],
+        filter: str,
+    ) -> AsyncIterator[BulkVersionResult]:
+        seen = set()
+        pending = set()  # type: set
+        try:
+            async for item in self._versions(versions, parent, filter):
+                name = item if isinstance(item, str) else item.name
+                if name in seen:
+                    continue
+                seen.add(name)
+                if len(pending) >= self._max_concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(self._apply(action, name, item)))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _get(self, name: str) -> resources.SecretVersion:
+        return await self._client.get_secret_version(
+            name=name, retry=self._retry, timeout=self._timeout
+        )
+
+    async def _apply(
+        self, action: str, name: str, item: VersionItem
+    ) -> BulkVersionResult:
+        method = _ACTIONS[action][0]
+        version = None if isinstance(item, str) else item
+        attempts = 0
+        try:
+            if version is None:
+                version = await self._get(name)
+            while True:
+                plan = self._plan(action, name, version, attempts)
+                if isinstance(plan, BulkVersionResult):
+                    return plan
+                if self._limiter is not None:
+                    wait = self._limiter.reserve(method, request_project(plan))
+                    if wait:
+                        await asyncio.sleep(wait)
+                attempts += 1
+                try:
+                    updated = await getattr(self._client, method)(
+                        request=plan, retry=self._retry, timeout=self._timeout
+                    )
+                except core_exceptions.GoogleAPIError as exc:
+                    if attempts >= self._max_attempts:
+                        raise
+                    if self._throttled(method, plan, exc):
+                        continue
+                    if not self._conflict(exc, plan):
+                        raise
+                    version = await self._get(name)
+                    if version.etag == plan.etag:
+                        raise
+                    continue
+                return BulkVersionResult(name, action, updated, attempts=attempts)
+        except Exception as exc:
+            return BulkVersionResult(
+                name, action, version, error=exc, attempts=attempts
+            )
+
+
+__all__ = (
+    "AsyncBulkVersionUpdater",
+    "BulkVersionResult",
+    "BulkVersionUpdater",
+    "DESTROY",
+    "DISABLE",
+    "ENABLE",
+)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from collections import OrderedDict
+import re
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from google.cloud.secretmanager_v1.types import service
+
+# Matches version names which refer to a fixed version number, as opposed to
+# an alias such as ``latest``.
+_PINNED_VERSION_RE = re.compile(r"^projects/[^/]+/secrets/[^/]+/versions/\d+$")
+
+
+class CacheStats(NamedTuple):
+    """A point-in-time snapshot of :class:`SecretCache` counters."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+class _CacheEntry:
+    __slots__ = ("response", "size", "expires_at")
+
+    def __init__(self, response, size, expires_at):
+        self.response = response
+        self.size = size
+        self.expires_at = expires_at
+
+
+class SecretCache:
+    """An in-process cache of ``access_secret_version`` responses.
+
+    Entries are keyed by the version name used in the request. Names which
+    refer to a numbered version (``projects/*/secrets/*/versions/5``) are
+    immutable on the server and are kept until they are evicted, expire
+    after ``pinned_ttl`` (if set), or are invalidated because the version
+    was disabled or destroyed through the client. Aliases such as
+    ``latest`` may move to a new version at any time, so they expire after
+    ``alias_ttl`` seconds.
+
+    The cache is bounded both by the number of entries and by the total
+    serialized size of the cached responses; the least recently used
+    entries are evicted first. All methods are thread-safe and never block
+    on I/O, so a single instance may be shared by sync and async clients.
+
+    Cached responses are shared between callers and must not be mutated.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        cache = secretmanager_v1.SecretCache(alias_ttl=10.0)
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"secret_cache": cache},
+        )
+    """
+
+    def __init__(
+        self,
+        *,
+        alias_ttl: float = 30.0,
+        pinned_ttl: Optional[float] = None,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Instantiate the cache.
+
+        Args:
+            alias_ttl (float): Seconds to keep responses for aliased
+                versions such as ``latest``.
+            pinned_ttl (Optional[float]): Seconds to keep responses for
+                numbered versions. If ``None``, they are kept until evicted
+                or invalidated.
+            max_entries (int): The maximum number of cached responses.
+            max_bytes (int): The maximum total serialized size, in bytes,
+                of the cached responses.
+            clock (Callable[[], float]): A monotonic clock, in seconds.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+
+        self._alias_ttl = alias_ttl
+        self._pinned_ttl = pinned_ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # type: OrderedDict[str, _CacheEntry]
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def alias_ttl(self) -> float:
+        """float: Seconds to keep responses for aliased versions."""
+        return self._alias_ttl
+
+    @property
+    def pinned_ttl(self) -> Optional[float]:
+        """Optional[float]: Seconds to keep responses for numbered versions."""
+        return self._pinned_ttl
+
+    @staticmethod
+    def is_pinned(name: str) -> bool:
+        """Returns whether ``name`` refers to a numbered secret version."""
+        return _PINNED_VERSION_RE.match(name) is not None
+
+    def ttl_for(self, name: str) -> Optional[float]:
+        """Returns the default time-to-live for ``name``, in seconds."""
+        return self._pinned_ttl if self.is_pinned(name) else self._alias_ttl
+
+    def get(self, name: str) -> Optional[service.AccessSecretVersionResponse]:
+        """Returns the cached response for ``name``, if it is still fresh.
+
+        Args:
+            name (str): The secret version name used in the request.
+
+        Returns:
+            Optional[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse]:
+                The cached response, or ``None`` on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                if entry.expires_at is None or entry.expires_at > self._clock():
+                    self._entries.move_to_end(name)
+                    self._hits += 1
+                    return entry.response
+                self._remove(name)
+            self._misses += 1
+            return None
+
+    def put(
+        self,
+        name: str,
+        response: service.AccessSecretVersionResponse,
+        *,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Stores ``response`` as the value for ``name``.
+
+        Args:
+            name (str): The secret version name used in the request.
+            response (google.cloud.secretmanager_v1.types.AccessSecretVersionResponse):
+                The response to cache.
+            ttl (Optional[float]): Overrides the default time-to-live for
+                this entry, in seconds.
+        """
+        if ttl is None:
+            ttl = self.ttl_for(name)
+        if ttl is not None and ttl <= 0:
+            return
+
+        size = len(name) + service.AccessSecretVersionResponse.pb(response).ByteSize()
+        if size > self._max_bytes:
+            return
+
+        with self._lock:
+            expires_at = None if ttl is None else self._clock() + ttl
+            self._remove(name)
+            self._entries[name] = _CacheEntry(response, size, expires_at)
+            self._bytes += size
+            while (
+                len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate(self, name: str) -> None:
+        """Removes the cached response for ``name``, if any."""
+        with self._lock:
+            self._remove(name)
+
+    def invalidate_secret(self, secret: str) -> None:
+        """Removes all cached versions of a secret.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+        """
+        prefix = secret.rstrip("/") + "/versions/"
+        with self._lock:
+            for name in [n for n in self._entries if n.startswith(prefix)]:
+                self._remove(name)
+
+    def invalidate_aliases(self, secret: str) -> List[str]:
+        """Removes the cached aliases of a secret, such as ``latest``.
+
+        Numbered versions are kept.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+
+        Returns:
+            List[str]: The names which were removed.
+        """
+        prefix = secret.rstrip("/") + "/versions/"
+        with self._lock:
+            names = [
+                n
+                for n in self._entries
+                if n.startswith(prefix) and not self.is_pinned(n)
+            ]
+            for name in names:
+                self._remove(name)
+        return names
+
+    def clear(self) -> None:
+        """Removes all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """google.cloud.secretmanager_v1.services.secret_manager_service.cache.CacheStats:
+        The current hit, miss and eviction counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def _remove(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+__all__ = (
+    "CacheStats",
+    "SecretCache",
+)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""CRC32C checksums of secret payloads.
+
+Checksums are computed with ``google-crc32c`` when its C extension, which
+uses the CPU's CRC32C instructions where available, is installed (the
+``crc32c`` extra of this package). Otherwise a pure-Python implementation
+is used, which is several orders of magnitude slower.
+"""
+import struct
+from typing import Iterable, List, Optional
+
+from google.api_core import exceptions as core_exceptions
+
+from google.cloud.secretmanager_v1.types import resources, service
+
+from .batch import AccessSecretVersionResult
+
+try:
+    import google_crc32c  # type: ignore
+except ImportError:  # pragma: NO COVER
+    google_crc32c = None
+
+# The reflected Castagnoli polynomial.
+_POLYNOMIAL = 0x82F63B78
+
+
+def _make_tables():
+    base = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ _POLYNOMIAL if crc & 1 else crc >> 1
+        base.append(crc)
+    tables = [base]
+    for _ in range(7):
+        previous = tables[-1]
+        tables.append([(value >> 8) ^ base[value & 0xFF] for value in previous])
+    return tuple(tuple(table) for table in tables)
+
+
+_TABLES = _make_tables()
+
+
+def python_crc32c(data: bytes, crc: int = 0) -> int:
+    """Computes the CRC32C of ``data`` in pure Python.
+
+    Processes eight bytes per step ("slicing-by-8").
+
+    Args:
+        data (bytes): The data to checksum; any bytes-like object.
+        crc (int): The checksum of preceding data, to extend.
+
+    Returns:
+        int: The checksum.
+    """
+    t0, t1, t2, t3, t4, t5, t6, t7 = _TABLES
+    view = memoryview(data).cast("B")
+    end = len(view) - len(view) % 8
+    crc ^= 0xFFFFFFFF
+    for low, high in struct.iter_unpack("<II", view[:end]):
+        low ^= crc
+        crc = (
+            t7[low & 0xFF]
+            ^ t6[(low >> 8) & 0xFF]
+            ^ t5[(low >> 16) & 0xFF]
+            ^ t4[low >> 24]
+            ^ t3[high & 0xFF]
+            ^ t2[(high >> 8) & 0xFF]
+            ^ t1[(high >> 16) & 0xFF]
+            ^ t0[high >> 24]
+        )
+    for byte in view[end:]:
+        crc = t0[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+if google_crc32c is not None and google_crc32c.implementation == "c":
+    IMPLEMENTATION = "c"
+
+    def crc32c(data: bytes) -> int:
+        """Computes the CRC32C of ``data``.
+
+        Args:
+            data (bytes): The data to checksum; any bytes-like object.
+
+        Returns:
+            int: The checksum.
+        """
+        return google_crc32c.value(bytes(data) if not isinstance(data, bytes) else data)
+
+else:  # pragma: NO COVER
+    IMPLEMENTATION = "python"
+    crc32c = python_crc32c
+
+
+class PayloadChecksumError(core_exceptions.DataLoss):
+    """A payload does not match its CRC32C checksum.
+
+    Attributes:
+        name (str): The secret version name, if known.
+        expected (int): The checksum sent with the payload.
+        actual (int): The checksum of the payload received.
+    """
+
+    def __init__(self, name: str, expected: int, actual: int):
+        super().__init__(
+            "Payload of {} failed CRC32C verification: expected {}, got {}.".format(
+                name or "secret version", expected, actual
+            )
+        )
+        self.name = name
+        self.expected = expected
+        self.actual = actual
+
+
+def with_checksum(message):
+    """Sets the payload's ``data_crc32c`` if it is not already set.
+
+    Args:
+        message (Union[google.cloud.secretmanager_v1.types.SecretPayload, google.cloud.secretmanager_v1.types.AddSecretVersionRequest, dict]):
+            The payload, or the request carrying it. A dict is treated as
+            a payload.
+
+    Returns:
+        Union[google.cloud.secretmanager_v1.types.SecretPayload, google.cloud.secretmanager_v1.types.AddSecretVersionRequest]:
+            ``message`` if its payload already has a checksum, otherwise
+            a copy with the checksum set. ``message`` is never modified.
+    """
+    if isinstance(message, dict):
+        message = resources.SecretPayload(message)
+    is_request = isinstance(message, service.AddSecretVersionRequest)
+    message_type = type(message)
+    pb = message_type.pb(message)
+    if (pb.payload if is_request else pb).HasField("data_crc32c"):
+        return message
+    copy = type(pb)()
+    copy.CopyFrom(pb)
+    payload = copy.payload if is_request else copy
+    payload.data_crc32c = crc32c(payload.data)
+    return message_type.wrap(copy)
+
+
+def verify_response(
+    response: service.AccessSecretVersionResponse, *, require: bool = False
+) -> service.AccessSecretVersionResponse:
+    """Checks the payload of ``response`` against its CRC32C checksum.
+
+    Args:
+        response (google.cloud.secretmanager_v1.types.AccessSecretVersionResponse):
+            The response to check.
+        require (bool): Whether a response without a checksum fails
+            verification. Versions added without a checksum are returned
+            without one, so this is off by default.
+
+    Returns:
+        google.cloud.secretmanager_v1.types.AccessSecretVersionResponse:
+            ``response``, if it passed verification.
+
+    Raises:
+        PayloadChecksumError: If the payload does not match its checksum,
+            or if it has none and ``require`` is true.
+    """
+    pb = service.AccessSecretVersionResponse.pb(response)
+    payload = pb.payload
+    if payload.HasField("data_crc32c"):
+        expected = payload.data_crc32c  # type: Optional[int]
+    elif require:
+        expected = None
+    else:
+        return response
+    actual = crc32c(payload.data)
+    if actual != expected:
+        raise PayloadChecksumError(pb.name, expected, actual)
+    return response
+
+
+def verify_results(
+    results: Iterable[AccessSecretVersionResult], *, require: bool = False
+) -> List[AccessSecretVersionResult]:
+    """Checks the payloads of a batch of access results.
+
+    Args:
+        results (Iterable[google.cloud.secretmanager_v1.services.secret_manager_service.batch.AccessSecretVersionResult]):
+            Results such as those returned by
+            :meth:`SecretManagerServiceClient.access_secret_versions`.
+        require (bool): Whether responses without a checksum fail
+            verification.
+
+    Returns:
+        List[google.cloud.secretmanager_v1.services.secret_manager_service.batch.AccessSecretVersionResult]:
+            The results, in the same order. Successful results whose
+            payload fails verification are replaced by results whose
+            ``error`` is a :class:`PayloadChecksumError`.
+    """
+    verified = []
+    for result in results:
+        if result.ok:
+            try:
+                verify_response(result.response, require=require)
+            except PayloadChecksumError as exc:
+                result = AccessSecretVersionResult(name=result.name, error=exc)
+        verified.append(result)
+    return verified
+
+
+__all__ = (
+    "IMPLEMENTATION",
+    "PayloadChecksumError",
+    "crc32c",
+    "python_crc32c",
+    "verify_response",
+    "verify_results",
+    "with_checksum",
+)
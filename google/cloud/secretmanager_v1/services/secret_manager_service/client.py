@@ -14,9 +14,23 @@
 # limitations under the License.
 #
 from collections import OrderedDict
+from concurrent import futures
+import functools
+import importlib
 import os
 import re
-from typing import Dict, Mapping, Optional, Sequence, Tuple, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 from google.api_core import client_options as client_options_lib
 from google.api_core import exceptions as core_exceptions
@@ -27,7 +41,6 @@ from google.auth.exceptions import MutualTLSChannelError  # type: ignore
 from google.auth.transport import mtls  # type: ignore
 from google.auth.transport.grpc import SslCredentials  # type: ignore
 from google.oauth2 import service_account  # type: ignore
-import pkg_resources
 
 try:
     OptionalRetry = Union[retries.Retry, gapic_v1.method._MethodDefault]
@@ -40,12 +53,38 @@ from google.protobuf import duration_pb2  # type: ignore
 from google.protobuf import field_mask_pb2  # type: ignore
 from google.protobuf import timestamp_pb2  # type: ignore
 
+from google.cloud.secretmanager_v1 import gapic_version as package_version
 from google.cloud.secretmanager_v1.services.secret_manager_service import pagers
 from google.cloud.secretmanager_v1.types import resources, service
 
+from . import checksum, paths
+from .batch import DEFAULT_MAX_CONCURRENCY, AccessSecretVersionResult
+from .cache import SecretCache
+from .singleflight import SingleFlight, request_key
 from .transports.base import DEFAULT_CLIENT_INFO, SecretManagerServiceTransport
 from .transports.grpc import SecretManagerServiceGrpcTransport
-from .transports.grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
+from .transports.grpc_pooled import SecretManagerServiceGrpcPooledTransport
+from .transports.pool import ChannelPoolMixin
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from .breaker import CircuitBreaker
+    from .disk_cache import DiskSecretCache
+
+# Client options understood by this library in addition to the ones defined
+# by google.api_core.client_options.ClientOptions. They may be given as keys
+# of a dict, or set as attributes of a ClientOptions instance.
+_EXTENDED_CLIENT_OPTIONS = (
+    "secret_cache",
+    "coalesce_requests",
+    "channel_pool_size",
+    "payload_checksums",
+    "disk_cache",
+    "metrics",
+    "rate_limiter",
+    "hedging",
+    "circuit_breaker",
+    "retry_policy",
+)
 
 
 class SecretManagerServiceClientMeta(type):
@@ -60,7 +99,20 @@ class SecretManagerServiceClientMeta(type):
         OrderedDict()
     )  # type: Dict[str, Type[SecretManagerServiceTransport]]
     _transport_registry["grpc"] = SecretManagerServiceGrpcTransport
-    _transport_registry["grpc_asyncio"] = SecretManagerServiceGrpcAsyncIOTransport
+    _transport_registry["grpc_pooled"] = SecretManagerServiceGrpcPooledTransport
+
+    # The asyncio transports are registered on first use, so that sync-only
+    # callers do not load them.
+    _lazy_transports = {
+        "grpc_asyncio": (
+            ".transports.grpc_asyncio",
+            "SecretManagerServiceGrpcAsyncIOTransport",
+        ),
+        "grpc_pooled_asyncio": (
+            ".transports.grpc_pooled_asyncio",
+            "SecretManagerServiceGrpcPooledAsyncIOTransport",
+        ),
+    }
 
     def get_transport_class(
         cls,
@@ -75,6 +127,11 @@ class SecretManagerServiceClientMeta(type):
         Returns:
             The transport class to use.
         """
+        if label in cls._lazy_transports and label not in cls._transport_registry:
+            module_name, class_name = cls._lazy_transports[label]
+            module = importlib.import_module(module_name, __package__)
+            cls._transport_registry[label] = getattr(module, class_name)
+
         # If a specific transport is requested, return that one.
         if label:
             return cls._transport_registry[label]
@@ -182,16 +239,12 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         secret: str,
     ) -> str:
         """Returns a fully-qualified secret string."""
-        return "projects/{project}/secrets/{secret}".format(
-            project=project,
-            secret=secret,
-        )
+        return paths.SECRET.format(project, secret)
 
     @staticmethod
     def parse_secret_path(path: str) -> Dict[str, str]:
         """Parses a secret path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/secrets/(?P<secret>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.SECRET.parse(path)
 
     @staticmethod
     def secret_version_path(
@@ -200,20 +253,12 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         secret_version: str,
     ) -> str:
         """Returns a fully-qualified secret_version string."""
-        return "projects/{project}/secrets/{secret}/versions/{secret_version}".format(
-            project=project,
-            secret=secret,
-            secret_version=secret_version,
-        )
+        return paths.SECRET_VERSION.format(project, secret, secret_version)
 
     @staticmethod
     def parse_secret_version_path(path: str) -> Dict[str, str]:
         """Parses a secret_version path into its component segments."""
-        m = re.match(
-            r"^projects/(?P<project>.+?)/secrets/(?P<secret>.+?)/versions/(?P<secret_version>.+?)$",
-            path,
-        )
-        return m.groupdict() if m else {}
+        return paths.SECRET_VERSION.parse(path)
 
     @staticmethod
     def topic_path(
@@ -221,76 +266,60 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         topic: str,
     ) -> str:
         """Returns a fully-qualified topic string."""
-        return "projects/{project}/topics/{topic}".format(
-            project=project,
-            topic=topic,
-        )
+        return paths.TOPIC.format(project, topic)
 
     @staticmethod
     def parse_topic_path(path: str) -> Dict[str, str]:
         """Parses a topic path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/topics/(?P<topic>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.TOPIC.parse(path)
 
     @staticmethod
     def common_billing_account_path(
         billing_account: str,
     ) -> str:
         """Returns a fully-qualified billing_account string."""
-        return "billingAccounts/{billing_account}".format(
-            billing_account=billing_account,
-        )
+        return paths.COMMON_BILLING_ACCOUNT.format(billing_account)
 
     @staticmethod
     def parse_common_billing_account_path(path: str) -> Dict[str, str]:
         """Parse a billing_account path into its component segments."""
-        m = re.match(r"^billingAccounts/(?P<billing_account>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_BILLING_ACCOUNT.parse(path)
 
     @staticmethod
     def common_folder_path(
         folder: str,
     ) -> str:
         """Returns a fully-qualified folder string."""
-        return "folders/{folder}".format(
-            folder=folder,
-        )
+        return paths.COMMON_FOLDER.format(folder)
 
     @staticmethod
     def parse_common_folder_path(path: str) -> Dict[str, str]:
         """Parse a folder path into its component segments."""
-        m = re.match(r"^folders/(?P<folder>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_FOLDER.parse(path)
 
     @staticmethod
     def common_organization_path(
         organization: str,
     ) -> str:
         """Returns a fully-qualified organization string."""
-        return "organizations/{organization}".format(
-            organization=organization,
-        )
+        return paths.COMMON_ORGANIZATION.format(organization)
 
     @staticmethod
     def parse_common_organization_path(path: str) -> Dict[str, str]:
         """Parse a organization path into its component segments."""
-        m = re.match(r"^organizations/(?P<organization>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_ORGANIZATION.parse(path)
 
     @staticmethod
     def common_project_path(
         project: str,
     ) -> str:
         """Returns a fully-qualified project string."""
-        return "projects/{project}".format(
-            project=project,
-        )
+        return paths.COMMON_PROJECT.format(project)
 
     @staticmethod
     def parse_common_project_path(path: str) -> Dict[str, str]:
         """Parse a project path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_PROJECT.parse(path)
 
     @staticmethod
     def common_location_path(
@@ -298,16 +327,12 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         location: str,
     ) -> str:
         """Returns a fully-qualified location string."""
-        return "projects/{project}/locations/{location}".format(
-            project=project,
-            location=location,
-        )
+        return paths.COMMON_LOCATION.format(project, location)
 
     @staticmethod
     def parse_common_location_path(path: str) -> Dict[str, str]:
         """Parse a location path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/locations/(?P<location>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_LOCATION.parse(path)
 
     @classmethod
     def get_mtls_endpoint_and_cert_source(
@@ -411,6 +436,56 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
                 not provided, the default SSL client certificate will be used if
                 present. If GOOGLE_API_USE_CLIENT_CERTIFICATE is "false" or not
                 set, no client certificate will be used.
+                (3) The ``secret_cache`` option can be set to a
+                :class:`~.cache.SecretCache` to serve repeated
+                ``access_secret_version`` calls from memory. It takes
+                effect even if a ``transport`` instance is provided.
+                A :class:`~.shared_cache.SharedSecretCache` shares the
+                cached responses between processes.
+                (4) If the ``coalesce_requests`` option is true, concurrent
+                ``access_secret_version`` calls with the same name and
+                metadata share a single RPC and its result or exception.
+                (5) The ``channel_pool_size`` option sets the number of
+                channels opened by the ``grpc_pooled`` and
+                ``grpc_pooled_asyncio`` transports.
+                (6) If the ``payload_checksums`` option is true,
+                ``add_secret_version`` sets the payload's ``data_crc32c``
+                when it is not set, and ``access_secret_version`` raises
+                :class:`~.checksum.PayloadChecksumError` if a payload does
+                not match its checksum.
+                (7) The ``disk_cache`` option can be set to a
+                :class:`~.disk_cache.DiskSecretCache` to keep
+                ``access_secret_version`` responses, encrypted, across
+                process restarts. Numbered versions are served from disk
+                without an RPC; aliases such as ``latest`` are served from
+                disk and revalidated in the background.
+                (8) The ``metrics`` option can be set to a
+                :class:`~.metrics.MetricsHook`, such as a
+                :class:`~.metrics.MetricsRecorder`, to receive the latency,
+                attempts, status codes, message sizes and marshalling time
+                of every RPC. It takes effect even if a ``transport``
+                instance is provided.
+                (9) The ``rate_limiter`` option can be set to an
+                :class:`~.ratelimit.AdaptiveRateLimiter` to pace RPCs on
+                the client, slowing down when the server responds with
+                ``ResourceExhausted``. It takes effect even if a
+                ``transport`` instance is provided.
+                (10) The ``hedging`` option can be set to a
+                :class:`~.hedging.HedgingPolicy` to send a second attempt
+                of reads which are slower than a percentile of recent
+                attempts, and use the first response. It takes effect
+                even if a ``transport`` instance is provided.
+                (11) The ``circuit_breaker`` option can be set to a
+                :class:`~.breaker.CircuitBreaker` to fail RPCs fast while
+                the service is failing, and to have
+                ``access_secret_version`` return the last good response
+                meanwhile. It takes effect even if a ``transport``
+                instance is provided.
+                (12) The ``retry_policy`` option can be set to a
+                :class:`~.policy.RetryPolicy` to set the default timeout,
+                retried errors, backoff and deadline of each method, and
+                to limit retries with a :class:`~.policy.RetryBudget`. It
+                takes effect even if a ``transport`` instance is provided.
             client_info (google.api_core.gapic_v1.client_info.ClientInfo):
                 The client info used to send a user-agent string along with
                 API requests. If ``None``, then default info will be used.
@@ -421,10 +496,26 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             google.auth.exceptions.MutualTLSChannelError: If mutual TLS transport
                 creation failed for any reason.
         """
+        extended_options = {}
         if isinstance(client_options, dict):
+            client_options = dict(client_options)
+            for key in _EXTENDED_CLIENT_OPTIONS:
+                if key in client_options:
+                    extended_options[key] = client_options.pop(key)
             client_options = client_options_lib.from_dict(client_options)
         if client_options is None:
             client_options = client_options_lib.ClientOptions()
+        for key in _EXTENDED_CLIENT_OPTIONS:
+            extended_options.setdefault(key, getattr(client_options, key, None))
+
+        self._secret_cache: Optional[SecretCache] = extended_options["secret_cache"]
+        self._coalesce_requests = bool(extended_options["coalesce_requests"])
+        self._access_flight = SingleFlight() if self._coalesce_requests else None
+        self._payload_checksums = bool(extended_options["payload_checksums"])
+        self._disk_cache: Optional["DiskSecretCache"] = extended_options["disk_cache"]
+        self._circuit_breaker: Optional["CircuitBreaker"] = extended_options[
+            "circuit_breaker"
+        ]
 
         api_endpoint, client_cert_source_func = self.get_mtls_endpoint_and_cert_source(
             client_options
@@ -463,6 +554,14 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
                 )
 
             Transport = type(self).get_transport_class(transport)
+            transport_kwargs = {}
+            if extended_options["channel_pool_size"] is not None:
+                if not issubclass(Transport, ChannelPoolMixin):
+                    raise ValueError(
+                        "client_options.channel_pool_size requires a pooled "
+                        "transport such as 'grpc_pooled'."
+                    )
+                transport_kwargs["pool_size"] = extended_options["channel_pool_size"]
             self._transport = Transport(
                 credentials=credentials,
                 credentials_file=client_options.credentials_file,
@@ -473,8 +572,30 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
                 client_info=client_info,
                 always_use_jwt_access=True,
                 api_audience=client_options.api_audience,
+                **transport_kwargs,
             )
 
+        if extended_options["retry_policy"] is not None:
+            from .policy import apply_retry_policy
+
+            apply_retry_policy(self._transport, extended_options["retry_policy"])
+        if extended_options["metrics"] is not None:
+            from .metrics import instrument_transport
+
+            instrument_transport(self._transport, extended_options["metrics"])
+        if extended_options["rate_limiter"] is not None:
+            from .ratelimit import limit_transport
+
+            limit_transport(self._transport, extended_options["rate_limiter"])
+        if extended_options["hedging"] is not None:
+            from .hedging import hedge_transport
+
+            hedge_transport(self._transport, extended_options["hedging"])
+        if self._circuit_breaker is not None:
+            from .breaker import guard_transport
+
+            guard_transport(self._transport, self._circuit_breaker)
+
     def list_secrets(
         self,
         request: Union[service.ListSecretsRequest, dict] = None,
@@ -483,6 +604,7 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         retry: OptionalRetry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0,
     ) -> pagers.ListSecretsPager:
         r"""Lists [Secrets][google.cloud.secretmanager.v1.Secret].
 
@@ -524,6 +646,9 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, the pager fetches up to
+                this many pages ahead in the background while the current
+                page is being consumed.
 
         Returns:
             google.cloud.secretmanager_v1.services.secret_manager_service.pagers.ListSecretsPager:
@@ -580,6 +705,7 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             request=request,
             response=response,
             metadata=metadata,
+            prefetch_pages=prefetch_pages,
         )
 
         # Done; return the response.
@@ -804,6 +930,10 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             if payload is not None:
                 request.payload = payload
 
+        # Let the service detect payloads corrupted in transit.
+        if self._payload_checksums:
+            request = checksum.with_checksum(request)
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.add_secret_version]
@@ -1131,6 +1261,7 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         retry: OptionalRetry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0,
     ) -> pagers.ListSecretVersionsPager:
         r"""Lists
         [SecretVersions][google.cloud.secretmanager.v1.SecretVersion].
@@ -1175,6 +1306,9 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, the pager fetches up to
+                this many pages ahead in the background while the current
+                page is being consumed.
 
         Returns:
             google.cloud.secretmanager_v1.services.secret_manager_service.pagers.ListSecretVersionsPager:
@@ -1231,6 +1365,7 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             request=request,
             response=response,
             metadata=metadata,
+            prefetch_pages=prefetch_pages,
         )
 
         # Done; return the response.
@@ -1426,6 +1561,13 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             if name is not None:
                 request.name = name
 
+        # Serve the response from the secret cache, if one is configured.
+        cache = self._secret_cache
+        if cache is not None:
+            cached = cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.access_secret_version]
@@ -1436,16 +1578,138 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             gapic_v1.routing_header.to_grpc_metadata((("name", request.name),)),
         )
 
-        # Send the request.
-        response = rpc(
+        # Send the request. Identical concurrent requests share one RPC if
+        # request coalescing is enabled.
+        send = functools.partial(
+            rpc,
             request,
             retry=retry,
             timeout=timeout,
             metadata=metadata,
         )
+        disk_cache = self._disk_cache
+
+        def fetch() -> service.AccessSecretVersionResponse:
+            if self._access_flight is not None:
+                response = self._access_flight.do(
+                    request_key(request.name, metadata), send
+                )
+            else:
+                response = send()
+
+            # Cache hits are not verified, so verify before caching.
+            if self._payload_checksums:
+                checksum.verify_response(response)
+
+            if cache is not None:
+                cache.put(request.name, response)
+            if disk_cache is not None:
+                disk_cache.put(request.name, response)
+            return response
+
+        # Serve the response from the disk cache, if one is configured.
+        # Aliases such as ``latest`` are refreshed in the background once
+        # they are old enough.
+        if disk_cache is not None:
+            entry = disk_cache.get(request.name)
+            if entry is not None:
+                if entry.stale:
+                    disk_cache.revalidate(request.name, fetch)
+                if cache is not None:
+                    cache.put(request.name, entry.response)
+                return entry.response
+
+        # While the circuit is open, serve the last good response instead.
+        if self._circuit_breaker is not None:
+            return self._circuit_breaker.serve_stale(request.name, fetch)
 
         # Done; return the response.
-        return response
+        return fetch()
+
+    def access_secret_versions(
+        self,
+        names: Iterable[str],
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        retry: OptionalRetry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> List[AccessSecretVersionResult]:
+        r"""Accesses many
+        [SecretVersions][google.cloud.secretmanager.v1.SecretVersion]
+        concurrently.
+
+        Each version is accessed with
+        :meth:`access_secret_version` on a pool of at most
+        ``max_concurrency`` threads sharing this client's channel. A
+        failure to access one version does not affect the others; it is
+        reported in the corresponding result instead of being raised.
+        Names that appear more than once are only accessed once.
+
+        .. code-block:: python
+
+            from google.cloud import secretmanager_v1
+
+            def sample_access_secret_versions():
+                # Create a client
+                client = secretmanager_v1.SecretManagerServiceClient()
+
+                # Make the requests
+                results = client.access_secret_versions(
+                    ["name_value_1", "name_value_2"],
+                    max_concurrency=8,
+                )
+
+                # Handle the responses
+                for result in results:
+                    if result.ok:
+                        print(result.response)
+                    else:
+                        print(result.error)
+
+        Args:
+            names (Iterable[str]):
+                The resource names of the
+                [SecretVersions][google.cloud.secretmanager.v1.SecretVersion]
+                in the format ``projects/*/secrets/*/versions/*``.
+            max_concurrency (int): The maximum number of requests in
+                flight at once.
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            List[google.cloud.secretmanager_v1.services.secret_manager_service.batch.AccessSecretVersionResult]:
+                One result per name, in the order given.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        names = list(names)
+        unique_names = list(dict.fromkeys(names))
+        if not unique_names:
+            return []
+
+        def access(name: str) -> AccessSecretVersionResult:
+            try:
+                response = self.access_secret_version(
+                    name=name,
+                    retry=retry,
+                    timeout=timeout,
+                    metadata=metadata,
+                )
+            except Exception as exc:
+                return AccessSecretVersionResult(name=name, error=exc)
+            return AccessSecretVersionResult(name=name, response=response)
+
+        with futures.ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(unique_names))
+        ) as executor:
+            results = dict(zip(unique_names, executor.map(access, unique_names)))
+
+        return [results[name] for name in names]
 
     def disable_secret_version(
         self,
@@ -1548,6 +1812,9 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             metadata=metadata,
         )
 
+        # The version can no longer be accessed; drop any cached payloads.
+        self._invalidate_cached_versions(request.name)
+
         # Done; return the response.
         return response
 
@@ -1757,6 +2024,9 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             metadata=metadata,
         )
 
+        # The version can no longer be accessed; drop any cached payloads.
+        self._invalidate_cached_versions(request.name)
+
         # Done; return the response.
         return response
 
@@ -2120,6 +2390,17 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         # Done; return the response.
         return response
 
+    def _invalidate_cached_versions(self, name: str) -> None:
+        """Drops cached responses for every version of the secret that
+        owns the version ``name``, including aliases such as ``latest``."""
+        secret = name.rpartition("/versions/")[0]
+        if self._secret_cache is not None:
+            self._secret_cache.invalidate_secret(secret)
+        if self._disk_cache is not None:
+            self._disk_cache.invalidate_secret(secret)
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.invalidate_secret(secret)
+
     def __enter__(self):
         return self
 
@@ -2134,14 +2415,9 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         self.transport.close()
 
 
-try:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
-        gapic_version=pkg_resources.get_distribution(
-            "google-cloud-secret-manager",
-        ).version,
-    )
-except pkg_resources.DistributionNotFound:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo()
+DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
+    gapic_version=package_version.__version__
+)
 
 
 __all__ = ("SecretManagerServiceClient",)
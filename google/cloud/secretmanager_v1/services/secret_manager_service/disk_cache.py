@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+from concurrent import futures
+import hashlib
+import hmac
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Set
+
+from google.api_core import exceptions as core_exceptions
+
+from google.cloud.secretmanager_v1.types import service
+
+from . import checksum
+from .cache import SecretCache
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # pragma: NO COVER
+    AESGCM = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Data files hold an encrypted AccessSecretVersionResponse:
+#   magic (4 bytes) | nonce (12 bytes) | AES-GCM ciphertext and tag
+# Reference files map a requested version name to a data file:
+#   magic (4 bytes) | nonce (12 bytes) | AES-GCM of
+#   stored_at (double) | crc32c (uint32) | resolved version name
+_DATA_MAGIC = b"SMD1"
+_REF_MAGIC = b"SMR1"
+_NONCE_SIZE = 12
+_HEADER_SIZE = 4 + _NONCE_SIZE
+_REF_RECORD = struct.Struct("<dI")
+
+# Errors which mean a version can no longer be accessed.
+_GONE_ERRORS = (core_exceptions.NotFound, core_exceptions.FailedPrecondition)
+
+
+class DiskCacheEntry(NamedTuple):
+    """A response read from a :class:`DiskSecretCache`.
+
+    Attributes:
+        response (google.cloud.secretmanager_v1.types.AccessSecretVersionResponse):
+            The stored response.
+        age (float): Seconds since the response was stored or revalidated.
+        stale (bool): Whether the entry is for an alias such as ``latest``
+            and is old enough to be revalidated.
+    """
+
+    response: service.AccessSecretVersionResponse
+    age: float
+    stale: bool
+
+
+class DiskSecretCache:
+    """A persistent, encrypted cache of ``access_secret_version`` responses.
+
+    Responses survive process restarts, so a restarted process does not
+    need to access every secret again. Each response is encrypted with
+    AES-GCM under a key supplied by the caller and stored in a file named
+    after its resolved version name and payload CRC32C, which
+    ``latest`` and the numbered version it resolves to share. Files are
+    written atomically and read through a memory map. File names are
+    keyed hashes, so they do not reveal secret names.
+
+    Numbered versions are immutable on the server and are served from
+    disk without an RPC. Aliases such as ``latest`` are served from disk
+    too, but once they are ``revalidate_after`` seconds old the client
+    accesses them again in the background and stores the result. Aliases
+    older than ``max_alias_age`` are not served.
+
+    Requires the ``cryptography`` package. Entries are invalidated when a
+    version is disabled or destroyed through a client using the cache,
+    but other processes sharing the directory only notice on
+    revalidation.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        disk_cache = secretmanager_v1.DiskSecretCache(
+            "/var/cache/secrets", key=load_key_from_somewhere()
+        )
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"disk_cache": disk_cache},
+        )
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        key: bytes,
+        *,
+        revalidate_after: float = 5.0,
+        max_alias_age: Optional[float] = 24 * 60 * 60.0,
+        revalidation_workers: int = 2,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Instantiate the cache.
+
+        Args:
+            directory (str): The directory holding the cache files. It is
+                created, readable only by its owner, if it does not exist.
+            key (bytes): A 16, 24 or 32 byte AES key. See
+                :meth:`generate_key`.
+            revalidate_after (float): Seconds after which an alias served
+                from disk is revalidated in the background.
+            max_alias_age (Optional[float]): Seconds after which an alias
+                is no longer served from disk. If ``None``, aliases are
+                served however old they are.
+            revalidation_workers (int): The number of threads revalidating
+                aliases for sync clients.
+            clock (Callable[[], float]): The wall clock, in seconds. Ages
+                are measured across processes, so this is not monotonic.
+
+        Raises:
+            ImportError: If ``cryptography`` is not installed.
+        """
+        if AESGCM is None:  # pragma: NO COVER
+            raise ImportError(
+                "DiskSecretCache requires the 'cryptography' package; install "
+                "google-cloud-secret-manager[cryptography]."
+            )
+        if len(key) not in (16, 24, 32):
+            raise ValueError("key must be 16, 24 or 32 bytes long")
+        if revalidation_workers < 1:
+            raise ValueError("revalidation_workers must be at least 1")
+
+        self._directory = os.path.abspath(directory)
+        os.makedirs(self._directory, mode=0o700, exist_ok=True)
+        self._aead = AESGCM(bytes(key))
+        self._name_key = hmac.new(bytes(key), b"file names", hashlib.sha256).digest()
+        self._revalidate_after = revalidate_after
+        self._max_alias_age = max_alias_age
+        self._revalidation_workers = revalidation_workers
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._revalidating = set()  # type: Set[str]
+        self._executor = None  # type: Optional[futures.ThreadPoolExecutor]
+        self._tasks = set()  # type: Set[asyncio.Future]
+
+    @staticmethod
+    def generate_key() -> bytes:
+        """Returns a new random 256-bit key."""
+        return AESGCM.generate_key(bit_length=256)
+
+    @property
+    def directory(self) -> str:
+        """str: The directory holding the cache files."""
+        return self._directory
+
+    @property
+    def revalidate_after(self) -> float:
+        """float: Seconds after which an alias is revalidated."""
+        return self._revalidate_after
+
+    def get(self, name: str) -> Optional[DiskCacheEntry]:
+        """Returns the stored response for ``name``, if any.
+
+        Unreadable, corrupted or tampered files are treated as misses and
+        removed.
+
+        Args:
+            name (str): The secret version name used in the request.
+
+        Returns:
+            Optional[DiskCacheEntry]: The entry, or ``None`` on a miss.
+        """
+        ref_path = self._ref_path(name)
+        record = self._read(ref_path, _REF_MAGIC, b"ref\0" + name.encode())
+        if record is None:
+            return None
+        stored_at, crc = _REF_RECORD.unpack_from(record)
+        resolved = record[_REF_RECORD.size :].decode()
+        age = max(0.0, self._clock() - stored_at)
+
+        pinned = SecretCache.is_pinned(name)
+        if not pinned and self._max_alias_age is not None and age > self._max_alias_age:
+            return None
+
+        data = self._read(
+            self._data_path(resolved, crc),
+            _DATA_MAGIC,
+            _data_aad(resolved, crc),
+            mapped=True,
+        )
+        if data is None:
+            _remove(ref_path)
+            return None
+        response = service.AccessSecretVersionResponse.deserialize(data)
+        return DiskCacheEntry(
+            response=response,
+            age=age,
+            stale=not pinned and age >= self._revalidate_after,
+        )
+
+    def put(self, name: str, response: service.AccessSecretVersionResponse) -> None:
+        """Stores ``response`` as the value for ``name``.
+
+        The response is also stored for the version it resolved to, so a
+        response for ``latest`` serves later requests for that numbered
+        version.
+
+        Args:
+            name (str): The secret version name used in the request.
+            response (google.cloud.secretmanager_v1.types.AccessSecretVersionResponse):
+                The response to store.
+        """
+        pb = service.AccessSecretVersionResponse.pb(response)
+        resolved = pb.name or name
+        payload = pb.payload
+        if payload.HasField("data_crc32c"):
+            crc = payload.data_crc32c
+        else:
+            crc = checksum.crc32c(payload.data)
+
+        data_path = self._data_path(resolved, crc)
+        if not os.path.exists(data_path):
+            self._write(
+                data_path,
+                _DATA_MAGIC,
+                pb.SerializeToString(),
+                _data_aad(resolved, crc),
+            )
+        record = _REF_RECORD.pack(self._clock(), crc) + resolved.encode()
+        for ref_name in {name, resolved}:
+            self._write(
+                self._ref_path(ref_name),
+                _REF_MAGIC,
+                record,
+                b"ref\0" + ref_name.encode(),
+            )
+
+    def invalidate(self, name: str) -> None:
+        """Removes the stored response for ``name``, if any."""
+        _remove(self._ref_path(name))
+
+    def invalidate_secret(self, secret: str) -> None:
+        """Removes all stored versions of a secret.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+        """
+        shutil.rmtree(self._secret_directory(secret.rstrip("/")), ignore_errors=True)
+
+    def invalidate_aliases(self, secret: str) -> List[str]:
+        """Removes the stored aliases of a secret, such as ``latest``.
+
+        Numbered versions are kept.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+
+        Returns:
+            List[str]: Always empty; the names of stored aliases cannot
+            be recovered from their file names.
+        """
+        try:
+            entries = list(os.scandir(self._secret_directory(secret.rstrip("/"))))
+        except FileNotFoundError:
+            return []
+        for entry in entries:
+            if entry.name.startswith("alias-"):
+                _remove(entry.path)
+        return []
+
+    def clear(self) -> None:
+        """Removes all stored responses."""
+        for entry in os.scandir(self._directory):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def revalidate(
+        self,
+        name: str,
+        fetch: Callable[[], service.AccessSecretVersionResponse],
+    ) -> Optional[futures.Future]:
+        """Calls ``fetch`` on a background thread to refresh ``name``.
+
+        If the version no longer exists or is disabled, the stored
+        response is removed; other errors are logged and the stored
+        response is kept.
+
+        Args:
+            name (str): The secret version name used in the request.
+            fetch (Callable[[], google.cloud.secretmanager_v1.types.AccessSecretVersionResponse]):
+                Accesses the version and stores the response with
+                :meth:`put`, as the client does.
+
+        Returns:
+            Optional[concurrent.futures.Future]: The background call, or
+            ``None`` if ``name`` is already being revalidated.
+        """
+        if not self._begin_revalidation(name):
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(
+                    max_workers=self._revalidation_workers,
+                    thread_name_prefix="secret-revalidation",
+                )
+            executor = self._executor
+
+        def run():
+            try:
+                fetch()
+            except Exception as exc:
+                self._revalidated(name, exc)
+            else:
+                self._revalidated(name, None)
+
+        return executor.submit(run)
+
+    def revalidate_async(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[service.AccessSecretVersionResponse]],
+    ) -> Optional[asyncio.Future]:
+        """Calls ``fetch`` in a background task to refresh ``name``.
+
+        See :meth:`revalidate`.
+
+        Returns:
+            Optional[asyncio.Future]: The background task, or ``None`` if
+            ``name`` is already being revalidated.
+        """
+        if not self._begin_revalidation(name):
+            return None
+
+        async def run():
+            try:
+                await fetch()
+            except Exception as exc:
+                self._revalidated(name, exc)
+            else:
+                self._revalidated(name, None)
+
+        task = asyncio.ensure_future(run())
+        # Keep a reference so that the task is not collected while pending.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def close(self) -> None:
+        """Waits for pending background revalidations to finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _begin_revalidation(self, name: str) -> bool:
+        with self._lock:
+            if name in self._revalidating:
+                return False
+            self._revalidating.add(name)
+            return True
+
+    def _revalidated(self, name, error):
+        # A successful fetch has already stored the response.
+        try:
+            if isinstance(error, _GONE_ERRORS):
+                self.invalidate(name)
+            elif error is not None:
+                _LOGGER.warning("Failed to revalidate %s: %s", name, error)
+        finally:
+            with self._lock:
+                self._revalidating.discard(name)
+
+    def _hash(self, value: str) -> str:
+        return hmac.new(self._name_key, value.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def _secret_directory(self, secret: str) -> str:
+        return os.path.join(self._directory, self._hash(secret))
+
+    def _split(self, name: str):
+        secret, _, version = name.rpartition("/versions/")
+        return self._secret_directory(secret), self._hash(version)
+
+    def _ref_path(self, name: str) -> str:
+        directory, version = self._split(name)
+        prefix = "ref-" if SecretCache.is_pinned(name) else "alias-"
+        return os.path.join(directory, prefix + version)
+
+    def _data_path(self, name: str, crc: int) -> str:
+        directory, version = self._split(name)
+        return os.path.join(directory, "data-{}-{:08x}".format(version, crc))
+
+    def _read(self, path, magic, aad, mapped=False) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                if mapped:
+                    try:
+                        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:
+                        # Empty files cannot be mapped.
+                        buffer = b""
+                else:
+                    buffer = f.read()
+                try:
+                    return self._decrypt(buffer, magic, aad)
+                finally:
+                    if mapped and buffer:
+                        buffer.close()
+        except FileNotFoundError:
+            return None
+        except (OSError, InvalidTag, ValueError) as exc:
+            _LOGGER.warning("Removing unreadable secret cache file %s: %s", path, exc)
+            _remove(path)
+            return None
+
+    def _decrypt(self, buffer, magic, aad) -> bytes:
+        if len(buffer) < _HEADER_SIZE or buffer[:4] != magic:
+            raise ValueError("not a secret cache file")
+        nonce = buffer[4:_HEADER_SIZE]
+        # Decrypt straight from the mapped file, without copying it first.
+        with memoryview(buffer) as view, view[_HEADER_SIZE:] as ciphertext:
+            return self._aead.decrypt(nonce, ciphertext, aad)
+
+    def _write(self, path, magic, plaintext, aad) -> None:
+        nonce = os.urandom(_NONCE_SIZE)
+        contents = magic + nonce + self._aead.encrypt(nonce, plaintext, aad)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(contents)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, path)
+            except BaseException:
+                _remove(temp_path)
+                raise
+        except OSError as exc:
+            # The cache is an optimization; failing to write it is not an
+            # error for the caller.
+            _LOGGER.warning("Failed to write secret cache file %s: %s", path, exc)
+
+
+def _data_aad(resolved: str, crc: int) -> bytes:
+    return b"data\0" + struct.pack("<I", crc) + resolved.encode()
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+__all__ = (
+    "DiskCacheEntry",
+    "DiskSecretCache",
+)
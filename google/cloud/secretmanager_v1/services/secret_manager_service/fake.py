@@ -0,0 +1,823 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""An in-memory stand-in for the Secret Manager service.
+
+:class:`FakeSecretManagerService` implements every RPC of
+``SecretManagerService`` against in-memory storage. It can be used in
+process through :class:`FakeSecretManagerServiceTransport` and
+:class:`FakeSecretManagerServiceAsyncIOTransport`, or over a local gRPC
+port through :class:`FakeSecretManagerServer`.
+
+.. code-block:: python
+
+    from google.cloud import secretmanager_v1
+    from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+        FakeSecretManagerService,
+    )
+
+    fake = FakeSecretManagerService(latency=0.005)
+    client = secretmanager_v1.SecretManagerServiceClient(
+        transport=fake.transport(),
+    )
+
+The fake is meant for tests and benchmarks, so it is not exported from
+the package. It does not check permissions, and it supports only a
+subset of the list filter syntax.
+"""
+import asyncio
+from collections import Counter, OrderedDict
+from concurrent import futures
+import itertools
+import random
+import re
+import shlex
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import gapic_v1
+from google.auth import credentials as ga_credentials  # type: ignore
+from google.iam.v1 import iam_policy_pb2  # type: ignore
+from google.iam.v1 import policy_pb2  # type: ignore
+from google.protobuf import empty_pb2  # type: ignore
+import grpc  # type: ignore
+from grpc.experimental import aio  # type: ignore
+
+from google.cloud.secretmanager_v1.types import resources, service
+
+from .transports._rpcs import RPCS, SERVICE_NAME, is_proto_plus
+from .transports.base import DEFAULT_CLIENT_INFO, SecretManagerServiceTransport
+
+_PROJECT_RE = re.compile(r"^projects/[^/]+$")
+_SECRET_RE = re.compile(r"^(projects/[^/]+)/secrets/([^/]+)$")
+_VERSION_RE = re.compile(r"^(projects/[^/]+/secrets/[^/]+)/versions/([^/]+)$")
+_SECRET_ID_RE = re.compile(r"^[\w-]{1,255}$")
+_FILTER_TERM_RE = re.compile(r"^(?P<field>[\w.]+)(?P<op>[:=])(?P<value>.*)$")
+
+# Limits enforced by the real service.
+_MAX_PAGE_SIZE = 25000
+_MAX_PAYLOAD_BYTES = 64 * 1024
+
+_SecretPb = resources.Secret.pb()
+_SecretVersionPb = resources.SecretVersion.pb()
+_State = resources.SecretVersion.State
+
+_UPDATABLE_SECRET_FIELDS = frozenset(
+    ("labels", "topics", "expire_time", "ttl", "rotation", "version_aliases")
+)
+
+
+def _copy(message):
+    copy = type(message)()
+    copy.CopyFrom(message)
+    return copy
+
+
+def _compile_filter(expression: str) -> Callable[[Any], bool]:
+    """Compiles the subset of the list filter syntax the fake supports.
+
+    Terms are separated by whitespace and must all match. A term is either
+    ``field:value``, which matches if ``value`` is a substring of the field
+    (or, for ``value`` ``*``, if the field is set), or ``field=value`` for
+    an exact match. ``labels.<key>`` refers to a label. A bare word matches
+    resource names containing it.
+    """
+    try:
+        terms = shlex.split(expression)
+    except ValueError as exc:
+        raise core_exceptions.InvalidArgument("Invalid filter: {}".format(exc))
+
+    checks = []
+    for term in terms:
+        match = _FILTER_TERM_RE.match(term)
+        if match is None:
+            checks.append(lambda message, value=term: value in message.name)
+            continue
+        field, op, value = match.group("field", "op", "value")
+        checks.append(_compile_term(field, op, value))
+    return lambda message: all(check(message) for check in checks)
+
+
+def _compile_term(field: str, op: str, value: str) -> Callable[[Any], bool]:
+    if field.startswith("labels."):
+        key = field[len("labels.") :]
+
+        def get(message):
+            return message.labels.get(key)
+
+    elif field in ("name", "state"):
+
+        def get(message):
+            if field not in message.DESCRIPTOR.fields_by_name:
+                return None
+            result = getattr(message, field)
+            if field == "state":
+                return _State(result).name
+            return result
+
+    else:
+        raise core_exceptions.InvalidArgument(
+            "Unsupported filter field {!r}".format(field)
+        )
+
+    if op == "=":
+        return lambda message: get(message) == value
+    if value == "*":
+        return lambda message: bool(get(message))
+    return lambda message: value in (get(message) or "")
+
+
+class _Secret:
+    __slots__ = ("secret", "versions", "next_version")
+
+    def __init__(self, secret):
+        self.secret = secret
+        self.versions = (
+            OrderedDict()
+        )  # type: OrderedDict[int, Tuple[Any, bytes, Optional[int]]]
+        self.next_version = 1
+
+
+class FakeSecretManagerService:
+    """An in-memory implementation of ``SecretManagerService``.
+
+    Every RPC of the service is a method of this class. Methods accept the
+    request messages used by the clients and return the same responses,
+    and report errors by raising the
+    :class:`google.api_core.exceptions.GoogleAPICallError` subclass the
+    real service would.
+
+    The following behaviour of the real service is modelled: secret and
+    version names, ``latest`` and the secret's ``version_aliases``,
+    version states, etags and etag checks, paging, a subset of the
+    ``filter`` syntax (``field:value``, ``field=value`` and
+    ``labels.<key>`` terms), payload size limits and per-secret IAM
+    policies. Every permission is granted.
+
+    Latency and errors can be injected to exercise client behaviour. All
+    methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: Union[float, Callable[[str], float]] = 0.0,
+        error_rate: float = 0.0,
+        error_factory: Callable[[str], Exception] = None,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Instantiate the fake service.
+
+        Args:
+            latency (Union[float, Callable[[str], float]]): Seconds each RPC
+                takes, or a function of the RPC name (for example
+                ``"access_secret_version"``) which returns them.
+            error_rate (float): The probability, between 0 and 1, that an
+                RPC fails with the error made by ``error_factory``.
+            error_factory (Callable[[str], Exception]): Makes the error for
+                ``error_rate`` from the RPC name. Defaults to
+                :class:`google.api_core.exceptions.ServiceUnavailable`.
+            seed (Optional[int]): Seeds the random number generator used
+                for ``error_rate``.
+            clock (Callable[[], float]): Returns the current time, in
+                seconds since the epoch, for resource timestamps.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_factory = error_factory or (
+            lambda rpc: core_exceptions.ServiceUnavailable(
+                "Injected error in {}".format(rpc)
+            )
+        )
+        self._random = random.Random(seed)
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        self._secrets = OrderedDict()  # type: OrderedDict[str, _Secret]
+        self._policies = {}  # type: Dict[str, policy_pb2.Policy]
+        self._etags = itertools.count(1)
+        self._injected = []  # type: list
+        self._calls = Counter()  # type: Counter[str]
+
+    # Fault injection and introspection.
+
+    def inject_error(
+        self, rpc: str, exception: Exception, *, times: Optional[int] = 1
+    ) -> None:
+        """Makes the next calls to ``rpc`` raise ``exception``.
+
+        Args:
+            rpc (str): The RPC name, such as ``"access_secret_version"``,
+                or ``"*"`` for every RPC.
+            exception (Exception): The error to raise.
+            times (Optional[int]): How many calls fail. If ``None``, calls
+                fail until :meth:`clear_errors` is called.
+        """
+        with self._lock:
+            self._injected.append([rpc, exception, times])
+
+    def clear_errors(self) -> None:
+        """Removes all injected errors."""
+        with self._lock:
+            del self._injected[:]
+
+    @property
+    def calls(self) -> Dict[str, int]:
+        """Dict[str, int]: The number of calls received by each RPC."""
+        with self._lock:
+            return dict(self._calls)
+
+    def latency_for(self, rpc: str) -> float:
+        """Returns the injected latency of a call to ``rpc``, in seconds."""
+        latency = self.latency
+        return latency(rpc) if callable(latency) else latency
+
+    def call(self, rpc: str, request: Any) -> Any:
+        """Handles one call to ``rpc``, after any injected latency.
+
+        Args:
+            rpc (str): The RPC name, such as ``"access_secret_version"``.
+            request (Any): The request message, a dict, or ``None``.
+
+        Returns:
+            Any: The response message.
+        """
+        with self._lock:
+            self._calls[rpc] += 1
+            for injected in self._injected:
+                name, exception, times = injected
+                if name in (rpc, "*"):
+                    if times is not None:
+                        injected[2] -= 1
+                        if injected[2] <= 0:
+                            self._injected.remove(injected)
+                    raise exception
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise self.error_factory(rpc)
+        return getattr(self, rpc)(request)
+
+    def transport(self, **kwargs) -> "FakeSecretManagerServiceTransport":
+        """Returns a sync transport backed by this service."""
+        return FakeSecretManagerServiceTransport(self, **kwargs)
+
+    def async_transport(self, **kwargs) -> "FakeSecretManagerServiceAsyncIOTransport":
+        """Returns an asyncio transport backed by this service."""
+        return FakeSecretManagerServiceAsyncIOTransport(self, **kwargs)
+
+    # Helpers.
+
+    def _now(self):
+        timestamp = _SecretPb().create_time
+        timestamp.FromNanoseconds(int(self._clock() * 1e9))
+        return timestamp
+
+    def _etag(self) -> str:
+        return '"{:016x}"'.format(next(self._etags))
+
+    def _get_secret(self, name: str) -> _Secret:
+        if not _SECRET_RE.match(name or ""):
+            raise core_exceptions.InvalidArgument(
+                "Invalid secret name {!r}".format(name)
+            )
+        entry = self._secrets.get(name)
+        if entry is None:
+            raise core_exceptions.NotFound("Secret [{}] not found.".format(name))
+        return entry
+
+    def _resolve_version(self, name: str) -> Tuple[_Secret, int]:
+        match = _VERSION_RE.match(name or "")
+        if match is None:
+            raise core_exceptions.InvalidArgument(
+                "Invalid secret version name {!r}".format(name)
+            )
+        entry = self._get_secret(match.group(1))
+        version_id = match.group(2)
+        if version_id == "latest":
+            if not entry.versions:
+                raise core_exceptions.NotFound(
+                    "Secret [{}] has no versions.".format(match.group(1))
+                )
+            return entry, next(reversed(entry.versions))
+        if version_id.isdigit():
+            number = int(version_id)
+        elif version_id in entry.secret.version_aliases:
+            number = entry.secret.version_aliases[version_id]
+        else:
+            raise core_exceptions.NotFound(
+                "Secret Version [{}] not found.".format(name)
+            )
+        if number not in entry.versions:
+            raise core_exceptions.NotFound(
+                "Secret Version [{}] not found.".format(name)
+            )
+        return entry, number
+
+    @staticmethod
+    def _check_etag(requested: str, current: str) -> None:
+        if requested and requested != current:
+            raise core_exceptions.Aborted(
+                "The etag {} does not match the current etag.".format(requested)
+            )
+
+    @staticmethod
+    def _page(items, request, response_type, field):
+        if request.page_size < 0:
+            raise core_exceptions.InvalidArgument("page_size must not be negative")
+        page_size = min(request.page_size or _MAX_PAGE_SIZE, _MAX_PAGE_SIZE)
+        try:
+            start = int(request.page_token or 0)
+        except ValueError:
+            raise core_exceptions.InvalidArgument(
+                "Invalid page token {!r}".format(request.page_token)
+            )
+        page = items[start : start + page_size]
+        response = response_type.pb(response_type(total_size=len(items)))
+        getattr(response, field).extend(page)
+        if start + page_size < len(items):
+            response.next_page_token = str(start + page_size)
+        return response_type.wrap(response)
+
+    # RPCs.
+
+    def list_secrets(self, request) -> service.ListSecretsResponse:
+        request = service.ListSecretsRequest(request)
+        if not _PROJECT_RE.match(request.parent):
+            raise core_exceptions.InvalidArgument(
+                "Invalid parent {!r}".format(request.parent)
+            )
+        matches = _compile_filter(request.filter)
+        prefix = request.parent + "/secrets/"
+        with self._lock:
+            secrets = [
+                _copy(entry.secret)
+                for name, entry in self._secrets.items()
+                if name.startswith(prefix) and matches(entry.secret)
+            ]
+        return self._page(secrets, request, service.ListSecretsResponse, "secrets")
+
+    def create_secret(self, request) -> resources.Secret:
+        request = service.CreateSecretRequest(request)
+        if not _PROJECT_RE.match(request.parent):
+            raise core_exceptions.InvalidArgument(
+                "Invalid parent {!r}".format(request.parent)
+            )
+        if not _SECRET_ID_RE.match(request.secret_id):
+            raise core_exceptions.InvalidArgument(
+                "Invalid secret_id {!r}".format(request.secret_id)
+            )
+        secret = _copy(resources.Secret.pb(request.secret))
+        if not secret.replication.WhichOneof("replication"):
+            raise core_exceptions.InvalidArgument("Secret.replication is required.")
+        name = "{}/secrets/{}".format(request.parent, request.secret_id)
+        with self._lock:
+            if name in self._secrets:
+                raise core_exceptions.AlreadyExists(
+                    "Secret [{}] already exists.".format(name)
+                )
+            secret.name = name
+            secret.create_time.CopyFrom(self._now())
+            if secret.HasField("ttl"):
+                secret.expire_time.FromNanoseconds(
+                    secret.create_time.ToNanoseconds() + secret.ttl.ToNanoseconds()
+                )
+                secret.ClearField("ttl")
+            secret.etag = self._etag()
+            self._secrets[name] = _Secret(secret)
+            return resources.Secret.wrap(_copy(secret))
+
+    def add_secret_version(self, request) -> resources.SecretVersion:
+        request = service.AddSecretVersionRequest(request)
+        payload = resources.SecretPayload.pb(request.payload)
+        if len(payload.data) > _MAX_PAYLOAD_BYTES:
+            raise core_exceptions.InvalidArgument(
+                "Secret payload must not exceed {} bytes.".format(_MAX_PAYLOAD_BYTES)
+            )
+        with self._lock:
+            entry = self._get_secret(request.parent)
+            number = entry.next_version
+            entry.next_version += 1
+            version = _SecretVersionPb(
+                name="{}/versions/{}".format(request.parent, number),
+                state=_State.ENABLED,
+                etag=self._etag(),
+                client_specified_payload_checksum=payload.HasField("data_crc32c"),
+            )
+            version.create_time.CopyFrom(self._now())
+            version.replication_status.automatic.SetInParent()
+            checksum = payload.data_crc32c if payload.HasField("data_crc32c") else None
+            entry.versions[number] = (version, payload.data, checksum)
+            return resources.SecretVersion.wrap(_copy(version))
+
+    def get_secret(self, request) -> resources.Secret:
+        request = service.GetSecretRequest(request)
+        with self._lock:
+            return resources.Secret.wrap(_copy(self._get_secret(request.name).secret))
+
+    def update_secret(self, request) -> resources.Secret:
+        request = service.UpdateSecretRequest(request)
+        paths = list(request.update_mask.paths)
+        if not paths:
+            raise core_exceptions.InvalidArgument("update_mask is required.")
+        unknown = [path for path in paths if path not in _UPDATABLE_SECRET_FIELDS]
+        if unknown:
+            raise core_exceptions.InvalidArgument(
+                "Cannot update field(s) {}".format(", ".join(unknown))
+            )
+        update = resources.Secret.pb(request.secret)
+        with self._lock:
+            entry = self._get_secret(update.name)
+            secret = entry.secret
+            self._check_etag(update.etag, secret.etag)
+            for path in paths:
+                if path == "ttl":
+                    secret.expire_time.FromNanoseconds(
+                        int(self._clock() * 1e9) + update.ttl.ToNanoseconds()
+                    )
+                    continue
+                secret.ClearField(path)
+                value = getattr(update, path)
+                if path in ("labels", "version_aliases"):
+                    getattr(secret, path).update(value)
+                elif path == "topics":
+                    secret.topics.extend(value)
+                elif update.HasField(path):
+                    getattr(secret, path).CopyFrom(value)
+            secret.etag = self._etag()
+            return resources.Secret.wrap(_copy(secret))
+
+    def delete_secret(self, request) -> empty_pb2.Empty:
+        request = service.DeleteSecretRequest(request)
+        with self._lock:
+            entry = self._get_secret(request.name)
+            self._check_etag(request.etag, entry.secret.etag)
+            del self._secrets[request.name]
+            self._policies.pop(request.name, None)
+        return empty_pb2.Empty()
+
+    def list_secret_versions(self, request) -> service.ListSecretVersionsResponse:
+        request = service.ListSecretVersionsRequest(request)
+        matches = _compile_filter(request.filter)
+        with self._lock:
+            entry = self._get_secret(request.parent)
+            # Versions are listed newest first.
+            versions = [
+                _copy(version)
+                for version, _, _ in reversed(entry.versions.values())
+                if matches(version)
+            ]
+        return self._page(
+            versions, request, service.ListSecretVersionsResponse, "versions"
+        )
+
+    def get_secret_version(self, request) -> resources.SecretVersion:
+        request = service.GetSecretVersionRequest(request)
+        with self._lock:
+            entry, number = self._resolve_version(request.name)
+            return resources.SecretVersion.wrap(_copy(entry.versions[number][0]))
+
+    def access_secret_version(self, request) -> service.AccessSecretVersionResponse:
+        request = service.AccessSecretVersionRequest(request)
+        with self._lock:
+            entry, number = self._resolve_version(request.name)
+            version, data, checksum = entry.versions[number]
+            if version.state != _State.ENABLED:
+                raise core_exceptions.FailedPrecondition(
+                    "Secret Version [{}] is in {} state.".format(
+                        version.name, _State(version.state).name
+                    )
+                )
+        response = service.AccessSecretVersionResponse.pb()(name=version.name)
+        response.payload.data = data
+        if checksum is not None:
+            response.payload.data_crc32c = checksum
+        return service.AccessSecretVersionResponse.wrap(response)
+
+    def _set_version_state(
+        self, name: str, etag: str, state
+    ) -> resources.SecretVersion:
+        with self._lock:
+            entry, number = self._resolve_version(name)
+            version, data, checksum = entry.versions[number]
+            self._check_etag(etag, version.etag)
+            if version.state == _State.DESTROYED:
+                raise core_exceptions.FailedPrecondition(
+                    "Secret Version [{}] is destroyed.".format(version.name)
+                )
+            version.state = state
+            if state == _State.DESTROYED:
+                version.destroy_time.CopyFrom(self._now())
+                data, checksum = b"", None
+            version.etag = self._etag()
+            entry.versions[number] = (version, data, checksum)
+            return resources.SecretVersion.wrap(_copy(version))
+
+    def disable_secret_version(self, request) -> resources.SecretVersion:
+        request = service.DisableSecretVersionRequest(request)
+        return self._set_version_state(request.name, request.etag, _State.DISABLED)
+
+    def enable_secret_version(self, request) -> resources.SecretVersion:
+        request = service.EnableSecretVersionRequest(request)
+        return self._set_version_state(request.name, request.etag, _State.ENABLED)
+
+    def destroy_secret_version(self, request) -> resources.SecretVersion:
+        request = service.DestroySecretVersionRequest(request)
+        return self._set_version_state(request.name, request.etag, _State.DESTROYED)
+
+    def set_iam_policy(self, request) -> policy_pb2.Policy:
+        if isinstance(request, dict):
+            request = iam_policy_pb2.SetIamPolicyRequest(**request)
+        with self._lock:
+            self._get_secret(request.resource)
+            current = self._policies.get(request.resource, policy_pb2.Policy())
+            if request.policy.etag and request.policy.etag != current.etag:
+                raise core_exceptions.Aborted("The policy etag does not match.")
+            policy = _copy(request.policy)
+            policy.etag = self._etag().encode("ascii")
+            self._policies[request.resource] = policy
+            return _copy(policy)
+
+    def get_iam_policy(self, request) -> policy_pb2.Policy:
+        if isinstance(request, dict):
+            request = iam_policy_pb2.GetIamPolicyRequest(**request)
+        with self._lock:
+            self._get_secret(request.resource)
+            return _copy(self._policies.get(request.resource, policy_pb2.Policy()))
+
+    def test_iam_permissions(
+        self, request
+    ) -> iam_policy_pb2.TestIamPermissionsResponse:
+        if isinstance(request, dict):
+            request = iam_policy_pb2.TestIamPermissionsRequest(**request)
+        with self._lock:
+            self._get_secret(request.resource)
+        return iam_policy_pb2.TestIamPermissionsResponse(
+            permissions=request.permissions
+        )
+
+
+def _stub_property(rpc: str) -> property:
+    return property(lambda self: self._stubs[rpc], doc="The {} stub.".format(rpc))
+
+
+class _FakeStub:
+    def __init__(self, fake: FakeSecretManagerService, rpc: str):
+        self._fake = fake
+        self._rpc = rpc
+
+    def __call__(self, request, timeout=None, metadata=(), **kwargs):
+        latency = self._fake.latency_for(self._rpc)
+        if latency > 0:
+            if timeout is not None and latency > timeout:
+                time.sleep(timeout)
+                raise core_exceptions.DeadlineExceeded("Deadline exceeded.")
+            time.sleep(latency)
+        return self._fake.call(self._rpc, request)
+
+
+class _FakeAsyncStub(aio.UnaryUnaryMultiCallable):
+    def __init__(self, fake: FakeSecretManagerService, rpc: str):
+        self._fake = fake
+        self._rpc = rpc
+
+    async def _call(self, request, timeout):
+        latency = self._fake.latency_for(self._rpc)
+        if latency > 0:
+            if timeout is not None and latency > timeout:
+                await asyncio.sleep(timeout)
+                raise core_exceptions.DeadlineExceeded("Deadline exceeded.")
+            await asyncio.sleep(latency)
+        return self._fake.call(self._rpc, request)
+
+    def __call__(self, request, *, timeout=None, metadata=None, **kwargs):
+        # A task can be awaited and supports done callbacks, like a call.
+        return asyncio.ensure_future(self._call(request, timeout))
+
+
+class FakeSecretManagerServiceTransport(SecretManagerServiceTransport):
+    """A sync transport which calls a :class:`FakeSecretManagerService`.
+
+    Calls go through the same retry and timeout wrappers as the gRPC
+    transport, so retries of injected errors behave as they would against
+    the real service.
+    """
+
+    _stub_class = _FakeStub
+
+    def __init__(
+        self,
+        fake: FakeSecretManagerService = None,
+        *,
+        credentials: ga_credentials.Credentials = None,
+        client_info: gapic_v1.client_info.ClientInfo = DEFAULT_CLIENT_INFO,
+        **kwargs,
+    ) -> None:
+        """Instantiate the transport.
+
+        Args:
+            fake (FakeSecretManagerService): The service to call. A new,
+                empty one is created if not provided.
+            credentials (Optional[google.auth.credentials.Credentials]):
+                Ignored; anonymous credentials are used if not provided.
+            client_info (google.api_core.gapic_v1.client_info.ClientInfo):
+                The client info used to wrap the methods.
+            kwargs: Passed to ``SecretManagerServiceTransport``.
+        """
+        self.fake = fake if fake is not None else FakeSecretManagerService()
+        self._stubs = {rpc: self._stub_class(self.fake, rpc) for rpc, _, _, _ in RPCS}
+        super().__init__(
+            credentials=credentials or ga_credentials.AnonymousCredentials(),
+            client_info=client_info,
+            **kwargs,
+        )
+        self._prep_wrapped_messages(client_info)
+
+    list_secrets = _stub_property("list_secrets")
+    create_secret = _stub_property("create_secret")
+    add_secret_version = _stub_property("add_secret_version")
+    get_secret = _stub_property("get_secret")
+    update_secret = _stub_property("update_secret")
+    delete_secret = _stub_property("delete_secret")
+    list_secret_versions = _stub_property("list_secret_versions")
+    get_secret_version = _stub_property("get_secret_version")
+    access_secret_version = _stub_property("access_secret_version")
+    disable_secret_version = _stub_property("disable_secret_version")
+    enable_secret_version = _stub_property("enable_secret_version")
+    destroy_secret_version = _stub_property("destroy_secret_version")
+    set_iam_policy = _stub_property("set_iam_policy")
+    get_iam_policy = _stub_property("get_iam_policy")
+    test_iam_permissions = _stub_property("test_iam_permissions")
+
+    def close(self):
+        pass
+
+    @property
+    def kind(self) -> str:
+        return "fake"
+
+
+class FakeSecretManagerServiceAsyncIOTransport(FakeSecretManagerServiceTransport):
+    """An asyncio transport which calls a :class:`FakeSecretManagerService`.
+
+    Use it with :class:`SecretManagerServiceAsyncClient`. Injected latency
+    is awaited rather than slept.
+    """
+
+    _stub_class = _FakeAsyncStub
+
+    def _prep_wrapped_messages(self, client_info):
+        # Use the same async retry and timeout wrappers as the gRPC AsyncIO
+        # transport.
+        from .transports.grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
+
+        SecretManagerServiceGrpcAsyncIOTransport._prep_wrapped_messages(
+            self, client_info
+        )
+
+    async def close(self):
+        pass
+
+
+def _rpc_handler(fake: FakeSecretManagerService, rpc, request_type, response_type):
+    if is_proto_plus(request_type):
+        deserialize = request_type.deserialize
+    else:
+        deserialize = request_type.FromString
+    if is_proto_plus(response_type):
+        serialize = response_type.serialize
+    else:
+        serialize = response_type.SerializeToString
+
+    def handle(request, context):
+        latency = fake.latency_for(rpc)
+        if latency > 0:
+            time.sleep(latency)
+        try:
+            return fake.call(rpc, request)
+        except core_exceptions.GoogleAPICallError as exc:
+            context.abort(exc.grpc_status_code or grpc.StatusCode.UNKNOWN, exc.message)
+
+    return grpc.unary_unary_rpc_method_handler(
+        handle,
+        request_deserializer=deserialize,
+        response_serializer=serialize,
+    )
+
+
+class FakeSecretManagerServer:
+    """Serves a :class:`FakeSecretManagerService` on a local gRPC port.
+
+    Unlike the fake transports, this exercises the real gRPC transports,
+    including serialization and the network stack.
+
+    .. code-block:: python
+
+        with FakeSecretManagerServer() as server:
+            client = server.client()
+            ...
+    """
+
+    def __init__(
+        self,
+        fake: FakeSecretManagerService = None,
+        *,
+        host: str = "localhost",
+        port: int = 0,
+        max_workers: int = 16,
+    ):
+        """Instantiate the server.
+
+        Args:
+            fake (FakeSecretManagerService): The service to serve. A new,
+                empty one is created if not provided.
+            host (str): The host to listen on.
+            port (int): The port to listen on; 0 picks a free port.
+            max_workers (int): The number of threads handling calls.
+        """
+        self.fake = fake if fake is not None else FakeSecretManagerService()
+        self._host = host
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+        handlers = {
+            method: _rpc_handler(self.fake, rpc, request_type, response_type)
+            for rpc, method, request_type, response_type in RPCS
+        }
+        self._server.add_generic_rpc_handlers(
+            (grpc.method_handlers_generic_handler(SERVICE_NAME, handlers),)
+        )
+        self._port = self._server.add_insecure_port("{}:{}".format(host, port))
+
+    @property
+    def target(self) -> str:
+        """str: The address clients should connect to."""
+        return "{}:{}".format(self._host, self._port)
+
+    def start(self) -> "FakeSecretManagerServer":
+        """Starts serving and returns the server."""
+        self._server.start()
+        return self
+
+    def stop(self, grace: Optional[float] = None) -> None:
+        """Stops serving.
+
+        Args:
+            grace (Optional[float]): Seconds to let in-flight calls finish.
+        """
+        self._server.stop(grace).wait()
+
+    def client(self, **kwargs):
+        """Returns a ``SecretManagerServiceClient`` connected to this server.
+
+        Args:
+            kwargs: Passed to the client.
+        """
+        from .client import SecretManagerServiceClient
+        from .transports.grpc import SecretManagerServiceGrpcTransport
+
+        transport = SecretManagerServiceGrpcTransport(
+            channel=grpc.insecure_channel(self.target)
+        )
+        return SecretManagerServiceClient(transport=transport, **kwargs)
+
+    def async_client(self, **kwargs):
+        """Returns a ``SecretManagerServiceAsyncClient`` connected to this server.
+
+        Must be called with an event loop running.
+
+        Args:
+            kwargs: Passed to the client.
+        """
+        from .async_client import SecretManagerServiceAsyncClient
+        from .transports.grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
+
+        transport = SecretManagerServiceGrpcAsyncIOTransport(
+            channel=aio.insecure_channel(self.target)
+        )
+        return SecretManagerServiceAsyncClient(transport=transport, **kwargs)
+
+    def __enter__(self) -> "FakeSecretManagerServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+__all__ = (
+    "FakeSecretManagerServer",
+    "FakeSecretManagerService",
+    "FakeSecretManagerServiceAsyncIOTransport",
+    "FakeSecretManagerServiceTransport",
+)
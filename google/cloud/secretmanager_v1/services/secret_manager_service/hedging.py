@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Hedged requests for idempotent Secret Manager reads."""
+import asyncio
+from collections import deque
+from concurrent import futures
+import contextvars
+import math
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+
+from grpc.experimental import aio  # type: ignore
+
+# Methods which only read, and so may safely be sent twice.
+DEFAULT_HEDGED_METHODS = frozenset(
+    (
+        "access_secret_version",
+        "get_secret",
+        "get_secret_version",
+        "list_secrets",
+        "list_secret_versions",
+    )
+)
+
+
+# The most hedges which may be saved up while calls are fast.
+_MAX_BUDGET = 10.0
+
+
+class HedgingStats(NamedTuple):
+    """A point-in-time snapshot of :class:`HedgingPolicy` counters."""
+
+    calls: int
+    hedges: int
+    hedge_wins: int
+
+
+class _Latencies:
+    """Recent attempt latencies of one method, and a cached percentile."""
+
+    __slots__ = ("samples", "pending", "delay")
+
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self.pending = 0
+        self.delay = None  # type: Optional[float]
+
+
+class HedgingPolicy:
+    """Sends a second attempt of slow reads, and uses the first response.
+
+    If an attempt of a hedged method has not completed after a delay, an
+    identical attempt is sent and the first successful response of the
+    two is returned; the other attempt is cancelled. The delay is a
+    percentile of the method's recent attempt latencies, so only the
+    slowest calls are hedged, and is clamped to ``[min_delay, max_delay]``.
+    Until ``min_samples`` latencies are known, ``initial_delay`` is used.
+
+    Every hedged call earns ``max_hedge_ratio`` of a hedge, and a hedge is
+    only sent when a whole one has been earned, so that at most that
+    fraction of calls, across all methods, is sent twice.
+
+    Hedging only applies to the methods in ``methods``, which must be
+    safe to repeat; by default, the reads.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        policy = secretmanager_v1.HedgingPolicy(percentile=95.0)
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"hedging": policy},
+        )
+    """
+
+    def __init__(
+        self,
+        *,
+        methods: Iterable[str] = DEFAULT_HEDGED_METHODS,
+        percentile: float = 95.0,
+        initial_delay: float = 0.1,
+        min_delay: float = 0.005,
+        max_delay: float = 1.0,
+        max_hedge_ratio: float = 0.05,
+        window: int = 1000,
+        min_samples: int = 20,
+        max_workers: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Instantiate the policy.
+
+        Args:
+            methods (Iterable[str]): The methods to hedge, such as
+                ``access_secret_version``.
+            percentile (float): The percentile, between 0 and 100, of
+                recent latencies after which a second attempt is sent.
+            initial_delay (float): The delay, in seconds, until
+                ``min_samples`` latencies are known.
+            min_delay (float): The shortest delay, in seconds.
+            max_delay (float): The longest delay, in seconds.
+            max_hedge_ratio (float): The largest fraction of calls which
+                may be hedged.
+            window (int): The number of recent latencies kept per method.
+            min_samples (int): The number of latencies needed before the
+                percentile is used.
+            max_workers (int): The number of threads used to send attempts
+                from sync clients through transports whose stubs do not
+                provide futures, such as the fake transports. gRPC
+                transports send attempts as futures, without threads.
+            clock (Callable[[], float]): A monotonic clock, in seconds.
+        """
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 <= min_delay <= max_delay:
+            raise ValueError("min_delay must be between 0 and max_delay")
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError("max_hedge_ratio must be between 0 and 1")
+        self._methods = frozenset(methods)
+        self._percentile = percentile
+        self._initial_delay = initial_delay
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._max_hedge_ratio = max_hedge_ratio
+        self._window = window
+        self._min_samples = min_samples
+        self._max_workers = max_workers
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._latencies = {}  # type: Dict[str, _Latencies]
+        self._budget = 0.0
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._executor = None  # type: Optional[futures.ThreadPoolExecutor]
+
+    @property
+    def methods(self) -> frozenset:
+        """frozenset: The hedged methods."""
+        return self._methods
+
+    def delay(self, method: str) -> float:
+        """Returns the seconds after which a call of ``method`` is hedged."""
+        with self._lock:
+            latencies = self._latencies.get(method)
+            if latencies is None or len(latencies.samples) < self._min_samples:
+                return self._initial_delay
+            # Sorting the window on every call would cost more than the
+            # call, so the percentile is refreshed every few samples.
+            if latencies.delay is None or latencies.pending >= 32:
+                ordered = sorted(latencies.samples)
+                index = math.ceil(len(ordered) * self._percentile / 100) - 1
+                latencies.delay = ordered[max(0, index)]
+                latencies.pending = 0
+            return min(self._max_delay, max(self._min_delay, latencies.delay))
+
+    def record(self, method: str, latency: float) -> None:
+        """Records the latency of a successful attempt.
+
+        Args:
+            method (str): The RPC, such as ``access_secret_version``.
+            latency (float): Seconds from sending the attempt to its
+                response.
+        """
+        with self._lock:
+            latencies = self._latencies.get(method)
+            if latencies is None:
+                latencies = self._latencies[method] = _Latencies(self._window)
+            latencies.samples.append(latency)
+            latencies.pending += 1
+
+    def stats(self) -> HedgingStats:
+        """Returns a snapshot of the policy's counters."""
+        with self._lock:
+            return HedgingStats(self._calls, self._hedges, self._hedge_wins)
+
+    def close(self) -> None:
+        """Stops the threads used by sync clients, if any."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _start_call(self) -> None:
+        with self._lock:
+            self._calls += 1
+            self._budget = min(_MAX_BUDGET, self._budget + self._max_hedge_ratio)
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            self._hedges += 1
+            return True
+
+    def _hedge_won(self) -> None:
+        with self._lock:
+            self._hedge_wins += 1
+
+    def _submit(self, func: Callable, *args, **kwargs) -> futures.Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(
+                    self._max_workers, thread_name_prefix="secretmanager-hedging"
+                )
+            executor = self._executor
+        # Run in a copy of the caller's context, as the stub would have.
+        return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+def _remaining(kwargs: dict, elapsed: float) -> dict:
+    timeout = kwargs.get("timeout")
+    if timeout is None:
+        return kwargs
+    return dict(kwargs, timeout=max(0.0, timeout - elapsed))
+
+
+class _HedgedStub:
+    def __init__(self, method: str, stub: Callable, policy: HedgingPolicy):
+        self._method = method
+        self._stub = stub
+        self._policy = policy
+
+    def _send(self, request, args, kwargs, completed: queue.SimpleQueue):
+        policy = self._policy
+        sent = [policy._clock()]
+        if hasattr(self._stub, "future"):
+            future = self._stub.future(request, *args, **kwargs)
+        else:
+
+            def attempt():
+                # Time the attempt from when a thread runs it, so that
+                # waiting for a thread does not raise the hedge delay.
+                sent[0] = policy._clock()
+                return self._stub(request, *args, **kwargs)
+
+            future = policy._submit(attempt)
+
+        def done(future):
+            if not future.cancelled() and future.exception() is None:
+                policy.record(self._method, policy._clock() - sent[0])
+            completed.put(future)
+
+        future.add_done_callback(done)
+        return future
+
+    def __call__(self, request, *args, **kwargs):
+        policy = self._policy
+        policy._start_call()
+        start = policy._clock()
+        completed = queue.SimpleQueue()
+        primary = self._send(request, args, kwargs, completed)
+        pending = [primary]
+        try:
+            first = completed.get(timeout=policy.delay(self._method))
+        except queue.Empty:
+            if policy._take_hedge():
+                hedge_kwargs = _remaining(kwargs, policy._clock() - start)
+                try:
+                    hedge = self._send(request, args, hedge_kwargs, completed)
+                except Exception:
+                    # The primary attempt may still succeed.
+                    pass
+                else:
+                    pending.append(hedge)
+            first = completed.get()
+        while True:
+            pending.remove(first)
+            if first.exception() is None:
+                for other in pending:
+                    other.cancel()
+                if first is not primary:
+                    policy._hedge_won()
+                return first.result()
+            if not pending:
+                # Both attempts failed: report the first attempt's error.
+                return primary.result()
+            first = completed.get()
+
+
+class _AsyncHedgedStub(aio.UnaryUnaryMultiCallable):
+    def __init__(self, method: str, stub: Callable, policy: HedgingPolicy):
+        self._method = method
+        self._stub = stub
+        self._policy = policy
+
+    def _send(self, request, kwargs) -> asyncio.Future:
+        policy = self._policy
+        sent = policy._clock()
+        call = self._stub(request, **kwargs)
+
+        async def attempt():
+            try:
+                response = await call
+            except asyncio.CancelledError:
+                if hasattr(call, "cancel"):
+                    call.cancel()
+                raise
+            policy.record(self._method, policy._clock() - sent)
+            return response
+
+        return asyncio.ensure_future(attempt())
+
+    def __call__(self, request, **kwargs):
+        return self._hedge(request, kwargs)
+
+    async def _hedge(self, request, kwargs):
+        policy = self._policy
+        policy._start_call()
+        start = policy._clock()
+        primary = self._send(request, kwargs)
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=policy.delay(self._method))
+            if not done and policy._take_hedge():
+                hedge_kwargs = _remaining(kwargs, policy._clock() - start)
+                try:
+                    pending.add(self._send(request, hedge_kwargs))
+                except Exception:
+                    # The primary attempt may still succeed.
+                    pass
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            policy._hedge_won()
+                        return task.result()
+                if not pending:
+                    # Both attempts failed: report the first attempt's error.
+                    return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+def hedge_transport(transport, policy: HedgingPolicy) -> None:
+    """Hedges the reads sent through a transport.
+
+    The stubs of the methods in ``policy.methods`` are wrapped, so that
+    each attempt, including retries, may be hedged. Adding the same policy
+    again does nothing.
+
+    Args:
+        transport (google.cloud.secretmanager_v1.services.secret_manager_service.transports.SecretManagerServiceTransport):
+            The transport to hedge, sync or asyncio.
+        policy (HedgingPolicy): The policy to use.
+
+    Raises:
+        ValueError: If the transport already has another policy, or does
+            not keep its stubs in ``_stubs``.
+    """
+    current = getattr(transport, "_hedging_policy", None)
+    if current is policy:
+        return
+    if current is not None:
+        raise ValueError("The transport already has another hedging policy.")
+    if not isinstance(getattr(transport, "_stubs", None), dict):
+        raise ValueError(
+            "Cannot hedge {}: it has no RPC stubs.".format(type(transport).__name__)
+        )
+
+    def wrap(rpc, stub):
+        if rpc not in policy.methods:
+            return stub
+        if isinstance(stub, aio.UnaryUnaryMultiCallable):
+            return _AsyncHedgedStub(rpc, stub, policy)
+        return _HedgedStub(rpc, stub, policy)
+
+    transport._wrap_stubs(wrap)
+    transport._hedging_policy = policy
+
+
+__all__ = (
+    "DEFAULT_HEDGED_METHODS",
+    "HedgingPolicy",
+    "HedgingStats",
+    "hedge_transport",
+)
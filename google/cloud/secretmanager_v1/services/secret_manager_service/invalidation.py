@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Cache invalidation from Secret Manager event notifications.
+
+Secrets configured with ``topics`` publish a Pub/Sub message for every
+change. The event is described entirely by the message attributes
+(``eventType``, ``secretId`` and, for version events, ``versionId``); the
+base64-encoded resource in the message data is never decoded here.
+"""
+import asyncio
+import logging
+import queue
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set
+
+from .batch import AccessSecretVersionResult
+
+_LOGGER = logging.getLogger(__name__)
+
+# Events after which the secret's aliases, such as ``latest``, may
+# resolve to a different version or payload.
+_ALIAS_EVENTS = frozenset(
+    (
+        "SECRET_UPDATE",
+        "SECRET_VERSION_ADD",
+        "SECRET_VERSION_ENABLE",
+        "SECRET_VERSION_DISABLE",
+        "SECRET_VERSION_DESTROY",
+    )
+)
+# Events after which a numbered version can no longer be accessed, or
+# can be accessed again.
+_VERSION_EVENTS = frozenset(
+    (
+        "SECRET_VERSION_ENABLE",
+        "SECRET_VERSION_DISABLE",
+        "SECRET_VERSION_DESTROY",
+    )
+)
+_SECRET_EVENTS = frozenset(("SECRET_DELETE",))
+
+
+class SecretEvent(NamedTuple):
+    """A decoded Secret Manager event notification.
+
+    Attributes:
+        event_type (str): The event type, such as ``SECRET_VERSION_ADD``.
+        secret (str): The secret name, in the format
+            ``projects/*/secrets/*``.
+        version (Optional[str]): The version name, for version events.
+    """
+
+    event_type: str
+    secret: str
+    version: Optional[str] = None
+
+
+def decode_event(message: Any) -> Optional[SecretEvent]:
+    """Decodes a Secret Manager event notification.
+
+    Args:
+        message (Any): One of:
+
+            * a Pub/Sub message with an ``attributes`` mapping, as
+              received by a ``google-cloud-pubsub`` subscriber;
+            * a dict with an ``attributes`` key, as passed to a Cloud
+              Function;
+            * a push delivery, a dict whose ``message`` key holds such a
+              dict;
+            * the attributes mapping itself.
+
+    Returns:
+        Optional[SecretEvent]: The event, or ``None`` if ``message`` is
+        not a Secret Manager notification.
+    """
+    if isinstance(message, Mapping):
+        if "message" in message:
+            message = message["message"]
+        attributes = message.get("attributes", message)
+    else:
+        attributes = getattr(message, "attributes", None)
+    if not attributes:
+        return None
+    event_type = attributes.get("eventType")
+    secret = attributes.get("secretId")
+    if not event_type or not secret:
+        return None
+    return SecretEvent(event_type, secret, attributes.get("versionId") or None)
+
+
+class InvalidationResult(NamedTuple):
+    """The outcome of handling a batch of notifications.
+
+    Attributes:
+        events (int): The number of Secret Manager events in the batch.
+        ignored (int): The number of messages which were not Secret
+            Manager events.
+        invalidated (List[str]): The cached version names which were
+            removed, where the caches can report them.
+        refreshed (List[google.cloud.secretmanager_v1.services.secret_manager_service.batch.AccessSecretVersionResult]):
+            The results of accessing the removed aliases again.
+    """
+
+    events: int
+    ignored: int
+    invalidated: List[str]
+    refreshed: List[AccessSecretVersionResult]
+
+
+class _Plan:
+    """The invalidations needed by a batch of events, one per secret."""
+
+    def __init__(self):
+        self.deleted = set()  # type: Set[str]
+        self.aliases = set()  # type: Set[str]
+        self.versions = {}  # type: Dict[str, Set[str]]
+
+    def add(self, event: SecretEvent) -> bool:
+        secret = event.secret
+        if event.event_type in _SECRET_EVENTS:
+            self.deleted.add(secret)
+        elif event.event_type in _ALIAS_EVENTS:
+            self.aliases.add(secret)
+            if event.event_type in _VERSION_EVENTS and event.version:
+                self.versions.setdefault(secret, set()).add(event.version)
+        else:
+            return False
+        return True
+
+    def apply(self, caches) -> List[str]:
+        invalidated = []
+        for cache in caches:
+            for secret in self.deleted:
+                cache.invalidate_secret(secret)
+            for secret in self.aliases - self.deleted:
+                invalidated.extend(cache.invalidate_aliases(secret))
+                for version in self.versions.get(secret, ()):
+                    cache.invalidate(version)
+        return list(dict.fromkeys(invalidated))
+
+
+class _BaseCacheInvalidator:
+    def __init__(self, client=None, *, caches: Iterable = None, refresh: bool = True):
+        """Instantiate the invalidator.
+
+        Args:
+            client (Optional[Union[google.cloud.secretmanager_v1.SecretManagerServiceClient, google.cloud.secretmanager_v1.SecretManagerServiceAsyncClient]]):
+                The client whose caches are invalidated, and which
+                refreshes them.
+            caches (Optional[Iterable]): The caches to invalidate. Any of
+                :class:`SecretCache`, :class:`SharedSecretCache`,
+                :class:`DiskSecretCache` and :class:`CircuitBreaker`, whose
+                last good responses may be served while a circuit is open.
+                Defaults to the ``secret_cache``, ``disk_cache`` and
+                ``circuit_breaker`` of ``client``.
+            refresh (bool): Whether to access removed aliases, such as
+                ``latest``, again through ``client`` so that the next
+                reader finds the new value cached.
+        """
+        if caches is None:
+            options = getattr(client, "_client", client)
+            caches = [
+                getattr(options, "_secret_cache", None),
+                getattr(options, "_disk_cache", None),
+                getattr(options, "_circuit_breaker", None),
+            ]
+        self._caches = [cache for cache in caches if cache is not None]
+        self._client = client
+        self._refresh = refresh and client is not None
+
+    def _invalidate(self, messages: Iterable[Any]):
+        plan = _Plan()
+        events = ignored = 0
+        for message in messages:
+            event = decode_event(message)
+            if event is None:
+                ignored += 1
+                continue
+            events += 1
+            if not plan.add(event):
+                _LOGGER.debug("Ignoring %s event for %s", *event[:2])
+        return events, ignored, plan.apply(self._caches)
+
+
+class CacheInvalidator(_BaseCacheInvalidator):
+    """Invalidates cached secrets when Secret Manager reports a change.
+
+    Only the affected entries are removed: adding a version removes the
+    secret's aliases such as ``latest``, disabling or destroying a
+    version also removes that version, and deleting the secret removes
+    all of its versions. With ``refresh``, the removed aliases are
+    accessed again in one batch, so that callers do not wait on the
+    first read after a rotation. This allows long cache TTLs without
+    serving stale values.
+
+    .. code-block:: python
+
+        from google.cloud import pubsub_v1, secretmanager_v1
+
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"secret_cache": secretmanager_v1.SecretCache(alias_ttl=3600.0)},
+        )
+        invalidator = secretmanager_v1.CacheInvalidator(client)
+        subscriber = pubsub_v1.SubscriberClient()
+        subscriber.subscribe(subscription_path, invalidator.pubsub_callback)
+    """
+
+    def handle(self, messages: Iterable[Any]) -> InvalidationResult:
+        """Handles a batch of notifications.
+
+        Events are combined per secret before any cache is touched, so a
+        burst of events for one secret costs one invalidation and at most
+        one refresh per alias.
+
+        Args:
+            messages (Iterable[Any]): The notifications, in any form
+                accepted by :func:`decode_event`.
+
+        Returns:
+            InvalidationResult: What was invalidated and refreshed.
+        """
+        events, ignored, invalidated = self._invalidate(messages)
+        refreshed = []
+        if self._refresh and invalidated:
+            refreshed = self._client.access_secret_versions(invalidated)
+        return InvalidationResult(events, ignored, invalidated, refreshed)
+
+    def pubsub_callback(self, message: Any) -> None:
+        """Handles one message from a ``google-cloud-pubsub`` streaming
+        pull and acknowledges it."""
+        self.handle([message])
+        message.ack()
+
+    def listen(self, source: "queue.Queue", *, max_batch_size: int = 100) -> None:
+        """Handles notifications from a queue until it yields ``None``.
+
+        Each batch holds the messages already waiting in the queue, up to
+        ``max_batch_size``.
+
+        Args:
+            source (queue.Queue): The queue of notifications.
+            max_batch_size (int): The maximum number of messages handled
+                together.
+        """
+        while True:
+            message = source.get()
+            if message is None:
+                return
+            batch = [message]
+            while len(batch) < max_batch_size:
+                try:
+                    message = source.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    self.handle(batch)
+                    return
+                batch.append(message)
+            self.handle(batch)
+
+
+class AsyncCacheInvalidator(_BaseCacheInvalidator):
+    """Invalidates cached secrets when Secret Manager reports a change,
+    refreshing them with a :class:`SecretManagerServiceAsyncClient`.
+
+    This is the asyncio counterpart of :class:`CacheInvalidator`.
+    """
+
+    async def handle(self, messages: Iterable[Any]) -> InvalidationResult:
+        """Handles a batch of notifications.
+
+        See :meth:`CacheInvalidator.handle`.
+        """
+        events, ignored, invalidated = self._invalidate(messages)
+        refreshed = []
+        if self._refresh and invalidated:
+            refreshed = await self._client.access_secret_versions(invalidated)
+        return InvalidationResult(events, ignored, invalidated, refreshed)
+
+    async def listen(
+        self, source: "asyncio.Queue", *, max_batch_size: int = 100
+    ) -> None:
+        """Handles notifications from a queue until it yields ``None``.
+
+        See :meth:`CacheInvalidator.listen`.
+        """
+        while True:
+            message = await source.get()
+            if message is None:
+                return
+            batch = [message]
+            while len(batch) < max_batch_size:
+                try:
+                    message = source.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if message is None:
+                    await self.handle(batch)
+                    return
+                batch.append(message)
+            await self.handle(batch)
+
+
+__all__ = (
+    "AsyncCacheInvalidator",
+    "CacheInvalidator",
+    "InvalidationResult",
+    "SecretEvent",
+    "decode_event",
+)
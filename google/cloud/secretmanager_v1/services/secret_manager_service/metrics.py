@@ -0,0 +1,619 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Per-RPC metrics for the Secret Manager clients.
+
+Metrics are collected by instrumenting a transport with a
+:class:`MetricsHook`, which the clients do when the ``metrics`` client
+option is set. A transport which is not instrumented is left untouched,
+so metrics cost nothing unless they are enabled.
+"""
+import asyncio
+from bisect import bisect_left
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from google.api_core import exceptions as core_exceptions
+import grpc  # type: ignore
+from grpc.experimental import aio  # type: ignore
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+DEFAULT_LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+REQUEST = "request"
+RESPONSE = "response"
+
+# The attempt counter of the call in progress in this thread or task.
+_attempts = contextvars.ContextVar("secretmanager_rpc_attempts", default=None)
+
+
+def status_code(exc: BaseException) -> str:
+    """Returns the name of the gRPC status code for an RPC failure.
+
+    Args:
+        exc (BaseException): The exception raised by the RPC.
+
+    Returns:
+        str: A ``grpc.StatusCode`` name, such as ``"UNAVAILABLE"``.
+    """
+    if isinstance(exc, core_exceptions.RetryError):
+        return grpc.StatusCode.DEADLINE_EXCEEDED.name
+    if isinstance(exc, asyncio.CancelledError):
+        return grpc.StatusCode.CANCELLED.name
+    code = getattr(exc, "grpc_status_code", None)
+    if code is None and isinstance(exc, grpc.RpcError):
+        code = exc.code() if callable(getattr(exc, "code", None)) else None
+    return code.name if isinstance(code, grpc.StatusCode) else "UNKNOWN"
+
+
+class MetricsHook:
+    """Receives measurements of the RPCs sent through a transport.
+
+    Subclass it and override the methods of interest; they all do nothing
+    by default. The methods are called in the thread or task which sent
+    the RPC, so they should be quick and thread-safe.
+    :class:`MetricsRecorder` is an implementation which aggregates the
+    measurements in memory.
+    """
+
+    def on_call(self, method: str, code: str, latency: float, attempts: int) -> None:
+        """Called once per RPC, after any retries.
+
+        Args:
+            method (str): The RPC, such as ``access_secret_version``.
+            code (str): The gRPC status code name of the outcome, ``"OK"``
+                on success.
+            latency (float): Seconds spent in the call, including retries
+                and the backoff between them.
+            attempts (int): The number of times the RPC was sent.
+        """
+
+    def on_attempt(self, method: str, code: str, latency: float) -> None:
+        """Called once per attempt, including each retry.
+
+        Args:
+            method (str): The RPC, such as ``access_secret_version``.
+            code (str): The gRPC status code name of the attempt.
+            latency (float): Seconds from sending the request to receiving
+                the deserialized response or the error.
+        """
+
+    def on_marshal(self, method: str, direction: str, seconds: float, size: int):
+        """Called when a message is serialized or deserialized.
+
+        Only transports which serialize messages, such as the gRPC
+        transports, report marshalling.
+
+        Args:
+            method (str): The RPC, such as ``access_secret_version``.
+            direction (str): ``"request"`` when a request was serialized,
+                ``"response"`` when a response was deserialized.
+            seconds (float): The time spent in proto-plus (de)serialization.
+            size (int): The size of the serialized message, in bytes.
+        """
+
+
+class Histogram(NamedTuple):
+    """A point-in-time snapshot of a latency histogram.
+
+    Attributes:
+        buckets (Tuple[float, ...]): The upper bound of each bucket.
+        counts (Tuple[int, ...]): The number of observations in each
+            bucket, not cumulative. The last count is for observations
+            above the last bound.
+        sum (float): The sum of all observations.
+    """
+
+    buckets: Tuple[float, ...]
+    counts: Tuple[int, ...]
+    sum: float
+
+    @property
+    def count(self) -> int:
+        """int: The number of observations."""
+        return sum(self.counts)
+
+
+class MethodMetrics(NamedTuple):
+    """A point-in-time snapshot of the metrics of one RPC method.
+
+    Attributes:
+        calls (Dict[str, int]): The number of calls by status code.
+        latency (Histogram): The latency of calls, including retries.
+        attempts (Dict[str, int]): The number of attempts by status code.
+        attempt_latency (Histogram): The latency of single attempts.
+        marshal_seconds (Dict[str, float]): Seconds spent serializing
+            requests (``"request"``) and deserializing responses
+            (``"response"``).
+        message_bytes (Dict[str, int]): Bytes of serialized requests and
+            responses.
+    """
+
+    calls: Dict[str, int]
+    latency: Histogram
+    attempts: Dict[str, int]
+    attempt_latency: Histogram
+    marshal_seconds: Dict[str, float]
+    message_bytes: Dict[str, int]
+
+    @property
+    def wire_seconds(self) -> float:
+        """float: Seconds spent in attempts, less the time spent in
+        marshalling."""
+        return max(0.0, self.attempt_latency.sum - sum(self.marshal_seconds.values()))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def snapshot(self) -> Histogram:
+        return Histogram(self.buckets, tuple(self.counts), self.sum)
+
+
+class _MethodStats:
+    __slots__ = (
+        "calls",
+        "latency",
+        "attempts",
+        "attempt_latency",
+        "marshal_seconds",
+        "message_bytes",
+    )
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.calls = {}  # type: Dict[str, int]
+        self.latency = _Histogram(buckets)
+        self.attempts = {}  # type: Dict[str, int]
+        self.attempt_latency = _Histogram(buckets)
+        self.marshal_seconds = {REQUEST: 0.0, RESPONSE: 0.0}
+        self.message_bytes = {REQUEST: 0, RESPONSE: 0}
+
+    def snapshot(self) -> MethodMetrics:
+        return MethodMetrics(
+            dict(self.calls),
+            self.latency.snapshot(),
+            dict(self.attempts),
+            self.attempt_latency.snapshot(),
+            dict(self.marshal_seconds),
+            dict(self.message_bytes),
+        )
+
+
+class MetricsRecorder(MetricsHook):
+    """A :class:`MetricsHook` which aggregates measurements in memory.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+        from google.cloud.secretmanager_v1.services.secret_manager_service import (
+            metrics,
+        )
+
+        recorder = metrics.MetricsRecorder()
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"metrics": recorder},
+        )
+        ...
+        print(metrics.render_prometheus(recorder))
+    """
+
+    def __init__(self, *, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """Instantiate the recorder.
+
+        Args:
+            buckets (Sequence[float]): The upper bounds, in seconds, of the
+                latency histogram buckets.
+        """
+        buckets = tuple(sorted(buckets))
+        if not buckets:
+            raise ValueError("buckets must not be empty")
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._methods = {}  # type: Dict[str, _MethodStats]
+
+    def _stats(self, method: str) -> _MethodStats:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = _MethodStats(self._buckets)
+        return stats
+
+    def on_call(self, method: str, code: str, latency: float, attempts: int) -> None:
+        with self._lock:
+            stats = self._stats(method)
+            stats.calls[code] = stats.calls.get(code, 0) + 1
+            stats.latency.observe(latency)
+
+    def on_attempt(self, method: str, code: str, latency: float) -> None:
+        with self._lock:
+            stats = self._stats(method)
+            stats.attempts[code] = stats.attempts.get(code, 0) + 1
+            stats.attempt_latency.observe(latency)
+
+    def on_marshal(self, method: str, direction: str, seconds: float, size: int):
+        with self._lock:
+            stats = self._stats(method)
+            stats.marshal_seconds[direction] += seconds
+            stats.message_bytes[direction] += size
+
+    def snapshot(self) -> Dict[str, MethodMetrics]:
+        """Returns the metrics of each RPC method called so far."""
+        with self._lock:
+            return {
+                method: stats.snapshot()
+                for method, stats in sorted(self._methods.items())
+            }
+
+    def reset(self) -> None:
+        """Discards all measurements."""
+        with self._lock:
+            self._methods.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{%s}" % ",".join(
+        '%s="%s"' % (key, _escape(value)) for key, value in labels.items()
+    )
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(
+    recorder: MetricsRecorder, *, namespace: str = "secretmanager_client"
+) -> str:
+    """Renders the metrics of a recorder in the Prometheus text format.
+
+    The output can be served from a ``/metrics`` endpoint as
+    ``text/plain; version=0.0.4``.
+
+    Args:
+        recorder (MetricsRecorder): The recorder to render.
+        namespace (str): The prefix of the metric names.
+
+    Returns:
+        str: The metrics in the Prometheus text exposition format.
+    """
+    snapshot = recorder.snapshot()
+    lines = []  # type: List[str]
+
+    def header(name, kind, text):
+        lines.append("# HELP {}_{} {}".format(namespace, name, text))
+        lines.append("# TYPE {}_{} {}".format(namespace, name, kind))
+
+    def sample(name, labels, value):
+        lines.append("{}_{}{} {}".format(namespace, name, labels, _number(value)))
+
+    def histogram(name, text, field):
+        header(name, "histogram", text)
+        for method, metrics in snapshot.items():
+            data = getattr(metrics, field)
+            cumulative = 0
+            for bound, count in zip(data.buckets, data.counts):
+                cumulative += count
+                labels = _labels(method=method, le=_number(float(bound)))
+                sample(name + "_bucket", labels, cumulative)
+            labels = _labels(method=method, le="+Inf")
+            sample(name + "_bucket", labels, data.count)
+            sample(name + "_sum", _labels(method=method), data.sum)
+            sample(name + "_count", _labels(method=method), data.count)
+
+    def counter(name, text, field, label):
+        header(name, "counter", text)
+        for method, metrics in snapshot.items():
+            for key, value in sorted(getattr(metrics, field).items()):
+                sample(name, _labels(method=method, **{label: key}), value)
+
+    histogram(
+        "rpc_duration_seconds",
+        "Latency of RPCs, including retries.",
+        "latency",
+    )
+    counter("rpc_calls_total", "RPCs by final status code.", "calls", "code")
+    histogram(
+        "rpc_attempt_duration_seconds",
+        "Latency of single RPC attempts.",
+        "attempt_latency",
+    )
+    counter("rpc_attempts_total", "RPC attempts by status code.", "attempts", "code")
+    counter(
+        "rpc_marshal_seconds_total",
+        "Time spent serializing requests and deserializing responses.",
+        "marshal_seconds",
+        "direction",
+    )
+    header(
+        "rpc_wire_seconds_total",
+        "counter",
+        "Time spent in RPC attempts, less marshalling.",
+    )
+    for method, metrics in snapshot.items():
+        sample("rpc_wire_seconds_total", _labels(method=method), metrics.wire_seconds)
+    counter(
+        "rpc_message_bytes_total",
+        "Serialized size of requests and responses.",
+        "message_bytes",
+        "direction",
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _marshal(method: str, direction: str, func: Callable, hook: MetricsHook, clock):
+    if direction == REQUEST:
+
+        def serialize(message):
+            start = clock()
+            data = func(message)
+            hook.on_marshal(method, REQUEST, clock() - start, len(data))
+            return data
+
+        return serialize
+
+    def deserialize(data):
+        start = clock()
+        message = func(data)
+        hook.on_marshal(method, RESPONSE, clock() - start, len(data))
+        return message
+
+    return deserialize
+
+
+class _MeteredStub:
+    def __init__(self, method: str, stub: Callable, hook: MetricsHook, clock):
+        self._method = method
+        self._stub = stub
+        self._hook = hook
+        self._clock = clock
+        # Let hedging send attempts without a thread of its own, as it
+        # could through the wrapped stub.
+        if hasattr(stub, "future"):
+            self.future = self._future
+
+    def __call__(self, request, *args, **kwargs):
+        attempts = _attempts.get()
+        if attempts is not None:
+            attempts[0] += 1
+        code = "OK"
+        start = self._clock()
+        try:
+            return self._stub(request, *args, **kwargs)
+        except BaseException as exc:
+            code = status_code(exc)
+            raise
+        finally:
+            self._hook.on_attempt(self._method, code, self._clock() - start)
+
+    def _future(self, request, *args, **kwargs):
+        attempts = _attempts.get()
+        if attempts is not None:
+            attempts[0] += 1
+        start = self._clock()
+        try:
+            future = self._stub.future(request, *args, **kwargs)
+        except BaseException as exc:
+            self._hook.on_attempt(self._method, status_code(exc), 0.0)
+            raise
+
+        def done(future):
+            if future.cancelled():
+                code = grpc.StatusCode.CANCELLED.name
+            elif future.exception() is not None:
+                code = status_code(future.exception())
+            else:
+                code = "OK"
+            self._hook.on_attempt(self._method, code, self._clock() - start)
+
+        future.add_done_callback(done)
+        return future
+
+
+class _AsyncMeteredStub(aio.UnaryUnaryMultiCallable):
+    def __init__(self, method: str, stub: Callable, hook: MetricsHook, clock):
+        self._method = method
+        self._stub = stub
+        self._hook = hook
+        self._clock = clock
+
+    def __call__(self, request, **kwargs):
+        attempts = _attempts.get()
+        if attempts is not None:
+            attempts[0] += 1
+        start = self._clock()
+        try:
+            call = self._stub(request, **kwargs)
+        except BaseException as exc:
+            self._hook.on_attempt(self._method, status_code(exc), 0.0)
+            raise
+        return self._attempt(call, start)
+
+    async def _attempt(self, call, start: float):
+        code = "OK"
+        try:
+            return await call
+        except BaseException as exc:
+            code = status_code(exc)
+            raise
+        finally:
+            self._hook.on_attempt(self._method, code, self._clock() - start)
+
+
+class _MeteredMethod:
+    def __init__(self, method: str, wrapped: Callable, hook: MetricsHook, clock):
+        self._method = method
+        self._wrapped = wrapped
+        self._hook = hook
+        self._clock = clock
+
+    def rewrap(self, wrapped: Callable) -> "_MeteredMethod":
+        return type(self)(self._method, wrapped, self._hook, self._clock)
+
+    def __call__(self, *args, **kwargs):
+        attempts = [0]
+        token = _attempts.set(attempts)
+        code = "OK"
+        start = self._clock()
+        try:
+            return self._wrapped(*args, **kwargs)
+        except BaseException as exc:
+            code = status_code(exc)
+            raise
+        finally:
+            _attempts.reset(token)
+            self._hook.on_call(self._method, code, self._clock() - start, attempts[0])
+
+
+class _AsyncMeteredMethod(_MeteredMethod):
+    async def __call__(self, *args, **kwargs):
+        attempts = [0]
+        token = _attempts.set(attempts)
+        code = "OK"
+        start = self._clock()
+        try:
+            return await self._wrapped(*args, **kwargs)
+        except BaseException as exc:
+            code = status_code(exc)
+            raise
+        finally:
+            _attempts.reset(token)
+            self._hook.on_call(self._method, code, self._clock() - start, attempts[0])
+
+
+def instrument_transport(
+    transport, hook: MetricsHook, *, clock: Callable[[], float] = time.perf_counter
+) -> None:
+    """Reports the RPCs sent through a transport to a metrics hook.
+
+    Every RPC stub is wrapped to time each attempt, and every wrapped
+    method to time each call and count its attempts; the retry and
+    timeout defaults are kept. The stubs of the gRPC transports are
+    recreated with timed serializers. Instrumenting a transport again
+    with the same hook does nothing.
+
+    Args:
+        transport (google.cloud.secretmanager_v1.services.secret_manager_service.transports.SecretManagerServiceTransport):
+            The transport to instrument, sync or asyncio.
+        hook (MetricsHook): The hook to report to.
+        clock (Callable[[], float]): A monotonic clock, in seconds.
+
+    Raises:
+        ValueError: If the transport is already instrumented with another
+            hook, already has a rate limiter, hedging or a circuit breaker,
+            or does not keep its stubs in ``_stubs``.
+    """
+    current = getattr(transport, "_metrics_hook", None)
+    if current is hook:
+        return
+    if current is not None:
+        raise ValueError("The transport already reports to another metrics hook.")
+    if any(
+        getattr(transport, attr, None) is not None
+        for attr in ("_rate_limiter", "_hedging_policy", "_circuit_breaker")
+    ):
+        # The gRPC stubs are recreated below, which would drop these.
+        raise ValueError(
+            "Instrument the transport before adding a rate limiter, hedging "
+            "or a circuit breaker."
+        )
+    if not isinstance(getattr(transport, "_stubs", None), dict):
+        raise ValueError(
+            "Cannot instrument {}: it has no RPC stubs.".format(
+                type(transport).__name__
+            )
+        )
+
+    from .transports._rpcs import RPCS, SERVICE_NAME, is_proto_plus
+    from .transports.grpc import SecretManagerServiceGrpcTransport
+    from .transports.grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
+
+    channel = None
+    if isinstance(
+        transport,
+        (SecretManagerServiceGrpcTransport, SecretManagerServiceGrpcAsyncIOTransport),
+    ):
+        channel = transport.grpc_channel
+    types = {rpc: (name, request, response) for rpc, name, request, response in RPCS}
+
+    def wrap(rpc, stub):
+        if channel is not None:
+            name, request_type, response_type = types[rpc]
+            if is_proto_plus(request_type):
+                serialize = request_type.serialize
+            else:
+                serialize = request_type.SerializeToString
+            if is_proto_plus(response_type):
+                deserialize = response_type.deserialize
+            else:
+                deserialize = response_type.FromString
+            stub = channel.unary_unary(
+                "/{}/{}".format(SERVICE_NAME, name),
+                request_serializer=_marshal(rpc, REQUEST, serialize, hook, clock),
+                response_deserializer=_marshal(rpc, RESPONSE, deserialize, hook, clock),
+            )
+        if isinstance(stub, aio.UnaryUnaryMultiCallable):
+            return _AsyncMeteredStub(rpc, stub, hook, clock)
+        return _MeteredStub(rpc, stub, hook, clock)
+
+    # Time the attempts, then the calls of the rebuilt wrapped methods.
+    transport._wrap_stubs(wrap)
+    for stub, wrapped in list(transport._wrapped_methods.items()):
+        if isinstance(stub, _AsyncMeteredStub):
+            metered = _AsyncMeteredMethod(stub._method, wrapped, hook, clock)
+        else:
+            metered = _MeteredMethod(stub._method, wrapped, hook, clock)
+        transport._wrapped_methods[stub] = metered
+    transport._metrics_hook = hook
+
+
+__all__ = (
+    "DEFAULT_LATENCY_BUCKETS",
+    "Histogram",
+    "MethodMetrics",
+    "MetricsHook",
+    "MetricsRecorder",
+    "instrument_transport",
+    "render_prometheus",
+    "status_code",
+)
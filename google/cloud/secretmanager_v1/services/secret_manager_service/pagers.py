@@ -26,6 +26,9 @@ from typing import (
 
 from google.cloud.secretmanager_v1.types import resources, service
 
+from . import projection
+from .prefetch import async_prefetched_pages, prefetched_pages
+
 
 class ListSecretsPager:
     """A pager for iterating through ``list_secrets`` requests.
@@ -51,7 +54,8 @@ class ListSecretsPager:
         request: service.ListSecretsRequest,
         response: service.ListSecretsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0
     ):
         """Instantiate the pager.
 
@@ -64,23 +68,69 @@ class ListSecretsPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, fetch up to this many pages
+                ahead in the background while the current page is being
+                consumed. At most this many pages are buffered.
         """
+        if prefetch_pages < 0:
+            raise ValueError("prefetch_pages must not be negative")
         self._method = method
         self._request = service.ListSecretsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch_pages = prefetch_pages
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
     @property
     def pages(self) -> Iterator[service.ListSecretsResponse]:
+        if self._prefetch_pages:
+            for page in prefetched_pages(
+                self._response, self._fetch, self._prefetch_pages
+            ):
+                self._response = page
+                yield page
+            return
         yield self._response
         while self._response.next_page_token:
             self._request.page_token = self._response.next_page_token
             self._response = self._method(self._request, metadata=self._metadata)
             yield self._response
 
+    def _fetch(self, page_token: str) -> service.ListSecretsResponse:
+        self._request.page_token = page_token
+        return self._method(self._request, metadata=self._metadata)
+
+    def project(self, fields: Optional[Sequence[str]] = None) -> Iterator[Any]:
+        """Iterates through the ``secrets`` field without proto-plus wrappers.
+
+        This avoids building a :class:`google.cloud.secretmanager_v1.types.Secret`
+        wrapper per item, and with ``fields`` set it keeps only the
+        requested fields of each item, so earlier pages can be freed.
+
+        Args:
+            fields (Optional[Sequence[str]]): The ``Secret`` fields to keep.
+                If set, each item is a named tuple with these fields.
+                Otherwise each item is the raw ``Secret`` protobuf message.
+
+        Returns:
+            Iterator[Any]: The projected items.
+
+        Raises:
+            ValueError: If ``fields`` is empty or names an unknown field.
+        """
+        descriptor = resources.Secret.pb().DESCRIPTOR
+        # Check the fields now, rather than when the first item is read.
+        projection.project((), fields, descriptor)
+        return (
+            item
+            for page in self.pages
+            for item in projection.project(
+                service.ListSecretsResponse.pb(page).secrets, fields, descriptor
+            )
+        )
+
     def __iter__(self) -> Iterator[resources.Secret]:
         for page in self.pages:
             yield from page.secrets
@@ -113,7 +163,8 @@ class ListSecretsAsyncPager:
         request: service.ListSecretsRequest,
         response: service.ListSecretsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0
     ):
         """Instantiates the pager.
 
@@ -126,23 +177,70 @@ class ListSecretsAsyncPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, fetch up to this many pages
+                ahead in the background while the current page is being
+                consumed. At most this many pages are buffered.
         """
+        if prefetch_pages < 0:
+            raise ValueError("prefetch_pages must not be negative")
         self._method = method
         self._request = service.ListSecretsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch_pages = prefetch_pages
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
     @property
     async def pages(self) -> AsyncIterator[service.ListSecretsResponse]:
+        if self._prefetch_pages:
+            async for page in async_prefetched_pages(
+                self._response, self._fetch, self._prefetch_pages
+            ):
+                self._response = page
+                yield page
+            return
         yield self._response
         while self._response.next_page_token:
             self._request.page_token = self._response.next_page_token
             self._response = await self._method(self._request, metadata=self._metadata)
             yield self._response
 
+    async def _fetch(self, page_token: str) -> service.ListSecretsResponse:
+        self._request.page_token = page_token
+        return await self._method(self._request, metadata=self._metadata)
+
+    def project(self, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Any]:
+        """Iterates through the ``secrets`` field without proto-plus wrappers.
+
+        This avoids building a :class:`google.cloud.secretmanager_v1.types.Secret`
+        wrapper per item, and with ``fields`` set it keeps only the
+        requested fields of each item, so earlier pages can be freed.
+
+        Args:
+            fields (Optional[Sequence[str]]): The ``Secret`` fields to keep.
+                If set, each item is a named tuple with these fields.
+                Otherwise each item is the raw ``Secret`` protobuf message.
+
+        Returns:
+            AsyncIterator[Any]: The projected items.
+
+        Raises:
+            ValueError: If ``fields`` is empty or names an unknown field.
+        """
+        descriptor = resources.Secret.pb().DESCRIPTOR
+        # Check the fields now, rather than when the first item is read.
+        projection.project((), fields, descriptor)
+
+        async def async_generator():
+            async for page in self.pages:
+                messages = service.ListSecretsResponse.pb(page).secrets
+                for item in projection.project(messages, fields, descriptor):
+                    yield item
+
+        return async_generator()
+
     def __aiter__(self) -> AsyncIterator[resources.Secret]:
         async def async_generator():
             async for page in self.pages:
@@ -179,7 +277,8 @@ class ListSecretVersionsPager:
         request: service.ListSecretVersionsRequest,
         response: service.ListSecretVersionsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0
     ):
         """Instantiate the pager.
 
@@ -192,23 +291,69 @@ class ListSecretVersionsPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, fetch up to this many pages
+                ahead in the background while the current page is being
+                consumed. At most this many pages are buffered.
         """
+        if prefetch_pages < 0:
+            raise ValueError("prefetch_pages must not be negative")
         self._method = method
         self._request = service.ListSecretVersionsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch_pages = prefetch_pages
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
     @property
     def pages(self) -> Iterator[service.ListSecretVersionsResponse]:
+        if self._prefetch_pages:
+            for page in prefetched_pages(
+                self._response, self._fetch, self._prefetch_pages
+            ):
+                self._response = page
+                yield page
+            return
         yield self._response
         while self._response.next_page_token:
             self._request.page_token = self._response.next_page_token
             self._response = self._method(self._request, metadata=self._metadata)
             yield self._response
 
+    def _fetch(self, page_token: str) -> service.ListSecretVersionsResponse:
+        self._request.page_token = page_token
+        return self._method(self._request, metadata=self._metadata)
+
+    def project(self, fields: Optional[Sequence[str]] = None) -> Iterator[Any]:
+        """Iterates through the ``versions`` field without proto-plus wrappers.
+
+        This avoids building a :class:`google.cloud.secretmanager_v1.types.SecretVersion`
+        wrapper per item, and with ``fields`` set it keeps only the
+        requested fields of each item, so earlier pages can be freed.
+
+        Args:
+            fields (Optional[Sequence[str]]): The ``SecretVersion`` fields to keep.
+                If set, each item is a named tuple with these fields.
+                Otherwise each item is the raw ``SecretVersion`` protobuf message.
+
+        Returns:
+            Iterator[Any]: The projected items.
+
+        Raises:
+            ValueError: If ``fields`` is empty or names an unknown field.
+        """
+        descriptor = resources.SecretVersion.pb().DESCRIPTOR
+        # Check the fields now, rather than when the first item is read.
+        projection.project((), fields, descriptor)
+        return (
+            item
+            for page in self.pages
+            for item in projection.project(
+                service.ListSecretVersionsResponse.pb(page).versions, fields, descriptor
+            )
+        )
+
     def __iter__(self) -> Iterator[resources.SecretVersion]:
         for page in self.pages:
             yield from page.versions
@@ -241,7 +386,8 @@ class ListSecretVersionsAsyncPager:
         request: service.ListSecretVersionsRequest,
         response: service.ListSecretVersionsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch_pages: int = 0
     ):
         """Instantiates the pager.
 
@@ -254,23 +400,70 @@ class ListSecretVersionsAsyncPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch_pages (int): If positive, fetch up to this many pages
+                ahead in the background while the current page is being
+                consumed. At most this many pages are buffered.
         """
+        if prefetch_pages < 0:
+            raise ValueError("prefetch_pages must not be negative")
         self._method = method
         self._request = service.ListSecretVersionsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch_pages = prefetch_pages
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
     @property
     async def pages(self) -> AsyncIterator[service.ListSecretVersionsResponse]:
+        if self._prefetch_pages:
+            async for page in async_prefetched_pages(
+                self._response, self._fetch, self._prefetch_pages
+            ):
+                self._response = page
+                yield page
+            return
         yield self._response
         while self._response.next_page_token:
             self._request.page_token = self._response.next_page_token
             self._response = await self._method(self._request, metadata=self._metadata)
             yield self._response
 
+    async def _fetch(self, page_token: str) -> service.ListSecretVersionsResponse:
+        self._request.page_token = page_token
+        return await self._method(self._request, metadata=self._metadata)
+
+    def project(self, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Any]:
+        """Iterates through the ``versions`` field without proto-plus wrappers.
+
+        This avoids building a :class:`google.cloud.secretmanager_v1.types.SecretVersion`
+        wrapper per item, and with ``fields`` set it keeps only the
+        requested fields of each item, so earlier pages can be freed.
+
+        Args:
+            fields (Optional[Sequence[str]]): The ``SecretVersion`` fields to keep.
+                If set, each item is a named tuple with these fields.
+                Otherwise each item is the raw ``SecretVersion`` protobuf message.
+
+        Returns:
+            AsyncIterator[Any]: The projected items.
+
+        Raises:
+            ValueError: If ``fields`` is empty or names an unknown field.
+        """
+        descriptor = resources.SecretVersion.pb().DESCRIPTOR
+        # Check the fields now, rather than when the first item is read.
+        projection.project((), fields, descriptor)
+
+        async def async_generator():
+            async for page in self.pages:
+                messages = service.ListSecretVersionsResponse.pb(page).versions
+                for item in projection.project(messages, fields, descriptor):
+                    yield item
+
+        return async_generator()
+
     def __aiter__(self) -> AsyncIterator[resources.SecretVersion]:
         async def async_generator():
             async for page in self.pages:
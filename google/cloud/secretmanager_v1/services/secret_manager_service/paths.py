@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Precompiled resource name templates.
+
+The ``*_path`` and ``parse_*_path`` helpers of
+:class:`SecretManagerServiceClient` use the templates defined here. The
+templates also parse and build whole iterables of names, which is much
+faster than calling the helpers once per name:
+
+.. code-block:: python
+
+    from google.cloud.secretmanager_v1.services.secret_manager_service import paths
+
+    for project, secret, version in paths.SECRET_VERSION.parse_many(names):
+        ...
+
+    columns = paths.SECRET_VERSION.parse_columns(names)
+    columns["secret"]  # A list with one entry per name.
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+_FIELD_RE = re.compile(r"\{(\w+)\}")
+
+# The number of names parsed by a single regular expression scan.
+_CHUNK_SIZE = 1024
+
+
+class ResourcePath:
+    """A resource name template, such as ``projects/{project}/secrets/{secret}``.
+
+    Parsing matches the client's ``parse_*_path`` helpers exactly: a field
+    matches one or more characters, including ``/``, and the template must
+    match the whole name.
+    """
+
+    def __init__(self, template: str):
+        """Instantiate the template.
+
+        Args:
+            template (str): The template; fields are enclosed in braces.
+        """
+        self._template = template
+        self._fields = tuple(_FIELD_RE.findall(template))
+        literals = _FIELD_RE.split(template)[::2]
+        self._format = "%s".join(literal.replace("%", "%%") for literal in literals)
+        escaped = [re.escape(literal) for literal in literals]
+        self._regex = re.compile(
+            "^"
+            + "".join(
+                literal + "(?P<{}>.+?)".format(field)
+                for literal, field in zip(escaped, self._fields)
+            )
+            + escaped[-1]
+            + "$"
+        )
+        # Matches well-formed names, whose fields do not contain "/", on
+        # their own line of a newline-separated block.
+        self._line_regex = re.compile(
+            "^" + "([^/\n]+)".join(escaped) + "$", flags=re.MULTILINE
+        )
+
+    @property
+    def template(self) -> str:
+        """str: The template this object was created with."""
+        return self._template
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Tuple[str, ...]: The field names, in template order."""
+        return self._fields
+
+    def format(self, *args: Any, **kwargs: Any) -> str:
+        """Builds a name from field values, by position or by name."""
+        if kwargs:
+            try:
+                args += tuple(kwargs.pop(f) for f in self._fields[len(args) :])
+            except KeyError as exc:
+                raise TypeError(
+                    "{} is missing field {}".format(self._template, exc)
+                ) from None
+            if kwargs:
+                raise TypeError(
+                    "{} got unexpected fields {}".format(
+                        self._template, ", ".join(sorted(kwargs))
+                    )
+                )
+        if len(args) != len(self._fields):
+            raise TypeError(
+                "{} takes {} field values, got {}".format(
+                    self._template, len(self._fields), len(args)
+                )
+            )
+        return self._format % args
+
+    def parse(self, path: str) -> Dict[str, str]:
+        """Parses a name into a dict of field values.
+
+        Returns:
+            Dict[str, str]: The field values, or an empty dict if ``path``
+                does not match the template.
+        """
+        m = self._regex.match(path)
+        return m.groupdict() if m else {}
+
+    def parse_tuple(self, path: str) -> Optional[Tuple[str, ...]]:
+        """Parses a name into a tuple of field values, in template order.
+
+        Returns:
+            Optional[Tuple[str, ...]]: The field values, or ``None`` if
+                ``path`` does not match the template.
+        """
+        m = self._regex.match(path)
+        return m.groups() if m else None
+
+    def parse_many(self, paths: Iterable[str]) -> Iterator[Optional[Tuple[str, ...]]]:
+        """Parses names into tuples of field values, in template order.
+
+        Names are matched in blocks with a single regular expression scan.
+        Blocks containing a name with ``/`` or a newline inside a field
+        are parsed name by name, with the same results as :meth:`parse`.
+
+        Args:
+            paths (Iterable[str]): The names to parse.
+
+        Yields:
+            Optional[Tuple[str, ...]]: The field values of each name, or
+                ``None`` for names which do not match the template.
+        """
+        single = len(self._fields) == 1
+        chunk = []  # type: List[str]
+        for path in paths:
+            chunk.append(path)
+            if len(chunk) == _CHUNK_SIZE:
+                yield from self._parse_chunk(chunk, single)
+                chunk = []
+        if chunk:
+            yield from self._parse_chunk(chunk, single)
+
+    def _parse_chunk(self, chunk: List[str], single: bool):
+        block = "\n".join(chunk)
+        # Every line must match, and no name may span several lines.
+        if block.count("\n") == len(chunk) - 1:
+            matches = self._line_regex.findall(block)
+            if len(matches) == len(chunk):
+                return [(m,) for m in matches] if single else matches
+        return [self.parse_tuple(path) for path in chunk]
+
+    def parse_columns(self, paths: Iterable[str]) -> Dict[str, List[Optional[str]]]:
+        """Parses names into one list of values per field.
+
+        Args:
+            paths (Iterable[str]): The names to parse.
+
+        Returns:
+            Dict[str, List[Optional[str]]]: The values of each field, with
+                one entry per name; entries are ``None`` for names which do
+                not match the template.
+        """
+        empty = (None,) * len(self._fields)
+        rows = [values or empty for values in self.parse_many(paths)]
+        if not rows:
+            return {field: [] for field in self._fields}
+        return {field: list(column) for field, column in zip(self._fields, zip(*rows))}
+
+    def format_many(self, values: Iterable[Sequence[Any]]) -> Iterator[str]:
+        """Builds names from rows of field values, in template order.
+
+        Args:
+            values (Iterable[Sequence[Any]]): One sequence of field values
+                per name.
+
+        Yields:
+            str: The names.
+        """
+        fmt = self._format
+        n = len(self._fields)
+        for row in values:
+            row = tuple(row)
+            if len(row) != n:
+                raise TypeError(
+                    "{} takes {} field values, got {}".format(
+                        self._template, n, len(row)
+                    )
+                )
+            yield fmt % row
+
+    def format_columns(self, *columns: Sequence[Any]) -> List[str]:
+        """Builds names from one sequence of values per field.
+
+        Args:
+            columns (Sequence[Any]): The values of each field, in template
+                order. All columns must have the same length.
+
+        Returns:
+            List[str]: The names.
+        """
+        if len(columns) != len(self._fields):
+            raise TypeError(
+                "{} takes {} columns, got {}".format(
+                    self._template, len(self._fields), len(columns)
+                )
+            )
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("All columns must have the same length")
+        fmt = self._format
+        return [fmt % row for row in zip(*columns)]
+
+    def __repr__(self) -> str:
+        return "ResourcePath({!r})".format(self._template)
+
+
+SECRET = ResourcePath("projects/{project}/secrets/{secret}")
+SECRET_VERSION = ResourcePath(
+    "projects/{project}/secrets/{secret}/versions/{secret_version}"
+)
+TOPIC = ResourcePath("projects/{project}/topics/{topic}")
+COMMON_BILLING_ACCOUNT = ResourcePath("billingAccounts/{billing_account}")
+COMMON_FOLDER = ResourcePath("folders/{folder}")
+COMMON_ORGANIZATION = ResourcePath("organizations/{organization}")
+COMMON_PROJECT = ResourcePath("projects/{project}")
+COMMON_LOCATION = ResourcePath("projects/{project}/locations/{location}")
+
+
+__all__ = (
+    "COMMON_BILLING_ACCOUNT",
+    "COMMON_FOLDER",
+    "COMMON_LOCATION",
+    "COMMON_ORGANIZATION",
+    "COMMON_PROJECT",
+    "ResourcePath",
+    "SECRET",
+    "SECRET_VERSION",
+    "TOPIC",
+)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Read-only views of secret payloads, and helpers to decode them."""
+import json
+import threading
+from typing import Any, Dict, Optional, Union
+import weakref
+
+from google.cloud.secretmanager_v1.types import resources, service
+
+_PayloadSource = Union[service.AccessSecretVersionResponse, resources.SecretPayload]
+
+# Views by id() of the message they were created from. proto-plus
+# messages are not hashable, so a WeakKeyDictionary cannot be used; each
+# entry is removed by a finalizer when its message is collected.
+_views = {}  # type: Dict[int, SecretPayloadView]
+_views_lock = threading.Lock()
+
+
+def _payload_pb(source):
+    pb = type(source).pb(source) if hasattr(type(source), "pb") else source
+    if "payload" in pb.DESCRIPTOR.fields_by_name:
+        return pb.payload
+    return pb
+
+
+class SecretPayloadView:
+    """Read-only access to the bytes of a secret payload.
+
+    Every read of ``response.payload.data`` copies the payload out of the
+    underlying protobuf message, and proto-plus wraps ``payload`` in a new
+    object on each access. A view copies the bytes once and then hands out
+    that single ``bytes`` object, ``memoryview`` slices of it, or values
+    decoded straight from it.
+
+    Use :meth:`of` to share one view per response, for example between
+    callers served from a :class:`SecretCache`. The view does not see
+    changes made to the message after it was created.
+    """
+
+    __slots__ = ("_data", "_crc32c")
+
+    def __init__(self, source: _PayloadSource):
+        """Instantiate the view.
+
+        Args:
+            source (Union[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse, google.cloud.secretmanager_v1.types.SecretPayload]):
+                The response or payload to read, as a proto-plus or a raw
+                protobuf message.
+        """
+        payload = _payload_pb(source)
+        self._data = payload.data
+        self._crc32c = payload.data_crc32c if payload.HasField("data_crc32c") else None
+
+    @classmethod
+    def of(cls, source: _PayloadSource) -> "SecretPayloadView":
+        """Returns the view of ``source``, creating it on first use.
+
+        Views of proto-plus messages are cached for as long as ``source``
+        is alive, so repeated calls with the same message do not copy the
+        payload again. Raw protobuf messages get a new view on every call,
+        since whether they can be weakly referenced depends on the
+        protobuf implementation in use.
+
+        Args:
+            source (Union[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse, google.cloud.secretmanager_v1.types.SecretPayload]):
+                The response or payload to read.
+
+        Returns:
+            SecretPayloadView: The view.
+        """
+        if not hasattr(type(source), "pb"):
+            return cls(source)
+        key = id(source)
+        view = _views.get(key)
+        if view is not None:
+            return view
+        view = cls(source)
+        weakref.finalize(source, _views.pop, key, None)
+        with _views_lock:
+            return _views.setdefault(key, view)
+
+    @property
+    def data(self) -> bytes:
+        """bytes: The payload. The same object is returned on every access."""
+        return self._data
+
+    @property
+    def crc32c(self) -> Optional[int]:
+        """Optional[int]: The payload checksum sent by the server, if any."""
+        return self._crc32c
+
+    def memoryview(self) -> memoryview:
+        """Returns a read-only ``memoryview`` of the payload.
+
+        Slicing the view does not copy the payload.
+        """
+        return memoryview(self._data)
+
+    def text(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        """Decodes the payload to a string.
+
+        Args:
+            encoding (str): The payload encoding.
+            errors (str): The error handling scheme, as for ``bytes.decode``.
+        """
+        return self._data.decode(encoding, errors)
+
+    def json(self, **kwargs) -> Any:
+        """Parses the payload as JSON.
+
+        The payload is passed to ``json.loads`` as bytes, so UTF-8, UTF-16
+        and UTF-32 payloads are all accepted.
+
+        Args:
+            kwargs: Passed to ``json.loads``.
+        """
+        return json.loads(self._data, **kwargs)
+
+    def __bytes__(self) -> bytes:
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return "<SecretPayloadView: {} bytes>".format(len(self._data))
+
+
+def payload_bytes(source: _PayloadSource) -> bytes:
+    """Returns the payload of ``source``, copying it at most once.
+
+    Args:
+        source (Union[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse, google.cloud.secretmanager_v1.types.SecretPayload]):
+            The response or payload to read.
+    """
+    return SecretPayloadView.of(source).data
+
+
+def payload_text(
+    source: _PayloadSource, encoding: str = "utf-8", errors: str = "strict"
+) -> str:
+    """Decodes the payload of ``source`` to a string.
+
+    Args:
+        source (Union[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse, google.cloud.secretmanager_v1.types.SecretPayload]):
+            The response or payload to read.
+        encoding (str): The payload encoding.
+        errors (str): The error handling scheme, as for ``bytes.decode``.
+    """
+    return SecretPayloadView.of(source).text(encoding, errors)
+
+
+def payload_json(source: _PayloadSource, **kwargs) -> Any:
+    """Parses the payload of ``source`` as JSON.
+
+    Args:
+        source (Union[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse, google.cloud.secretmanager_v1.types.SecretPayload]):
+            The response or payload to read.
+        kwargs: Passed to ``json.loads``.
+    """
+    return SecretPayloadView.of(source).json(**kwargs)
+
+
+__all__ = (
+    "SecretPayloadView",
+    "payload_bytes",
+    "payload_json",
+    "payload_text",
+)
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Per-method retry and timeout policies, and a shared retry budget."""
+from collections import deque
+import threading
+import time
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple, Union
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import gapic_v1
+from google.api_core import retry as retries
+from google.api_core import retry_async
+import grpc  # type: ignore
+from grpc.experimental import aio  # type: ignore
+
+Retry = Union[retries.Retry, retry_async.AsyncRetry]
+
+
+class MethodPolicy(NamedTuple):
+    """The default timeout and retry settings of one method.
+
+    Attributes:
+        timeout (Optional[float]): The timeout of each attempt, in seconds.
+        retry_codes (Tuple[str, ...]): The ``grpc.StatusCode`` names of
+            errors which are retried, such as ``"UNAVAILABLE"``. If empty,
+            and ``predicate`` is not set, calls are not retried.
+        predicate (Optional[Callable[[Exception], bool]]): Decides which
+            errors are retried, instead of ``retry_codes``.
+        initial_backoff (float): The delay, in seconds, before the first
+            retry.
+        max_backoff (float): The longest delay, in seconds, between
+            retries.
+        backoff_multiplier (float): The factor by which the delay grows
+            after each retry.
+        deadline (Optional[float]): The total time, in seconds, for a
+            call and its retries.
+    """
+
+    timeout: Optional[float] = 60.0
+    retry_codes: Tuple[str, ...] = ()
+    predicate: Optional[Callable[[Exception], bool]] = None
+    initial_backoff: float = 1.0
+    max_backoff: float = 60.0
+    backoff_multiplier: float = 2.0
+    deadline: Optional[float] = 60.0
+
+    def retry(self, asyncio: bool = False) -> Optional[Retry]:
+        """Returns the retry described by the policy.
+
+        Args:
+            asyncio (bool): Whether to return an ``AsyncRetry``, for the
+                asyncio transports.
+
+        Returns:
+            Optional[Union[google.api_core.retry.Retry, google.api_core.retry_async.AsyncRetry]]:
+                The retry, or ``None`` if calls are not retried.
+        """
+        predicate = self.predicate
+        if predicate is None:
+            if not self.retry_codes:
+                return None
+            predicate = retries.if_exception_type(
+                *(
+                    core_exceptions.exception_class_for_grpc_status(
+                        grpc.StatusCode[code]
+                    )
+                    for code in self.retry_codes
+                )
+            )
+        retry_class = retry_async.AsyncRetry if asyncio else retries.Retry
+        return retry_class(
+            initial=self.initial_backoff,
+            maximum=self.max_backoff,
+            multiplier=self.backoff_multiplier,
+            predicate=predicate,
+            deadline=self.deadline,
+        )
+
+
+class RetryBudgetStats(NamedTuple):
+    """A point-in-time snapshot of :class:`RetryBudget` counters."""
+
+    calls: int
+    retries: int
+    denied: int
+
+
+class RetryBudget:
+    """Limits retries to a fraction of calls, so that retries cannot
+    multiply the load on a failing service.
+
+    Every call adds ``ratio`` of a retry to the budget, and every retry
+    takes a whole one; a retry which finds less than one in the budget is
+    not made, and the call fails with its last error. Only the calls and
+    retries of the last ``window_seconds`` count, and
+    ``min_retries_per_second`` retries are allowed regardless of traffic,
+    so that rare calls can still be retried.
+
+    One budget is meant to be shared by every client in the process,
+    through their :class:`RetryPolicy`.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        *,
+        min_retries_per_second: float = 10.0,
+        window_seconds: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Instantiate the budget.
+
+        Args:
+            ratio (float): The largest number of retries per call.
+            min_retries_per_second (float): Retries allowed regardless of
+                the number of calls.
+            window_seconds (int): The number of seconds of calls and
+                retries which count.
+            clock (Callable[[], float]): A monotonic clock, in seconds.
+        """
+        if ratio < 0 or min_retries_per_second < 0:
+            raise ValueError("ratio and min_retries_per_second must not be negative")
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        self._ratio = ratio
+        self._reserve = min_retries_per_second * window_seconds
+        self._window_seconds = window_seconds
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        # [second, calls, retries] for each of the last few seconds.
+        self._buckets = deque()  # type: deque
+        self._window_calls = 0
+        self._window_retries = 0
+        self._calls = 0
+        self._retries = 0
+        self._denied = 0
+
+    def _bucket(self) -> list:
+        second = int(self._clock())
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= second - self._window_seconds:
+            _, calls, retries_ = buckets.popleft()
+            self._window_calls -= calls
+            self._window_retries -= retries_
+        if not buckets or buckets[-1][0] != second:
+            buckets.append([second, 0, 0])
+        return buckets[-1]
+
+    def _deposit(self) -> None:
+        with self._lock:
+            self._bucket()[1] += 1
+            self._window_calls += 1
+            self._calls += 1
+
+    def _withdraw(self) -> bool:
+        with self._lock:
+            bucket = self._bucket()
+            available = (
+                self._ratio * self._window_calls + self._reserve - self._window_retries
+            )
+            if available < 1:
+                self._denied += 1
+                return False
+            bucket[2] += 1
+            self._window_retries += 1
+            self._retries += 1
+            return True
+
+    def budgeted(self, retry: Retry) -> Retry:
+        """Returns a copy of ``retry`` which only retries within the budget.
+
+        Args:
+            retry (Union[google.api_core.retry.Retry, google.api_core.retry_async.AsyncRetry]):
+                The retry to limit.
+        """
+        predicate = retry._predicate
+
+        def budgeted_predicate(exc: Exception) -> bool:
+            return predicate(exc) and self._withdraw()
+
+        return retry.with_predicate(budgeted_predicate)
+
+    def stats(self) -> RetryBudgetStats:
+        """Returns a snapshot of the budget's counters."""
+        with self._lock:
+            return RetryBudgetStats(self._calls, self._retries, self._denied)
+
+
+class _PolicyMethod:
+    """Applies a policy to the calls of a wrapped method."""
+
+    def __init__(
+        self, wrapped: Callable, budget: Optional[RetryBudget], default_timeout: bool
+    ):
+        self._wrapped = wrapped
+        self._budget = budget
+        self._default_timeout = default_timeout
+
+    def __call__(self, *args, retry=gapic_v1.method.DEFAULT, timeout=None, **kwargs):
+        # The clients pass ``timeout=None`` unless the caller gave a
+        # timeout, which would replace the policy's with no timeout at all.
+        if timeout is None and self._default_timeout:
+            timeout = gapic_v1.method.DEFAULT
+        budget = self._budget
+        if budget is not None:
+            budget._deposit()
+            if retry is not None and retry is not gapic_v1.method.DEFAULT:
+                retry = budget.budgeted(retry)
+        return self._wrapped(*args, retry=retry, timeout=timeout, **kwargs)
+
+
+class RetryPolicy:
+    """Sets the default timeout and retries of each method.
+
+    Methods in ``methods`` use their :class:`MethodPolicy`, and the others
+    use ``default``; if ``default`` is ``None``, they keep the settings of
+    the service configuration, and calls without a ``timeout`` have none.
+    A ``retry`` or ``timeout`` passed to a call still overrides the policy
+    for that call.
+
+    With a :class:`RetryBudget`, all retries, including those passed to a
+    call, are limited to a fraction of the calls.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        budget = secretmanager_v1.RetryBudget(ratio=0.1)
+        policy = secretmanager_v1.RetryPolicy(
+            {
+                "access_secret_version": secretmanager_v1.MethodPolicy(
+                    timeout=5.0,
+                    retry_codes=("UNAVAILABLE", "RESOURCE_EXHAUSTED"),
+                    initial_backoff=0.1,
+                    max_backoff=2.0,
+                    deadline=15.0,
+                ),
+            },
+            default=secretmanager_v1.MethodPolicy(timeout=10.0, deadline=10.0),
+            budget=budget,
+        )
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"retry_policy": policy},
+        )
+    """
+
+    def __init__(
+        self,
+        methods: Optional[Mapping[str, MethodPolicy]] = None,
+        *,
+        default: Optional[MethodPolicy] = None,
+        budget: Optional[RetryBudget] = None,
+    ):
+        """Instantiate the policy.
+
+        Args:
+            methods (Optional[Mapping[str, MethodPolicy]]): The settings of
+                specific methods, such as ``access_secret_version``.
+            default (Optional[MethodPolicy]): The settings of the other
+                methods.
+            budget (Optional[RetryBudget]): The budget which limits
+                retries.
+
+        Raises:
+            ValueError: If a policy names an unknown status code.
+        """
+        self._methods = dict(methods or {})  # type: Dict[str, MethodPolicy]
+        self._default = default
+        self._budget = budget
+        for policy in list(self._methods.values()) + [default]:
+            for code in policy.retry_codes if policy is not None else ():
+                if code not in grpc.StatusCode.__members__:
+                    raise ValueError("Unknown status code {!r}.".format(code))
+
+    @property
+    def budget(self) -> Optional[RetryBudget]:
+        """Optional[RetryBudget]: The budget which limits retries."""
+        return self._budget
+
+    def for_method(self, method: str) -> Optional[MethodPolicy]:
+        """Returns the settings of a method, or ``None`` if it keeps the
+        settings of the service configuration."""
+        return self._methods.get(method, self._default)
+
+    def _wrap_methods(self, transport) -> None:
+        """Rebuilds the wrapped methods of a transport with the policy."""
+        for name, stub in transport._stubs.items():
+            wrapped = transport._wrapped_methods.get(stub)
+            if wrapped is None:
+                continue
+            asyncio = isinstance(stub, aio.UnaryUnaryMultiCallable)
+            policy = self.for_method(name)
+            if policy is not None:
+                retry, timeout = policy.retry(asyncio), policy.timeout
+            elif self._budget is not None:
+                # Keep the service configuration's defaults.
+                retry = getattr(wrapped, "_retry", None)
+                timeout = getattr(wrapped, "_timeout", None)
+            else:
+                continue
+            if retry is not None and self._budget is not None:
+                retry = self._budget.budgeted(retry)
+            wrap_method = (
+                gapic_v1.method_async.wrap_method
+                if asyncio
+                else gapic_v1.method.wrap_method
+            )
+            wrapped = wrap_method(
+                stub,
+                default_retry=retry,
+                default_timeout=timeout,
+                client_info=transport._client_info,
+            )
+            transport._wrapped_methods[stub] = _PolicyMethod(
+                wrapped, self._budget, default_timeout=policy is not None
+            )
+
+
+def apply_retry_policy(transport, policy: RetryPolicy) -> None:
+    """Sets the default timeout and retries of a transport's methods.
+
+    The policy stays in effect when the stubs are wrapped afterwards, for
+    instance by :func:`~.metrics.instrument_transport`.
+
+    Args:
+        transport (google.cloud.secretmanager_v1.services.secret_manager_service.transports.SecretManagerServiceTransport):
+            The transport, sync or asyncio.
+        policy (RetryPolicy): The policy to apply.
+
+    Raises:
+        ValueError: If the transport already has another policy, does not
+            keep its stubs in ``_stubs``, or the policy names a method the
+            transport does not have.
+    """
+    current = getattr(transport, "_retry_policy", None)
+    if current is policy:
+        return
+    if current is not None:
+        raise ValueError("The transport already has another retry policy.")
+    if not isinstance(getattr(transport, "_stubs", None), dict):
+        raise ValueError(
+            "Cannot apply a retry policy to {}: it has no RPC stubs.".format(
+                type(transport).__name__
+            )
+        )
+    unknown = sorted(set(policy._methods) - set(transport._stubs))
+    if unknown:
+        raise ValueError("Unknown methods: {}.".format(", ".join(unknown)))
+    transport._retry_policy = policy
+    # Rebuilding the wrapped methods applies the policy, and keeps any
+    # wrappers added to them.
+    transport._wrap_stubs(lambda name, stub: stub)
+
+
+__all__ = (
+    "MethodPolicy",
+    "RetryBudget",
+    "RetryBudgetStats",
+    "RetryPolicy",
+    "apply_retry_policy",
+)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import contextlib
+import queue
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+PageT = TypeVar("PageT")
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("exception",)
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def prefetched_pages(
+    response: PageT,
+    fetch: Callable[[str], PageT],
+    depth: int,
+) -> Iterator[PageT]:
+    """Yields ``response`` and the pages after it, fetching them ahead.
+
+    The following pages are fetched on a background thread, which runs at
+    most ``depth`` pages ahead of the caller. Because each request needs
+    the token from the previous response, only one request is in flight
+    at a time and at most ``depth`` pages are buffered.
+
+    Args:
+        response (PageT): The first page.
+        fetch (Callable[[str], PageT]): Fetches the page for a page token.
+        depth (int): The maximum number of pages fetched ahead.
+
+    Raises:
+        Exception: Any error raised while fetching a page, once the pages
+            before it have been yielded.
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1")
+
+    yield response
+    if not response.next_page_token:
+        return
+
+    buffer = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item):
+        if stopped.is_set():
+            return False
+        buffer.put(item)
+        return True
+
+    def run(token):
+        try:
+            while token:
+                page = fetch(token)
+                token = page.next_page_token
+                if not put(page):
+                    return
+        except Exception as exc:
+            put(_Failure(exc))
+        else:
+            put(_DONE)
+
+    thread = threading.Thread(
+        target=run,
+        args=(response.next_page_token,),
+        name="secretmanager-page-prefetch",
+        daemon=True,
+    )
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
+    finally:
+        # If the caller stopped early, unblock the thread so that it can
+        # notice and exit. Draining once is enough: the thread checks the
+        # flag before each put, so it adds at most one more item.
+        stopped.set()
+        while True:
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                break
+
+
+async def async_prefetched_pages(
+    response: PageT,
+    fetch: Callable[[str], Awaitable[PageT]],
+    depth: int,
+) -> AsyncIterator[PageT]:
+    """Yields ``response`` and the pages after it, fetching them ahead.
+
+    The asyncio counterpart of :func:`prefetched_pages`; the following
+    pages are fetched by a task, which is cancelled if the caller stops
+    iterating early.
+
+    Args:
+        response (PageT): The first page.
+        fetch (Callable[[str], Awaitable[PageT]]): Fetches the page for a
+            page token.
+        depth (int): The maximum number of pages fetched ahead.
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1")
+
+    yield response
+    if not response.next_page_token:
+        return
+
+    buffer = asyncio.Queue(maxsize=depth)
+
+    async def run(token):
+        try:
+            while token:
+                page = await fetch(token)
+                token = page.next_page_token
+                await buffer.put(page)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await buffer.put(_Failure(exc))
+        else:
+            await buffer.put(_DONE)
+
+    task = asyncio.ensure_future(run(response.next_page_token))
+    try:
+        while True:
+            item = await buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
+    finally:
+        task.cancel()
+        # Wait for the task to finish, so that closing the iterator does
+        # not leave it pending.
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+__all__ = (
+    "async_prefetched_pages",
+    "prefetched_pages",
+)
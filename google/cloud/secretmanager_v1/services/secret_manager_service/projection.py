@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import collections
+import functools
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple, Type
+
+from google.protobuf import message as message_lib
+
+
+@functools.lru_cache(maxsize=None)
+def projection_type(descriptor: Any, fields: Tuple[str, ...]) -> Type[tuple]:
+    """Returns the record type used for projections of a message type.
+
+    Args:
+        descriptor (google.protobuf.descriptor.Descriptor): The descriptor
+            of the projected message type.
+        fields (Tuple[str, ...]): The names of the fields to keep.
+
+    Returns:
+        Type[tuple]: A named tuple type with one attribute per field. Named
+            tuples define empty ``__slots__``, so records have no
+            per-instance ``__dict__``.
+
+    Raises:
+        ValueError: If ``fields`` is empty or names a field which
+            ``descriptor`` does not define.
+    """
+    if not fields:
+        raise ValueError("At least one field must be projected.")
+    unknown = [f for f in fields if f not in descriptor.fields_by_name]
+    if unknown:
+        raise ValueError(
+            "{} has no field(s) {}".format(descriptor.full_name, ", ".join(unknown))
+        )
+    return collections.namedtuple(descriptor.name + "Projection", fields)
+
+
+def _detach(value: Any) -> Any:
+    # Copy values out of the parsed message, so that records do not keep
+    # the page they came from alive.
+    if isinstance(value, (str, bytes, int, float)):
+        return value
+    if isinstance(value, message_lib.Message):
+        copy = type(value)()
+        copy.CopyFrom(value)
+        return copy
+    if hasattr(value, "items"):
+        return {key: _detach(item) for key, item in value.items()}
+    return tuple(_detach(item) for item in value)
+
+
+def project(
+    messages: Iterable[message_lib.Message],
+    fields: Optional[Sequence[str]],
+    descriptor: Any,
+) -> Iterator[Any]:
+    """Returns an iterator over lightweight views of protobuf messages.
+
+    Args:
+        messages (Iterable[google.protobuf.message.Message]): The raw
+            protobuf messages, for example the ``secrets`` field of a
+            ``ListSecretsResponse`` protobuf.
+        fields (Optional[Sequence[str]]): The fields to keep. If ``None``,
+            the raw messages are returned without a proto-plus wrapper.
+        descriptor (google.protobuf.descriptor.Descriptor): The descriptor
+            of the message type, used to check ``fields``.
+
+    Returns:
+        Iterator[Any]: The raw messages, or one named tuple per message
+            when ``fields`` is set. Map fields become dicts, repeated
+            fields become tuples, and message fields become copies of the
+            protobuf message. Enum fields are returned as ints.
+
+    Raises:
+        ValueError: If ``fields`` is empty or contains an unknown field.
+            This is raised by this call, not during iteration.
+    """
+    if fields is None:
+        return iter(messages)
+    if isinstance(fields, str):
+        fields = (fields,)
+    record = projection_type(descriptor, tuple(fields))
+    names = record._fields
+    return (record._make([_detach(getattr(m, n)) for n in names]) for m in messages)
+
+
+__all__ = (
+    "project",
+    "projection_type",
+)
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""A client-side adaptive rate limiter for Secret Manager RPCs."""
+import asyncio
+from concurrent import futures
+import threading
+import time
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from google.api_core import exceptions as core_exceptions
+from grpc.experimental import aio  # type: ignore
+
+from .metrics import status_code
+
+# Fields which hold the resource name of a request, in order of preference.
+_RESOURCE_FIELDS = ("name", "parent", "resource")
+
+
+def request_project(request) -> str:
+    """Returns the project a request is for.
+
+    Args:
+        request (Any): A Secret Manager or IAM request message.
+
+    Returns:
+        str: The project ID or number from the request's resource name, or
+        ``""`` if the request does not name a project.
+    """
+    for field in _RESOURCE_FIELDS:
+        value = getattr(request, field, None)
+        if value and isinstance(value, str) and value.startswith("projects/"):
+            return value.split("/", 2)[1]
+    return ""
+
+
+class RateLimiterStats(NamedTuple):
+    """A point-in-time snapshot of :class:`AdaptiveRateLimiter` counters."""
+
+    waits: int
+    wait_seconds: float
+    rejections: int
+    decreases: int
+
+
+class _Bucket:
+    __slots__ = ("ceiling", "rate", "tokens", "updated", "hold_until")
+
+    def __init__(self, ceiling: float, capacity: float, now: float):
+        self.ceiling = ceiling
+        self.rate = ceiling
+        self.tokens = capacity
+        self.updated = now
+        self.hold_until = now
+
+
+class AdaptiveRateLimiter:
+    """Paces RPCs on the client to stay within the server's quota.
+
+    Secret Manager quotas are enforced per project, so each project has
+    a token bucket shared by all methods, and each method has its own
+    token bucket in every project. Each attempt takes a token from both
+    buckets. A bucket starts at its ceiling rate. When the server rejects
+    an attempt with ``ResourceExhausted``, the rates of both buckets are
+    multiplied by ``decrease``; afterwards they grow again by ``increase``
+    calls per second, every second, back up to their ceilings (additive
+    increase, multiplicative decrease).
+
+    An attempt which finds its bucket empty waits for a token, instead of
+    being sent and rejected. If it would wait longer than ``max_wait`` or
+    its timeout, it fails at once with ``ResourceExhausted``, which the
+    default retry policy of ``access_secret_version`` retries.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        limiter = secretmanager_v1.AdaptiveRateLimiter(
+            rate=1000.0,
+            project_rate=1500.0,
+            method_rates={"add_secret_version": 10.0},
+        )
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"rate_limiter": limiter},
+        )
+
+    One limiter may be shared by several clients, sync or async, so that
+    they share their budgets.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1500.0,
+        *,
+        project_rate: Optional[float] = None,
+        method_rates: Optional[Mapping[str, float]] = None,
+        burst_seconds: float = 1.0,
+        min_rate: float = 1.0,
+        decrease: float = 0.5,
+        increase: Optional[float] = None,
+        cooldown: float = 1.0,
+        max_wait: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Instantiate the limiter.
+
+        Args:
+            rate (float): The ceiling, in calls per second, of each method
+                in each project.
+            project_rate (Optional[float]): The ceiling, in calls per
+                second, of all methods together in each project. Defaults
+                to ``rate``.
+            method_rates (Optional[Mapping[str, float]]): Ceilings for
+                specific methods, such as ``access_secret_version``,
+                overriding ``rate``.
+            burst_seconds (float): How many seconds' worth of calls, at the
+                current rate, may be sent at once.
+            min_rate (float): The rate is never decreased below this.
+            decrease (float): The factor applied to the rate after a
+                ``ResourceExhausted`` response.
+            increase (Optional[float]): Calls per second added to the rate
+                for every second without a decrease. Defaults to a tenth
+                of the ceiling, so that the rate recovers in seconds.
+            cooldown (float): Seconds after a decrease during which further
+                ``ResourceExhausted`` responses, from attempts already in
+                flight, are ignored and the rate does not increase.
+            max_wait (float): The longest an attempt waits for a token.
+            clock (Callable[[], float]): A monotonic clock, in seconds.
+            sleep (Callable[[float], None]): Waits in sync clients.
+        """
+        rates = dict(method_rates or {})
+        if project_rate is None:
+            project_rate = rate
+        if (
+            rate <= 0
+            or project_rate <= 0
+            or any(value <= 0 for value in rates.values())
+        ):
+            raise ValueError("rates must be positive")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        if min_rate <= 0 or burst_seconds <= 0:
+            raise ValueError("min_rate and burst_seconds must be positive")
+        self._rate = rate
+        self._project_rate = project_rate
+        self._method_rates = rates
+        self._burst_seconds = burst_seconds
+        self._min_rate = min_rate
+        self._decrease = decrease
+        self._increase = increase
+        self._cooldown = cooldown
+        self._max_wait = max_wait
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        # The bucket of a whole project is keyed by a method of None.
+        self._buckets = {}  # type: Dict[Tuple[Optional[str], str], _Bucket]
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._rejections = 0
+        self._decreases = 0
+
+    def _capacity(self, rate: float) -> float:
+        return max(1.0, rate * self._burst_seconds)
+
+    def _bucket(self, method: Optional[str], project: str, now: float) -> _Bucket:
+        key = (method, project)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if method is None:
+                ceiling = self._project_rate
+            else:
+                ceiling = self._method_rates.get(method, self._rate)
+            bucket = self._buckets[key] = _Bucket(ceiling, self._capacity(ceiling), now)
+            return bucket
+        elapsed = now - bucket.updated
+        if elapsed > 0:
+            if now >= bucket.hold_until and bucket.rate < bucket.ceiling:
+                increase = self._increase
+                if increase is None:
+                    increase = bucket.ceiling / 10
+                growth = now - max(bucket.updated, bucket.hold_until)
+                bucket.rate = min(bucket.ceiling, bucket.rate + increase * growth)
+            bucket.tokens = min(
+                self._capacity(bucket.rate), bucket.tokens + bucket.rate * elapsed
+            )
+            bucket.updated = now
+        return bucket
+
+    def _buckets_for(
+        self, method: str, project: str, now: float
+    ) -> Tuple[_Bucket, _Bucket]:
+        return self._bucket(method, project, now), self._bucket(None, project, now)
+
+    def reserve(
+        self, method: str, project: str = "", timeout: Optional[float] = None
+    ) -> float:
+        """Takes a token for one attempt from the method's and the
+        project's buckets.
+
+        Args:
+            method (str): The RPC, such as ``access_secret_version``.
+            project (str): The project the RPC is for.
+            timeout (Optional[float]): The attempt's timeout, in seconds.
+                It does not wait longer than this.
+
+        Returns:
+            float: The seconds to wait before sending the attempt.
+
+        Raises:
+            google.api_core.exceptions.ResourceExhausted: If the wait would
+                exceed ``max_wait`` or ``timeout``.
+        """
+        with self._lock:
+            buckets = self._buckets_for(method, project, self._clock())
+            for bucket in buckets:
+                bucket.tokens -= 1
+            # Wait for the bucket which is furthest behind.
+            bucket = min(buckets, key=lambda item: item.tokens / item.rate)
+            if bucket.tokens >= 0:
+                return 0.0
+            wait = -bucket.tokens / bucket.rate
+            limit = self._max_wait if timeout is None else min(self._max_wait, timeout)
+            if wait > limit:
+                for item in buckets:
+                    item.tokens += 1
+                self._rejections += 1
+                raise core_exceptions.ResourceExhausted(
+                    "Client-side rate limit of {:.1f} calls/s for {} exceeded.".format(
+                        bucket.rate, method
+                    )
+                )
+            self._waits += 1
+            self._wait_seconds += wait
+            return wait
+
+    def throttled(self, method: str, project: str = "") -> None:
+        """Reports that the server rejected an attempt with
+        ``ResourceExhausted``, decreasing the rates of the method and of
+        the project.
+
+        Args:
+            method (str): The RPC, such as ``access_secret_version``.
+            project (str): The project the RPC is for.
+        """
+        with self._lock:
+            now = self._clock()
+            decreased = False
+            for bucket in self._buckets_for(method, project, now):
+                if now < bucket.hold_until:
+                    continue
+                bucket.rate = max(self._min_rate, bucket.rate * self._decrease)
+                bucket.tokens = min(bucket.tokens, self._capacity(bucket.rate))
+                bucket.hold_until = now + self._cooldown
+                decreased = True
+            if decreased:
+                self._decreases += 1
+
+    def rate(self, method: str, project: str = "") -> float:
+        """Returns the current rate, in calls per second, of a method in a
+        project. It is at most the project's rate."""
+        with self._lock:
+            buckets = self._buckets_for(method, project, self._clock())
+            return min(bucket.rate for bucket in buckets)
+
+    def stats(self) -> RateLimiterStats:
+        """Returns a snapshot of the limiter's counters."""
+        with self._lock:
+            return RateLimiterStats(
+                self._waits, self._wait_seconds, self._rejections, self._decreases
+            )
+
+    def _reserve(self, method: str, request, kwargs) -> Tuple[str, float]:
+        project = request_project(request)
+        timeout = kwargs.get("timeout")
+        wait = self.reserve(method, project, timeout)
+        if wait and timeout is not None:
+            kwargs["timeout"] = timeout - wait
+        return project, wait
+
+    def _observe(self, method: str, project: str, exc: BaseException) -> None:
+        if status_code(exc) == "RESOURCE_EXHAUSTED":
+            self.throttled(method, project)
+
+
+class _LimitedStub:
+    def __init__(self, method: str, stub: Callable, limiter: AdaptiveRateLimiter):
+        self._method = method
+        self._stub = stub
+        self._limiter = limiter
+        # Let hedging send attempts without a thread of its own, as it
+        # could through the wrapped stub.
+        if hasattr(stub, "future"):
+            self.future = self._future
+
+    def __call__(self, request, *args, **kwargs):
+        project, wait = self._limiter._reserve(self._method, request, kwargs)
+        if wait:
+            self._limiter._sleep(wait)
+        try:
+            return self._stub(request, *args, **kwargs)
+        except Exception as exc:
+            self._limiter._observe(self._method, project, exc)
+            raise
+
+    def _future(self, request, *args, **kwargs):
+        project, wait = self._limiter._reserve(self._method, request, kwargs)
+        if wait:
+            # Send the attempt once its token is due, without blocking the
+            # caller, which may be waiting on another attempt.
+            return _DelayedFuture(
+                wait, lambda: self._send_future(request, args, kwargs, project)
+            )
+        return self._send_future(request, args, kwargs, project)
+
+    def _send_future(self, request, args, kwargs, project: str):
+        try:
+            future = self._stub.future(request, *args, **kwargs)
+        except Exception as exc:
+            self._limiter._observe(self._method, project, exc)
+            raise
+
+        def done(future):
+            if not future.cancelled() and future.exception() is not None:
+                self._limiter._observe(self._method, project, future.exception())
+
+        future.add_done_callback(done)
+        return future
+
+
+class _DelayedFuture(futures.Future):
+    """The future of an attempt which is sent after a delay."""
+
+    def __init__(self, delay: float, send: Callable):
+        super().__init__()
+        self._send = send
+        self._inner_lock = threading.Lock()
+        self._inner = None
+        self._cancelling = False
+        timer = threading.Timer(delay, self._start)
+        timer.daemon = True
+        timer.start()
+
+    def cancel(self) -> bool:
+        # Before the attempt is sent, this future is simply cancelled;
+        # afterwards, the attempt itself is.
+        if super().cancel():
+            return True
+        with self._inner_lock:
+            self._cancelling = True
+            inner = self._inner
+        return inner is not None and inner.cancel()
+
+    def _start(self) -> None:
+        if not self.set_running_or_notify_cancel():
+            return
+        try:
+            inner = self._send()
+        except Exception as exc:
+            self.set_exception(exc)
+            return
+        with self._inner_lock:
+            self._inner = inner
+            cancelling = self._cancelling
+        inner.add_done_callback(self._copy)
+        if cancelling:
+            inner.cancel()
+
+    def _copy(self, inner) -> None:
+        if inner.cancelled():
+            self.set_exception(futures.CancelledError())
+        elif inner.exception() is not None:
+            self.set_exception(inner.exception())
+        else:
+            self.set_result(inner.result())
+
+
+class _AsyncLimitedStub(aio.UnaryUnaryMultiCallable):
+    def __init__(self, method: str, stub: Callable, limiter: AdaptiveRateLimiter):
+        self._method = method
+        self._stub = stub
+        self._limiter = limiter
+
+    def __call__(self, request, **kwargs):
+        # Reserve now, so that a rejection is raised by the call itself.
+        project, wait = self._limiter._reserve(self._method, request, kwargs)
+        return self._attempt(request, kwargs, project, wait)
+
+    async def _attempt(self, request, kwargs, project: str, wait: float):
+        if wait:
+            await asyncio.sleep(wait)
+        try:
+            return await self._stub(request, **kwargs)
+        except Exception as exc:
+            self._limiter._observe(self._method, project, exc)
+            raise
+
+
+def limit_transport(transport, limiter: AdaptiveRateLimiter) -> None:
+    """Paces the RPCs sent through a transport with a rate limiter.
+
+    Every RPC stub is wrapped, so that each attempt, including retries,
+    takes a token. Adding the same limiter again does nothing. Metrics
+    added with :func:`~.metrics.instrument_transport` are kept, and do
+    not count the time spent waiting for a token.
+
+    Args:
+        transport (google.cloud.secretmanager_v1.services.secret_manager_service.transports.SecretManagerServiceTransport):
+            The transport to limit, sync or asyncio.
+        limiter (AdaptiveRateLimiter): The limiter to use.
+
+    Raises:
+        ValueError: If the transport already has another limiter, or does
+            not keep its stubs in ``_stubs``.
+    """
+    current = getattr(transport, "_rate_limiter", None)
+    if current is limiter:
+        return
+    if current is not None:
+        raise ValueError("The transport already has another rate limiter.")
+    if not isinstance(getattr(transport, "_stubs", None), dict):
+        raise ValueError(
+            "Cannot limit {}: it has no RPC stubs.".format(type(transport).__name__)
+        )
+
+    def wrap(rpc, stub):
+        if isinstance(stub, aio.UnaryUnaryMultiCallable):
+            return _AsyncLimitedStub(rpc, stub, limiter)
+        return _LimitedStub(rpc, stub, limiter)
+
+    transport._wrap_stubs(wrap)
+    transport._rate_limiter = limiter
+
+
+__all__ = (
+    "AdaptiveRateLimiter",
+    "RateLimiterStats",
+    "limit_transport",
+    "request_project",
+)
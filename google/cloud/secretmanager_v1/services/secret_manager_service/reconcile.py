@@ -0,0 +1,735 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Reconciliation of a project's secrets with a desired-state manifest.
+
+A manifest maps secret IDs to the secrets they should be. Planning lists
+the project's secrets once, compares each with its entry in the manifest
+as it streams past, and keeps only the differences: a secret to create,
+or a secret to update with the smallest ``update_mask`` which brings it to
+its desired state. Applying a plan sends those changes concurrently, each
+update with the etag the secret was listed with.
+"""
+import asyncio
+from concurrent import futures
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import gapic_v1
+from google.api_core import retry as retries
+from google.protobuf import field_mask_pb2  # type: ignore
+
+from google.cloud.secretmanager_v1.types import resources, service
+
+from .batch import DEFAULT_MAX_CONCURRENCY
+
+try:
+    OptionalRetry = Union[retries.Retry, gapic_v1.method._MethodDefault]
+except AttributeError:  # pragma: NO COVER
+    OptionalRetry = Union[retries.Retry, object]  # type: ignore
+
+_SecretPb = resources.Secret.pb()
+
+CREATE = "create"
+UPDATE = "update"
+
+# The secret fields a reconciler manages. ``expiration`` stands for
+# ``expire_time`` or ``ttl``, whichever the desired secret sets.
+MANAGED_FIELDS = ("labels", "topics", "expiration", "rotation", "version_aliases")
+
+SecretLike = Union[resources.Secret, Mapping]
+
+
+def _copy(message):
+    copy = type(message)()
+    copy.CopyFrom(message)
+    return copy
+
+
+def _secret_pb(secret: SecretLike):
+    if isinstance(secret, _SecretPb):
+        return secret
+    if not isinstance(secret, resources.Secret):
+        secret = resources.Secret(secret)
+    return resources.Secret.pb(secret)
+
+
+def _rotation_differs(current, desired) -> bool:
+    if not desired.HasField("rotation"):
+        return current.HasField("rotation")
+    if not current.HasField("rotation"):
+        return True
+    if current.rotation.rotation_period != desired.rotation.rotation_period:
+        return True
+    # The service moves ``next_rotation_time`` forward at each rotation,
+    # so it only has to match when the secret has none.
+    return desired.rotation.HasField(
+        "next_rotation_time"
+    ) and not current.rotation.HasField("next_rotation_time")
+
+
+def _update_mask(current, desired, fields: Iterable[str]) -> Tuple[str, ...]:
+    paths = []
+    for field in fields:
+        if field == "labels" or field == "version_aliases":
+            if dict(getattr(current, field)) != dict(getattr(desired, field)):
+                paths.append(field)
+        elif field == "topics":
+            if sorted(topic.name for topic in current.topics) != sorted(
+                topic.name for topic in desired.topics
+            ):
+                paths.append(field)
+        elif field == "rotation":
+            if _rotation_differs(current, desired):
+                paths.append(field)
+        elif field == "expiration":
+            if desired.HasField("ttl"):
+                # A TTL counts from when it is set, so setting it again
+                # would postpone the expiration on every run; it is only
+                # applied to secrets which do not expire.
+                if not current.HasField("expire_time"):
+                    paths.append("ttl")
+            elif (
+                desired.HasField("expire_time") != current.HasField("expire_time")
+                or desired.expire_time != current.expire_time
+            ):
+                paths.append("expire_time")
+        else:
+            raise ValueError("Unknown field {!r}.".format(field))
+    return tuple(paths)
+
+
+def secret_update_mask(
+    current: SecretLike,
+    desired: SecretLike,
+    fields: Iterable[str] = MANAGED_FIELDS,
+) -> Tuple[str, ...]:
+    """Returns the smallest ``update_mask`` which makes a secret match its
+    desired state.
+
+    Args:
+        current (Union[google.cloud.secretmanager_v1.types.Secret, Mapping]):
+            The secret as it is.
+        desired (Union[google.cloud.secretmanager_v1.types.Secret, Mapping]):
+            The secret as it should be. Fields it does not set are
+            cleared, if they are in ``fields``.
+        fields (Iterable[str]): The fields to compare, from
+            :data:`MANAGED_FIELDS`.
+
+    Returns:
+        Tuple[str, ...]: The paths of the fields which differ, in the order
+        of ``fields``; empty if the secret is already as desired.
+    """
+    return _update_mask(_secret_pb(current), _secret_pb(desired), fields)
+
+
+class SecretChange(NamedTuple):
+    """A change which brings one secret to its desired state.
+
+    Attributes:
+        name (str): The secret's resource name.
+        action (str): ``"create"`` or ``"update"``.
+        desired (google.cloud.secretmanager_v1.types.Secret): The secret as
+            it should be.
+        update_mask (Tuple[str, ...]): For updates, the fields to change.
+        etag (str): For updates, the etag of the secret the change was
+            computed from; the update fails if the secret has changed
+            since.
+    """
+
+    name: str
+    action: str
+    desired: resources.Secret
+    update_mask: Tuple[str, ...] = ()
+    etag: str = ""
+
+
+class ReconcilePlan:
+    """The changes which bring a project's secrets to their desired state.
+
+    Attributes:
+        parent (str): The project, in the format ``projects/*``.
+        changes (List[SecretChange]): The updates, in the order the secrets
+            were listed, then the creates, in the order of the manifest.
+        unchanged (int): The number of secrets already as desired.
+        unmanaged (List[str]): The names of listed secrets which are not in
+            the manifest. They are left alone.
+        listed (int): The number of secrets listed.
+        elapsed (float): Seconds taken to list and compare the secrets.
+        diff_seconds (float): Seconds of ``elapsed`` spent comparing them.
+    """
+
+    def __init__(
+        self,
+        parent: str,
+        changes: List[SecretChange],
+        unchanged: int,
+        unmanaged: List[str],
+        listed: int,
+        elapsed: float,
+        diff_seconds: float,
+    ):
+        self.parent = parent
+        self.changes = changes
+        self.unchanged = unchanged
+        self.unmanaged = unmanaged
+        self.listed = listed
+        self.elapsed = elapsed
+        self.diff_seconds = diff_seconds
+
+    @property
+    def creates(self) -> List[SecretChange]:
+        """List[SecretChange]: The secrets to create."""
+        return [change for change in self.changes if change.action == CREATE]
+
+    @property
+    def updates(self) -> List[SecretChange]:
+        """List[SecretChange]: The secrets to update."""
+        return [change for change in self.changes if change.action == UPDATE]
+
+    def summary(self) -> str:
+        """Describes the plan, one line per change.
+
+        Suitable for review before the plan is applied.
+        """
+        lines = [
+            "Plan for {}: {} to create, {} to update, {} unchanged, "
+            "{} unmanaged; listed {} secrets in {:.1f} ms "
+            "({:.1f} ms comparing).".format(
+                self.parent,
+                len(self.creates),
+                len(self.updates),
+                self.unchanged,
+                len(self.unmanaged),
+                self.listed,
+                self.elapsed * 1e3,
+                self.diff_seconds * 1e3,
+            )
+        ]
+        for change in self.changes:
+            if change.action == CREATE:
+                lines.append("  + {}".format(change.name))
+            else:
+                lines.append(
+                    "  ~ {}  [{}]".format(change.name, ", ".join(change.update_mask))
+                )
+        return "\n".join(lines)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __repr__(self) -> str:
+        return "<ReconcilePlan: {} creates, {} updates, {} unchanged>".format(
+            len(self.creates), len(self.updates), self.unchanged
+        )
+
+
+class SecretChangeResult(NamedTuple):
+    """The outcome of applying one change.
+
+    Exactly one of ``secret`` and ``error`` is set.
+
+    Attributes:
+        change (SecretChange): The change, as planned.
+        secret (Optional[google.cloud.secretmanager_v1.types.Secret]): The
+            secret as it is after the change.
+        error (Optional[Exception]): The error which prevented the
+            change, if any; usually a
+            :class:`google.api_core.exceptions.GoogleAPIError`.
+        attempts (int): The number of requests sent. A change is sent again
+            when the secret was changed by someone else in the meantime.
+        latency (float): Seconds taken to apply the change. Time spent
+            waiting for a free slot is not included.
+    """
+
+    change: SecretChange
+    secret: Optional[resources.Secret] = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """bool: Whether the secret is now as desired."""
+        return self.error is None
+
+
+class ReconcileReport:
+    """The results of applying a plan.
+
+    Attributes:
+        plan (ReconcilePlan): The plan which was applied.
+        results (List[SecretChangeResult]): One result per change, in the
+            order of the plan.
+        elapsed (float): Seconds taken to apply all of them.
+    """
+
+    def __init__(
+        self, plan: ReconcilePlan, results: List[SecretChangeResult], elapsed: float
+    ):
+        self.plan = plan
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def failed(self) -> List[SecretChangeResult]:
+        """List[SecretChangeResult]: The changes which were not applied."""
+        return [result for result in self.results if not result.ok]
+
+    def slowest(self, n: int = 5) -> List[SecretChangeResult]:
+        """Returns the ``n`` results which took longest, slowest first."""
+        return sorted(self.results, key=lambda result: result.latency, reverse=True)[:n]
+
+    def summary(self, n: int = 5) -> str:
+        """Describes the outcome, its failures and its ``n`` slowest
+        changes."""
+        lines = [
+            "Applied {} of {} changes to {} in {:.1f} ms.".format(
+                len(self.results) - len(self.failed),
+                len(self.results),
+                self.plan.parent,
+                self.elapsed * 1e3,
+            )
+        ]
+        for result in self.failed:
+            lines.append("  failed: {}  ({})".format(result.change.name, result.error))
+        for result in self.slowest(n):
+            lines.append(
+                "  {:>9.1f} ms  {} {}".format(
+                    result.latency * 1e3, result.change.action, result.change.name
+                )
+            )
+        return "\n".join(lines)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __repr__(self) -> str:
+        return "<ReconcileReport: {} results, {} failed, {:.1f} ms>".format(
+            len(self.results), len(self.failed), self.elapsed * 1e3
+        )
+
+
+class _PlanBuilder:
+    """Compares listed secrets with the manifest, one at a time."""
+
+    def __init__(self, reconciler: "_BaseSecretReconciler", manifest):
+        self._reconciler = reconciler
+        self._clock = reconciler._clock
+        self._started = self._clock()
+        # The desired secrets not listed yet, by name.
+        self._desired = reconciler._index(manifest)  # type: Dict[str, object]
+        self._updates = []  # type: List[SecretChange]
+        self._unchanged = 0
+        self._unmanaged = []  # type: List[str]
+        self._listed = 0
+        self._diff_seconds = 0.0
+
+    def add(self, secret: resources.Secret) -> None:
+        self._listed += 1
+        desired = self._desired.pop(secret.name, None)
+        if desired is None:
+            self._unmanaged.append(secret.name)
+            return
+        started = self._clock()
+        change = self._reconciler._diff(resources.Secret.pb(secret), desired)
+        self._diff_seconds += self._clock() - started
+        if change is None:
+            self._unchanged += 1
+        else:
+            self._updates.append(change)
+
+    def build(self) -> ReconcilePlan:
+        reconciler = self._reconciler
+        creates = [
+            SecretChange(name, CREATE, resources.Secret.wrap(desired))
+            for name, desired in self._desired.items()
+        ]
+        return ReconcilePlan(
+            reconciler._parent,
+            self._updates + creates,
+            self._unchanged,
+            self._unmanaged,
+            self._listed,
+            self._clock() - self._started,
+            self._diff_seconds,
+        )
+
+
+class _BaseSecretReconciler:
+    def __init__(
+        self,
+        client,
+        parent: str,
+        *,
+        fields: Iterable[str] = MANAGED_FIELDS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_attempts: int = 3,
+        prefetch_pages: int = 2,
+        retry: OptionalRetry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """Instantiate the reconciler.
+
+        Args:
+            client: The client used to list, create and update secrets.
+            parent (str): The project whose secrets are reconciled, in the
+                format ``projects/*``.
+            fields (Iterable[str]): The fields to reconcile, from
+                :data:`MANAGED_FIELDS`. Other fields are only set when a
+                secret is created.
+            max_concurrency (int): The maximum number of changes in flight
+                at once.
+            max_attempts (int): The most requests sent for one change,
+                when the secret is changed by someone else in the meantime.
+            prefetch_pages (int): The number of pages of secrets listed
+                ahead while earlier ones are compared.
+            retry (google.api_core.retry.Retry): Designation of what errors,
+                if any, should be retried.
+            timeout (float): The timeout for each request.
+            clock (Callable[[], float]): Returns the time in seconds, used
+                to measure elapsed time and latency.
+        """
+        fields = tuple(fields)
+        unknown = sorted(set(fields) - set(MANAGED_FIELDS))
+        if unknown:
+            raise ValueError("Unknown fields: {}.".format(", ".join(unknown)))
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self._client = client
+        self._parent = parent
+        self._fields = fields
+        self._max_concurrency = max_concurrency
+        self._max_attempts = max_attempts
+        self._prefetch_pages = prefetch_pages
+        self._retry = retry
+        self._timeout = timeout
+        self._clock = clock
+
+    def _index(self, manifest: Mapping[str, SecretLike]) -> Dict[str, object]:
+        desired = {}
+        for secret_id, secret in manifest.items():
+            name = "{}/secrets/{}".format(self._parent, secret_id)
+            secret = _copy(_secret_pb(secret))
+            secret.name = name
+            secret.ClearField("etag")
+            desired[name] = secret
+        return desired
+
+    def _list_request(self, filter: str) -> service.ListSecretsRequest:
+        return service.ListSecretsRequest(parent=self._parent, filter=filter)
+
+    def _diff(self, current, desired) -> Optional[SecretChange]:
+        mask = _update_mask(current, desired, self._fields)
+        if not mask:
+            return None
+        return SecretChange(
+            current.name, UPDATE, resources.Secret.wrap(desired), mask, current.etag
+        )
+
+    def _request(self, change: SecretChange):
+        """Returns the method and request which apply a change."""
+        desired = resources.Secret.pb(change.desired)
+        if change.action == CREATE:
+            secret = _copy(desired)
+            secret.ClearField("name")
+            return "create_secret", service.CreateSecretRequest(
+                parent=self._parent,
+                secret_id=change.name.rsplit("/", 1)[1],
+                secret=resources.Secret.wrap(secret),
+            )
+        # Only the changed fields are sent.
+        secret = _SecretPb(name=change.name, etag=change.etag)
+        for path in change.update_mask:
+            value = getattr(desired, path)
+            if path in ("labels", "version_aliases"):
+                getattr(secret, path).update(value)
+            elif path == "topics":
+                secret.topics.extend(value)
+            elif desired.HasField(path):
+                getattr(secret, path).CopyFrom(value)
+        return "update_secret", service.UpdateSecretRequest(
+            secret=resources.Secret.wrap(secret),
+            update_mask=field_mask_pb2.FieldMask(paths=list(change.update_mask)),
+        )
+
+    @staticmethod
+    def _conflict(exc: Exception, change: SecretChange) -> bool:
+        if change.action == CREATE:
+            return isinstance(exc, core_exceptions.AlreadyExists)
+        # A mismatched etag is reported as ``Aborted`` or, by some
+        # backends, ``FailedPrecondition``.
+        return isinstance(
+            exc, (core_exceptions.Aborted, core_exceptions.FailedPrecondition)
+        )
+
+    def _replan(
+        self, change: SecretChange, current: resources.Secret
+    ) -> Optional[SecretChange]:
+        """Returns the change to send after a conflict, or ``None`` if the
+        secret is already as desired."""
+        return self._diff(
+            resources.Secret.pb(current), resources.Secret.pb(change.desired)
+        )
+
+    def _result(self, change, started, attempts, secret=None, error=None):
+        return SecretChangeResult(
+            change, secret, error, attempts, latency=self._clock() - started
+        )
+
+
+class SecretReconciler(_BaseSecretReconciler):
+    """Reconciles a project's secrets with a manifest, using a
+    :class:`SecretManagerServiceClient`.
+
+    Changes are applied on a pool of at most ``max_concurrency`` threads
+    sharing the client's channel. A change which finds that the secret was
+    changed, or created, by someone else in the meantime reads the secret
+    again and sends only what still differs.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        reconciler = secretmanager_v1.SecretReconciler(
+            secretmanager_v1.SecretManagerServiceClient(),
+            "projects/my-project",
+            max_concurrency=16,
+        )
+        plan = reconciler.plan(
+            {
+                "db-password": {
+                    "replication": {"automatic": {}},
+                    "labels": {"team": "payments"},
+                },
+            },
+            filter="labels.team=payments",
+        )
+        print(plan.summary())
+        report = reconciler.apply(plan)
+        print(report.summary())
+    """
+
+    def plan(
+        self, manifest: Mapping[str, SecretLike], *, filter: str = ""
+    ) -> ReconcilePlan:
+        """Computes the changes which make the project match a manifest.
+
+        Args:
+            manifest (Mapping[str, Union[google.cloud.secretmanager_v1.types.Secret, Mapping]]):
+                The desired secrets, by secret ID. Secrets which do not
+                exist must set ``replication``.
+            filter (str): A ``list_secrets`` filter which the project's
+                managed secrets match, to list fewer secrets. Secrets in
+                the manifest which it misses are planned as creates, and
+                updated instead when they are found to exist.
+
+        Returns:
+            ReconcilePlan: The changes. Nothing is changed.
+        """
+        builder = _PlanBuilder(self, manifest)
+        pager = self._client.list_secrets(
+            request=self._list_request(filter),
+            retry=self._retry,
+            timeout=self._timeout,
+            prefetch_pages=self._prefetch_pages,
+        )
+        for secret in pager:
+            builder.add(secret)
+        return builder.build()
+
+    def apply(self, plan: ReconcilePlan) -> ReconcileReport:
+        """Applies the changes of a plan.
+
+        Args:
+            plan (ReconcilePlan): The plan, from :meth:`plan`.
+
+        Returns:
+            ReconcileReport: The results. Failures are reported rather than
+            raised.
+        """
+        started = self._clock()
+        if not plan.changes:
+            return ReconcileReport(plan, [], 0.0)
+        with futures.ThreadPoolExecutor(
+            max_workers=min(self._max_concurrency, len(plan.changes))
+        ) as executor:
+            results = list(executor.map(self._apply, plan.changes))
+        return ReconcileReport(plan, results, self._clock() - started)
+
+    def reconcile(
+        self, manifest: Mapping[str, SecretLike], *, filter: str = ""
+    ) -> ReconcileReport:
+        """Plans and applies the changes which make the project match a
+        manifest; see :meth:`plan`."""
+        return self.apply(self.plan(manifest, filter=filter))
+
+    def _apply(self, change: SecretChange) -> SecretChangeResult:
+        started = self._clock()
+        attempts = 0
+        pending = change
+        try:
+            while True:
+                method, request = self._request(pending)
+                attempts += 1
+                try:
+                    secret = getattr(self._client, method)(
+                        request=request, retry=self._retry, timeout=self._timeout
+                    )
+                except core_exceptions.GoogleAPIError as exc:
+                    if attempts >= self._max_attempts or not self._conflict(
+                        exc, pending
+                    ):
+                        raise
+                    current = self._client.get_secret(
+                        name=change.name, retry=self._retry, timeout=self._timeout
+                    )
+                    if pending.action == UPDATE and current.etag == pending.etag:
+                        # The secret has not changed since it was listed.
+                        raise
+                    pending = self._replan(pending, current)
+                    if pending is None:
+                        return self._result(change, started, attempts, secret=current)
+                    continue
+                return self._result(change, started, attempts, secret=secret)
+        except Exception as exc:
+            return self._result(change, started, attempts, error=exc)
+
+
+class AsyncSecretReconciler(_BaseSecretReconciler):
+    """Reconciles a project's secrets with a manifest, using a
+    :class:`SecretManagerServiceAsyncClient`.
+
+    At most ``max_concurrency`` changes are in flight at once; otherwise
+    it behaves as :class:`SecretReconciler`.
+    """
+
+    async def plan(
+        self, manifest: Mapping[str, SecretLike], *, filter: str = ""
+    ) -> ReconcilePlan:
+        """Computes the changes which make the project match a manifest.
+
+        Args:
+            manifest (Mapping[str, Union[google.cloud.secretmanager_v1.types.Secret, Mapping]]):
+                The desired secrets, by secret ID. Secrets which do not
+                exist must set ``replication``.
+            filter (str): A ``list_secrets`` filter which the project's
+                managed secrets match, to list fewer secrets.
+
+        Returns:
+            ReconcilePlan: The changes. Nothing is changed.
+        """
+        builder = _PlanBuilder(self, manifest)
+        pager = await self._client.list_secrets(
+            request=self._list_request(filter),
+            retry=self._retry,
+            timeout=self._timeout,
+            prefetch_pages=self._prefetch_pages,
+        )
+        async for secret in pager:
+            builder.add(secret)
+        return builder.build()
+
+    async def apply(self, plan: ReconcilePlan) -> ReconcileReport:
+        """Applies the changes of a plan.
+
+        Args:
+            plan (ReconcilePlan): The plan, from :meth:`plan`.
+
+        Returns:
+            ReconcileReport: The results. Failures are reported rather than
+            raised.
+        """
+        started = self._clock()
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def apply(change: SecretChange) -> SecretChangeResult:
+            async with semaphore:
+                return await self._apply(change)
+
+        results = await asyncio.gather(*[apply(change) for change in plan.changes])
+        return ReconcileReport(plan, list(results), self._clock() - started)
+
+    async def reconcile(
+        self, manifest: Mapping[str, SecretLike], *, filter: str = ""
+    ) -> ReconcileReport:
+        """Plans and applies the changes which make the project match a
+        manifest; see :meth:`plan`."""
+        return await self.apply(await self.plan(manifest, filter=filter))
+
+    async def _apply(self, change: SecretChange) -> SecretChangeResult:
+        started = self._clock()
+        attempts = 0
+        pending = change
+        try:
+            while True:
+                method, request = self._request(pending)
+                attempts += 1
+                try:
+                    secret = await getattr(self._client, method)(
+                        request=request, retry=self._retry, timeout=self._timeout
+                    )
+                except core_exceptions.GoogleAPIError as exc:
+                    if attempts >= self._max_attempts or not self._conflict(
+                        exc, pending
+                    ):
+                        raise
+                    current = await self._client.get_secret(
+                        name=change.name, retry=self._retry, timeout=self._timeout
+                    )
+                    if pending.action == UPDATE and current.etag == pending.etag:
+                        # The secret has not changed since it was listed.
+                        raise
+                    pending = self._replan(pending, current)
+                    if pending is None:
+                        return self._result(change, started, attempts, secret=current)
+                    continue
+                return self._result(change, started, attempts, secret=secret)
+        except Exception as exc:
+            return self._result(change, started, attempts, error=exc)
+
+
+__all__ = (
+    "AsyncSecretReconciler",
+    "CREATE",
+    "MANAGED_FIELDS",
+    "ReconcilePlan",
+    "ReconcileReport",
+    "SecretChange",
+    "SecretChangeResult",
+    "SecretReconciler",
+    "UPDATE",
+    "secret_update_mask",
+)
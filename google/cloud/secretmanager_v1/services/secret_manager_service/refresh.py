@@ -0,0 +1,595 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import heapq
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import gapic_v1
+
+from google.cloud.secretmanager_v1.types import resources, service
+
+from . import checksum
+from .cache import SecretCache
+
+_LOGGER = logging.getLogger(__name__)
+
+# Refresh interval used when the client has no cache to stay ahead of.
+DEFAULT_REFRESH_INTERVAL = 60.0
+
+# Fraction of the cache's alias TTL after which a refresh is scheduled.
+_REFRESH_AHEAD_FACTOR = 0.8
+
+# Upper bound of the delay before retrying a failed refresh.
+_MAX_RETRY_DELAY = 60.0
+
+
+def _latest(secret: str) -> str:
+    return secret + "/versions/latest"
+
+
+def _next_rotation_time(secret: resources.Secret) -> Optional[float]:
+    pb = resources.Secret.pb(secret)
+    if not pb.HasField("rotation") or not pb.rotation.HasField("next_rotation_time"):
+        return None
+    timestamp = pb.rotation.next_rotation_time
+    return timestamp.seconds + timestamp.nanos / 1e9
+
+
+class _Subscription:
+    __slots__ = ("secret", "response", "next_rotation", "failures", "error", "due")
+
+    def __init__(self, secret, response, next_rotation):
+        self.secret = secret
+        self.response = response
+        self.next_rotation = next_rotation
+        self.failures = 0
+        self.error = None
+        self.due = None
+
+
+class _RefreshSchedule:
+    """Bookkeeping shared by :class:`SecretRefresher` and
+    :class:`AsyncSecretRefresher`."""
+
+    def __init__(
+        self,
+        cache: Optional[SecretCache],
+        refresh_interval: Optional[float],
+        jitter: float,
+        rotation_spread: float,
+        clock: Callable[[], float],
+        wall_clock: Callable[[], float],
+    ):
+        if refresh_interval is None:
+            if cache is not None and cache.alias_ttl > 0:
+                refresh_interval = cache.alias_ttl * _REFRESH_AHEAD_FACTOR
+            else:
+                refresh_interval = DEFAULT_REFRESH_INTERVAL
+        if refresh_interval <= 0:
+            raise ValueError("refresh_interval must be positive")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in [0, 1)")
+
+        self._cache = cache
+        self._refresh_interval = refresh_interval
+        self._jitter = jitter
+        self._rotation_spread = rotation_spread
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._random = random.Random()
+        self._subscriptions = {}  # type: Dict[str, _Subscription]
+        self._heap = []  # type: List[Tuple[float, str]]
+
+    @property
+    def refresh_interval(self) -> float:
+        return self._refresh_interval
+
+    def next_delay(self, subscription: _Subscription) -> float:
+        # Refreshes are only ever moved earlier by the jitter, so that a
+        # cached entry is always replaced before it expires.
+        delay = self._refresh_interval * (1.0 - self._jitter * self._random.random())
+        if subscription.failures:
+            retry_delay = min(_MAX_RETRY_DELAY, 2.0 ** (subscription.failures - 1))
+            delay = min(
+                delay, retry_delay * (1.0 - self._jitter * self._random.random())
+            )
+        if subscription.next_rotation is not None:
+            # A rotated value can only show up once the rotation time has
+            # passed; spread the fleet's reads over the following window.
+            until_rotation = subscription.next_rotation - self._wall_clock()
+            if until_rotation > 0:
+                delay = min(
+                    delay,
+                    until_rotation + self._rotation_spread * self._random.random(),
+                )
+        return delay
+
+    def add(self, subscription: _Subscription) -> None:
+        self._subscriptions[subscription.secret] = subscription
+        self.schedule(subscription)
+
+    def schedule(self, subscription: _Subscription) -> None:
+        subscription.due = self._clock() + self.next_delay(subscription)
+        heapq.heappush(self._heap, (subscription.due, subscription.secret))
+
+    def remove(self, secret: str) -> None:
+        self._subscriptions.pop(secret, None)
+
+    def get(self, secret: str) -> Optional[_Subscription]:
+        return self._subscriptions.get(secret)
+
+    def time_until_next(self) -> Optional[float]:
+        while self._heap:
+            due, secret = self._heap[0]
+            subscription = self._subscriptions.get(secret)
+            if subscription is not None and subscription.due == due:
+                return max(0.0, due - self._clock())
+            # The secret was unsubscribed or rescheduled; drop the entry.
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self) -> List[_Subscription]:
+        now = self._clock()
+        due = []
+        while self.time_until_next() is not None and self._heap[0][0] <= now:
+            _, secret = heapq.heappop(self._heap)
+            subscription = self._subscriptions[secret]
+            subscription.due = None
+            due.append(subscription)
+        return due
+
+    def rotation_passed(self, subscription: _Subscription) -> bool:
+        return (
+            subscription.next_rotation is not None
+            and subscription.next_rotation <= self._wall_clock()
+        )
+
+    def update(
+        self,
+        subscription: _Subscription,
+        response: Optional[service.AccessSecretVersionResponse],
+        error: Optional[Exception],
+    ) -> None:
+        if error is None:
+            subscription.response = response
+            subscription.failures = 0
+            subscription.error = None
+            if self._cache is not None:
+                self._cache.put(_latest(subscription.secret), response)
+        else:
+            # Keep serving the previous value until a refresh succeeds.
+            subscription.failures += 1
+            subscription.error = error
+            _LOGGER.warning(
+                "Failed to refresh secret %s: %s", subscription.secret, error
+            )
+        if subscription.secret in self._subscriptions:
+            self.schedule(subscription)
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+
+class SecretRefresher:
+    """Keeps the ``latest`` version of subscribed secrets fresh in the
+    background.
+
+    Values are re-read on a daemon thread shortly before they would go
+    stale, and readers keep receiving the previous value until the new one
+    arrives, so the fetch latency never lands on the request path. The
+    refresh interval defaults to a fraction of the alias TTL of the
+    client's ``secret_cache`` (if any), and every refreshed value is
+    written back to that cache, so ``access_secret_version`` calls for
+    ``latest`` keep hitting the cache.
+
+    Secrets with a rotation schedule are also re-read shortly after their
+    ``rotation.next_rotation_time``. All delays are jittered so that a
+    fleet of processes does not refresh in lockstep.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        client = secretmanager_v1.SecretManagerServiceClient()
+        with secretmanager_v1.SecretRefresher(client) as refresher:
+            refresher.subscribe("projects/my-project/secrets/my-secret")
+            ...
+            payload = refresher.get("projects/my-project/secrets/my-secret").payload
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        refresh_interval: Optional[float] = None,
+        jitter: float = 0.1,
+        rotation_spread: float = 30.0,
+        track_rotation: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        """Instantiate the refresher.
+
+        Args:
+            client (google.cloud.secretmanager_v1.SecretManagerServiceClient):
+                The client used to read the secrets.
+            refresh_interval (Optional[float]): Seconds between refreshes of
+                a secret. Defaults to 80% of the client cache's alias TTL,
+                or one minute if the client has no cache.
+            jitter (float): Fraction by which each delay is randomly
+                shortened.
+            rotation_spread (float): Width, in seconds, of the window after
+                a secret's rotation time in which it is re-read.
+            track_rotation (bool): Whether to read each secret's rotation
+                schedule with ``get_secret``. This requires permission to
+                get the secret in addition to accessing its versions.
+            clock (Callable[[], float]): A monotonic clock, in seconds.
+            wall_clock (Callable[[], float]): The current POSIX time.
+        """
+        self._client = client
+        self._track_rotation = track_rotation
+        self._schedule = _RefreshSchedule(
+            client._secret_cache,
+            refresh_interval,
+            jitter,
+            rotation_spread,
+            clock,
+            wall_clock,
+        )
+        self._condition = threading.Condition()
+        self._thread = None  # type: Optional[threading.Thread]
+        self._stopped = False
+
+    @property
+    def refresh_interval(self) -> float:
+        """float: The number of seconds between refreshes of a secret."""
+        return self._schedule.refresh_interval
+
+    def subscribe(self, secret: str) -> service.AccessSecretVersionResponse:
+        """Starts keeping ``secret`` fresh.
+
+        The first value is read before this method returns.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+
+        Returns:
+            google.cloud.secretmanager_v1.types.AccessSecretVersionResponse:
+                The current value of the ``latest`` version.
+        """
+        with self._condition:
+            subscription = self._schedule.get(secret)
+        if subscription is not None:
+            return subscription.response
+
+        response = self._fetch(secret)
+        subscription = _Subscription(secret, response, self._read_rotation(secret))
+        with self._condition:
+            existing = self._schedule.get(secret)
+            if existing is not None:
+                return existing.response
+            self._schedule.update(subscription, response, None)
+            self._schedule.add(subscription)
+            self._condition.notify()
+        return response
+
+    def unsubscribe(self, secret: str) -> None:
+        """Stops keeping ``secret`` fresh."""
+        with self._condition:
+            self._schedule.remove(secret)
+
+    def get(self, secret: str) -> service.AccessSecretVersionResponse:
+        """Returns the most recent value of ``secret``, subscribing to it if
+        necessary."""
+        with self._condition:
+            subscription = self._schedule.get(secret)
+        if subscription is None:
+            return self.subscribe(secret)
+        return subscription.response
+
+    def last_error(self, secret: str) -> Optional[Exception]:
+        """Returns the error from the last failed refresh of ``secret``, if
+        the most recent attempt failed."""
+        with self._condition:
+            subscription = self._schedule.get(secret)
+        return None if subscription is None else subscription.error
+
+    def refresh(self, secret: str) -> None:
+        """Re-reads ``secret`` now, on the calling thread."""
+        with self._condition:
+            subscription = self._schedule.get(secret)
+        if subscription is None:
+            self.subscribe(secret)
+        else:
+            self._refresh(subscription)
+
+    def start(self) -> "SecretRefresher":
+        """Starts the background refresh thread."""
+        with self._condition:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="SecretRefresher",
+                    daemon=True,
+                )
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the background refresh thread and waits for it to exit."""
+        with self._condition:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+            self._condition.notify()
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self) -> "SecretRefresher":
+        return self.start()
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def _fetch(self, secret: str) -> service.AccessSecretVersionResponse:
+        # Call the transport directly; going through the client would be
+        # answered by the very cache entry being refreshed.
+        transport = self._client._transport
+        rpc = transport._wrapped_methods[transport.access_secret_version]
+        request = service.AccessSecretVersionRequest(name=_latest(secret))
+        metadata = (
+            gapic_v1.routing_header.to_grpc_metadata((("name", request.name),)),
+        )
+        response = rpc(request, metadata=metadata)
+        # Cache hits are not verified, so verify before the value is cached.
+        if self._client._payload_checksums:
+            checksum.verify_response(response)
+        return response
+
+    def _read_rotation(self, secret: str) -> Optional[float]:
+        if not self._track_rotation:
+            return None
+        try:
+            return _next_rotation_time(self._client.get_secret(name=secret))
+        except core_exceptions.GoogleAPIError as exc:
+            _LOGGER.debug("Not tracking rotation of %s: %s", secret, exc)
+            return None
+
+    def _refresh(self, subscription: _Subscription) -> None:
+        # Any error, not only an API error, is kept as the subscription's
+        # error so that it is rescheduled and the thread keeps running.
+        try:
+            if self._schedule.rotation_passed(subscription):
+                subscription.next_rotation = self._read_rotation(subscription.secret)
+            response, error = self._fetch(subscription.secret), None
+        except Exception as exc:
+            response, error = None, exc
+        with self._condition:
+            self._schedule.update(subscription, response, error)
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    delay = self._schedule.time_until_next()
+                    if delay == 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stopped:
+                    return
+                due = self._schedule.pop_due()
+            for subscription in due:
+                self._refresh(subscription)
+
+
+class AsyncSecretRefresher:
+    """Keeps the ``latest`` version of subscribed secrets fresh from an
+    asyncio task.
+
+    This is the asyncio counterpart of :class:`SecretRefresher` and
+    behaves the same way; :meth:`start` must be called from a running
+    event loop.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        refresh_interval: Optional[float] = None,
+        jitter: float = 0.1,
+        rotation_spread: float = 30.0,
+        track_rotation: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        """Instantiate the refresher.
+
+        Args:
+            client (google.cloud.secretmanager_v1.SecretManagerServiceAsyncClient):
+                The client used to read the secrets.
+            refresh_interval (Optional[float]): Seconds between refreshes of
+                a secret. Defaults to 80% of the client cache's alias TTL,
+                or one minute if the client has no cache.
+            jitter (float): Fraction by which each delay is randomly
+                shortened.
+            rotation_spread (float): Width, in seconds, of the window after
+                a secret's rotation time in which it is re-read.
+            track_rotation (bool): Whether to read each secret's rotation
+                schedule with ``get_secret``.
+            clock (Callable[[], float]): A monotonic clock, in seconds.
+            wall_clock (Callable[[], float]): The current POSIX time.
+        """
+        self._client = client
+        self._track_rotation = track_rotation
+        self._schedule = _RefreshSchedule(
+            client._client._secret_cache,
+            refresh_interval,
+            jitter,
+            rotation_spread,
+            clock,
+            wall_clock,
+        )
+        self._wakeup = None  # type: Optional[asyncio.Event]
+        self._task = None  # type: Optional[asyncio.Task]
+
+    @property
+    def refresh_interval(self) -> float:
+        """float: The number of seconds between refreshes of a secret."""
+        return self._schedule.refresh_interval
+
+    async def subscribe(self, secret: str) -> service.AccessSecretVersionResponse:
+        """Starts keeping ``secret`` fresh.
+
+        The first value is read before this coroutine returns.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+
+        Returns:
+            google.cloud.secretmanager_v1.types.AccessSecretVersionResponse:
+                The current value of the ``latest`` version.
+        """
+        subscription = self._schedule.get(secret)
+        if subscription is not None:
+            return subscription.response
+
+        response = await self._fetch(secret)
+        next_rotation = await self._read_rotation(secret)
+        existing = self._schedule.get(secret)
+        if existing is not None:
+            return existing.response
+        subscription = _Subscription(secret, response, next_rotation)
+        self._schedule.update(subscription, response, None)
+        self._schedule.add(subscription)
+        self._wake()
+        return response
+
+    def unsubscribe(self, secret: str) -> None:
+        """Stops keeping ``secret`` fresh."""
+        self._schedule.remove(secret)
+
+    async def get(self, secret: str) -> service.AccessSecretVersionResponse:
+        """Returns the most recent value of ``secret``, subscribing to it if
+        necessary."""
+        subscription = self._schedule.get(secret)
+        if subscription is None:
+            return await self.subscribe(secret)
+        return subscription.response
+
+    def last_error(self, secret: str) -> Optional[Exception]:
+        """Returns the error from the last failed refresh of ``secret``, if
+        the most recent attempt failed."""
+        subscription = self._schedule.get(secret)
+        return None if subscription is None else subscription.error
+
+    async def refresh(self, secret: str) -> None:
+        """Re-reads ``secret`` now."""
+        subscription = self._schedule.get(secret)
+        if subscription is None:
+            await self.subscribe(secret)
+        else:
+            await self._refresh(subscription)
+
+    def start(self) -> "AsyncSecretRefresher":
+        """Starts the background refresh task on the running event loop."""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def stop(self) -> None:
+        """Stops the background refresh task."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def __aenter__(self) -> "AsyncSecretRefresher":
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _fetch(self, secret: str) -> service.AccessSecretVersionResponse:
+        # Call the transport directly; going through the client would be
+        # answered by the very cache entry being refreshed.
+        transport = self._client.transport
+        rpc = transport._wrapped_methods[transport.access_secret_version]
+        request = service.AccessSecretVersionRequest(name=_latest(secret))
+        metadata = (
+            gapic_v1.routing_header.to_grpc_metadata((("name", request.name),)),
+        )
+        response = await rpc(request, metadata=metadata)
+        # Cache hits are not verified, so verify before the value is cached.
+        if self._client._client._payload_checksums:
+            checksum.verify_response(response)
+        return response
+
+    async def _read_rotation(self, secret: str) -> Optional[float]:
+        if not self._track_rotation:
+            return None
+        try:
+            return _next_rotation_time(await self._client.get_secret(name=secret))
+        except core_exceptions.GoogleAPIError as exc:
+            _LOGGER.debug("Not tracking rotation of %s: %s", secret, exc)
+            return None
+
+    async def _refresh(self, subscription: _Subscription) -> None:
+        # Any error, not only an API error, is kept as the subscription's
+        # error so that it is rescheduled and the task keeps running.
+        try:
+            if self._schedule.rotation_passed(subscription):
+                subscription.next_rotation = await self._read_rotation(
+                    subscription.secret
+                )
+            response, error = await self._fetch(subscription.secret), None
+        except Exception as exc:
+            response, error = None, exc
+        self._schedule.update(subscription, response, error)
+
+    async def _run(self) -> None:
+        while True:
+            delay = self._schedule.time_until_next()
+            if delay != 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await asyncio.gather(*[self._refresh(s) for s in self._schedule.pop_due()])
+
+
+__all__ = (
+    "AsyncSecretRefresher",
+    "DEFAULT_REFRESH_INTERVAL",
+    "SecretRefresher",
+)
@@ -0,0 +1,606 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Resolution of ``sm://`` secret references in configuration.
+
+A reference has the form ``sm://<project>/<secret>[/<version>]``, where
+the version is a version number or ``latest`` (the default). References
+may make up a whole value or be embedded in one, as in
+``postgres://app:sm://my-project/db-password@db/app``.
+
+The resolvers first collect every reference in their input, then access
+each distinct secret version once, concurrently, and finally substitute
+the values in a single pass over the input.
+"""
+import asyncio
+from concurrent import futures
+import os
+import re
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import gapic_v1
+from google.api_core import retry as retries
+
+from . import paths
+from .batch import DEFAULT_MAX_CONCURRENCY
+from .payload import SecretPayloadView
+
+try:
+    OptionalRetry = Union[retries.Retry, gapic_v1.method._MethodDefault]
+except AttributeError:  # pragma: NO COVER
+    OptionalRetry = Union[retries.Retry, object]  # type: ignore
+
+# A reference ends at the first character which cannot be part of it, so
+# that it can be embedded in a larger value. Whatever follows a ``/``
+# after the secret ID is taken as the version, so that a malformed
+# version makes the reference invalid rather than falling back to
+# ``latest``.
+REFERENCE_PATTERN = re.compile(
+    r"sm://(?P<project>[a-z0-9][a-z0-9.:-]*)/(?P<secret>[A-Za-z0-9_-]+)"
+    r"(?:/(?P<version>[A-Za-z0-9_-]*))?"
+)
+
+_VERSION_PATTERN = re.compile(r"[0-9]+|latest")
+
+
+def _is_valid(m) -> bool:
+    version = m.group("version")
+    return version is None or _VERSION_PATTERN.fullmatch(version) is not None
+
+
+class SecretReference(NamedTuple):
+    """A parsed ``sm://`` reference.
+
+    Attributes:
+        project (str): The project ID or number.
+        secret (str): The secret ID.
+        version (str): The version number, or ``latest``.
+    """
+
+    project: str
+    secret: str
+    version: str = "latest"
+
+    @property
+    def name(self) -> str:
+        """str: The resource name of the referenced secret version."""
+        return paths.SECRET_VERSION.format(self.project, self.secret, self.version)
+
+    @classmethod
+    def parse(cls, reference: str) -> "SecretReference":
+        """Parses a reference.
+
+        Args:
+            reference (str): The reference, such as ``sm://p/s/1``.
+
+        Raises:
+            ValueError: If ``reference`` is not a valid reference.
+        """
+        m = REFERENCE_PATTERN.fullmatch(reference)
+        if m is None or not _is_valid(m):
+            raise ValueError("Invalid secret reference: {!r}".format(reference))
+        return cls._from_match(m)
+
+    @classmethod
+    def _from_match(cls, m) -> "SecretReference":
+        return cls(
+            m.group("project"), m.group("secret"), m.group("version") or "latest"
+        )
+
+
+def find_references(text: str) -> List[SecretReference]:
+    """Returns the references in ``text``, in order of appearance.
+
+    Raises:
+        ValueError: If a reference has an invalid version, such as
+            ``sm://p/s/1abc``.
+    """
+    references = []
+    for m in REFERENCE_PATTERN.finditer(text):
+        if not _is_valid(m):
+            raise ValueError("Invalid secret reference: {!r}".format(m.group(0)))
+        references.append(SecretReference._from_match(m))
+    return references
+
+
+class ResolvedReference(NamedTuple):
+    """The outcome of resolving one secret version.
+
+    Exactly one of ``value`` and ``error`` is set.
+
+    Attributes:
+        reference (str): The first reference to the version, as written.
+        name (str): The resource name of the secret version, or the
+            reference itself if it is invalid.
+        value (Optional[str]): The decoded payload, if it was resolved.
+        error (Optional[Exception]): The error raised while accessing or
+            decoding the payload, if any; usually a
+            :class:`google.api_core.exceptions.GoogleAPIError`.
+        latency (float): Seconds from sending the request to receiving
+            the response or error. Time spent waiting for a free slot
+            is not included.
+    """
+
+    reference: str
+    name: str
+    value: Optional[str] = None
+    error: Optional[Exception] = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """bool: Whether the version was resolved."""
+        return self.error is None
+
+
+class ResolutionReport:
+    """The results of resolving a set of references.
+
+    Attributes:
+        results (List[ResolvedReference]): One result per distinct secret
+            version, in order of first reference.
+        elapsed (float): Seconds taken to resolve all of them.
+    """
+
+    def __init__(self, results: List[ResolvedReference], elapsed: float):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def failed(self) -> List[ResolvedReference]:
+        """List[ResolvedReference]: The results which were not resolved."""
+        return [result for result in self.results if not result.ok]
+
+    def slowest(self, n: int = 5) -> List[ResolvedReference]:
+        """Returns the ``n`` results which took longest, slowest first."""
+        return sorted(self.results, key=lambda result: result.latency, reverse=True)[:n]
+
+    def summary(self, n: int = 5) -> str:
+        """Describes the resolution and its ``n`` slowest results.
+
+        Suitable for logging at startup.
+        """
+        lines = [
+            "Resolved {} of {} secret versions in {:.1f} ms.".format(
+                len(self.results) - len(self.failed),
+                len(self.results),
+                self.elapsed * 1e3,
+            )
+        ]
+        for result in self.slowest(n):
+            lines.append(
+                "  {:>9.1f} ms  {}{}".format(
+                    result.latency * 1e3,
+                    result.reference,
+                    "" if result.ok else "  ({})".format(result.error),
+                )
+            )
+        return "\n".join(lines)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __repr__(self) -> str:
+        return "<ResolutionReport: {} results, {} failed, {:.1f} ms>".format(
+            len(self.results), len(self.failed), self.elapsed * 1e3
+        )
+
+
+class SecretResolutionError(core_exceptions.GoogleAPIError):
+    """One or more references could not be resolved.
+
+    Attributes:
+        report (ResolutionReport): The results, including the failures.
+    """
+
+    def __init__(self, report: ResolutionReport):
+        failed = report.failed
+        super().__init__(
+            "Failed to resolve {} secret reference(s): {}".format(
+                len(failed),
+                "; ".join(
+                    "{}: {}".format(result.reference, result.error) for result in failed
+                ),
+            )
+        )
+        self.report = report
+
+
+class _BaseSecretResolver:
+    def __init__(
+        self,
+        client,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        encoding: str = "utf-8",
+        retry: OptionalRetry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """Instantiate the resolver.
+
+        Args:
+            client: The client used to access secret versions. Its cache,
+                if any, is used.
+            max_concurrency (int): The maximum number of requests in
+                flight at once.
+            encoding (str): The encoding of the secret payloads.
+            retry (google.api_core.retry.Retry): Designation of what errors,
+                if any, should be retried.
+            timeout (float): The timeout for each request.
+            clock (Callable[[], float]): Returns the time in seconds, used
+                to measure latency.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._client = client
+        self._max_concurrency = max_concurrency
+        self._encoding = encoding
+        self._retry = retry
+        self._timeout = timeout
+        self._clock = clock
+
+    def _plan(self, texts: Iterable[str]) -> Dict[str, str]:
+        # The first reference to each secret version, by name. Invalid
+        # references are kept by themselves, to be reported as failures.
+        first = {}  # type: Dict[str, str]
+        for text in texts:
+            for m in REFERENCE_PATTERN.finditer(text):
+                if _is_valid(m):
+                    first.setdefault(SecretReference._from_match(m).name, m.group(0))
+                else:
+                    first.setdefault(m.group(0), m.group(0))
+        return first
+
+    @staticmethod
+    def _invalid(name: str) -> Optional[ResolvedReference]:
+        """Returns the failed result of an invalid reference, or ``None``
+        if ``name`` is a secret version name."""
+        if not name.startswith("sm://"):
+            return None
+        error = ValueError("Invalid secret reference: {!r}".format(name))
+        return ResolvedReference(name, name, error=error)
+
+    def _result(self, name, reference, response, error, started):
+        latency = self._clock() - started
+        if error is None:
+            try:
+                value = SecretPayloadView(response).text(self._encoding)
+            except UnicodeDecodeError as exc:
+                error = exc
+        if error is not None:
+            return ResolvedReference(reference, name, error=error, latency=latency)
+        return ResolvedReference(reference, name, value=value, latency=latency)
+
+    @staticmethod
+    def _check(report: ResolutionReport, strict: bool) -> None:
+        if strict and report.failed:
+            raise SecretResolutionError(report)
+
+    @staticmethod
+    def _substitute(
+        texts: Iterable[str], report: ResolutionReport
+    ) -> Iterable[Optional[str]]:
+        """Yields each text with its resolved references replaced, or
+        ``None`` if it has none."""
+        values = {result.name: result.value for result in report if result.ok}
+
+        def replace(m):
+            if not _is_valid(m):
+                return m.group(0)
+            value = values.get(SecretReference._from_match(m).name)
+            return m.group(0) if value is None else value
+
+        for text in texts:
+            if "sm://" not in text:
+                yield None
+            else:
+                yield REFERENCE_PATTERN.sub(replace, text)
+
+
+class SecretResolver(_BaseSecretResolver):
+    """Resolves ``sm://`` references with a
+    :class:`SecretManagerServiceClient`.
+
+    Requests are made on a pool of at most ``max_concurrency`` threads
+    sharing the client's channel.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        resolver = secretmanager_v1.SecretResolver(
+            secretmanager_v1.SecretManagerServiceClient(), max_concurrency=16
+        )
+        report = resolver.resolve_environ()
+        print(report.summary())
+    """
+
+    def resolve(self, references: Iterable[str]) -> ResolutionReport:
+        """Resolves every reference in ``references``.
+
+        Args:
+            references (Iterable[str]): Strings containing references.
+                References to the same secret version are resolved once.
+
+        Returns:
+            ResolutionReport: The results. Failures are reported rather
+            than raised.
+        """
+        return self._resolve(self._plan(references))
+
+    def _resolve(self, plan: Dict[str, str]) -> ResolutionReport:
+        started = self._clock()
+        if not plan:
+            return ResolutionReport([], 0.0)
+
+        def access(name: str) -> ResolvedReference:
+            invalid = self._invalid(name)
+            if invalid is not None:
+                return invalid
+            request_started = self._clock()
+            try:
+                response = self._client.access_secret_version(
+                    name=name, retry=self._retry, timeout=self._timeout
+                )
+            except Exception as exc:
+                return self._result(name, plan[name], None, exc, request_started)
+            return self._result(name, plan[name], response, None, request_started)
+
+        with futures.ThreadPoolExecutor(
+            max_workers=min(self._max_concurrency, len(plan))
+        ) as executor:
+            results = list(executor.map(access, plan))
+        return ResolutionReport(results, self._clock() - started)
+
+    def resolve_text(
+        self, text: str, *, strict: bool = True
+    ) -> Tuple[str, ResolutionReport]:
+        """Replaces the references in ``text`` with their values.
+
+        Args:
+            text (str): The text, such as the contents of a config file.
+            strict (bool): Whether to raise if any reference cannot be
+                resolved. Otherwise unresolved references are left as
+                they are.
+
+        Returns:
+            Tuple[str, ResolutionReport]: The resolved text and the
+            results.
+
+        Raises:
+            SecretResolutionError: If ``strict`` and a reference could not
+                be resolved.
+        """
+        report = self._resolve(self._plan([text]))
+        self._check(report, strict)
+        (resolved,) = self._substitute([text], report)
+        return (text if resolved is None else resolved), report
+
+    def resolve_mapping(
+        self, mapping: Mapping[str, str], *, strict: bool = True
+    ) -> Tuple[Dict[str, str], ResolutionReport]:
+        """Replaces the references in the values of ``mapping``.
+
+        Args:
+            mapping (Mapping[str, str]): The mapping, which is not modified.
+            strict (bool): Whether to raise if any reference cannot be
+                resolved.
+
+        Returns:
+            Tuple[Dict[str, str], ResolutionReport]: A copy of ``mapping``
+            with the references replaced, and the results.
+
+        Raises:
+            SecretResolutionError: If ``strict`` and a reference could not
+                be resolved.
+        """
+        values = list(mapping.values())
+        report = self._resolve(self._plan(values))
+        self._check(report, strict)
+        return _replaced(mapping, values, self._substitute(values, report)), report
+
+    def resolve_environ(
+        self,
+        environ: MutableMapping[str, str] = None,
+        *,
+        strict: bool = True,
+    ) -> ResolutionReport:
+        """Replaces the references in environment variables, in place.
+
+        Args:
+            environ (MutableMapping[str, str]): The environment to update.
+                Defaults to ``os.environ``.
+            strict (bool): Whether to raise if any reference cannot be
+                resolved, in which case ``environ`` is not modified.
+
+        Returns:
+            ResolutionReport: The results.
+
+        Raises:
+            SecretResolutionError: If ``strict`` and a reference could not
+                be resolved.
+        """
+        if environ is None:
+            environ = os.environ
+        resolved, report = self.resolve_mapping(environ, strict=strict)
+        _update(environ, resolved)
+        return report
+
+    def resolve_file(
+        self, path: str, *, encoding: str = "utf-8", strict: bool = True
+    ) -> Tuple[str, ResolutionReport]:
+        """Replaces the references in a text file.
+
+        The file is not modified. Values are substituted as they are, so
+        a format which needs quoting or escaping should reference them
+        where that is not required.
+
+        Args:
+            path (str): The path of the file.
+            encoding (str): The encoding of the file.
+            strict (bool): Whether to raise if any reference cannot be
+                resolved.
+
+        Returns:
+            Tuple[str, ResolutionReport]: The resolved contents and the
+            results.
+
+        Raises:
+            SecretResolutionError: If ``strict`` and a reference could not
+                be resolved.
+        """
+        return self.resolve_text(_read_text(path, encoding), strict=strict)
+
+
+class AsyncSecretResolver(_BaseSecretResolver):
+    """Resolves ``sm://`` references with a
+    :class:`SecretManagerServiceAsyncClient`.
+
+    At most ``max_concurrency`` requests are in flight at once.
+    """
+
+    async def resolve(self, references: Iterable[str]) -> ResolutionReport:
+        """Resolves every reference in ``references``.
+
+        Args:
+            references (Iterable[str]): Strings containing references.
+                References to the same secret version are resolved once.
+
+        Returns:
+            ResolutionReport: The results. Failures are reported rather
+            than raised.
+        """
+        return await self._resolve(self._plan(references))
+
+    async def _resolve(self, plan: Dict[str, str]) -> ResolutionReport:
+        started = self._clock()
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def access(name: str) -> ResolvedReference:
+            invalid = self._invalid(name)
+            if invalid is not None:
+                return invalid
+            async with semaphore:
+                request_started = self._clock()
+                try:
+                    response = await self._client.access_secret_version(
+                        name=name, retry=self._retry, timeout=self._timeout
+                    )
+                except Exception as exc:
+                    return self._result(name, plan[name], None, exc, request_started)
+                return self._result(name, plan[name], response, None, request_started)
+
+        results = await asyncio.gather(*[access(name) for name in plan])
+        return ResolutionReport(list(results), self._clock() - started)
+
+    async def resolve_text(
+        self, text: str, *, strict: bool = True
+    ) -> Tuple[str, ResolutionReport]:
+        """Replaces the references in ``text`` with their values.
+
+        See :meth:`SecretResolver.resolve_text`.
+        """
+        report = await self._resolve(self._plan([text]))
+        self._check(report, strict)
+        (resolved,) = self._substitute([text], report)
+        return (text if resolved is None else resolved), report
+
+    async def resolve_mapping(
+        self, mapping: Mapping[str, str], *, strict: bool = True
+    ) -> Tuple[Dict[str, str], ResolutionReport]:
+        """Replaces the references in the values of ``mapping``.
+
+        See :meth:`SecretResolver.resolve_mapping`.
+        """
+        values = list(mapping.values())
+        report = await self._resolve(self._plan(values))
+        self._check(report, strict)
+        return _replaced(mapping, values, self._substitute(values, report)), report
+
+    async def resolve_environ(
+        self,
+        environ: MutableMapping[str, str] = None,
+        *,
+        strict: bool = True,
+    ) -> ResolutionReport:
+        """Replaces the references in environment variables, in place.
+
+        See :meth:`SecretResolver.resolve_environ`.
+        """
+        if environ is None:
+            environ = os.environ
+        resolved, report = await self.resolve_mapping(environ, strict=strict)
+        _update(environ, resolved)
+        return report
+
+    async def resolve_file(
+        self, path: str, *, encoding: str = "utf-8", strict: bool = True
+    ) -> Tuple[str, ResolutionReport]:
+        """Replaces the references in a text file.
+
+        See :meth:`SecretResolver.resolve_file`. The file is read in the
+        event loop's default executor.
+        """
+        text = await asyncio.get_running_loop().run_in_executor(
+            None, _read_text, path, encoding
+        )
+        return await self.resolve_text(text, strict=strict)
+
+
+def _read_text(path, encoding):
+    with open(path, encoding=encoding) as f:
+        return f.read()
+
+
+def _replaced(mapping, values, substituted):
+    return {
+        key: value if resolved is None else resolved
+        for key, value, resolved in zip(mapping.keys(), values, substituted)
+    }
+
+
+def _update(environ, resolved):
+    for key, value in resolved.items():
+        if environ[key] != value:
+            environ[key] = value
+
+
+__all__ = (
+    "AsyncSecretResolver",
+    "REFERENCE_PATTERN",
+    "ResolutionReport",
+    "ResolvedReference",
+    "SecretReference",
+    "SecretResolutionError",
+    "SecretResolver",
+    "find_references",
+)
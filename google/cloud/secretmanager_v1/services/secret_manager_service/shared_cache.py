@@ -0,0 +1,574 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import zlib
+
+from google.cloud.secretmanager_v1.types import service
+
+from .cache import CacheStats, SecretCache
+
+try:
+    import fcntl
+except ImportError:  # pragma: NO COVER
+    fcntl = None
+
+# The segment starts with a header, followed by fixed-size slots:
+#   magic (4 bytes) | layout version | slot count | slot size
+_MAGIC = b"SMSC"
+_LAYOUT_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sIII")
+_FILE_HEADER_SIZE = 64
+
+# Each slot starts with a header, followed by the UTF-8 version name and
+# the serialized AccessSecretVersionResponse:
+#   sequence | state | crc32 of name and data | name hash | expires_at |
+#   stored_at | name length | data length
+# The sequence is odd while the slot is being written (a seqlock), so
+# that readers never need to take the lock.
+_SLOT_HEADER = struct.Struct("<QIIQddII")
+_SEQUENCE = struct.Struct("<Q")
+
+_EMPTY = 0
+_USED = 1
+_DELETED = 2
+
+# Slots examined for each name, starting at the one its hash selects.
+_MAX_PROBES = 8
+
+# Attempts to read a slot which is being written before giving up.
+_MAX_READ_ATTEMPTS = 100
+
+
+def _name_hash(encoded_name: bytes) -> int:
+    # hash() is randomized per process, so it cannot be shared.
+    return int.from_bytes(
+        hashlib.blake2b(encoded_name, digest_size=8).digest(), "little"
+    )
+
+
+class SharedSecretCache:
+    """A cache of ``access_secret_version`` responses shared between
+    processes.
+
+    Responses are stored in a memory-mapped file, so every process which
+    maps it sees the responses stored by the others: one worker accesses a
+    secret and the rest read its response instead of making their own
+    RPCs. It has the same interface and expiry rules as
+    :class:`SecretCache` and is used the same way, through the
+    ``secret_cache`` client option, by sync and async clients.
+
+    Without a ``path``, the cache is backed by an unlinked temporary file
+    and is shared with processes forked after it is created; create it in
+    the master process of a pre-fork server. With a ``path``, any process
+    opening the same file shares it; put it on a memory file system such
+    as ``/dev/shm``, since it holds secret payloads in plaintext. The file
+    is readable only by its owner.
+
+    The file holds ``max_entries`` slots of ``slot_size`` bytes; it is
+    sparse, so only slots in use take up memory. Writers serialize on a
+    POSIX record lock and readers use a sequence lock, so reads never
+    block. Each process keeps the responses it has decoded, so reading an
+    unchanged entry again does not decode it again. Requires a POSIX
+    system.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        # In the master process, before the workers are forked.
+        cache = secretmanager_v1.SharedSecretCache(alias_ttl=30.0)
+
+        # In each worker.
+        client = secretmanager_v1.SecretManagerServiceClient(
+            client_options={"secret_cache": cache},
+        )
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        alias_ttl: float = 30.0,
+        pinned_ttl: Optional[float] = None,
+        max_entries: int = 1024,
+        slot_size: int = 68 * 1024,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        """Instantiate the cache.
+
+        Args:
+            path (Optional[str]): The file backing the cache. It is created
+                if it does not exist. If ``None``, an unlinked temporary
+                file is used.
+            alias_ttl (float): Seconds to keep responses for aliased
+                versions such as ``latest``.
+            pinned_ttl (Optional[float]): Seconds to keep responses for
+                numbered versions. If ``None``, they are kept until evicted
+                or invalidated.
+            max_entries (int): The number of slots. Must match the file's
+                if it already exists.
+            slot_size (int): The size of each slot, in bytes. Responses
+                larger than a slot are not cached. The default fits the
+                largest payload the service accepts. Must match the
+                file's if it already exists.
+            clock (Optional[Callable[[], float]]): A clock shared by all
+                processes using the cache, in seconds. Expiry times are
+                stored in the file as readings of this clock. If ``None``,
+                ``time.time`` is used with a ``path``, since the file may
+                outlive a reboot, which restarts ``time.monotonic``; without
+                a ``path`` the file is gone once its processes exit, so
+                ``time.monotonic`` is used, which is system-wide on the
+                platforms this cache supports and is not affected by
+                changes to the system time.
+
+        Raises:
+            ValueError: If an existing file has a different layout.
+        """
+        if fcntl is None:  # pragma: NO COVER
+            raise ImportError("SharedSecretCache requires a POSIX system.")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError(
+                "slot_size must be larger than {}".format(_SLOT_HEADER.size)
+            )
+
+        self._alias_ttl = alias_ttl
+        self._pinned_ttl = pinned_ttl
+        self._slots = max_entries
+        self._slot_size = slot_size
+        if clock is None:
+            clock = time.monotonic if path is None else time.time
+        self._clock = clock
+        self._size = _FILE_HEADER_SIZE + max_entries * slot_size
+
+        if path is None:
+            fd, temp_path = tempfile.mkstemp(prefix="secret-cache-")
+            os.unlink(temp_path)
+        else:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._fd = fd
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        try:
+            with self._write_lock():
+                self._init_file()
+        except BaseException:
+            os.close(fd)
+            raise
+        self._map = mmap.mmap(fd, self._size, mmap.MAP_SHARED)
+
+        # Responses this process has decoded, by slot, with the sequence
+        # number they were decoded at.
+        self._decoded: Dict[int, Tuple[int, service.AccessSecretVersionResponse]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _init_file(self) -> None:
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            os.ftruncate(self._fd, self._size)
+            os.pwrite(
+                self._fd,
+                _FILE_HEADER.pack(
+                    _MAGIC, _LAYOUT_VERSION, self._slots, self._slot_size
+                ),
+                0,
+            )
+            return
+        header = os.pread(self._fd, _FILE_HEADER.size, 0)
+        if len(header) < _FILE_HEADER.size or size != self._size:
+            raise ValueError("The shared secret cache file has a different layout")
+        magic, version, slots, slot_size = _FILE_HEADER.unpack(header)
+        if (magic, version, slots, slot_size) != (
+            _MAGIC,
+            _LAYOUT_VERSION,
+            self._slots,
+            self._slot_size,
+        ):
+            raise ValueError("The shared secret cache file has a different layout")
+
+    @property
+    def alias_ttl(self) -> float:
+        """float: Seconds to keep responses for aliased versions."""
+        return self._alias_ttl
+
+    @property
+    def pinned_ttl(self) -> Optional[float]:
+        """Optional[float]: Seconds to keep responses for numbered versions."""
+        return self._pinned_ttl
+
+    is_pinned = staticmethod(SecretCache.is_pinned)
+
+    def ttl_for(self, name: str) -> Optional[float]:
+        """Returns the default time-to-live for ``name``, in seconds."""
+        return self._pinned_ttl if self.is_pinned(name) else self._alias_ttl
+
+    def get(self, name: str) -> Optional[service.AccessSecretVersionResponse]:
+        """Returns the cached response for ``name``, if it is still fresh.
+
+        Args:
+            name (str): The secret version name used in the request.
+
+        Returns:
+            Optional[google.cloud.secretmanager_v1.types.AccessSecretVersionResponse]:
+                The cached response, or ``None`` on a miss.
+        """
+        response = self._lookup(name)
+        self._check_fork()
+        with self._stats_lock:
+            if response is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return response
+
+    def put(
+        self,
+        name: str,
+        response: service.AccessSecretVersionResponse,
+        *,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Stores ``response`` as the value for ``name``.
+
+        Args:
+            name (str): The secret version name used in the request.
+            response (google.cloud.secretmanager_v1.types.AccessSecretVersionResponse):
+                The response to cache.
+            ttl (Optional[float]): Overrides the default time-to-live for
+                this entry, in seconds.
+        """
+        if ttl is None:
+            ttl = self.ttl_for(name)
+        if ttl is not None and ttl <= 0:
+            return
+
+        encoded = name.encode()
+        data = service.AccessSecretVersionResponse.pb(response).SerializeToString()
+        if _SLOT_HEADER.size + len(encoded) + len(data) > self._slot_size:
+            return
+        name_hash = _name_hash(encoded)
+        checksum = zlib.crc32(data, zlib.crc32(encoded))
+
+        with self._write_lock():
+            now = self._clock()
+            expires_at = math.inf if ttl is None else now + ttl
+            index = self._slot_for_write(encoded, name_hash, now)
+            self._write_slot(
+                index,
+                _USED,
+                checksum,
+                name_hash,
+                expires_at,
+                now,
+                encoded,
+                data,
+            )
+
+    def invalidate(self, name: str) -> None:
+        """Removes the cached response for ``name``, if any."""
+        encoded = name.encode()
+        name_hash = _name_hash(encoded)
+        with self._write_lock():
+            for index in self._probe(name_hash):
+                header = self._header(index)
+                if header[1] == _EMPTY:
+                    break
+                if (
+                    header[1] == _USED
+                    and header[3] == name_hash
+                    and self._name(index, header) == encoded
+                ):
+                    self._delete(index)
+
+    def invalidate_secret(self, secret: str) -> None:
+        """Removes all cached versions of a secret.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+        """
+        prefix = (secret.rstrip("/") + "/versions/").encode()
+        with self._write_lock():
+            for index, header in self._used_slots():
+                if self._name(index, header).startswith(prefix):
+                    self._delete(index)
+
+    def invalidate_aliases(self, secret: str) -> List[str]:
+        """Removes the cached aliases of a secret, such as ``latest``.
+
+        Numbered versions are kept.
+
+        Args:
+            secret (str): The secret name, in the format
+                ``projects/*/secrets/*``.
+
+        Returns:
+            List[str]: The names which were removed.
+        """
+        prefix = (secret.rstrip("/") + "/versions/").encode()
+        names = []
+        with self._write_lock():
+            for index, header in self._used_slots():
+                name = self._name(index, header)
+                if name.startswith(prefix) and not self.is_pinned(name.decode()):
+                    self._delete(index)
+                    names.append(name.decode())
+        return names
+
+    def clear(self) -> None:
+        """Removes all cached responses."""
+        with self._write_lock():
+            for index in range(self._slots):
+                if self._header(index)[1] != _EMPTY:
+                    self._write_slot(index, _EMPTY, 0, 0, 0.0, 0.0, b"", b"")
+
+    @property
+    def stats(self) -> CacheStats:
+        """google.cloud.secretmanager_v1.services.secret_manager_service.cache.CacheStats:
+        The hit, miss and eviction counters of this process, and the
+        entries and bytes held by the shared cache."""
+        entries = 0
+        size = 0
+        now = self._clock()
+        for _, header in self._used_slots():
+            if header[4] > now:
+                entries += 1
+                size += header[6] + header[7]
+        self._check_fork()
+        with self._stats_lock:
+            hits, misses, evictions = self._hits, self._misses, self._evictions
+        return CacheStats(
+            hits=hits,
+            misses=misses,
+            evictions=evictions,
+            entries=entries,
+            bytes=size,
+        )
+
+    def close(self) -> None:
+        """Unmaps the cache in this process.
+
+        The cache must not be used afterwards.
+        """
+        self._decoded.clear()
+        self._map.close()
+        os.close(self._fd)
+
+    def __len__(self) -> int:
+        return self.stats.entries
+
+    def __contains__(self, name: str) -> bool:
+        return self._lookup(name) is not None
+
+    def _offset(self, index: int) -> int:
+        return _FILE_HEADER_SIZE + index * self._slot_size
+
+    def _probe(self, name_hash: int) -> Iterator[int]:
+        start = name_hash % self._slots
+        for i in range(min(_MAX_PROBES, self._slots)):
+            yield (start + i) % self._slots
+
+    def _header(self, index: int):
+        return _SLOT_HEADER.unpack_from(self._map, self._offset(index))
+
+    def _name(self, index: int, header) -> bytes:
+        start = self._offset(index) + _SLOT_HEADER.size
+        return self._map[start : start + header[6]]
+
+    def _used_slots(self):
+        for index in range(self._slots):
+            header = self._header(index)
+            if header[1] == _USED and not header[0] & 1:
+                yield index, header
+
+    def _lookup(self, name: str) -> Optional[service.AccessSecretVersionResponse]:
+        encoded = name.encode()
+        name_hash = _name_hash(encoded)
+        for index in self._probe(name_hash):
+            found, response = self._read(index, encoded, name_hash)
+            if found is None:
+                return None
+            if found:
+                return response
+        return None
+
+    def _read(self, index, encoded, name_hash):
+        """Reads slot ``index`` without locking.
+
+        Returns:
+            Tuple[Optional[bool], Optional[AccessSecretVersionResponse]]:
+            ``(None, None)`` if the slot is empty, which ends the probe,
+            ``(False, None)`` if it holds another name, and
+            ``(True, response)`` if it holds ``encoded``; ``response`` is
+            ``None`` if it has expired.
+        """
+        offset = self._offset(index)
+        data_start = offset + _SLOT_HEADER.size + len(encoded)
+        for _ in range(_MAX_READ_ATTEMPTS):
+            header = _SLOT_HEADER.unpack_from(self._map, offset)
+            (
+                sequence,
+                state,
+                checksum,
+                slot_hash,
+                expires_at,
+                _,
+                name_len,
+                data_len,
+            ) = header
+            if sequence & 1:
+                # Being written; wait for the writer to finish.
+                time.sleep(0)
+                continue
+            if state == _EMPTY:
+                return None, None
+            if state != _USED or slot_hash != name_hash or name_len != len(encoded):
+                return False, None
+            if expires_at <= self._clock():
+                return True, None
+
+            decoded = self._decoded.get(index)
+            if decoded is not None and decoded[0] == sequence:
+                name = data = None
+            else:
+                name = self._map[offset + _SLOT_HEADER.size : data_start]
+                data = self._map[data_start : data_start + data_len]
+            if _SEQUENCE.unpack_from(self._map, offset)[0] != sequence:
+                continue
+            if data is None:
+                return True, decoded[1]
+            if zlib.crc32(data, zlib.crc32(name)) != checksum:
+                # Written by a process which died mid-write.
+                return False, None
+            if name != encoded:
+                return False, None
+            response = service.AccessSecretVersionResponse.deserialize(data)
+            self._decoded[index] = (sequence, response)
+            return True, response
+        return False, None
+
+    def _slot_for_write(self, encoded, name_hash, now) -> int:
+        free = None
+        oldest = None
+        oldest_stored_at = math.inf
+        for index in self._probe(name_hash):
+            header = self._header(index)
+            state, slot_hash, expires_at, stored_at = (
+                header[1],
+                header[3],
+                header[4],
+                header[5],
+            )
+            if state == _USED and slot_hash == name_hash:
+                if self._name(index, header) == encoded:
+                    return index
+            if state == _EMPTY:
+                return index if free is None else free
+            if free is None and (state == _DELETED or expires_at <= now):
+                free = index
+            if stored_at < oldest_stored_at:
+                oldest, oldest_stored_at = index, stored_at
+        if free is not None:
+            return free
+        with self._stats_lock:
+            self._evictions += 1
+        return oldest
+
+    def _delete(self, index: int) -> None:
+        self._write_slot(index, _DELETED, 0, 0, 0.0, 0.0, b"", b"")
+
+    def _write_slot(
+        self, index, state, checksum, name_hash, expires_at, stored_at, name, data
+    ) -> None:
+        # Must be called with the write lock held.
+        offset = self._offset(index)
+        # A writer which died mid-write leaves the sequence odd; round it
+        # up, so that odd still means "being written" from now on.
+        sequence = (_SEQUENCE.unpack_from(self._map, offset)[0] + 1) & ~1
+        _SEQUENCE.pack_into(self._map, offset, sequence + 1)
+        start = offset + _SLOT_HEADER.size
+        self._map[start : start + len(name)] = name
+        start += len(name)
+        self._map[start : start + len(data)] = data
+        _SLOT_HEADER.pack_into(
+            self._map,
+            offset,
+            sequence + 1,
+            state,
+            checksum,
+            name_hash,
+            expires_at,
+            stored_at,
+            len(name),
+            len(data),
+        )
+        _SEQUENCE.pack_into(self._map, offset, sequence + 2)
+
+    def _check_fork(self) -> None:
+        if self._pid != os.getpid():
+            # Forked: the parent's thread locks may have been held by a
+            # thread which does not exist in this process.
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._stats_lock = threading.Lock()
+            self._decoded = {}
+
+    def _write_lock(self):
+        self._check_fork()
+        return _WriteLock(self._lock, self._fd)
+
+
+class _WriteLock:
+    """Serializes writers across threads and processes.
+
+    POSIX record locks are owned by processes, so threads of one process
+    also need a thread lock.
+    """
+
+    __slots__ = ("_lock", "_fd")
+
+    def __init__(self, lock, fd):
+        self._lock = lock
+        self._fd = fd
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+        finally:
+            self._lock.release()
+
+
+__all__ = ("SharedSecretCache",)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Sequence, Tuple
+
+
+def request_key(name: str, metadata: Sequence[Tuple[str, str]]) -> Hashable:
+    """Returns the key under which identical requests are coalesced.
+
+    Args:
+        name (str): The resource name in the request.
+        metadata (Sequence[Tuple[str, str]]): The metadata sent with the
+            request, including the routing header.
+    """
+    return (name, tuple(tuple(item) for item in metadata))
+
+
+class _Call:
+    __slots__ = ("event", "result", "exception")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls made from multiple threads.
+
+    The first caller for a key runs the function; callers arriving while
+    it is in flight block until it finishes and then share its result or
+    exception. Once the call completes, the next caller for the key starts
+    a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[Hashable, _Call]
+        self._shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Runs ``func`` unless an identical call is already in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            func (Callable[[], Any]): Performs the call.
+
+        Returns:
+            Any: The result of the call.
+
+        Raises:
+            RuntimeError: If the caller running the call was interrupted
+                by an exception which is not an :class:`Exception`, such
+                as :class:`KeyboardInterrupt`.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._shared += 1
+
+        if not leader:
+            call.event.wait()
+            if isinstance(call.exception, Exception):
+                raise call.exception
+            if call.exception is not None:
+                # The leader was interrupted, say by KeyboardInterrupt,
+                # which is not for the other callers' threads to raise.
+                raise RuntimeError("The shared call was interrupted.") from (
+                    call.exception
+                )
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    @property
+    def shared(self) -> int:
+        """int: The number of calls served by another caller's request."""
+        return self._shared
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent identical calls made from coroutines.
+
+    The call is run as a task so that cancelling one waiter does not
+    cancel the request for the others.
+    """
+
+    def __init__(self):
+        self._calls = {}  # type: Dict[Hashable, asyncio.Future]
+        self._shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits ``func`` unless an identical call is already in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            func (Callable[[], Awaitable[Any]]): Performs the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self._shared += 1
+        return await asyncio.shield(task)
+
+    @property
+    def shared(self) -> int:
+        """int: The number of calls served by another caller's request."""
+        return self._shared
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+__all__ = (
+    "AsyncSingleFlight",
+    "SingleFlight",
+)
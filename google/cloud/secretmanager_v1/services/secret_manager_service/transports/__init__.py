@@ -14,21 +14,43 @@
 # limitations under the License.
 #
 from collections import OrderedDict
+import importlib
 from typing import Dict, Type
 
 from .base import SecretManagerServiceTransport
 from .grpc import SecretManagerServiceGrpcTransport
-from .grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
+from .grpc_pooled import SecretManagerServiceGrpcPooledTransport
 
-# Compile a registry of transports.
 _transport_registry = (
     OrderedDict()
 )  # type: Dict[str, Type[SecretManagerServiceTransport]]
 _transport_registry["grpc"] = SecretManagerServiceGrpcTransport
-_transport_registry["grpc_asyncio"] = SecretManagerServiceGrpcAsyncIOTransport
+_transport_registry["grpc_pooled"] = SecretManagerServiceGrpcPooledTransport
+
+# The asyncio transports are imported on first use, so that sync-only
+# callers do not load them.
+_LAZY_TRANSPORTS = {
+    "SecretManagerServiceGrpcAsyncIOTransport": ("grpc_asyncio", ".grpc_asyncio"),
+    "SecretManagerServiceGrpcPooledAsyncIOTransport": (
+        "grpc_pooled_asyncio",
+        ".grpc_pooled_asyncio",
+    ),
+}
 
 __all__ = (
     "SecretManagerServiceTransport",
     "SecretManagerServiceGrpcTransport",
     "SecretManagerServiceGrpcAsyncIOTransport",
+    "SecretManagerServiceGrpcPooledTransport",
+    "SecretManagerServiceGrpcPooledAsyncIOTransport",
 )
+
+
+def __getattr__(name):
+    if name not in _LAZY_TRANSPORTS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    label, module = _LAZY_TRANSPORTS[name]
+    transport = getattr(importlib.import_module(module, __name__), name)
+    _transport_registry[label] = transport
+    globals()[name] = transport
+    return transport
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""The RPCs of ``SecretManagerService`` and their message types.
+
+Shared by the fake service and by :func:`instrument_transport`, which
+both need to (de)serialize every RPC's messages.
+"""
+from google.iam.v1 import iam_policy_pb2  # type: ignore
+from google.iam.v1 import policy_pb2  # type: ignore
+from google.protobuf import empty_pb2  # type: ignore
+
+from google.cloud.secretmanager_v1.types import resources, service
+
+SERVICE_NAME = "google.cloud.secretmanager.v1.SecretManagerService"
+
+# The method name, gRPC method name, request type and response type of
+# each RPC.
+# fmt: off
+RPCS = (
+    ("list_secrets", "ListSecrets", service.ListSecretsRequest, service.ListSecretsResponse),
+    ("create_secret", "CreateSecret", service.CreateSecretRequest, resources.Secret),
+    ("add_secret_version", "AddSecretVersion", service.AddSecretVersionRequest, resources.SecretVersion),
+    ("get_secret", "GetSecret", service.GetSecretRequest, resources.Secret),
+    ("update_secret", "UpdateSecret", service.UpdateSecretRequest, resources.Secret),
+    ("delete_secret", "DeleteSecret", service.DeleteSecretRequest, empty_pb2.Empty),
+    ("list_secret_versions", "ListSecretVersions", service.ListSecretVersionsRequest, service.ListSecretVersionsResponse),
+    ("get_secret_version", "GetSecretVersion", service.GetSecretVersionRequest, resources.SecretVersion),
+    ("access_secret_version", "AccessSecretVersion", service.AccessSecretVersionRequest, service.AccessSecretVersionResponse),
+    ("disable_secret_version", "DisableSecretVersion", service.DisableSecretVersionRequest, resources.SecretVersion),
+    ("enable_secret_version", "EnableSecretVersion", service.EnableSecretVersionRequest, resources.SecretVersion),
+    ("destroy_secret_version", "DestroySecretVersion", service.DestroySecretVersionRequest, resources.SecretVersion),
+    ("set_iam_policy", "SetIamPolicy", iam_policy_pb2.SetIamPolicyRequest, policy_pb2.Policy),
+    ("get_iam_policy", "GetIamPolicy", iam_policy_pb2.GetIamPolicyRequest, policy_pb2.Policy),
+    ("test_iam_permissions", "TestIamPermissions", iam_policy_pb2.TestIamPermissionsRequest, iam_policy_pb2.TestIamPermissionsResponse),
+)
+# fmt: on
+
+
+def is_proto_plus(message_type: type) -> bool:
+    """Returns whether ``message_type`` is a proto-plus message, rather
+    than a protobuf one."""
+    return hasattr(message_type, "wrap")
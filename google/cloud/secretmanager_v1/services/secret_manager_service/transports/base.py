@@ -26,18 +26,13 @@ from google.iam.v1 import iam_policy_pb2  # type: ignore
 from google.iam.v1 import policy_pb2  # type: ignore
 from google.oauth2 import service_account  # type: ignore
 from google.protobuf import empty_pb2  # type: ignore
-import pkg_resources
 
+from google.cloud.secretmanager_v1 import gapic_version as package_version
 from google.cloud.secretmanager_v1.types import resources, service
 
-try:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
-        gapic_version=pkg_resources.get_distribution(
-            "google-cloud-secret-manager",
-        ).version,
-    )
-except pkg_resources.DistributionNotFound:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo()
+DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
+    gapic_version=package_version.__version__
+)
 
 
 class SecretManagerServiceTransport(abc.ABC):
@@ -47,6 +42,10 @@ class SecretManagerServiceTransport(abc.ABC):
 
     DEFAULT_HOST: str = "secretmanager.googleapis.com"
 
+    # Set by ``policy.apply_retry_policy``; applied whenever the wrapped
+    # methods are rebuilt by ``_wrap_stubs``.
+    _retry_policy = None
+
     def __init__(
         self,
         *,
@@ -122,6 +121,9 @@ class SecretManagerServiceTransport(abc.ABC):
         # Save the credentials.
         self._credentials = credentials
 
+        # Save the client info, so that the wrapped methods can be rebuilt.
+        self._client_info = client_info
+
         # Save the hostname. Default to port 443 (HTTPS) if none is specified.
         if ":" not in host:
             host += ":443"
@@ -217,6 +219,28 @@ class SecretManagerServiceTransport(abc.ABC):
             ),
         }
 
+    def _wrap_stubs(self, wrap: Callable[[str, Callable], Callable]) -> None:
+        """Replaces every RPC stub with ``wrap(name, stub)``.
+
+        The wrapped methods are rebuilt around the new stubs with the same
+        defaults, or those of the transport's retry policy. Wrapped methods
+        which were themselves wrapped, by a callable with a
+        ``rewrap(wrapped)`` method, are wrapped again.
+        """
+        previous = {}
+        for name, stub in list(self._stubs.items()):
+            previous[name] = self._wrapped_methods.get(stub)
+            self._stubs[name] = wrap(name, stub)
+        self._prep_wrapped_messages(self._client_info)
+        if self._retry_policy is not None:
+            self._retry_policy._wrap_methods(self)
+        for name, wrapped in previous.items():
+            if hasattr(wrapped, "rewrap"):
+                stub = self._stubs[name]
+                self._wrapped_methods[stub] = wrapped.rewrap(
+                    self._wrapped_methods[stub]
+                )
+
     def close(self):
         """Closes resources associated with the transport.
 
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from .grpc import SecretManagerServiceGrpcTransport
+from .pool import ChannelPool, ChannelPoolMixin
+
+
+class SecretManagerServiceGrpcPooledTransport(
+    ChannelPoolMixin, SecretManagerServiceGrpcTransport
+):
+    """gRPC backend transport for SecretManagerService over a channel pool.
+
+    This behaves like :class:`SecretManagerServiceGrpcTransport`, but opens
+    ``pool_size`` channels, each with its own connection, and spreads
+    calls across them. Use it when many threads share one client and a
+    single HTTP/2 connection limits throughput.
+
+    .. code-block:: python
+
+        from google.cloud import secretmanager_v1
+
+        client = secretmanager_v1.SecretManagerServiceClient(
+            transport="grpc_pooled",
+            client_options={"channel_pool_size": 8},
+        )
+
+    Args:
+        pool_size (int): The number of channels to open. Ignored if
+            ``channel`` is provided.
+        pool_policy (str): How to pick a channel for each call, either
+            ``"least_outstanding"`` (the default) or ``"round_robin"``.
+        kwargs: Passed to :class:`SecretManagerServiceGrpcTransport`.
+    """
+
+    _channel_pool_class = ChannelPool
+
+
+__all__ = ("SecretManagerServiceGrpcPooledTransport",)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+from typing import Callable, Sequence
+
+from grpc.experimental import aio  # type: ignore
+
+from .grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
+from .pool import ChannelPoolMixin, _ChannelPoolBase
+
+
+class _AsyncPooledUnaryUnaryMultiCallable(aio.UnaryUnaryMultiCallable):
+    def __init__(self, pool: "AsyncChannelPool", callables: Sequence[Callable]):
+        self._pool = pool
+        self._callables = callables
+
+    def __call__(self, request, **kwargs):
+        index = self._pool._acquire()
+        try:
+            call = self._callables[index](request, **kwargs)
+        except BaseException:
+            self._pool._release(index)
+            raise
+        call.add_done_callback(lambda _: self._pool._release(index))
+        return call
+
+
+class AsyncChannelPool(_ChannelPoolBase):
+    """Spreads unary calls over several ``grpc.aio.Channel`` instances.
+
+    The asyncio counterpart of :class:`~.pool.ChannelPool`.
+
+    Args:
+        channels (Sequence[grpc.aio.Channel]): The channels to pool.
+        policy (str): How to pick a channel for each call.
+    """
+
+    def unary_unary(self, method: str, **kwargs) -> aio.UnaryUnaryMultiCallable:
+        """Returns a multi-callable which picks a channel for each call."""
+        return _AsyncPooledUnaryUnaryMultiCallable(
+            self, self._multi_callables(method, **kwargs)
+        )
+
+    async def close(self) -> None:
+        """Closes all pooled channels."""
+        await asyncio.gather(*(channel.close() for channel in self._channels))
+
+
+class SecretManagerServiceGrpcPooledAsyncIOTransport(
+    ChannelPoolMixin, SecretManagerServiceGrpcAsyncIOTransport
+):
+    """gRPC AsyncIO backend transport for SecretManagerService over a channel pool.
+
+    The asyncio counterpart of
+    :class:`~.grpc_pooled.SecretManagerServiceGrpcPooledTransport`.
+
+    Args:
+        pool_size (int): The number of channels to open. Ignored if
+            ``channel`` is provided.
+        pool_policy (str): How to pick a channel for each call, either
+            ``"least_outstanding"`` (the default) or ``"round_robin"``.
+        kwargs: Passed to :class:`SecretManagerServiceGrpcAsyncIOTransport`.
+    """
+
+    _channel_pool_class = AsyncChannelPool
+
+
+__all__ = (
+    "AsyncChannelPool",
+    "SecretManagerServiceGrpcPooledAsyncIOTransport",
+)
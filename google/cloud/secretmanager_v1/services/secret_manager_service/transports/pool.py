@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import threading
+from typing import Any, Callable, List, Sequence, Tuple
+
+import grpc  # type: ignore
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+DEFAULT_POOL_SIZE = 4
+
+_POLICIES = (ROUND_ROBIN, LEAST_OUTSTANDING)
+
+
+def _check_policy(policy: str) -> None:
+    if policy not in _POLICIES:
+        raise ValueError(
+            "Unknown channel pool policy {!r}; expected one of {}".format(
+                policy, ", ".join(_POLICIES)
+            )
+        )
+
+
+class _ChannelPoolBase:
+    def __init__(self, channels: Sequence[Any], policy: str = LEAST_OUTSTANDING):
+        if not channels:
+            raise ValueError("A channel pool needs at least one channel.")
+        _check_policy(policy)
+        self._channels = list(channels)
+        self._policy = policy
+        self._lock = threading.Lock()
+        self._outstanding = [0] * len(self._channels)
+        self._next = 0
+
+    @property
+    def channels(self) -> Tuple[Any, ...]:
+        """Tuple[Any, ...]: The pooled channels."""
+        return tuple(self._channels)
+
+    @property
+    def outstanding(self) -> Tuple[int, ...]:
+        """Tuple[int, ...]: The number of calls in flight on each channel."""
+        with self._lock:
+            return tuple(self._outstanding)
+
+    def _acquire(self) -> int:
+        count = len(self._channels)
+        with self._lock:
+            start = self._next % count
+            self._next += 1
+            index = start
+            if self._policy == LEAST_OUTSTANDING:
+                # Scan from a rotating start so that ties are spread evenly.
+                for offset in range(1, count):
+                    candidate = (start + offset) % count
+                    if self._outstanding[candidate] < self._outstanding[index]:
+                        index = candidate
+            self._outstanding[index] += 1
+            return index
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._outstanding[index] -= 1
+
+    def _multi_callables(self, method: str, **kwargs) -> List[Any]:
+        return [channel.unary_unary(method, **kwargs) for channel in self._channels]
+
+
+class _PooledUnaryUnaryMultiCallable(grpc.UnaryUnaryMultiCallable):
+    def __init__(self, pool: "ChannelPool", callables: Sequence[Callable]):
+        self._pool = pool
+        self._callables = callables
+
+    def _invoke(self, attr, request, *args, **kwargs):
+        index = self._pool._acquire()
+        try:
+            return getattr(self._callables[index], attr)(request, *args, **kwargs)
+        finally:
+            self._pool._release(index)
+
+    def __call__(self, request, *args, **kwargs):
+        return self._invoke("__call__", request, *args, **kwargs)
+
+    def with_call(self, request, *args, **kwargs):
+        return self._invoke("with_call", request, *args, **kwargs)
+
+    def future(self, request, *args, **kwargs):
+        index = self._pool._acquire()
+        try:
+            future = self._callables[index].future(request, *args, **kwargs)
+        except BaseException:
+            self._pool._release(index)
+            raise
+        future.add_done_callback(lambda _: self._pool._release(index))
+        return future
+
+
+class ChannelPool(_ChannelPoolBase):
+    """Spreads unary calls over several ``grpc.Channel`` instances.
+
+    Each channel has its own HTTP/2 connection, so a pool is not limited
+    by the concurrent stream limit of a single connection. For every call,
+    the pool picks a channel either in turn (``"round_robin"``) or with the
+    fewest calls in flight (``"least_outstanding"``).
+
+    Only ``unary_unary`` is supported, which covers every Secret Manager
+    RPC.
+
+    Args:
+        channels (Sequence[grpc.Channel]): The channels to pool.
+        policy (str): How to pick a channel for each call.
+    """
+
+    def unary_unary(self, method: str, **kwargs) -> grpc.UnaryUnaryMultiCallable:
+        """Returns a multi-callable which picks a channel for each call."""
+        return _PooledUnaryUnaryMultiCallable(
+            self, self._multi_callables(method, **kwargs)
+        )
+
+    def close(self) -> None:
+        """Closes all pooled channels."""
+        for channel in self._channels:
+            channel.close()
+
+
+class ChannelPoolMixin:
+    """Gives a gRPC transport a pool of channels instead of a single one.
+
+    The first channel is created by the transport as usual; the others are
+    created with the same host, credentials and options. If a ``channel``
+    is passed to the transport, it is used on its own.
+    """
+
+    _channel_pool_class = ChannelPool
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        pool_policy: str = LEAST_OUTSTANDING,
+        **kwargs,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        _check_policy(pool_policy)
+        self._pool_size = 1 if kwargs.get("channel") else pool_size
+        self._pool_policy = pool_policy
+        self._pool_quota_project_id = kwargs.get("quota_project_id")
+        self._channel_pool = None
+        super().__init__(**kwargs)
+
+    @classmethod
+    def create_channel(cls, *args, **kwargs):
+        # By default, gRPC shares connections between channels with the
+        # same target and arguments, which would defeat the pool.
+        options = list(kwargs.pop("options", None) or ())
+        options.append(("grpc.use_local_subchannel_pool", 1))
+        return super().create_channel(*args, options=options, **kwargs)
+
+    @property
+    def grpc_channel(self):
+        """Return the pool of channels used to connect to this service."""
+        if self._channel_pool is None:
+            channels = [self._grpc_channel]
+            for _ in range(self._pool_size - 1):
+                channels.append(
+                    type(self).create_channel(
+                        self._host,
+                        credentials=self._credentials,
+                        credentials_file=None,
+                        scopes=self._scopes,
+                        ssl_credentials=self._ssl_channel_credentials,
+                        quota_project_id=self._pool_quota_project_id,
+                        options=[
+                            ("grpc.max_send_message_length", -1),
+                            ("grpc.max_receive_message_length", -1),
+                        ],
+                    )
+                )
+            self._channel_pool = self._channel_pool_class(channels, self._pool_policy)
+        return self._channel_pool
+
+
+__all__ = (
+    "ChannelPool",
+    "ChannelPoolMixin",
+    "DEFAULT_POOL_SIZE",
+    "LEAST_OUTSTANDING",
+    "ROUND_ROBIN",
+)
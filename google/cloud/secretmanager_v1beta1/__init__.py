@@ -15,24 +15,63 @@
 # limitations under the License.
 #
 
-from .services.secret_manager_service import SecretManagerServiceClient
-from .types.resources import Replication, Secret, SecretPayload, SecretVersion
-from .types.service import (
-    AccessSecretVersionRequest,
-    AccessSecretVersionResponse,
-    AddSecretVersionRequest,
-    CreateSecretRequest,
-    DeleteSecretRequest,
-    DestroySecretVersionRequest,
-    DisableSecretVersionRequest,
-    EnableSecretVersionRequest,
-    GetSecretRequest,
-    GetSecretVersionRequest,
-    ListSecretsRequest,
-    ListSecretsResponse,
-    ListSecretVersionsRequest,
-    ListSecretVersionsResponse,
-    UpdateSecretRequest,
+import importlib
+from typing import TYPE_CHECKING
+
+from google.cloud.secretmanager_v1beta1 import gapic_version as package_version
+
+__version__ = package_version.__version__
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from .services.secret_manager_service import SecretManagerServiceClient
+    from .types.resources import Replication, Secret, SecretPayload, SecretVersion
+    from .types.service import (
+        AccessSecretVersionRequest,
+        AccessSecretVersionResponse,
+        AddSecretVersionRequest,
+        CreateSecretRequest,
+        DeleteSecretRequest,
+        DestroySecretVersionRequest,
+        DisableSecretVersionRequest,
+        EnableSecretVersionRequest,
+        GetSecretRequest,
+        GetSecretVersionRequest,
+        ListSecretsRequest,
+        ListSecretsResponse,
+        ListSecretVersionsRequest,
+        ListSecretVersionsResponse,
+        UpdateSecretRequest,
+    )
+
+# Maps each public name to the module which defines it. Modules are
+# imported on first attribute access (PEP 562), so importing this package
+# does not load the clients, their transports or the message types until
+# they are used.
+_LAZY_IMPORTS = {
+    "AccessSecretVersionRequest": ".types.service",
+    "AccessSecretVersionResponse": ".types.service",
+    "AddSecretVersionRequest": ".types.service",
+    "CreateSecretRequest": ".types.service",
+    "DeleteSecretRequest": ".types.service",
+    "DestroySecretVersionRequest": ".types.service",
+    "DisableSecretVersionRequest": ".types.service",
+    "EnableSecretVersionRequest": ".types.service",
+    "GetSecretRequest": ".types.service",
+    "GetSecretVersionRequest": ".types.service",
+    "ListSecretsRequest": ".types.service",
+    "ListSecretsResponse": ".types.service",
+    "ListSecretVersionsRequest": ".types.service",
+    "ListSecretVersionsResponse": ".types.service",
+    "Replication": ".types.resources",
+    "Secret": ".types.resources",
+    "SecretManagerServiceClient": ".services.secret_manager_service",
+    "SecretPayload": ".types.resources",
+    "SecretVersion": ".types.resources",
+    "UpdateSecretRequest": ".types.service",
+}
+_LAZY_SUBMODULES = (
+    "services",
+    "types",
 )
 
 __all__ = (
@@ -57,3 +96,19 @@ __all__ = (
     "UpdateSecretRequest",
     "SecretManagerServiceClient",
 )
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cache the value so that later lookups do not go through __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
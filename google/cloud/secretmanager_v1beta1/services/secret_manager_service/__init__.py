@@ -13,12 +13,34 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-#
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from .async_client import SecretManagerServiceAsyncClient
+    from .client import SecretManagerServiceClient
 
-from .async_client import SecretManagerServiceAsyncClient
-from .client import SecretManagerServiceClient
+# The clients are imported on first use, so that sync-only callers do not
+# load the async client.
+_LAZY_IMPORTS = {
+    "SecretManagerServiceAsyncClient": ".async_client",
+    "SecretManagerServiceClient": ".client",
+}
 
 __all__ = (
     "SecretManagerServiceClient",
     "SecretManagerServiceAsyncClient",
 )
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
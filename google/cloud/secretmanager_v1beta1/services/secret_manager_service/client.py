@@ -16,7 +16,6 @@
 #
 
 from collections import OrderedDict
-from distutils import util
 import os
 import re
 from typing import Callable, Dict, Optional, Sequence, Tuple, Type, Union
@@ -34,14 +33,14 @@ from google.iam.v1 import policy_pb2 as policy  # type: ignore
 from google.oauth2 import service_account  # type: ignore
 from google.protobuf import field_mask_pb2 as field_mask  # type: ignore
 from google.protobuf import timestamp_pb2 as timestamp  # type: ignore
-import pkg_resources
 
+from google.cloud.secretmanager_v1beta1 import gapic_version as package_version
 from google.cloud.secretmanager_v1beta1.services.secret_manager_service import pagers
 from google.cloud.secretmanager_v1beta1.types import resources, service
 
+from . import paths
 from .transports.base import DEFAULT_CLIENT_INFO, SecretManagerServiceTransport
 from .transports.grpc import SecretManagerServiceGrpcTransport
-from .transports.grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
 
 
 class SecretManagerServiceClientMeta(type):
@@ -56,7 +55,6 @@ class SecretManagerServiceClientMeta(type):
         OrderedDict()
     )  # type: Dict[str, Type[SecretManagerServiceTransport]]
     _transport_registry["grpc"] = SecretManagerServiceGrpcTransport
-    _transport_registry["grpc_asyncio"] = SecretManagerServiceGrpcAsyncIOTransport
 
     def get_transport_class(
         cls,
@@ -71,6 +69,15 @@ class SecretManagerServiceClientMeta(type):
         Returns:
             The transport class to use.
         """
+        # The asyncio transport is registered on first use, so that
+        # sync-only callers do not load it.
+        if label == "grpc_asyncio" and label not in cls._transport_registry:
+            from .transports.grpc_asyncio import (
+                SecretManagerServiceGrpcAsyncIOTransport,
+            )
+
+            cls._transport_registry[label] = SecretManagerServiceGrpcAsyncIOTransport
+
         # If a specific transport is requested, return that one.
         if label:
             return cls._transport_registry[label]
@@ -175,16 +182,12 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         secret: str,
     ) -> str:
         """Return a fully-qualified secret string."""
-        return "projects/{project}/secrets/{secret}".format(
-            project=project,
-            secret=secret,
-        )
+        return paths.SECRET.format(project, secret)
 
     @staticmethod
     def parse_secret_path(path: str) -> Dict[str, str]:
         """Parse a secret path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/secrets/(?P<secret>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.SECRET.parse(path)
 
     @staticmethod
     def secret_version_path(
@@ -193,80 +196,60 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         secret_version: str,
     ) -> str:
         """Return a fully-qualified secret_version string."""
-        return "projects/{project}/secrets/{secret}/versions/{secret_version}".format(
-            project=project,
-            secret=secret,
-            secret_version=secret_version,
-        )
+        return paths.SECRET_VERSION.format(project, secret, secret_version)
 
     @staticmethod
     def parse_secret_version_path(path: str) -> Dict[str, str]:
         """Parse a secret_version path into its component segments."""
-        m = re.match(
-            r"^projects/(?P<project>.+?)/secrets/(?P<secret>.+?)/versions/(?P<secret_version>.+?)$",
-            path,
-        )
-        return m.groupdict() if m else {}
+        return paths.SECRET_VERSION.parse(path)
 
     @staticmethod
     def common_billing_account_path(
         billing_account: str,
     ) -> str:
         """Return a fully-qualified billing_account string."""
-        return "billingAccounts/{billing_account}".format(
-            billing_account=billing_account,
-        )
+        return paths.COMMON_BILLING_ACCOUNT.format(billing_account)
 
     @staticmethod
     def parse_common_billing_account_path(path: str) -> Dict[str, str]:
         """Parse a billing_account path into its component segments."""
-        m = re.match(r"^billingAccounts/(?P<billing_account>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_BILLING_ACCOUNT.parse(path)
 
     @staticmethod
     def common_folder_path(
         folder: str,
     ) -> str:
         """Return a fully-qualified folder string."""
-        return "folders/{folder}".format(
-            folder=folder,
-        )
+        return paths.COMMON_FOLDER.format(folder)
 
     @staticmethod
     def parse_common_folder_path(path: str) -> Dict[str, str]:
         """Parse a folder path into its component segments."""
-        m = re.match(r"^folders/(?P<folder>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_FOLDER.parse(path)
 
     @staticmethod
     def common_organization_path(
         organization: str,
     ) -> str:
         """Return a fully-qualified organization string."""
-        return "organizations/{organization}".format(
-            organization=organization,
-        )
+        return paths.COMMON_ORGANIZATION.format(organization)
 
     @staticmethod
     def parse_common_organization_path(path: str) -> Dict[str, str]:
         """Parse a organization path into its component segments."""
-        m = re.match(r"^organizations/(?P<organization>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_ORGANIZATION.parse(path)
 
     @staticmethod
     def common_project_path(
         project: str,
     ) -> str:
         """Return a fully-qualified project string."""
-        return "projects/{project}".format(
-            project=project,
-        )
+        return paths.COMMON_PROJECT.format(project)
 
     @staticmethod
     def parse_common_project_path(path: str) -> Dict[str, str]:
         """Parse a project path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_PROJECT.parse(path)
 
     @staticmethod
     def common_location_path(
@@ -274,16 +257,12 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         location: str,
     ) -> str:
         """Return a fully-qualified location string."""
-        return "projects/{project}/locations/{location}".format(
-            project=project,
-            location=location,
-        )
+        return paths.COMMON_LOCATION.format(project, location)
 
     @staticmethod
     def parse_common_location_path(path: str) -> Dict[str, str]:
         """Parse a location path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/locations/(?P<location>.+?)$", path)
-        return m.groupdict() if m else {}
+        return paths.COMMON_LOCATION.parse(path)
 
     def __init__(
         self,
@@ -336,9 +315,17 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
             client_options = client_options_lib.ClientOptions()
 
         # Create SSL credentials for mutual TLS if needed.
-        use_client_cert = bool(
-            util.strtobool(os.getenv("GOOGLE_API_USE_CLIENT_CERTIFICATE", "false"))
-        )
+        # Accepts the same values as distutils.util.strtobool, without
+        # importing distutils (and, through setuptools, pkg_resources).
+        env = os.getenv("GOOGLE_API_USE_CLIENT_CERTIFICATE", "false").lower()
+        if env in ("y", "yes", "t", "true", "on", "1"):
+            use_client_cert = True
+        elif env in ("n", "no", "f", "false", "off", "0"):
+            use_client_cert = False
+        else:
+            raise ValueError(
+                "Environment variable `GOOGLE_API_USE_CLIENT_CERTIFICATE` must be either `true` or `false`"
+            )
 
         client_cert_source_func = None
         is_mtls = False
@@ -1777,14 +1764,9 @@ class SecretManagerServiceClient(metaclass=SecretManagerServiceClientMeta):
         return response
 
 
-try:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
-        gapic_version=pkg_resources.get_distribution(
-            "google-cloud-secret-manager",
-        ).version,
-    )
-except pkg_resources.DistributionNotFound:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo()
+DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
+    gapic_version=package_version.__version__
+)
 
 
 __all__ = ("SecretManagerServiceClient",)
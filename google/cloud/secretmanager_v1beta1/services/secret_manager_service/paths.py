@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Precompiled resource name templates.
+
+The ``*_path`` and ``parse_*_path`` helpers of
+:class:`SecretManagerServiceClient` use the templates defined here. See
+:mod:`google.cloud.secretmanager_v1.services.secret_manager_service.paths`
+for the bulk parsing and building methods of :class:`ResourcePath`.
+
+.. code-block:: python
+
+    from google.cloud.secretmanager_v1beta1.services.secret_manager_service import paths
+
+    for project, secret, version in paths.SECRET_VERSION.parse_many(names):
+        ...
+"""
+from google.cloud.secretmanager_v1.services.secret_manager_service.paths import (
+    ResourcePath,
+)
+
+SECRET = ResourcePath("projects/{project}/secrets/{secret}")
+SECRET_VERSION = ResourcePath(
+    "projects/{project}/secrets/{secret}/versions/{secret_version}"
+)
+COMMON_BILLING_ACCOUNT = ResourcePath("billingAccounts/{billing_account}")
+COMMON_FOLDER = ResourcePath("folders/{folder}")
+COMMON_ORGANIZATION = ResourcePath("organizations/{organization}")
+COMMON_PROJECT = ResourcePath("projects/{project}")
+COMMON_LOCATION = ResourcePath("projects/{project}/locations/{location}")
+
+
+__all__ = (
+    "COMMON_BILLING_ACCOUNT",
+    "COMMON_FOLDER",
+    "COMMON_LOCATION",
+    "COMMON_ORGANIZATION",
+    "COMMON_PROJECT",
+    "ResourcePath",
+    "SECRET",
+    "SECRET_VERSION",
+)
@@ -13,24 +13,31 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-#
-
 from collections import OrderedDict
 from typing import Dict, Type
 
 from .base import SecretManagerServiceTransport
 from .grpc import SecretManagerServiceGrpcTransport
-from .grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
 
-# Compile a registry of transports.
 _transport_registry = (
     OrderedDict()
 )  # type: Dict[str, Type[SecretManagerServiceTransport]]
 _transport_registry["grpc"] = SecretManagerServiceGrpcTransport
-_transport_registry["grpc_asyncio"] = SecretManagerServiceGrpcAsyncIOTransport
 
 __all__ = (
     "SecretManagerServiceTransport",
     "SecretManagerServiceGrpcTransport",
     "SecretManagerServiceGrpcAsyncIOTransport",
 )
+
+
+def __getattr__(name):
+    # The asyncio transport is imported on first use, so that sync-only
+    # callers do not load it.
+    if name == "SecretManagerServiceGrpcAsyncIOTransport":
+        from .grpc_asyncio import SecretManagerServiceGrpcAsyncIOTransport
+
+        _transport_registry["grpc_asyncio"] = SecretManagerServiceGrpcAsyncIOTransport
+        globals()[name] = SecretManagerServiceGrpcAsyncIOTransport
+        return SecretManagerServiceGrpcAsyncIOTransport
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -25,19 +25,14 @@ from google.auth import credentials  # type: ignore
 from google.iam.v1 import iam_policy_pb2 as iam_policy  # type: ignore
 from google.iam.v1 import policy_pb2 as policy  # type: ignore
 from google.protobuf import empty_pb2 as empty  # type: ignore
-import pkg_resources
 
 from google import auth  # type: ignore
+from google.cloud.secretmanager_v1beta1 import gapic_version as package_version
 from google.cloud.secretmanager_v1beta1.types import resources, service
 
-try:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
-        gapic_version=pkg_resources.get_distribution(
-            "google-cloud-secret-manager",
-        ).version,
-    )
-except pkg_resources.DistributionNotFound:
-    DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo()
+DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
+    gapic_version=package_version.__version__
+)
 
 
 class SecretManagerServiceTransport(abc.ABC):
@@ -186,6 +186,18 @@ def unit(session):
     default(session)
 
 
+@nox.session(python=DEFAULT_PYTHON_VERSION)
+def benchmark(session):
+    """Run the benchmark suite and compare it to the stored baseline.
+
+    Pass ``-- --save benchmarks/baseline.json`` to record a new baseline
+    instead, for example after changing machines.
+    """
+    session.install("-e", ".")
+    args = session.posargs or ["--compare", "benchmarks/baseline.json"]
+    session.run("python", "benchmarks/suite.py", *args)
+
+
 def install_systemtest_dependencies(session, *constraints):
 
     # Use pre-release gRPC for system tests.
@@ -21,7 +21,6 @@ import setuptools
 
 name = "google-cloud-secret-manager"
 description = "Secret Manager API API client library"
-version = "2.12.0"
 release_status = "Development Status :: 5 - Production/Stable"
 dependencies = [
     "google-api-core[grpc] >= 1.32.0, <3.0.0dev,!=2.0.*,!=2.1.*,!=2.2.*,!=2.3.*,!=2.4.*,!=2.5.*,!=2.6.*,!=2.7.*",
@@ -29,10 +28,21 @@ dependencies = [
     "proto-plus >= 1.15.0, <2.0.0dev",
     "protobuf >= 3.19.0, <4.0.0dev",
 ]
-extras = {"libcst": "libcst >= 0.2.5"}
+extras = {
+    "libcst": "libcst >= 0.2.5",
+    "crc32c": "google-crc32c >= 1.0.0, <2.0.0dev",
+    "cryptography": "cryptography >= 2.0.0",
+}
 
 package_root = os.path.abspath(os.path.dirname(__file__))
 
+version = {}
+with open(
+    os.path.join(package_root, "google/cloud/secretmanager/gapic_version.py")
+) as fp:
+    exec(fp.read(), version)
+version = version["__version__"]
+
 readme_filename = os.path.join(package_root, "README.rst")
 with io.open(readme_filename, encoding="utf-8") as readme_file:
     readme = readme_file.read()
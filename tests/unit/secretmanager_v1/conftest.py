@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+    FakeSecretManagerService,
+)
+
+SECRET = "projects/p/secrets/s"
+
+
+def new_fake(payload=b"x", *, latency=0.0, versions=1):
+    """Returns a fake service holding the secret ``SECRET``.
+
+    Args:
+        payload (bytes): The payload of each version of the secret.
+        latency (Union[float, Callable[[str], float]]): Seconds each RPC
+            takes, as for :class:`FakeSecretManagerService`.
+        versions (int): The number of versions to add.
+    """
+    fake = FakeSecretManagerService(latency=latency)
+    fake.create_secret(
+        {
+            "parent": "projects/p",
+            "secret_id": "s",
+            "secret": {"replication": {"automatic": {}}},
+        }
+    )
+    for _ in range(versions):
+        fake.add_secret_version({"parent": SECRET, "payload": {"data": payload}})
+    return fake
+
+
+@pytest.fixture
+def make_fake():
+    """Returns :func:`new_fake`, to create fakes in a test."""
+    return new_fake
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import grpc_helpers_async
+from google.auth import credentials as ga_credentials
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.types import service
+
+NAMES = [
+    "projects/p/secrets/a/versions/1",
+    "projects/p/secrets/missing/versions/1",
+    "projects/p/secrets/b/versions/latest",
+    "projects/p/secrets/a/versions/1",
+]
+
+
+def fake_access(request, **kwargs):
+    if "missing" in request.name:
+        raise core_exceptions.NotFound("not found")
+    return service.AccessSecretVersionResponse(name=request.name)
+
+
+def check_results(results):
+    assert [r.name for r in results] == NAMES
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert results[0].response.name == NAMES[0]
+    assert isinstance(results[1].error, core_exceptions.NotFound)
+    assert results[1].response is None
+    assert results[2].response.name == NAMES[2]
+    assert results[3] is results[0]
+
+
+def test_access_secret_versions():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_access
+        results = client.access_secret_versions(NAMES, max_concurrency=2)
+
+    # Duplicate names are only requested once.
+    assert call.call_count == 3
+    check_results(results)
+
+
+def test_access_secret_versions_other_errors():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    def broken_access(request, **kwargs):
+        if "missing" in request.name:
+            raise RuntimeError("broken")
+        return fake_access(request)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = broken_access
+        results = client.access_secret_versions(NAMES, retry=None)
+
+    # The error of one name does not fail the others.
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert isinstance(results[1].error, RuntimeError)
+
+
+def test_access_secret_versions_empty():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    assert client.access_secret_versions([]) == []
+
+
+def test_access_secret_versions_invalid_concurrency():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    with pytest.raises(ValueError):
+        client.access_secret_versions(NAMES, max_concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_access_secret_versions_async():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    def fake_async_access(request, **kwargs):
+        if "missing" in request.name:
+            raise core_exceptions.NotFound("not found")
+        return grpc_helpers_async.FakeUnaryUnaryCall(
+            service.AccessSecretVersionResponse(name=request.name)
+        )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_async_access
+        results = await client.access_secret_versions(NAMES, max_concurrency=2)
+
+    assert call.call_count == 3
+    check_results(results)
+
+
+@pytest.mark.asyncio
+async def test_access_secret_versions_async_invalid_concurrency():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    with pytest.raises(ValueError):
+        await client.access_secret_versions(NAMES, max_concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_access_secret_versions_async_other_errors():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    def broken_async_access(request, **kwargs):
+        if "missing" in request.name:
+            raise RuntimeError("broken")
+        return grpc_helpers_async.FakeUnaryUnaryCall(
+            service.AccessSecretVersionResponse(name=request.name)
+        )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = broken_async_access
+        results = await client.access_secret_versions(NAMES, retry=None)
+
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert isinstance(results[1].error, RuntimeError)
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import time
+
+from google.api_core import exceptions as core_exceptions
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    breaker,
+)
+from google.cloud.secretmanager_v1.types import service
+
+_SECRET = "projects/p/secrets/s"
+_VERSION = _SECRET + "/versions/1"
+_ENDPOINT = "secretmanager.googleapis.com:443"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(**kwargs):
+    kwargs.setdefault("clock", FakeClock())
+    kwargs.setdefault("min_calls", 4)
+    return breaker.CircuitBreaker(**kwargs)
+
+
+def _client(fake, circuit_breaker, **kwargs):
+    return SecretManagerServiceClient(
+        transport=fake.transport(**kwargs),
+        client_options={"circuit_breaker": circuit_breaker},
+    )
+
+
+def _trip(client, fake, method="get_secret", calls=4):
+    fake.inject_error("*", core_exceptions.ServiceUnavailable("down"), times=calls)
+    for _ in range(calls):
+        with pytest.raises(core_exceptions.ServiceUnavailable):
+            getattr(client, method)(
+                name=_SECRET if method == "get_secret" else _VERSION, retry=None
+            )
+
+
+def test_opens_and_fails_fast(make_fake):
+    fake = make_fake()
+    cb = _breaker()
+    client = _client(fake, cb)
+    _trip(client, fake)
+    assert cb.state("get_secret", _ENDPOINT) == breaker.OPEN
+    assert cb.state("list_secrets", _ENDPOINT) == breaker.CLOSED
+
+    calls = fake.calls["get_secret"]
+    start = time.perf_counter()
+    with pytest.raises(breaker.CircuitOpenError) as exc_info:
+        # The default retry policy does not retry an open circuit.
+        client.get_secret(name=_SECRET)
+    assert time.perf_counter() - start < 1.0
+    assert exc_info.value.retry_after == 30.0
+    assert exc_info.value.method == "get_secret"
+    assert fake.calls["get_secret"] == calls
+    assert cb.stats() == breaker.CircuitBreakerStats(
+        trips=1, rejections=1, stale_served=0
+    )
+    # Other methods and endpoints have their own circuits.
+    client.list_secrets(parent="projects/p")
+    _client(fake, cb, host="secretmanager.example.com").get_secret(name=_SECRET)
+
+
+def test_client_errors_do_not_count(make_fake):
+    fake = make_fake()
+    cb = _breaker()
+    client = _client(fake, cb)
+    for _ in range(10):
+        with pytest.raises(core_exceptions.NotFound):
+            client.get_secret(name="projects/p/secrets/missing")
+    assert cb.state("get_secret", _ENDPOINT) == breaker.CLOSED
+
+
+def test_failure_threshold_and_window(make_fake):
+    clock = FakeClock()
+    fake = make_fake()
+    cb = _breaker(clock=clock, failure_threshold=0.5, window_seconds=10.0)
+    client = _client(fake, cb)
+    for _ in range(3):
+        client.get_secret(name=_SECRET)
+    _trip(client, fake, calls=2)
+    # Two of five attempts failed.
+    assert cb.state("get_secret", _ENDPOINT) == breaker.CLOSED
+    clock.now += 11
+    # The old attempts have left the window.
+    _trip(client, fake, calls=3)
+    assert cb.state("get_secret", _ENDPOINT) == breaker.CLOSED
+    _trip(client, fake, calls=1)
+    assert cb.state("get_secret", _ENDPOINT) == breaker.OPEN
+
+
+def test_slow_calls_count_as_failures(make_fake):
+    clock = FakeClock()
+
+    def latency(rpc):
+        clock.now += 6.0
+        return 0.0
+
+    fake = make_fake(latency=latency)
+    cb = _breaker(clock=clock, slow_call_seconds=5.0)
+    client = _client(fake, cb)
+    for _ in range(4):
+        client.get_secret(name=_SECRET)
+    assert cb.state("get_secret", _ENDPOINT) == breaker.OPEN
+
+
+def test_half_open_probe(make_fake):
+    clock = FakeClock()
+    fake = make_fake()
+    cb = _breaker(clock=clock, open_seconds=30.0)
+    client = _client(fake, cb)
+    _trip(client, fake)
+    clock.now += 30
+    assert cb.state("get_secret", _ENDPOINT) == breaker.HALF_OPEN
+
+    # A single probe is let through; it fails and the circuit reopens.
+    circuit, probe = cb._allow("get_secret", _ENDPOINT)
+    assert probe
+    with pytest.raises(breaker.CircuitOpenError):
+        client.get_secret(name=_SECRET)
+    cb._record(circuit, "get_secret", _ENDPOINT, True, probe)
+    assert cb.state("get_secret", _ENDPOINT) == breaker.OPEN
+    assert cb.stats().trips == 2
+
+    # A cancelled probe lets another one through.
+    clock.now += 30
+    circuit, probe = cb._allow("get_secret", _ENDPOINT)
+    cb._record(circuit, "get_secret", _ENDPOINT, None, probe)
+    assert client.get_secret(name=_SECRET).name == _SECRET
+    assert cb.state("get_secret", _ENDPOINT) == breaker.CLOSED
+
+
+def test_stragglers_do_not_decide_half_open_circuits(make_fake):
+    clock = FakeClock()
+    fake = make_fake()
+    cb = _breaker(clock=clock, open_seconds=30.0)
+    client = _client(fake, cb)
+    # An attempt is sent while the circuit is closed, and is still in
+    # flight when it opens and becomes half open.
+    straggler, probe = cb._allow("get_secret", _ENDPOINT)
+    assert not probe
+    _trip(client, fake)
+    clock.now += 30
+    circuit, probe = cb._allow("get_secret", _ENDPOINT)
+    assert probe
+
+    for failed in (False, True):
+        cb._record(straggler, "get_secret", _ENDPOINT, failed, False)
+        assert cb.state("get_secret", _ENDPOINT) == breaker.HALF_OPEN
+        # The probe is still in flight, so no other attempt is let through.
+        with pytest.raises(breaker.CircuitOpenError):
+            client.get_secret(name=_SECRET)
+
+    cb._record(circuit, "get_secret", _ENDPOINT, False, probe)
+    assert cb.state("get_secret", _ENDPOINT) == breaker.CLOSED
+
+
+def test_serves_stale_responses(make_fake):
+    clock = FakeClock()
+    fake = make_fake()
+    served = []
+    cb = _breaker(
+        clock=clock,
+        open_seconds=120.0,
+        max_stale_age=60.0,
+        on_stale=lambda name, stale: served.append((name, stale.age)),
+    )
+    client = _client(fake, cb)
+    assert client.access_secret_version(name=_VERSION).payload.data == b"x"
+    assert cb.last_good(_VERSION).age == 0.0
+
+    clock.now += 20
+    # The earlier success is in the window too.
+    _trip(client, fake, method="access_secret_version", calls=3)
+    response = client.access_secret_version(name=_VERSION)
+    assert response.payload.data == b"x"
+    assert served == [(_VERSION, 20.0)]
+    assert cb.stats().stale_served == 1
+
+    # There is nothing to serve for other names, or once it is too old.
+    with pytest.raises(breaker.CircuitOpenError):
+        client.access_secret_version(name=_SECRET + "/versions/latest")
+    clock.now += 41
+    assert cb.last_good(_VERSION) is None
+    with pytest.raises(breaker.CircuitOpenError):
+        client.access_secret_version(name=_VERSION)
+
+
+def test_serve_stale_directly():
+    cb = _breaker()
+    response = service.AccessSecretVersionResponse(name=_VERSION)
+    assert cb.serve_stale(_VERSION, lambda: response) == response
+
+    def fetch():
+        raise breaker.CircuitOpenError("access_secret_version", _ENDPOINT, 1.0)
+
+    assert cb.serve_stale(_VERSION, fetch) == response
+    with pytest.raises(breaker.CircuitOpenError):
+        cb.serve_stale(_SECRET + "/versions/2", fetch)
+    assert cb.stats().stale_served == 1
+
+
+def test_serve_stale_disabled_and_invalidation(make_fake):
+    fake = make_fake()
+    cb = _breaker(serve_stale=False)
+    client = _client(fake, cb)
+    client.access_secret_version(name=_VERSION)
+    _trip(client, fake, method="access_secret_version", calls=3)
+    with pytest.raises(breaker.CircuitOpenError):
+        client.access_secret_version(name=_VERSION)
+
+    cb = _breaker()
+    client = _client(fake, cb)
+    client.access_secret_version(name=_VERSION)
+    client.disable_secret_version(name=_VERSION)
+    assert cb.last_good(_VERSION) is None
+
+
+def test_guard_transport_once(make_fake):
+    fake = make_fake()
+    cb = _breaker()
+    transport = fake.transport()
+    breaker.guard_transport(transport, cb)
+    stub = transport.get_secret
+    breaker.guard_transport(transport, cb)
+    assert transport.get_secret is stub
+    with pytest.raises(ValueError):
+        breaker.guard_transport(transport, _breaker())
+
+    with pytest.raises(ValueError):
+        _breaker(failure_threshold=0.0)
+
+
+@pytest.mark.asyncio
+async def test_async_client(make_fake):
+    clock = FakeClock()
+    fake = make_fake()
+    cb = _breaker(clock=clock)
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(),
+        client_options={"circuit_breaker": cb},
+    )
+    await client.access_secret_version(name=_VERSION)
+    fake.inject_error("*", core_exceptions.ServiceUnavailable("down"), times=4)
+    for _ in range(4):
+        with pytest.raises(core_exceptions.ServiceUnavailable):
+            await client.get_secret(name=_SECRET, retry=None)
+    with pytest.raises(breaker.CircuitOpenError):
+        await client.get_secret(name=_SECRET)
+
+    fake.inject_error("*", core_exceptions.ServiceUnavailable("down"), times=3)
+    for _ in range(3):
+        with pytest.raises(core_exceptions.ServiceUnavailable):
+            await client.access_secret_version(
+                name=_SECRET + "/versions/latest", retry=None
+            )
+    clock.now += 5
+    response = await client.access_secret_version(name=_VERSION)
+    assert response.payload.data == b"x"
+    assert cb.last_good(_VERSION).age == 5.0
+
+    clock.now += 30
+    assert (await client.get_secret(name=_SECRET)).name == _SECRET
+    assert cb.state("get_secret", _ENDPOINT) == breaker.CLOSED
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import time
+
+from google.api_core import exceptions as core_exceptions
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    bulk,
+)
+from google.cloud.secretmanager_v1.types import resources
+
+_SECRET = "projects/p/secrets/s"
+_State = resources.SecretVersion.State
+
+
+def _version(number):
+    return "{}/versions/{}".format(_SECRET, number)
+
+
+def _state(fake, number):
+    return fake.get_secret_version({"name": _version(number)}).state
+
+
+def test_destroy_by_filter(make_fake):
+    fake = make_fake(versions=5)
+    for number in (1, 2, 3):
+        fake.disable_secret_version({"name": _version(number)})
+    client = SecretManagerServiceClient(transport=fake.transport())
+    updater = bulk.BulkVersionUpdater(client, max_concurrency=2)
+
+    results = list(updater.destroy(parent=_SECRET, filter="state:DISABLED"))
+
+    assert sorted(result.name for result in results) == [
+        _version(1),
+        _version(2),
+        _version(3),
+    ]
+    assert all(result.changed and result.attempts == 1 for result in results)
+    assert all(result.version.state == _State.DESTROYED for result in results)
+    assert [_state(fake, number) for number in (4, 5)] == [_State.ENABLED] * 2
+    # Listed versions are not read again.
+    assert fake.calls.get("get_secret_version", 0) == 0
+
+
+def test_explicit_versions(make_fake):
+    fake = make_fake(versions=5)
+    fake.disable_secret_version({"name": _version(2)})
+    fake.destroy_secret_version({"name": _version(3)})
+    client = SecretManagerServiceClient(transport=fake.transport())
+    updater = bulk.BulkVersionUpdater(client)
+
+    results = {
+        result.name: result
+        for result in updater.disable(
+            [_version(1), _version(1), _version(2), _version(3), _version(9)]
+        )
+    }
+
+    assert len(results) == 4
+    assert results[_version(1)].changed
+    assert results[_version(2)].skipped and results[_version(2)].attempts == 0
+    assert isinstance(results[_version(3)].error, core_exceptions.FailedPrecondition)
+    assert isinstance(results[_version(9)].error, core_exceptions.NotFound)
+    assert results[_version(9)].version is None
+    # Only version 1 needed a request.
+    assert fake.calls["disable_secret_version"] == 1
+
+
+def test_dry_run_changes_nothing(make_fake):
+    fake = make_fake(versions=5)
+    client = SecretManagerServiceClient(transport=fake.transport())
+    updater = bulk.BulkVersionUpdater(client, dry_run=True)
+
+    results = list(updater.destroy(parent=_SECRET))
+
+    assert len(results) == 5
+    assert all(result.ok and result.dry_run for result in results)
+    assert not any(result.changed for result in results)
+    assert "destroy_secret_version" not in fake.calls
+    assert [_state(fake, number) for number in range(1, 6)] == [_State.ENABLED] * 5
+
+
+def test_etag_conflict_reads_again(make_fake):
+    fake = make_fake(versions=2)
+    client = SecretManagerServiceClient(transport=fake.transport())
+    stale = [client.get_secret_version(name=_version(n)) for n in (1, 2)]
+    # Version 1 changes, but stays enabled; version 2 is disabled meanwhile.
+    fake.disable_secret_version({"name": _version(1)})
+    fake.enable_secret_version({"name": _version(1)})
+    fake.disable_secret_version({"name": _version(2)})
+    updater = bulk.BulkVersionUpdater(client)
+
+    results = {result.name: result for result in updater.disable(stale)}
+
+    assert results[_version(1)].changed
+    assert results[_version(1)].attempts == 2
+    assert results[_version(2)].skipped
+    assert results[_version(2)].attempts == 1
+    assert fake.calls["get_secret_version"] == 4
+
+
+def test_conflicts_give_up_after_max_attempts(make_fake):
+    fake = make_fake(versions=1)
+    fake.inject_error(
+        "disable_secret_version", core_exceptions.Aborted("etag mismatch"), times=5
+    )
+    client = SecretManagerServiceClient(transport=fake.transport())
+    version = client.get_secret_version(name=_version(1))
+    updater = bulk.BulkVersionUpdater(client, max_attempts=3, retry=None)
+
+    (result,) = updater.disable([version])
+
+    # The etag did not change, so the error is not a conflict.
+    assert isinstance(result.error, core_exceptions.Aborted)
+    assert result.attempts == 1
+
+
+def test_other_errors(make_fake):
+    fake = make_fake(versions=3)
+    fake.inject_error("disable_secret_version", RuntimeError("broken"))
+    client = SecretManagerServiceClient(transport=fake.transport())
+    updater = bulk.BulkVersionUpdater(client, max_concurrency=1, retry=None)
+
+    results = list(updater.disable([_version(n) for n in (1, 2, 3)]))
+
+    # The error of one version does not stop the others.
+    assert [result.ok for result in results] == [False, True, True]
+    assert isinstance(results[0].error, RuntimeError)
+    assert [_state(fake, n) for n in (1, 2, 3)] == [
+        _State.ENABLED,
+        _State.DISABLED,
+        _State.DISABLED,
+    ]
+
+
+def test_rate_limit_and_throttling(make_fake):
+    fake = make_fake(versions=4)
+    fake.inject_error(
+        "disable_secret_version", core_exceptions.ResourceExhausted("quota"), times=1
+    )
+    client = SecretManagerServiceClient(transport=fake.transport())
+    updater = bulk.BulkVersionUpdater(client, rate=20.0, retry=None)
+
+    started = time.monotonic()
+    results = list(updater.disable(parent=_SECRET))
+    elapsed = time.monotonic() - started
+
+    assert all(result.changed for result in results)
+    assert sum(result.attempts for result in results) == 5
+    # The burst of 20 calls was halved to 10 by the rejection, so nothing
+    # waited long.
+    assert elapsed < 1.0
+    assert updater._limiter.stats().decreases == 1
+
+
+def test_runs_concurrently(make_fake):
+    fake = make_fake(versions=20, latency=0.05)
+    client = SecretManagerServiceClient(transport=fake.transport())
+    updater = bulk.BulkVersionUpdater(client, max_concurrency=10)
+
+    started = time.monotonic()
+    results = list(updater.disable([_version(n) for n in range(1, 21)]))
+    elapsed = time.monotonic() - started
+
+    assert len(results) == 20 and all(result.changed for result in results)
+    # Sequentially, the reads and changes would take two seconds.
+    assert elapsed < 1.0
+
+
+def test_invalid_arguments(make_fake):
+    client = SecretManagerServiceClient(transport=make_fake(versions=5).transport())
+    updater = bulk.BulkVersionUpdater(client)
+    with pytest.raises(ValueError):
+        updater.run("delete", [_version(1)])
+    with pytest.raises(ValueError):
+        updater.run(bulk.DISABLE)
+    with pytest.raises(ValueError):
+        updater.run(bulk.DISABLE, [_version(1)], parent=_SECRET)
+    with pytest.raises(ValueError):
+        bulk.BulkVersionUpdater(client, max_attempts=0)
+
+
+def test_listing_errors_raise_while_iterating(make_fake):
+    fake = make_fake(versions=5)
+    fake.inject_error(
+        "list_secret_versions", core_exceptions.PermissionDenied("no"), times=1
+    )
+    client = SecretManagerServiceClient(transport=fake.transport())
+    updater = bulk.BulkVersionUpdater(client, retry=None)
+
+    results = updater.disable(parent=_SECRET)
+    assert "list_secret_versions" not in fake.calls
+    with pytest.raises(core_exceptions.PermissionDenied):
+        next(results)
+
+
+@pytest.mark.asyncio
+async def test_async_listing_errors_raise_while_iterating(make_fake):
+    fake = make_fake(versions=5)
+    fake.inject_error(
+        "list_secret_versions", core_exceptions.PermissionDenied("no"), times=1
+    )
+    client = SecretManagerServiceAsyncClient(transport=fake.async_transport())
+    updater = bulk.AsyncBulkVersionUpdater(client, retry=None)
+
+    results = updater.disable(parent=_SECRET)
+    assert "list_secret_versions" not in fake.calls
+    with pytest.raises(core_exceptions.PermissionDenied):
+        await results.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_async_updater(make_fake):
+    fake = make_fake(versions=5)
+    fake.disable_secret_version({"name": _version(1)})
+    client = SecretManagerServiceAsyncClient(transport=fake.async_transport())
+    updater = bulk.AsyncBulkVersionUpdater(client, max_concurrency=2, rate=100.0)
+
+    enabled = [result async for result in updater.enable([_version(1), _version(2)])]
+    assert sorted((r.name, r.changed, r.skipped) for r in enabled) == [
+        (_version(1), True, False),
+        (_version(2), False, True),
+    ]
+
+    destroyed = [
+        result
+        async for result in updater.destroy(parent=_SECRET, filter="state:ENABLED")
+    ]
+    assert len(destroyed) == 5
+    assert all(result.changed for result in destroyed)
+    assert [_state(fake, number) for number in range(1, 6)] == [_State.DESTROYED] * 5
+
+
+@pytest.mark.asyncio
+async def test_async_other_errors(make_fake):
+    fake = make_fake(versions=3)
+    fake.inject_error("disable_secret_version", RuntimeError("broken"))
+    client = SecretManagerServiceAsyncClient(transport=fake.async_transport())
+    updater = bulk.AsyncBulkVersionUpdater(client, max_concurrency=1, retry=None)
+
+    results = [
+        result async for result in updater.disable([_version(n) for n in (1, 2, 3)])
+    ]
+
+    assert sorted(result.ok for result in results) == [False, True, True]
+    assert isinstance([r for r in results if not r.ok][0].error, RuntimeError)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from google.api_core import client_options, grpc_helpers_async
+from google.auth import credentials as ga_credentials
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.cache import (
+    SecretCache,
+)
+from google.cloud.secretmanager_v1.types import resources, service
+
+PINNED = "projects/p/secrets/s/versions/1"
+LATEST = "projects/p/secrets/s/versions/latest"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(name, data=b"secret"):
+    return service.AccessSecretVersionResponse(
+        name=name,
+        payload=resources.SecretPayload(data=data),
+    )
+
+
+def test_is_pinned():
+    assert SecretCache.is_pinned(PINNED)
+    assert not SecretCache.is_pinned(LATEST)
+    assert not SecretCache.is_pinned("projects/p/secrets/s/versions/prod")
+
+
+def test_get_miss_then_hit():
+    cache = SecretCache()
+    assert cache.get(PINNED) is None
+
+    response = make_response(PINNED)
+    cache.put(PINNED, response)
+    assert cache.get(PINNED) is response
+
+    stats = cache.stats
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.entries == 1
+    assert stats.bytes > len(PINNED)
+
+
+def test_alias_expires_and_pinned_does_not():
+    clock = FakeClock()
+    cache = SecretCache(alias_ttl=10.0, clock=clock)
+    cache.put(PINNED, make_response(PINNED))
+    cache.put(LATEST, make_response(PINNED))
+
+    clock.now = 9.0
+    assert cache.get(LATEST) is not None
+
+    clock.now = 10.0
+    assert cache.get(LATEST) is None
+    assert LATEST not in cache
+    assert cache.get(PINNED) is not None
+
+
+def test_pinned_ttl_and_per_entry_ttl():
+    clock = FakeClock()
+    cache = SecretCache(pinned_ttl=100.0, clock=clock)
+    cache.put(PINNED, make_response(PINNED))
+    cache.put(LATEST, make_response(PINNED), ttl=500.0)
+
+    clock.now = 200.0
+    assert cache.get(PINNED) is None
+    assert cache.get(LATEST) is not None
+
+
+def test_zero_ttl_is_not_cached():
+    cache = SecretCache(alias_ttl=0)
+    cache.put(LATEST, make_response(PINNED))
+    assert len(cache) == 0
+
+
+def test_lru_eviction_by_entries():
+    cache = SecretCache(max_entries=2)
+    names = ["projects/p/secrets/s/versions/%d" % i for i in range(3)]
+    cache.put(names[0], make_response(names[0]))
+    cache.put(names[1], make_response(names[1]))
+
+    # Touch the oldest entry so that the second one is evicted instead.
+    cache.get(names[0])
+    cache.put(names[2], make_response(names[2]))
+
+    assert names[0] in cache
+    assert names[1] not in cache
+    assert names[2] in cache
+    assert cache.stats.evictions == 1
+
+
+def test_eviction_by_bytes():
+    cache = SecretCache(max_bytes=300)
+    first = "projects/p/secrets/a/versions/1"
+    second = "projects/p/secrets/b/versions/1"
+    cache.put(first, make_response(first, b"x" * 200))
+    cache.put(second, make_response(second, b"y" * 200))
+
+    assert first not in cache
+    assert second in cache
+    assert cache.stats.bytes <= 300
+
+    # Entries larger than the whole cache are never stored.
+    cache.put(first, make_response(first, b"z" * 1000))
+    assert first not in cache
+
+
+def test_invalidate_secret():
+    cache = SecretCache()
+    other = "projects/p/secrets/other/versions/1"
+    for name in (PINNED, LATEST, other):
+        cache.put(name, make_response(name))
+
+    cache.invalidate_secret("projects/p/secrets/s")
+    assert len(cache) == 1
+    assert other in cache
+
+    cache.invalidate(other)
+    assert len(cache) == 0
+    assert cache.stats.bytes == 0
+
+
+def test_clear():
+    cache = SecretCache()
+    cache.put(PINNED, make_response(PINNED))
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats.bytes == 0
+
+
+@pytest.mark.parametrize("max_entries,max_bytes", [(0, 1), (1, 0)])
+def test_invalid_bounds(max_entries, max_bytes):
+    with pytest.raises(ValueError):
+        SecretCache(max_entries=max_entries, max_bytes=max_bytes)
+
+
+@pytest.mark.parametrize("as_dict", [True, False])
+def test_client_access_secret_version_uses_cache(as_dict):
+    cache = SecretCache()
+    if as_dict:
+        options = {"secret_cache": cache}
+    else:
+        options = client_options.ClientOptions()
+        options.secret_cache = cache
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options=options,
+    )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.return_value = make_response(PINNED)
+        first = client.access_secret_version(name=PINNED)
+        second = client.access_secret_version(name=PINNED)
+
+    assert call.call_count == 1
+    assert first is second
+    assert cache.stats.hits == 1
+
+
+def test_client_without_cache():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.return_value = make_response(PINNED)
+        client.access_secret_version(name=PINNED)
+        client.access_secret_version(name=PINNED)
+
+    assert call.call_count == 2
+
+
+def test_client_destroy_invalidates_cache():
+    cache = SecretCache()
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options={"secret_cache": cache},
+    )
+    cache.put(PINNED, make_response(PINNED))
+    cache.put(LATEST, make_response(PINNED))
+
+    with mock.patch.object(
+        type(client.transport.destroy_secret_version), "__call__"
+    ) as call:
+        call.return_value = resources.SecretVersion(name=PINNED)
+        client.destroy_secret_version(name=PINNED)
+
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_client_access_secret_version_uses_cache():
+    cache = SecretCache()
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options={"secret_cache": cache},
+    )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(make_response(LATEST))
+        first = await client.access_secret_version(name=LATEST)
+        second = await client.access_secret_version(name=LATEST)
+
+    assert call.call_count == 1
+    assert first is second
+
+
+@pytest.mark.asyncio
+async def test_async_client_disable_invalidates_cache():
+    cache = SecretCache()
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options={"secret_cache": cache},
+    )
+    cache.put(PINNED, make_response(PINNED))
+
+    with mock.patch.object(
+        type(client.transport.disable_secret_version), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            resources.SecretVersion(name=PINNED)
+        )
+        await client.disable_secret_version(name=PINNED)
+
+    assert PINNED not in cache
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+
+from google.api_core import exceptions as core_exceptions
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    checksum,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.batch import (
+    AccessSecretVersionResult,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.cache import (
+    SecretCache,
+)
+from google.cloud.secretmanager_v1.types import resources, service
+
+SECRET = "projects/p/secrets/s"
+
+# From RFC 3720, appendix B.4.
+_VECTORS = (
+    (b"", 0),
+    (b"123456789", 0xE3069283),
+    (b"\x00" * 32, 0x8A9136AA),
+    (b"\xff" * 32, 0x62A8AB43),
+    (bytes(range(32)), 0x46DD794E),
+)
+
+
+@pytest.mark.parametrize("data,expected", _VECTORS)
+def test_crc32c_known_values(data, expected):
+    assert checksum.python_crc32c(data) == expected
+    assert checksum.crc32c(data) == expected
+
+
+def test_python_crc32c_matches_crc32c():
+    for size in (1, 7, 8, 9, 1000, 65536 + 3):
+        data = os.urandom(size)
+        assert checksum.python_crc32c(data) == checksum.crc32c(data)
+        assert checksum.python_crc32c(memoryview(data)) == checksum.crc32c(data)
+    data = os.urandom(100)
+    assert checksum.python_crc32c(
+        data[50:], checksum.python_crc32c(data[:50])
+    ) == checksum.crc32c(data)
+
+
+def test_with_checksum():
+    payload = resources.SecretPayload(data=b"123456789")
+    checked = checksum.with_checksum(payload)
+    assert checked.data_crc32c == 0xE3069283
+    assert "data_crc32c" not in payload
+    assert checksum.with_checksum(checked) is checked
+
+    assert checksum.with_checksum({"data": b""}).data_crc32c == 0
+
+    request = service.AddSecretVersionRequest(parent=SECRET, payload=payload)
+    checked = checksum.with_checksum(request)
+    assert checked.parent == SECRET
+    assert checked.payload.data_crc32c == 0xE3069283
+    assert "data_crc32c" not in request.payload
+
+
+def test_verify_response():
+    good = service.AccessSecretVersionResponse(
+        name=SECRET + "/versions/1",
+        payload={"data": b"123456789", "data_crc32c": 0xE3069283},
+    )
+    assert checksum.verify_response(good) is good
+
+    bad = service.AccessSecretVersionResponse(
+        name=SECRET + "/versions/2", payload={"data": b"123456789", "data_crc32c": 1}
+    )
+    with pytest.raises(checksum.PayloadChecksumError) as info:
+        checksum.verify_response(bad)
+    assert isinstance(info.value, core_exceptions.DataLoss)
+    assert info.value.name == SECRET + "/versions/2"
+    assert (info.value.expected, info.value.actual) == (1, 0xE3069283)
+
+    unchecked = service.AccessSecretVersionResponse(payload={"data": b"x"})
+    assert checksum.verify_response(unchecked) is unchecked
+    with pytest.raises(checksum.PayloadChecksumError):
+        checksum.verify_response(unchecked, require=True)
+
+
+def test_verify_results():
+    good = service.AccessSecretVersionResponse(
+        payload={"data": b"a", "data_crc32c": checksum.crc32c(b"a")}
+    )
+    bad = service.AccessSecretVersionResponse(payload={"data": b"a", "data_crc32c": 0})
+    error = core_exceptions.NotFound("gone")
+    results = checksum.verify_results(
+        [
+            AccessSecretVersionResult(name="a", response=good),
+            AccessSecretVersionResult(name="b", response=bad),
+            AccessSecretVersionResult(name="c", error=error),
+        ]
+    )
+    assert [r.name for r in results] == ["a", "b", "c"]
+    assert results[0].response is good
+    assert isinstance(results[1].error, checksum.PayloadChecksumError)
+    assert results[2].error is error
+
+
+def test_client_sets_and_verifies_checksums(make_fake):
+    fake = make_fake(versions=0)
+    cache = SecretCache()
+    client = SecretManagerServiceClient(
+        transport=fake.transport(),
+        client_options={"payload_checksums": True, "secret_cache": cache},
+    )
+    request = service.AddSecretVersionRequest(
+        parent=SECRET, payload={"data": b"123456789"}
+    )
+    version = client.add_secret_version(request)
+    assert version.client_specified_payload_checksum
+    assert "data_crc32c" not in request.payload
+
+    response = client.access_secret_version(name=version.name)
+    assert response.payload.data_crc32c == 0xE3069283
+
+    # The fake stores whatever checksum it is sent, like a corrupted write.
+    fake.add_secret_version(
+        {"parent": SECRET, "payload": {"data": b"x", "data_crc32c": 1}}
+    )
+    with pytest.raises(checksum.PayloadChecksumError):
+        client.access_secret_version(name=SECRET + "/versions/2")
+    assert SECRET + "/versions/2" not in cache
+
+    results = client.access_secret_versions(
+        [SECRET + "/versions/1", SECRET + "/versions/2"]
+    )
+    assert results[0].ok
+    assert isinstance(results[1].error, checksum.PayloadChecksumError)
+
+
+def test_client_checksums_off_by_default(make_fake):
+    fake = make_fake(versions=0)
+    client = SecretManagerServiceClient(transport=fake.transport())
+    version = client.add_secret_version(parent=SECRET, payload={"data": b"x"})
+    assert not version.client_specified_payload_checksum
+    fake.add_secret_version(
+        {"parent": SECRET, "payload": {"data": b"x", "data_crc32c": 1}}
+    )
+    client.access_secret_version(name=SECRET + "/versions/2")
+
+
+@pytest.mark.asyncio
+async def test_async_client_sets_and_verifies_checksums(make_fake):
+    fake = make_fake(versions=0)
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(),
+        client_options={"payload_checksums": True},
+    )
+    version = await client.add_secret_version(
+        parent=SECRET, payload={"data": b"123456789"}
+    )
+    assert version.client_specified_payload_checksum
+    response = await client.access_secret_version(name=version.name)
+    assert response.payload.data_crc32c == 0xE3069283
+
+    fake.add_secret_version(
+        {"parent": SECRET, "payload": {"data": b"x", "data_crc32c": 1}}
+    )
+    with pytest.raises(checksum.PayloadChecksumError):
+        await client.access_secret_version(name=SECRET + "/versions/2")
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import os
+import threading
+
+from google.api_core import exceptions as core_exceptions
+import pytest
+
+pytest.importorskip("cryptography")
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (  # noqa: E402
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.cache import (  # noqa: E402
+    SecretCache,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.disk_cache import (  # noqa: E402
+    DiskSecretCache,
+)
+from google.cloud.secretmanager_v1.types import service  # noqa: E402
+
+SECRET = "projects/p/secrets/s"
+KEY = bytes(range(32))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingDiskCache(DiskSecretCache):
+    """Records the thread of every ``get`` and ``put``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gets = []
+        self.puts = []
+
+    def get(self, name):
+        self.gets.append(threading.get_ident())
+        return super().get(name)
+
+    def put(self, name, response):
+        self.puts.append(threading.get_ident())
+        super().put(name, response)
+
+
+def _response(version, data, secret=SECRET):
+    return service.AccessSecretVersionResponse(
+        name="{}/versions/{}".format(secret, version), payload={"data": data}
+    )
+
+
+def _files(directory):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+
+def test_put_and_get(tmp_path):
+    cache = DiskSecretCache(str(tmp_path), KEY, clock=FakeClock())
+    assert cache.get(SECRET + "/versions/1") is None
+
+    response = _response(1, b"hunter2")
+    cache.put(SECRET + "/versions/latest", response)
+    # latest and the version it resolved to share one data file.
+    assert len([f for f in _files(tmp_path) if "data-" in f]) == 1
+
+    for name in (SECRET + "/versions/latest", SECRET + "/versions/1"):
+        entry = cache.get(name)
+        assert entry.response == response
+        assert entry.age == 0 and not entry.stale
+
+    # A new instance with the same directory and key sees the entries.
+    assert DiskSecretCache(str(tmp_path), KEY).get(SECRET + "/versions/1")
+
+
+def test_files_are_encrypted_and_names_hidden(tmp_path):
+    cache = DiskSecretCache(str(tmp_path), KEY)
+    cache.put(SECRET + "/versions/1", _response(1, b"super-secret-value"))
+    for path in _files(tmp_path):
+        assert "secrets" not in path
+        with open(path, "rb") as f:
+            contents = f.read()
+        assert b"super-secret-value" not in contents
+        assert SECRET.encode() not in contents
+        assert os.stat(path).st_mode & 0o077 == 0
+
+
+def test_wrong_key_and_tampering_are_misses(tmp_path):
+    DiskSecretCache(str(tmp_path), KEY).put(SECRET + "/versions/1", _response(1, b"x"))
+    other_key = DiskSecretCache(str(tmp_path), os.urandom(32))
+    assert other_key.get(SECRET + "/versions/1") is None
+
+    cache = DiskSecretCache(str(tmp_path), KEY)
+    before = set(_files(tmp_path))
+    cache.put(SECRET + "/versions/2", _response(2, b"y"))
+    (data,) = [f for f in set(_files(tmp_path)) - before if "data-" in f]
+    with open(data, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 1]))
+    assert cache.get(SECRET + "/versions/2") is None
+    assert not os.path.exists(data)
+
+    with pytest.raises(ValueError):
+        DiskSecretCache(str(tmp_path), b"short")
+
+
+def test_alias_staleness(tmp_path):
+    clock = FakeClock()
+    cache = DiskSecretCache(
+        str(tmp_path), KEY, revalidate_after=5.0, max_alias_age=60.0, clock=clock
+    )
+    cache.put(SECRET + "/versions/latest", _response(3, b"z"))
+    clock.now += 10
+    assert cache.get(SECRET + "/versions/latest").stale
+    assert not cache.get(SECRET + "/versions/3").stale
+    clock.now += 100
+    assert cache.get(SECRET + "/versions/latest") is None
+    assert cache.get(SECRET + "/versions/3").age == 110
+
+
+def test_invalidate(tmp_path):
+    cache = DiskSecretCache(str(tmp_path), KEY)
+    cache.put(SECRET + "/versions/latest", _response(1, b"a"))
+    other = "projects/p/secrets/other"
+    cache.put(other + "/versions/1", _response(1, b"b", secret=other))
+    cache.invalidate(SECRET + "/versions/latest")
+    assert cache.get(SECRET + "/versions/latest") is None
+    assert cache.get(SECRET + "/versions/1") is not None
+    cache.invalidate_secret(SECRET)
+    assert cache.get(SECRET + "/versions/1") is None
+    assert cache.get(other + "/versions/1") is not None
+    cache.clear()
+    assert _files(tmp_path) == []
+
+
+def test_client_serves_pinned_versions_across_restarts(tmp_path, make_fake):
+    fake = make_fake(b"first")
+    client = SecretManagerServiceClient(
+        transport=fake.transport(),
+        client_options={"disk_cache": DiskSecretCache(str(tmp_path), KEY)},
+    )
+    assert client.access_secret_version(name=SECRET + "/versions/1").payload.data == (
+        b"first"
+    )
+    assert fake.calls["access_secret_version"] == 1
+
+    # A restarted process, with a memory cache in front of the disk.
+    memory = SecretCache()
+    client = SecretManagerServiceClient(
+        transport=fake.transport(),
+        client_options={
+            "disk_cache": DiskSecretCache(str(tmp_path), KEY),
+            "secret_cache": memory,
+        },
+    )
+    response = client.access_secret_version(name=SECRET + "/versions/1")
+    assert response.payload.data == b"first"
+    assert fake.calls["access_secret_version"] == 1
+    assert SECRET + "/versions/1" in memory
+
+    # Disabling the version through the client drops it from disk.
+    client.disable_secret_version(name=SECRET + "/versions/1")
+    memory.clear()
+    with pytest.raises(core_exceptions.FailedPrecondition):
+        client.access_secret_version(name=SECRET + "/versions/1")
+
+
+def test_client_revalidates_latest_in_background(tmp_path, make_fake):
+    fake = make_fake(b"first")
+    clock = FakeClock()
+    disk = RecordingDiskCache(str(tmp_path), KEY, revalidate_after=5.0, clock=clock)
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"disk_cache": disk}
+    )
+    latest = SECRET + "/versions/latest"
+    client.access_secret_version(name=latest)
+    fake.add_secret_version({"parent": SECRET, "payload": {"data": b"second"}})
+
+    # Fresh enough: served from disk without revalidating.
+    assert client.access_secret_version(name=latest).payload.data == b"first"
+    assert fake.calls["access_secret_version"] == 1
+
+    # Stale: still served from disk, and refreshed in the background.
+    clock.now += 10
+    assert client.access_secret_version(name=latest).payload.data == b"first"
+    disk.close()
+    assert fake.calls["access_secret_version"] == 2
+    # The revalidated response is stored once.
+    assert len(disk.puts) == 2
+    assert client.access_secret_version(name=latest).payload.data == b"second"
+
+    # A version which is gone is dropped from disk on revalidation.
+    clock.now += 10
+    fake.inject_error("access_secret_version", core_exceptions.NotFound("gone"))
+    client.access_secret_version(name=latest, retry=None)
+    disk.close()
+    assert disk.get(latest) is None
+
+
+def test_revalidation_is_deduplicated(tmp_path):
+    cache = DiskSecretCache(str(tmp_path), KEY)
+    latest = SECRET + "/versions/latest"
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        response = _response(1, b"a")
+        cache.put(latest, response)
+        return response
+
+    first = cache.revalidate(latest, fetch)
+    assert cache.revalidate(latest, fetch) is None
+    release.set()
+    first.result()
+    assert calls == [1]
+    assert cache.get(latest).response.payload.data == b"a"
+    assert cache.revalidate(latest, fetch) is not None
+    cache.close()
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_async_client(tmp_path, make_fake):
+    fake = make_fake(b"first")
+    clock = FakeClock()
+    disk = RecordingDiskCache(str(tmp_path), KEY, clock=clock)
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(), client_options={"disk_cache": disk}
+    )
+    latest = SECRET + "/versions/latest"
+    await client.access_secret_version(name=latest)
+    fake.add_secret_version({"parent": SECRET, "payload": {"data": b"second"}})
+    clock.now += 10
+    assert (await client.access_secret_version(name=latest)).payload.data == b"first"
+    for _ in range(100):
+        if len(disk.puts) == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert (await client.access_secret_version(name=latest)).payload.data == b"second"
+    assert fake.calls["access_secret_version"] == 2
+    assert len(disk.puts) == 2
+    # Disk access does not block the event loop.
+    assert threading.get_ident() not in disk.gets + disk.puts
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import time
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import retry as retries
+from google.iam.v1 import policy_pb2  # type: ignore
+from google.protobuf import field_mask_pb2  # type: ignore
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+    FakeSecretManagerServer,
+    FakeSecretManagerService,
+    FakeSecretManagerServiceTransport,
+)
+from google.cloud.secretmanager_v1.types import resources
+
+_PARENT = "projects/p"
+_REPLICATION = {"automatic": {}}
+
+
+@pytest.fixture
+def fake():
+    return FakeSecretManagerService(clock=lambda: 1000.0)
+
+
+@pytest.fixture
+def client(fake):
+    return SecretManagerServiceClient(transport=fake.transport())
+
+
+def _create(client, secret_id="s", **secret):
+    secret.setdefault("replication", _REPLICATION)
+    return client.create_secret(parent=_PARENT, secret_id=secret_id, secret=secret)
+
+
+def test_create_and_get_secret(client):
+    secret = _create(client, labels={"env": "prod"})
+    assert secret.name == "projects/p/secrets/s"
+    assert secret.create_time.timestamp() == 1000.0
+    assert secret.etag
+
+    got = client.get_secret(name=secret.name)
+    assert got.labels == {"env": "prod"}
+    assert got.etag == secret.etag
+
+
+def test_create_secret_errors(client):
+    _create(client)
+    with pytest.raises(core_exceptions.AlreadyExists):
+        _create(client)
+    with pytest.raises(core_exceptions.InvalidArgument):
+        _create(client, secret_id="bad/id")
+    with pytest.raises(core_exceptions.InvalidArgument):
+        client.create_secret(parent=_PARENT, secret_id="x", secret={})
+    with pytest.raises(core_exceptions.NotFound):
+        client.get_secret(name="projects/p/secrets/missing")
+
+
+def test_versions_and_access(client):
+    secret = _create(client)
+    first = client.add_secret_version(parent=secret.name, payload={"data": b"one"})
+    second = client.add_secret_version(parent=secret.name, payload={"data": b"two"})
+    assert first.name.endswith("/versions/1")
+    assert second.name.endswith("/versions/2")
+    assert second.state == resources.SecretVersion.State.ENABLED
+
+    latest = client.access_secret_version(name=secret.name + "/versions/latest")
+    assert latest.name == second.name
+    assert latest.payload.data == b"two"
+
+    names = [v.name for v in client.list_secret_versions(parent=secret.name)]
+    assert names == [second.name, first.name]
+
+
+def test_version_aliases(client):
+    secret = _create(client, version_aliases={"stable": 1})
+    client.add_secret_version(parent=secret.name, payload={"data": b"one"})
+    client.add_secret_version(parent=secret.name, payload={"data": b"two"})
+    response = client.access_secret_version(name=secret.name + "/versions/stable")
+    assert response.payload.data == b"one"
+    assert response.name == secret.name + "/versions/1"
+
+
+def test_version_state_transitions(client):
+    secret = _create(client)
+    version = client.add_secret_version(parent=secret.name, payload={"data": b"x"})
+
+    with pytest.raises(core_exceptions.Aborted):
+        client.disable_secret_version(request={"name": version.name, "etag": '"0"'})
+    disabled = client.disable_secret_version(
+        request={"name": version.name, "etag": version.etag}
+    )
+    assert disabled.state == resources.SecretVersion.State.DISABLED
+    with pytest.raises(core_exceptions.FailedPrecondition):
+        client.access_secret_version(name=version.name)
+
+    client.enable_secret_version(name=version.name)
+    assert client.access_secret_version(name=version.name).payload.data == b"x"
+
+    destroyed = client.destroy_secret_version(name=version.name)
+    assert destroyed.state == resources.SecretVersion.State.DESTROYED
+    assert destroyed.destroy_time.timestamp() == 1000.0
+    with pytest.raises(core_exceptions.FailedPrecondition):
+        client.enable_secret_version(name=version.name)
+
+
+def test_update_and_delete_secret(client):
+    secret = _create(client, labels={"a": "1"})
+    updated = client.update_secret(
+        secret={"name": secret.name, "labels": {"b": "2"}},
+        update_mask=field_mask_pb2.FieldMask(paths=["labels"]),
+    )
+    assert updated.labels == {"b": "2"}
+    assert updated.etag != secret.etag
+
+    with pytest.raises(core_exceptions.InvalidArgument):
+        client.update_secret(
+            secret={"name": secret.name},
+            update_mask=field_mask_pb2.FieldMask(paths=["replication"]),
+        )
+    with pytest.raises(core_exceptions.Aborted):
+        client.delete_secret(request={"name": secret.name, "etag": secret.etag})
+    client.delete_secret(request={"name": secret.name, "etag": updated.etag})
+    with pytest.raises(core_exceptions.NotFound):
+        client.get_secret(name=secret.name)
+
+
+def test_list_secrets_pages_and_filters(client):
+    for i in range(5):
+        _create(client, "s{}".format(i), labels={"parity": "even" if i % 2 else "odd"})
+    _create(client, "other", labels={})
+
+    pager = client.list_secrets(request={"parent": _PARENT, "page_size": 2})
+    pages = list(pager.pages)
+    assert [len(page.secrets) for page in pages] == [2, 2, 2]
+    assert pages[0].total_size == 6
+
+    even = client.list_secrets(
+        request={"parent": _PARENT, "filter": "labels.parity=even"}
+    )
+    assert [s.name.rsplit("/", 1)[1] for s in even] == ["s1", "s3"]
+    labelled = client.list_secrets(
+        request={"parent": _PARENT, "filter": "labels.parity:* name:s"}
+    )
+    assert len(list(labelled)) == 5
+
+    with pytest.raises(core_exceptions.InvalidArgument):
+        list(client.list_secrets(request={"parent": _PARENT, "filter": "ttl:1"}))
+    with pytest.raises(core_exceptions.InvalidArgument):
+        list(client.list_secrets(request={"parent": _PARENT, "page_token": "x"}))
+
+
+def test_list_secret_versions_state_filter(client):
+    secret = _create(client)
+    for _ in range(3):
+        client.add_secret_version(parent=secret.name, payload={"data": b"x"})
+    client.disable_secret_version(name=secret.name + "/versions/2")
+    enabled = client.list_secret_versions(
+        request={"parent": secret.name, "filter": "state:ENABLED"}
+    )
+    assert [v.name[-1] for v in enabled] == ["3", "1"]
+
+
+def test_payload_size_limit(client):
+    secret = _create(client)
+    with pytest.raises(core_exceptions.InvalidArgument):
+        client.add_secret_version(
+            parent=secret.name, payload={"data": b"x" * (64 * 1024 + 1)}
+        )
+
+
+def test_iam(client):
+    secret = _create(client)
+    assert client.get_iam_policy(request={"resource": secret.name}) == (
+        policy_pb2.Policy()
+    )
+    policy = client.set_iam_policy(
+        request={
+            "resource": secret.name,
+            "policy": {"bindings": [{"role": "roles/viewer", "members": ["user:a"]}]},
+        }
+    )
+    assert policy.etag
+    assert client.get_iam_policy(request={"resource": secret.name}) == policy
+    with pytest.raises(core_exceptions.Aborted):
+        client.set_iam_policy(
+            request={"resource": secret.name, "policy": {"etag": b"stale"}}
+        )
+
+    response = client.test_iam_permissions(
+        request={"resource": secret.name, "permissions": ["p.a", "p.b"]}
+    )
+    assert list(response.permissions) == ["p.a", "p.b"]
+
+
+def test_injected_errors(fake, client):
+    secret = _create(client)
+    client.add_secret_version(parent=secret.name, payload={"data": b"x"})
+    name = secret.name + "/versions/1"
+
+    fake.inject_error("access_secret_version", core_exceptions.NotFound("boom"))
+    with pytest.raises(core_exceptions.NotFound, match="boom"):
+        client.access_secret_version(name=name)
+    assert client.access_secret_version(name=name).payload.data == b"x"
+
+    fake.inject_error("*", core_exceptions.PermissionDenied("no"), times=None)
+    for _ in range(3):
+        with pytest.raises(core_exceptions.PermissionDenied):
+            client.get_secret(name=secret.name)
+    fake.clear_errors()
+    client.get_secret(name=secret.name)
+    assert fake.calls["get_secret"] == 4
+
+
+def test_injected_errors_are_retried(fake, client):
+    secret = _create(client)
+    client.add_secret_version(parent=secret.name, payload={"data": b"x"})
+    fake.inject_error(
+        "access_secret_version", core_exceptions.ServiceUnavailable("x"), times=2
+    )
+    response = client.access_secret_version(
+        name=secret.name + "/versions/1",
+        retry=retries.Retry(
+            predicate=retries.if_exception_type(core_exceptions.ServiceUnavailable),
+            initial=0.001,
+            maximum=0.001,
+        ),
+    )
+    assert response.payload.data == b"x"
+    assert fake.calls["access_secret_version"] == 3
+
+
+def test_error_rate():
+    fake = FakeSecretManagerService(error_rate=1.0)
+    with pytest.raises(core_exceptions.ServiceUnavailable):
+        fake.call("get_secret", {"name": "projects/p/secrets/s"})
+
+    fake = FakeSecretManagerService(error_rate=0.5, seed=0)
+    failures = 0
+    for _ in range(200):
+        try:
+            fake.call("list_secrets", {"parent": _PARENT})
+        except core_exceptions.ServiceUnavailable:
+            failures += 1
+    assert 50 < failures < 150
+
+
+def test_latency_and_deadline():
+    fake = FakeSecretManagerService(
+        latency=lambda rpc: 0.05 if rpc == "get_secret" else 0.0
+    )
+    transport = FakeSecretManagerServiceTransport(fake)
+    client = SecretManagerServiceClient(transport=transport)
+    _create(client)
+
+    start = time.monotonic()
+    client.get_secret(name="projects/p/secrets/s")
+    assert time.monotonic() - start >= 0.05
+
+    with pytest.raises(core_exceptions.DeadlineExceeded):
+        client.get_secret(name="projects/p/secrets/s", timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_async_transport(fake):
+    client = SecretManagerServiceAsyncClient(transport=fake.async_transport())
+    secret = await client.create_secret(
+        parent=_PARENT, secret_id="s", secret={"replication": _REPLICATION}
+    )
+    await client.add_secret_version(parent=secret.name, payload={"data": b"x"})
+    response = await client.access_secret_version(name=secret.name + "/versions/1")
+    assert response.payload.data == b"x"
+
+    pager = await client.list_secrets(parent=_PARENT)
+    assert [s.name async for s in pager] == [secret.name]
+
+    fake.inject_error("get_secret", core_exceptions.NotFound("boom"))
+    with pytest.raises(core_exceptions.NotFound):
+        await client.get_secret(name=secret.name)
+    await client.transport.close()
+
+
+def test_server(fake):
+    with FakeSecretManagerServer(fake) as server:
+        assert server.target.startswith("localhost:")
+        client = server.client()
+        secret = _create(client, labels={"k": "v"})
+        client.add_secret_version(parent=secret.name, payload={"data": b"x"})
+        response = client.access_secret_version(name=secret.name + "/versions/1")
+        assert response.payload.data == b"x"
+        assert client.get_iam_policy(request={"resource": secret.name}) == (
+            policy_pb2.Policy()
+        )
+
+        with pytest.raises(core_exceptions.NotFound):
+            client.get_secret(name="projects/p/secrets/missing")
+        client.transport.close()
+    assert fake.calls["access_secret_version"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_async_client(fake):
+    with FakeSecretManagerServer(fake) as server:
+        client = server.async_client()
+        secret = await client.create_secret(
+            parent=_PARENT, secret_id="s", secret={"replication": _REPLICATION}
+        )
+        assert (await client.get_secret(name=secret.name)).name == secret.name
+        await client.transport.close()
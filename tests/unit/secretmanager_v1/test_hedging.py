@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import threading
+import time
+
+from google.api_core import exceptions as core_exceptions
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    hedging,
+    metrics,
+    ratelimit,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+    FakeSecretManagerServer,
+)
+
+_SECRET = "projects/p/secrets/s"
+_VERSION = _SECRET + "/versions/1"
+_SLOW = 0.5
+
+
+class SlowFirst:
+    """Makes the first call of an RPC slow, and the others fast."""
+
+    def __init__(self, rpc="access_secret_version"):
+        self._rpc = rpc
+        self._lock = threading.Lock()
+        self._seen = False
+
+    def __call__(self, rpc):
+        if rpc != self._rpc:
+            return 0.0
+        with self._lock:
+            seen, self._seen = self._seen, True
+        return 0.001 if seen else _SLOW
+
+
+def _policy(**kwargs):
+    kwargs.setdefault("initial_delay", 0.02)
+    kwargs.setdefault("max_hedge_ratio", 1.0)
+    return hedging.HedgingPolicy(**kwargs)
+
+
+def test_delay():
+    policy = hedging.HedgingPolicy(
+        percentile=90.0,
+        initial_delay=0.5,
+        min_delay=0.01,
+        max_delay=0.2,
+        min_samples=10,
+    )
+    assert policy.delay("get_secret") == 0.5
+    for latency in range(1, 11):
+        policy.record("get_secret", latency / 100)
+    assert policy.delay("get_secret") == 0.09
+    assert policy.delay("access_secret_version") == 0.5
+    for _ in range(100):
+        policy.record("get_secret", 10.0)
+    assert policy.delay("get_secret") == 0.2
+
+    with pytest.raises(ValueError):
+        hedging.HedgingPolicy(percentile=100.0)
+    with pytest.raises(ValueError):
+        hedging.HedgingPolicy(min_delay=2.0, max_delay=1.0)
+
+
+def test_hedge_budget():
+    policy = hedging.HedgingPolicy(max_hedge_ratio=0.5)
+    policy._start_call()
+    assert not policy._take_hedge()
+    policy._start_call()
+    assert policy._take_hedge()
+    assert not policy._take_hedge()
+    assert policy.stats() == hedging.HedgingStats(calls=2, hedges=1, hedge_wins=0)
+
+
+def test_sync_hedge_wins(make_fake):
+    fake = make_fake(latency=SlowFirst())
+    policy = _policy()
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"hedging": policy}
+    )
+    start = time.perf_counter()
+    assert client.access_secret_version(name=_VERSION).payload.data == b"x"
+    assert time.perf_counter() - start < _SLOW / 2
+    assert policy.stats() == hedging.HedgingStats(calls=1, hedges=1, hedge_wins=1)
+    policy.close()
+
+
+def test_sync_no_hedge_without_budget(make_fake):
+    fake = make_fake(latency=SlowFirst("get_secret"))
+    policy = _policy(max_hedge_ratio=0.0, initial_delay=0.001)
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"hedging": policy}
+    )
+    start = time.perf_counter()
+    client.get_secret(name=_SECRET)
+    assert time.perf_counter() - start >= _SLOW
+    assert fake.calls["get_secret"] == 1
+    assert policy.stats().hedges == 0
+    policy.close()
+
+
+def test_sync_errors_and_unhedged_methods(make_fake):
+    fake = make_fake()
+    policy = _policy()
+    transport = fake.transport()
+    stub = transport.add_secret_version
+    client = SecretManagerServiceClient(
+        transport=transport, client_options={"hedging": policy}
+    )
+    assert transport.add_secret_version is stub
+    with pytest.raises(core_exceptions.NotFound):
+        client.access_secret_version(name=_SECRET + "/versions/9")
+    assert fake.calls["access_secret_version"] == 1
+    assert policy.stats().hedges == 0
+
+    hedging.hedge_transport(transport, policy)
+    with pytest.raises(ValueError):
+        hedging.hedge_transport(transport, _policy())
+    policy.close()
+
+
+def test_hedges_are_attempts_in_metrics(make_fake):
+    fake = make_fake(latency=SlowFirst())
+    recorder = metrics.MetricsRecorder()
+    policy = _policy()
+    client = SecretManagerServiceClient(
+        transport=fake.transport(),
+        client_options={"metrics": recorder, "hedging": policy},
+    )
+    client.access_secret_version(name=_VERSION)
+    # The losing attempt is recorded once it completes in its thread.
+    time.sleep(_SLOW)
+    access = recorder.snapshot()["access_secret_version"]
+    assert access.calls == {"OK": 1}
+    assert sum(access.attempts.values()) == 2
+    policy.close()
+
+
+def test_grpc_transport_uses_futures(make_fake):
+    fake = make_fake(latency=SlowFirst())
+    policy = _policy()
+    with FakeSecretManagerServer(fake) as server:
+        client = server.client(client_options={"hedging": policy})
+        start = time.perf_counter()
+        client.access_secret_version(name=_VERSION)
+        assert time.perf_counter() - start < _SLOW / 2
+        # Let the cancelled attempt finish in its server thread, which
+        # would otherwise outlive the test.
+        time.sleep(_SLOW)
+    assert policy.stats().hedge_wins == 1
+    assert policy._executor is None
+
+
+def test_wrapped_grpc_stubs_use_futures(make_fake):
+    fake = make_fake(latency=0.2)
+    recorder = metrics.MetricsRecorder()
+    limiter = ratelimit.AdaptiveRateLimiter(1000.0)
+    policy = _policy(initial_delay=1.0, max_workers=2)
+    with FakeSecretManagerServer(fake) as server:
+        client = server.client(
+            client_options={
+                "metrics": recorder,
+                "rate_limiter": limiter,
+                "hedging": policy,
+            }
+        )
+        client.access_secret_version(name=_VERSION)
+        threads = [
+            threading.Thread(
+                target=client.access_secret_version, kwargs={"name": _VERSION}
+            )
+            for _ in range(8)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    # Through two threads, the reads would take four times as long.
+    assert elapsed < 0.6
+    assert policy._executor is None
+    assert recorder.snapshot()["access_secret_version"].attempts == {"OK": 9}
+
+
+@pytest.mark.asyncio
+async def test_async_hedge_wins(make_fake):
+    fake = make_fake(latency=SlowFirst())
+    policy = _policy()
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(), client_options={"hedging": policy}
+    )
+    start = time.perf_counter()
+    response = await client.access_secret_version(name=_VERSION)
+    assert response.payload.data == b"x"
+    assert time.perf_counter() - start < _SLOW / 2
+    assert policy.stats() == hedging.HedgingStats(calls=1, hedges=1, hedge_wins=1)
+
+    with pytest.raises(core_exceptions.NotFound):
+        await client.get_secret(name="projects/p/secrets/missing")
+
+
+@pytest.mark.asyncio
+async def test_async_grpc_transport(make_fake):
+    fake = make_fake(latency=SlowFirst())
+    policy = _policy()
+    with FakeSecretManagerServer(fake) as server:
+        client = server.async_client(client_options={"hedging": policy})
+        start = time.perf_counter()
+        await client.access_secret_version(name=_VERSION)
+        assert time.perf_counter() - start < _SLOW / 2
+        await asyncio.sleep(_SLOW)
+    assert policy.stats().hedge_wins == 1
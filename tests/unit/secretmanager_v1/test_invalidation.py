@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import base64
+import queue
+import threading
+from unittest import mock
+
+from google.api_core import exceptions as core_exceptions
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    breaker,
+    invalidation,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.cache import (
+    SecretCache,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.shared_cache import (
+    SharedSecretCache,
+)
+from google.cloud.secretmanager_v1.types import service
+
+SECRET = "projects/p/secrets/s"
+LATEST = SECRET + "/versions/latest"
+
+
+def _event(event_type, secret=SECRET, version=None):
+    attributes = {"eventType": event_type, "secretId": secret}
+    if version is not None:
+        attributes["versionId"] = version
+    return {
+        "attributes": attributes,
+        "data": base64.b64encode(b'{"name": "ignored"}').decode(),
+    }
+
+
+def _response(name):
+    return service.AccessSecretVersionResponse(name=name, payload={"data": b"x"})
+
+
+def test_decode_event():
+    expected = invalidation.SecretEvent(
+        "SECRET_VERSION_ADD", SECRET, SECRET + "/versions/2"
+    )
+    message = _event("SECRET_VERSION_ADD", version=SECRET + "/versions/2")
+    assert invalidation.decode_event(message) == expected
+    assert invalidation.decode_event({"message": message}) == expected
+    assert invalidation.decode_event(message["attributes"]) == expected
+    assert invalidation.decode_event(mock.Mock(attributes=message["attributes"])) == (
+        expected
+    )
+    assert invalidation.decode_event({"attributes": {"other": "x"}}) is None
+    assert invalidation.decode_event(mock.Mock(attributes={})) is None
+    assert invalidation.decode_event(
+        _event("SECRET_DELETE")
+    ) == invalidation.SecretEvent("SECRET_DELETE", SECRET)
+
+
+@pytest.mark.parametrize("cache_type", [SecretCache, SharedSecretCache])
+def test_invalidates_only_affected_entries(cache_type):
+    cache = cache_type()
+    other = "projects/p/secrets/other"
+    names = [
+        LATEST,
+        SECRET + "/versions/1",
+        SECRET + "/versions/2",
+        other + "/versions/latest",
+    ]
+    for name in names:
+        cache.put(name, _response(name))
+
+    invalidator = invalidation.CacheInvalidator(caches=[cache])
+    result = invalidator.handle(
+        [_event("SECRET_VERSION_ADD", version=SECRET + "/versions/3")] * 10
+        + [{"attributes": {}}, _event("SECRET_ROTATE"), _event("TOPIC_CONFIGURED")]
+    )
+    assert result.events == 12 and result.ignored == 1
+    assert result.invalidated == [LATEST]
+    assert result.refreshed == []
+    assert [name in cache for name in names] == [False, True, True, True]
+
+    invalidator.handle(
+        [_event("SECRET_VERSION_DISABLE", version=SECRET + "/versions/1")]
+    )
+    assert [name in cache for name in names] == [False, False, True, True]
+
+    invalidator.handle([_event("SECRET_DELETE", secret=other)])
+    assert [name in cache for name in names] == [False, False, True, False]
+
+
+def test_refreshes_removed_aliases(make_fake):
+    fake = make_fake(b"v1")
+    cache = SecretCache(alias_ttl=3600)
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"secret_cache": cache}
+    )
+    assert client.access_secret_version(name=LATEST).payload.data == b"v1"
+    fake.add_secret_version({"parent": SECRET, "payload": {"data": b"v2"}})
+    assert client.access_secret_version(name=LATEST).payload.data == b"v1"
+
+    result = invalidation.CacheInvalidator(client).handle(
+        [_event("SECRET_VERSION_ADD", version=SECRET + "/versions/2")]
+    )
+    assert [r.response.payload.data for r in result.refreshed] == [b"v2"]
+    calls = fake.calls["access_secret_version"]
+    assert client.access_secret_version(name=LATEST).payload.data == b"v2"
+    assert fake.calls["access_secret_version"] == calls
+
+
+def test_invalidates_disk_cache(tmp_path, make_fake):
+    pytest.importorskip("cryptography")
+    from google.cloud.secretmanager_v1.services.secret_manager_service.disk_cache import (
+        DiskSecretCache,
+    )
+
+    disk = DiskSecretCache(str(tmp_path), bytes(32))
+    disk.put(LATEST, _response(SECRET + "/versions/1"))
+    client = SecretManagerServiceClient(
+        transport=make_fake(b"v1").transport(), client_options={"disk_cache": disk}
+    )
+    invalidation.CacheInvalidator(client).handle([_event("SECRET_VERSION_ADD")])
+    assert disk.get(LATEST) is None
+    assert disk.get(SECRET + "/versions/1") is not None
+
+
+def test_disabled_version_is_not_served_stale(make_fake):
+    fake = make_fake(b"v1")
+    cb = breaker.CircuitBreaker(min_calls=4, open_seconds=60.0)
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"circuit_breaker": cb}
+    )
+    version = SECRET + "/versions/1"
+    assert client.access_secret_version(name=version).payload.data == b"v1"
+    fake.disable_secret_version({"name": version})
+
+    invalidation.CacheInvalidator(client).handle(
+        [_event("SECRET_VERSION_DISABLE", version=version)]
+    )
+    assert cb.last_good(version) is None
+
+    # With the earlier success, three failures open the circuit.
+    fake.inject_error("*", core_exceptions.ServiceUnavailable("down"), times=3)
+    for _ in range(3):
+        with pytest.raises(core_exceptions.ServiceUnavailable):
+            client.access_secret_version(name=version, retry=None)
+    with pytest.raises(breaker.CircuitOpenError):
+        client.access_secret_version(name=version)
+
+
+def test_listen_and_pubsub_callback():
+    cache = SecretCache()
+    invalidator = invalidation.CacheInvalidator(caches=[cache])
+    handled = []
+    handle = invalidator.handle
+
+    def record(messages):
+        messages = list(messages)
+        handled.append(len(messages))
+        return handle(messages)
+
+    invalidator.handle = record
+    source = queue.Queue()
+    for _ in range(5):
+        source.put(_event("SECRET_VERSION_ADD"))
+    source.put(None)
+    thread = threading.Thread(
+        target=invalidator.listen, args=(source,), kwargs={"max_batch_size": 3}
+    )
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert handled == [3, 2]
+
+    cache.put(LATEST, _response(LATEST))
+    message = mock.Mock(attributes=_event("SECRET_VERSION_ADD")["attributes"])
+    invalidator.pubsub_callback(message)
+    message.ack.assert_called_once_with()
+    assert LATEST not in cache
+
+
+@pytest.mark.asyncio
+async def test_async_invalidator(make_fake):
+    fake = make_fake(b"v1")
+    cache = SecretCache(alias_ttl=3600)
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(), client_options={"secret_cache": cache}
+    )
+    await client.access_secret_version(name=LATEST)
+    fake.add_secret_version({"parent": SECRET, "payload": {"data": b"v2"}})
+
+    invalidator = invalidation.AsyncCacheInvalidator(client)
+    source = asyncio.Queue()
+    source.put_nowait(_event("SECRET_VERSION_ADD"))
+    source.put_nowait(None)
+    await invalidator.listen(source)
+    assert cache.get(LATEST).payload.data == b"v2"
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import ast
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+from google.cloud import secretmanager, secretmanager_v1, secretmanager_v1beta1
+
+PACKAGES = (secretmanager, secretmanager_v1, secretmanager_v1beta1)
+
+
+def _loaded_modules(statement):
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    env = dict(os.environ, PYTHONPATH=root)
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            statement + "\nimport sys\nprint('\\n'.join(sys.modules))",
+        ],
+        env=env,
+        universal_newlines=True,
+    )
+    return set(output.split())
+
+
+def _imports_pkg_resources(modules):
+    """Returns the loaded secretmanager modules that import pkg_resources.
+
+    Dependencies such as googleapis-common-protos may load pkg_resources
+    themselves, so only this package's own sources are checked.
+    """
+    found = []
+    for name in sorted(modules):
+        if not name.startswith("google.cloud.secretmanager"):
+            continue
+        origin = importlib.util.find_spec(name).origin
+        if not origin or not origin.endswith(".py"):
+            continue
+        with open(origin) as source:
+            tree = ast.parse(source.read(), origin)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                imported = [node.module or ""]
+            else:
+                continue
+            if any(i.split(".")[0] == "pkg_resources" for i in imported):
+                found.append(name)
+                break
+    return found
+
+
+@pytest.mark.parametrize("package", PACKAGES, ids=lambda p: p.__name__)
+def test_all_names_resolve(package):
+    for name in package.__all__:
+        assert getattr(package, name) is not None
+        assert name in dir(package)
+
+
+@pytest.mark.parametrize("package", PACKAGES, ids=lambda p: p.__name__)
+def test_unknown_name_raises_attribute_error(package):
+    with pytest.raises(AttributeError):
+        package.NotAClient
+
+
+@pytest.mark.parametrize("package", PACKAGES, ids=lambda p: p.__name__)
+def test_version(package):
+    version = importlib.import_module(package.__name__ + ".gapic_version")
+    assert package.__version__ == version.__version__
+    assert package.__version__ == secretmanager.__version__
+
+
+def test_submodules_load_on_access():
+    assert secretmanager_v1.types.Secret is secretmanager_v1.Secret
+    assert secretmanager_v1beta1.services.secret_manager_service is not None
+
+
+def test_package_import_is_lazy():
+    modules = _loaded_modules("import google.cloud.secretmanager")
+    assert "google.cloud.secretmanager_v1.types.service" not in modules
+    assert (
+        "google.cloud.secretmanager_v1.services.secret_manager_service.client"
+        not in modules
+    )
+    assert _imports_pkg_resources(modules) == []
+
+
+@pytest.mark.parametrize(
+    "version",
+    ["secretmanager_v1", "secretmanager_v1beta1"],
+)
+def test_sync_client_does_not_load_async(version):
+    modules = _loaded_modules(
+        "from google.cloud.{} import SecretManagerServiceClient".format(version)
+    )
+    prefix = "google.cloud.{}.services.secret_manager_service.".format(version)
+    assert prefix + "client" in modules
+    assert prefix + "async_client" not in modules
+    assert prefix + "transports.grpc_asyncio" not in modules
+    assert prefix + "transports.grpc_pooled_asyncio" not in modules
+    assert _imports_pkg_resources(modules) == []
+
+
+def test_channel_pool_does_not_use_grpc_aio():
+    # grpc.aio itself is always loaded, by grpc and google.api_core, so
+    # check that the sync pool module does not depend on it.
+    modules = _loaded_modules(
+        "from google.cloud.secretmanager_v1.services.secret_manager_service"
+        ".transports import pool\n"
+        "assert not hasattr(pool, 'aio')\n"
+        "assert not hasattr(pool, 'AsyncChannelPool')"
+    )
+    prefix = "google.cloud.secretmanager_v1.services.secret_manager_service."
+    assert prefix + "transports.pool" in modules
+    assert prefix + "transports.grpc_pooled_asyncio" not in modules
+
+
+def test_async_transport_registered_on_first_use():
+    client_class = secretmanager_v1.SecretManagerServiceClient
+    transport_class = client_class.get_transport_class("grpc_asyncio")
+    assert transport_class.__name__ == "SecretManagerServiceGrpcAsyncIOTransport"
+    assert client_class._transport_registry["grpc_asyncio"] is transport_class
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import retry as retries
+from google.api_core import retry_async
+import grpc
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    breaker,
+    metrics,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+    FakeSecretManagerServer,
+)
+
+_SECRET = "projects/p/secrets/s"
+_RETRY = retries.Retry(
+    initial=0.001,
+    maximum=0.001,
+    predicate=retries.if_exception_type(core_exceptions.ServiceUnavailable),
+    deadline=5.0,
+)
+
+
+def test_status_code():
+    assert metrics.status_code(core_exceptions.NotFound("x")) == "NOT_FOUND"
+    assert metrics.status_code(core_exceptions.RetryError("x", None)) == (
+        "DEADLINE_EXCEEDED"
+    )
+    assert metrics.status_code(asyncio.CancelledError()) == "CANCELLED"
+    assert metrics.status_code(ValueError()) == "UNKNOWN"
+
+    class _RpcError(grpc.RpcError):
+        def code(self):
+            return grpc.StatusCode.UNAVAILABLE
+
+    assert metrics.status_code(_RpcError()) == "UNAVAILABLE"
+
+
+def test_disabled_leaves_transport_untouched(make_fake):
+    transport = make_fake(b"x" * 100).transport()
+    wrapped = dict(transport._wrapped_methods)
+    SecretManagerServiceClient(transport=transport)
+    assert transport._wrapped_methods == wrapped
+    assert not hasattr(transport, "_metrics_hook")
+
+
+def test_counts_attempts_and_codes(make_fake):
+    fake = make_fake(b"x" * 100)
+    recorder = metrics.MetricsRecorder()
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"metrics": recorder}
+    )
+    fake.inject_error(
+        "access_secret_version", core_exceptions.ServiceUnavailable("x"), times=2
+    )
+    client.access_secret_version(name=_SECRET + "/versions/1", retry=_RETRY)
+    with pytest.raises(core_exceptions.NotFound):
+        client.get_secret(name="projects/p/secrets/missing")
+
+    snapshot = recorder.snapshot()
+    access = snapshot["access_secret_version"]
+    assert access.calls == {"OK": 1}
+    assert access.attempts == {"UNAVAILABLE": 2, "OK": 1}
+    assert access.latency.count == 1
+    assert access.attempt_latency.count == 3
+    assert access.latency.sum >= access.attempt_latency.sum
+    # The fake transport does not serialize messages.
+    assert access.message_bytes == {"request": 0, "response": 0}
+    assert snapshot["get_secret"].calls == {"NOT_FOUND": 1}
+
+
+def test_hook_receives_attempts_per_call(make_fake):
+    events = []
+
+    class Hook(metrics.MetricsHook):
+        def on_call(self, method, code, latency, attempts):
+            events.append((method, code, attempts))
+
+    fake = make_fake(b"x" * 100)
+    fake.inject_error(
+        "access_secret_version", core_exceptions.ServiceUnavailable("x"), times=1
+    )
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"metrics": Hook()}
+    )
+    client.access_secret_version(name=_SECRET + "/versions/1", retry=_RETRY)
+    client.get_secret(name=_SECRET)
+    assert events == [("access_secret_version", "OK", 2), ("get_secret", "OK", 1)]
+
+
+def test_instrument_transport_twice(make_fake):
+    transport = make_fake(b"x" * 100).transport()
+    recorder = metrics.MetricsRecorder()
+    metrics.instrument_transport(transport, recorder)
+    wrapped = dict(transport._wrapped_methods)
+    metrics.instrument_transport(transport, recorder)
+    assert transport._wrapped_methods == wrapped
+    with pytest.raises(ValueError):
+        metrics.instrument_transport(transport, metrics.MetricsRecorder())
+
+
+def test_instrument_transport_with_circuit_breaker(make_fake):
+    transport = make_fake(b"x" * 100).transport()
+    SecretManagerServiceClient(
+        transport=transport,
+        client_options={"circuit_breaker": breaker.CircuitBreaker()},
+    )
+    guarded = dict(transport._wrapped_methods)
+    with pytest.raises(ValueError):
+        SecretManagerServiceClient(
+            transport=transport,
+            client_options={"metrics": metrics.MetricsRecorder()},
+        )
+    assert transport._wrapped_methods == guarded
+
+
+@pytest.mark.asyncio
+async def test_async_client(make_fake):
+    fake = make_fake(b"x" * 100)
+    recorder = metrics.MetricsRecorder()
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(), client_options={"metrics": recorder}
+    )
+    fake.inject_error(
+        "access_secret_version", core_exceptions.ServiceUnavailable("x"), times=1
+    )
+    await client.access_secret_version(
+        name=_SECRET + "/versions/1",
+        retry=retry_async.AsyncRetry(
+            initial=0.001,
+            maximum=0.001,
+            predicate=retries.if_exception_type(core_exceptions.ServiceUnavailable),
+            deadline=5.0,
+        ),
+    )
+    access = recorder.snapshot()["access_secret_version"]
+    assert access.calls == {"OK": 1}
+    assert access.attempts == {"UNAVAILABLE": 1, "OK": 1}
+
+
+def test_grpc_transport_reports_marshalling(make_fake):
+    recorder = metrics.MetricsRecorder()
+    with FakeSecretManagerServer(make_fake(b"x" * 100)) as server:
+        client = server.client(client_options={"metrics": recorder})
+        client.access_secret_version(name=_SECRET + "/versions/1")
+        with pytest.raises(core_exceptions.NotFound):
+            client.access_secret_version(name=_SECRET + "/versions/9")
+
+    access = recorder.snapshot()["access_secret_version"]
+    assert access.calls == {"OK": 1, "NOT_FOUND": 1}
+    assert access.message_bytes["request"] > 0
+    assert access.message_bytes["response"] > 100
+    assert access.marshal_seconds["request"] > 0
+    assert access.marshal_seconds["response"] > 0
+    assert 0 < access.wire_seconds < access.attempt_latency.sum
+
+
+@pytest.mark.asyncio
+async def test_grpc_asyncio_transport_reports_marshalling(make_fake):
+    recorder = metrics.MetricsRecorder()
+    with FakeSecretManagerServer(make_fake(b"x" * 100)) as server:
+        client = server.async_client(client_options={"metrics": recorder})
+        await client.access_secret_version(name=_SECRET + "/versions/1")
+        with pytest.raises(core_exceptions.NotFound):
+            await client.get_secret(name="projects/p/secrets/missing")
+
+    snapshot = recorder.snapshot()
+    access = snapshot["access_secret_version"]
+    assert access.attempts == {"OK": 1}
+    assert access.message_bytes["response"] > 100
+    assert snapshot["get_secret"].calls == {"NOT_FOUND": 1}
+
+
+def test_render_prometheus():
+    recorder = metrics.MetricsRecorder(buckets=(0.1, 1.0))
+    recorder.on_call("get_secret", "OK", 0.05, 1)
+    recorder.on_call("get_secret", "OK", 0.5, 2)
+    recorder.on_call("get_secret", "UNAVAILABLE", 5.0, 3)
+    recorder.on_attempt("get_secret", "OK", 0.05)
+    recorder.on_marshal("get_secret", "request", 0.25, 10)
+    recorder.on_marshal("get_secret", "response", 0.25, 30)
+    recorder.on_call('we"ird\n', "OK", 0.05, 1)
+
+    text = metrics.render_prometheus(recorder, namespace="sm")
+    lines = text.splitlines()
+    assert "# TYPE sm_rpc_duration_seconds histogram" in lines
+    assert 'sm_rpc_duration_seconds_bucket{method="get_secret",le="0.1"} 1' in lines
+    assert 'sm_rpc_duration_seconds_bucket{method="get_secret",le="1.0"} 2' in lines
+    assert 'sm_rpc_duration_seconds_bucket{method="get_secret",le="+Inf"} 3' in lines
+    assert 'sm_rpc_duration_seconds_sum{method="get_secret"} 5.55' in lines
+    assert 'sm_rpc_duration_seconds_count{method="get_secret"} 3' in lines
+    assert 'sm_rpc_calls_total{method="get_secret",code="UNAVAILABLE"} 1' in lines
+    assert 'sm_rpc_attempts_total{method="get_secret",code="OK"} 1' in lines
+    assert (
+        'sm_rpc_message_bytes_total{method="get_secret",direction="response"} 30'
+        in lines
+    )
+    # Attempts took 0.05s, of which 0.5s were marshalling: clamped at zero.
+    assert 'sm_rpc_wire_seconds_total{method="get_secret"} 0.0' in lines
+    assert 'sm_rpc_calls_total{method="we\\"ird\\n",code="OK"} 1' in lines
+    assert text.endswith("\n")
+
+    recorder.reset()
+    assert recorder.snapshot() == {}
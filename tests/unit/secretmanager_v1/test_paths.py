@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import re
+
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceClient,
+    paths,
+)
+
+# The patterns the client used before they were precompiled.
+_LEGACY_PATTERNS = {
+    paths.SECRET: r"^projects/(?P<project>.+?)/secrets/(?P<secret>.+?)$",
+    paths.SECRET_VERSION: r"^projects/(?P<project>.+?)/secrets/(?P<secret>.+?)/versions/(?P<secret_version>.+?)$",
+    paths.TOPIC: r"^projects/(?P<project>.+?)/topics/(?P<topic>.+?)$",
+    paths.COMMON_PROJECT: r"^projects/(?P<project>.+?)$",
+}
+
+_NAMES = [
+    "projects/p/secrets/s",
+    "projects/p/secrets/s/versions/1",
+    "projects/p/secrets/s/versions/latest",
+    "projects/a/b/secrets/c/versions/d/e",
+    "projects/p/secrets/x/secrets/y",
+    "projects/p/topics/t",
+    "projects/p",
+    "projects/p/secrets/s\n",
+    "projects/p\n/secrets/s",
+    "projects//secrets/s",
+    "projects/p/secrets/",
+    "",
+    "folders/f",
+]
+
+
+def _legacy(pattern, path):
+    m = re.match(pattern, path)
+    return m.groupdict() if m else {}
+
+
+@pytest.mark.parametrize("template", list(_LEGACY_PATTERNS))
+def test_parse_matches_legacy_pattern(template):
+    pattern = _LEGACY_PATTERNS[template]
+    for name in _NAMES:
+        expected = _legacy(pattern, name)
+        assert template.parse(name) == expected
+        assert template.parse_tuple(name) == (
+            tuple(expected.values()) if expected else None
+        )
+
+
+@pytest.mark.parametrize("template", list(_LEGACY_PATTERNS))
+def test_parse_many_matches_parse(template):
+    # Mix well-formed and malformed names across several chunks, and check
+    # chunks made only of well-formed names take the same results.
+    names = _NAMES * 200 + ["projects/p/secrets/s/versions/1"] * 3000
+    assert list(template.parse_many(names)) == [
+        template.parse_tuple(name) for name in names
+    ]
+
+
+def test_parse_many_newline_cannot_shift_results():
+    names = ["projects/a/secrets/b\nprojects/c/secrets/d", "bad"]
+    # Fields never contain a newline, so neither name matches.
+    assert list(paths.SECRET.parse_many(names)) == [None, None]
+
+
+def test_parse_columns():
+    columns = paths.SECRET_VERSION.parse_columns(
+        ["projects/p/secrets/s/versions/1", "nope", "projects/q/secrets/t/versions/2"]
+    )
+    assert columns == {
+        "project": ["p", None, "q"],
+        "secret": ["s", None, "t"],
+        "secret_version": ["1", None, "2"],
+    }
+    assert paths.SECRET.parse_columns([]) == {"project": [], "secret": []}
+    assert paths.COMMON_FOLDER.parse_columns(["folders/f"]) == {"folder": ["f"]}
+
+
+def test_format():
+    assert paths.SECRET.format("p", "s") == "projects/p/secrets/s"
+    assert paths.SECRET.format("p", secret="s") == "projects/p/secrets/s"
+    assert paths.SECRET.format(project=123, secret="s") == "projects/123/secrets/s"
+    assert paths.ResourcePath("a/{x}%").format("%s") == "a/%s%"
+    with pytest.raises(TypeError):
+        paths.SECRET.format("p")
+    with pytest.raises(TypeError):
+        paths.SECRET.format(project="p")
+    with pytest.raises(TypeError):
+        paths.SECRET.format("p", "s", extra="x")
+
+
+def test_format_many_and_columns():
+    rows = [("p", "s", 1), ("q", "t", "latest")]
+    expected = [
+        "projects/p/secrets/s/versions/1",
+        "projects/q/secrets/t/versions/latest",
+    ]
+    assert list(paths.SECRET_VERSION.format_many(rows)) == expected
+    assert paths.SECRET_VERSION.format_columns(*zip(*rows)) == expected
+    with pytest.raises(TypeError):
+        list(paths.SECRET_VERSION.format_many([("p", "s")]))
+    with pytest.raises(TypeError):
+        paths.SECRET_VERSION.format_columns(["p"], ["s"])
+    with pytest.raises(ValueError):
+        paths.SECRET_VERSION.format_columns(["p"], ["s"], [])
+
+
+def test_client_helpers_use_templates():
+    client = SecretManagerServiceClient
+    path = client.secret_version_path("p", "s", "1")
+    assert path == "projects/p/secrets/s/versions/1"
+    assert client.parse_secret_version_path(path) == {
+        "project": "p",
+        "secret": "s",
+        "secret_version": "1",
+    }
+    assert client.topic_path("p", "t") == "projects/p/topics/t"
+    assert client.parse_common_location_path("projects/p/locations/l") == {
+        "project": "p",
+        "location": "l",
+    }
+    assert client.parse_common_organization_path("folders/f") == {}
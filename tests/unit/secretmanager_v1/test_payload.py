@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import gc
+import json
+
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import payload
+from google.cloud.secretmanager_v1.services.secret_manager_service.payload import (
+    SecretPayloadView,
+    payload_bytes,
+    payload_json,
+    payload_text,
+)
+from google.cloud.secretmanager_v1.types import resources, service
+
+_DOCUMENT = {"user": "admin", "password": "héllo"}
+
+
+def _response(data, **payload_fields):
+    return service.AccessSecretVersionResponse(
+        name="projects/p/secrets/s/versions/1",
+        payload=dict(data=data, **payload_fields),
+    )
+
+
+def test_view_returns_one_bytes_object():
+    response = _response(b"secret", data_crc32c=123)
+    view = SecretPayloadView(response)
+    assert view.data == b"secret"
+    assert view.data is view.data
+    assert bytes(view) is view.data
+    assert len(view) == 6
+    assert view.crc32c == 123
+    assert view.memoryview().readonly
+    assert view.memoryview()[1:3] == b"ec"
+    assert repr(view) == "<SecretPayloadView: 6 bytes>"
+
+
+def test_view_sources():
+    response = _response(b"x")
+    pb = service.AccessSecretVersionResponse.pb(response)
+    assert SecretPayloadView(pb).data == b"x"
+    assert SecretPayloadView(response.payload).data == b"x"
+    assert SecretPayloadView(pb.payload).data == b"x"
+    assert SecretPayloadView(resources.SecretPayload(data=b"y")).crc32c is None
+
+
+def test_of_caches_per_message():
+    response = _response(b"x" * 1024)
+    view = SecretPayloadView.of(response)
+    assert SecretPayloadView.of(response) is view
+    assert payload_bytes(response) is view.data
+
+    key = id(response)
+    del response
+    gc.collect()
+    assert key not in payload._views
+
+
+def test_of_raw_protobuf_is_not_cached():
+    pb = service.AccessSecretVersionResponse.pb(_response(b"x"))
+    count = len(payload._views)
+    assert SecretPayloadView.of(pb) is not SecretPayloadView.of(pb)
+    assert SecretPayloadView.of(pb.payload) is not SecretPayloadView.of(pb.payload)
+    assert payload_bytes(pb) == b"x"
+    assert len(payload._views) == count
+
+
+def test_text_and_json():
+    encoded = json.dumps(_DOCUMENT, ensure_ascii=False).encode("utf-8")
+    response = _response(encoded)
+    assert payload_text(response) == encoded.decode("utf-8")
+    assert payload_json(response) == _DOCUMENT
+    assert payload_text(_response(b"\xff"), errors="replace") == "�"
+    with pytest.raises(UnicodeDecodeError):
+        payload_text(_response(b"\xff"))
+    assert payload_json(_response(json.dumps([1.5]).encode("utf-16"))) == [1.5]
+    assert payload_json(_response(b'{"a": 1.5}'), parse_float=str) == {"a": "1.5"}
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from google.api_core import exceptions as core_exceptions
+from google.api_core import retry as retries
+from google.api_core import retry_async
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    metrics,
+    policy,
+    ratelimit,
+)
+
+_SECRET = "projects/p/secrets/s"
+_VERSION = _SECRET + "/versions/1"
+
+_FAST_RETRY = policy.MethodPolicy(
+    timeout=5.0,
+    retry_codes=("UNAVAILABLE",),
+    initial_backoff=0.001,
+    max_backoff=0.001,
+    deadline=5.0,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _unavailable(fake, rpc="access_secret_version", times=2):
+    fake.inject_error(rpc, core_exceptions.ServiceUnavailable("down"), times=times)
+
+
+def test_method_policy_retry():
+    assert policy.MethodPolicy().retry() is None
+    retry = _FAST_RETRY.retry()
+    assert isinstance(retry, retries.Retry)
+    assert retry._predicate(core_exceptions.ServiceUnavailable(""))
+    assert not retry._predicate(core_exceptions.NotFound(""))
+    assert isinstance(_FAST_RETRY.retry(asyncio=True), retry_async.AsyncRetry)
+
+    custom = policy.MethodPolicy(predicate=lambda exc: True).retry()
+    assert custom._predicate(core_exceptions.NotFound(""))
+
+    with pytest.raises(ValueError):
+        policy.RetryPolicy({"get_secret": policy.MethodPolicy(retry_codes=("NOPE",))})
+
+
+def test_policy_sets_retries_and_timeouts(make_fake):
+    fake = make_fake(latency=lambda rpc: 0.2 if rpc == "get_secret" else 0.0)
+    client = SecretManagerServiceClient(
+        transport=fake.transport(),
+        client_options={
+            "retry_policy": policy.RetryPolicy(
+                {"access_secret_version": _FAST_RETRY},
+                default=policy.MethodPolicy(timeout=0.01),
+            )
+        },
+    )
+    _unavailable(fake)
+    assert client.access_secret_version(name=_VERSION).payload.data == b"x"
+    assert fake.calls["access_secret_version"] == 3
+
+    with pytest.raises(core_exceptions.DeadlineExceeded):
+        client.get_secret(name=_SECRET)
+    # A timeout given to the call still wins.
+    assert client.get_secret(name=_SECRET, timeout=1.0).name == _SECRET
+
+
+def test_unknown_method(make_fake):
+    with pytest.raises(ValueError):
+        SecretManagerServiceClient(
+            transport=make_fake().transport(),
+            client_options={
+                "retry_policy": policy.RetryPolicy({"access_secret": _FAST_RETRY})
+            },
+        )
+
+
+def test_retry_budget():
+    clock = FakeClock()
+    budget = policy.RetryBudget(
+        0.5, min_retries_per_second=0.0, window_seconds=10, clock=clock
+    )
+    assert not budget._withdraw()
+    budget._deposit()
+    budget._deposit()
+    assert budget._withdraw()
+    assert not budget._withdraw()
+    clock.now += 10
+    budget._deposit()
+    budget._deposit()
+    # The earlier calls and retry have left the window.
+    assert budget._withdraw()
+    assert budget.stats() == policy.RetryBudgetStats(calls=4, retries=2, denied=2)
+
+    budget = policy.RetryBudget(0.0, min_retries_per_second=0.2, window_seconds=10)
+    assert budget._withdraw() and budget._withdraw()
+    assert not budget._withdraw()
+
+
+def test_budget_limits_every_retry(make_fake):
+    fake = make_fake()
+    budget = policy.RetryBudget(0.0, min_retries_per_second=0.0)
+    client = SecretManagerServiceClient(
+        transport=fake.transport(),
+        client_options={"retry_policy": policy.RetryPolicy(budget=budget)},
+    )
+    # The service configuration's retry of access_secret_version is kept,
+    # but may not retry.
+    _unavailable(fake, times=1)
+    with pytest.raises(core_exceptions.ServiceUnavailable):
+        client.access_secret_version(name=_VERSION)
+    # Nor may a retry passed to the call.
+    _unavailable(fake, rpc="get_secret", times=1)
+    with pytest.raises(core_exceptions.ServiceUnavailable):
+        client.get_secret(name=_SECRET, retry=_FAST_RETRY.retry())
+    assert fake.calls["access_secret_version"] == 1
+    assert fake.calls["get_secret"] == 1
+    assert budget.stats() == policy.RetryBudgetStats(calls=2, retries=0, denied=2)
+
+
+def test_policy_survives_other_wrappers(make_fake):
+    fake = make_fake()
+    recorder = metrics.MetricsRecorder()
+    budget = policy.RetryBudget(1.0)
+    client = SecretManagerServiceClient(
+        transport=fake.transport(),
+        client_options={
+            "retry_policy": policy.RetryPolicy(
+                {"access_secret_version": _FAST_RETRY}, budget=budget
+            ),
+            "metrics": recorder,
+            "rate_limiter": ratelimit.AdaptiveRateLimiter(),
+        },
+    )
+    _unavailable(fake)
+    client.access_secret_version(name=_VERSION)
+    assert fake.calls["access_secret_version"] == 3
+    assert recorder.snapshot()["access_secret_version"].attempts == {
+        "UNAVAILABLE": 2,
+        "OK": 1,
+    }
+    assert budget.stats() == policy.RetryBudgetStats(calls=1, retries=2, denied=0)
+
+    transport = client.transport
+    other = policy.RetryPolicy()
+    policy.apply_retry_policy(transport, transport._retry_policy)
+    with pytest.raises(ValueError):
+        policy.apply_retry_policy(transport, other)
+
+
+@pytest.mark.asyncio
+async def test_async_client(make_fake):
+    fake = make_fake()
+    budget = policy.RetryBudget()
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(),
+        client_options={
+            "retry_policy": policy.RetryPolicy(
+                {"access_secret_version": _FAST_RETRY}, budget=budget
+            )
+        },
+    )
+    _unavailable(fake)
+    response = await client.access_secret_version(name=_VERSION)
+    assert response.payload.data == b"x"
+    assert fake.calls["access_secret_version"] == 3
+    assert budget.stats().retries == 2
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import asyncio
+import itertools
+
+from google.auth import credentials as ga_credentials
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    transports,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.transports.grpc_pooled_asyncio import (
+    AsyncChannelPool,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.transports.pool import (
+    LEAST_OUTSTANDING,
+    ROUND_ROBIN,
+    ChannelPool,
+)
+from google.cloud.secretmanager_v1.types import resources
+
+_channel_ids = itertools.count()
+
+
+class _FakeCall:
+    """Records the channel used and returns a canned response."""
+
+    def __init__(self, channel, response):
+        self.channel = channel
+        self.response = response
+
+    def __call__(self, request, **kwargs):
+        self.channel.calls += 1
+        return self.response(request) if callable(self.response) else self.response
+
+
+class _FakeChannel:
+    def __init__(self, response=None):
+        self.id = next(_channel_ids)
+        self.response = response
+        self.calls = 0
+        self.closed = False
+
+    def unary_unary(self, method, **kwargs):
+        return _FakeCall(self, self.response)
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeAsyncCall:
+    def __init__(self, response):
+        self._future = asyncio.get_event_loop().create_future()
+        self._future.set_result(response)
+
+    def add_done_callback(self, callback):
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def __await__(self):
+        return self._future.__await__()
+
+
+class _FakeAsyncChannel(_FakeChannel):
+    def unary_unary(self, method, **kwargs):
+        channel = self
+
+        def call(request, **kwargs):
+            channel.calls += 1
+            return _FakeAsyncCall(channel.response)
+
+        return call
+
+    async def close(self):
+        self.closed = True
+
+
+def test_round_robin():
+    channels = [_FakeChannel("r") for _ in range(3)]
+    pool = ChannelPool(channels, ROUND_ROBIN)
+    stub = pool.unary_unary("/m")
+
+    for _ in range(6):
+        assert stub(object()) == "r"
+
+    assert [c.calls for c in channels] == [2, 2, 2]
+    assert pool.outstanding == (0, 0, 0)
+
+
+def test_least_outstanding_prefers_idle_channel():
+    channels = [_FakeChannel() for _ in range(3)]
+    pool = ChannelPool(channels, LEAST_OUTSTANDING)
+    seen = []
+
+    def nested(request):
+        # While this call is in flight, the next call must avoid its channel.
+        seen.append(pool.outstanding)
+        if len(seen) < 3:
+            return stub(request)
+        return "done"
+
+    for channel in channels:
+        channel.response = nested
+    stub = pool.unary_unary("/m")
+
+    assert stub(object()) == "done"
+    assert sorted(seen[-1]) == [1, 1, 1]
+    assert [c.calls for c in channels] == [1, 1, 1]
+    assert pool.outstanding == (0, 0, 0)
+
+
+def test_call_releases_channel_on_error():
+    channel = _FakeChannel()
+
+    def fail(request):
+        raise RuntimeError("boom")
+
+    channel.response = fail
+    pool = ChannelPool([channel])
+
+    with pytest.raises(RuntimeError):
+        pool.unary_unary("/m")(object())
+    assert pool.outstanding == (0,)
+
+
+def test_future_releases_channel_when_done():
+    future = mock.Mock()
+    callable_ = mock.Mock()
+    callable_.future.return_value = future
+    channel = mock.Mock()
+    channel.unary_unary.return_value = callable_
+    pool = ChannelPool([channel])
+
+    assert pool.unary_unary("/m").future(object()) is future
+    assert pool.outstanding == (1,)
+    (callback,), _ = future.add_done_callback.call_args
+    callback(future)
+    assert pool.outstanding == (0,)
+
+
+def test_pool_close_closes_all_channels():
+    channels = [_FakeChannel() for _ in range(2)]
+
+    ChannelPool(channels).close()
+
+    assert all(c.closed for c in channels)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [((),), (([_FakeChannel()], "random"))],
+)
+def test_pool_rejects_bad_arguments(args):
+    with pytest.raises(ValueError):
+        ChannelPool(*args)
+
+
+@pytest.mark.asyncio
+async def test_async_pool_spreads_calls_and_releases():
+    channels = [_FakeAsyncChannel("r") for _ in range(2)]
+    pool = AsyncChannelPool(channels)
+    stub = pool.unary_unary("/m")
+
+    calls = [stub(object()) for _ in range(4)]
+    assert pool.outstanding == (2, 2)
+    assert await asyncio.gather(*calls) == ["r"] * 4
+    await asyncio.sleep(0)
+
+    assert pool.outstanding == (0, 0)
+    assert [c.calls for c in channels] == [2, 2]
+
+    await pool.close()
+    assert all(c.closed for c in channels)
+
+
+def test_pooled_transport_opens_pool_size_channels():
+    transport = transports.SecretManagerServiceGrpcPooledTransport(
+        credentials=ga_credentials.AnonymousCredentials(),
+        pool_size=3,
+    )
+
+    assert isinstance(transport.grpc_channel, ChannelPool)
+    assert len(transport.grpc_channel.channels) == 3
+    assert len(set(map(id, transport.grpc_channel.channels))) == 3
+    transport.close()
+
+
+def test_pooled_transport_uses_local_subchannel_pool():
+    with mock.patch(
+        "google.api_core.grpc_helpers.create_channel", autospec=True
+    ) as create_channel:
+        transports.SecretManagerServiceGrpcPooledTransport(
+            credentials=ga_credentials.AnonymousCredentials(),
+            pool_size=2,
+        )
+
+    assert create_channel.call_count == 2
+    for call in create_channel.call_args_list:
+        assert ("grpc.use_local_subchannel_pool", 1) in call.kwargs["options"]
+
+
+def test_pooled_transport_with_channel_uses_it_alone():
+    channel = _FakeChannel()
+
+    transport = transports.SecretManagerServiceGrpcPooledTransport(
+        channel=channel, pool_size=4
+    )
+
+    assert transport.grpc_channel.channels == (channel,)
+
+
+def test_pooled_transport_rejects_bad_pool_size():
+    with pytest.raises(ValueError):
+        transports.SecretManagerServiceGrpcPooledTransport(
+            credentials=ga_credentials.AnonymousCredentials(),
+            pool_size=0,
+        )
+
+
+def test_client_pooled_transport():
+    response = resources.Secret(name="projects/p/secrets/s")
+    channels = []
+
+    def create_channel(*args, **kwargs):
+        channels.append(_FakeChannel(response))
+        return channels[-1]
+
+    with mock.patch.object(
+        transports.SecretManagerServiceGrpcPooledTransport,
+        "create_channel",
+        side_effect=create_channel,
+    ):
+        client = SecretManagerServiceClient(
+            credentials=ga_credentials.AnonymousCredentials(),
+            transport="grpc_pooled",
+            client_options={"channel_pool_size": 2},
+        )
+
+    assert isinstance(
+        client.transport, transports.SecretManagerServiceGrpcPooledTransport
+    )
+    for _ in range(4):
+        assert client.get_secret(name="projects/p/secrets/s") == response
+    assert [c.calls for c in channels] == [2, 2]
+
+
+def test_client_pool_size_requires_pooled_transport():
+    with pytest.raises(ValueError):
+        SecretManagerServiceClient(
+            credentials=ga_credentials.AnonymousCredentials(),
+            client_options={"channel_pool_size": 2},
+        )
+
+
+@pytest.mark.asyncio
+async def test_async_client_pooled_transport():
+    response = resources.Secret(name="projects/p/secrets/s")
+    channels = []
+
+    def create_channel(*args, **kwargs):
+        channels.append(_FakeAsyncChannel(response))
+        return channels[-1]
+
+    with mock.patch.object(
+        transports.SecretManagerServiceGrpcPooledAsyncIOTransport,
+        "create_channel",
+        side_effect=create_channel,
+    ):
+        client = SecretManagerServiceAsyncClient(
+            credentials=ga_credentials.AnonymousCredentials(),
+            transport="grpc_pooled_asyncio",
+            client_options={"channel_pool_size": 3},
+        )
+
+    for _ in range(3):
+        assert await client.get_secret(name="projects/p/secrets/s") == response
+    await asyncio.sleep(0)
+    assert [c.calls for c in channels] == [1, 1, 1]
+    assert client.transport.grpc_channel.outstanding == (0, 0, 0)
+
+
+def test_registry():
+    assert (
+        SecretManagerServiceClient.get_transport_class("grpc_pooled")
+        is transports.SecretManagerServiceGrpcPooledTransport
+    )
+    assert (
+        SecretManagerServiceClient.get_transport_class("grpc_pooled_asyncio")
+        is transports.SecretManagerServiceGrpcPooledAsyncIOTransport
+    )
+    assert "grpc_pooled" in transports._transport_registry
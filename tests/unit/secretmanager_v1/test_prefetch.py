@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import asyncio
+import threading
+
+from google.api_core import exceptions as core_exceptions
+from google.auth import credentials as ga_credentials
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    pagers,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.prefetch import (
+    async_prefetched_pages,
+    prefetched_pages,
+)
+from google.cloud.secretmanager_v1.types import resources, service
+
+PARENT = "projects/my-project"
+
+
+def _pages(count):
+    return [
+        service.ListSecretsResponse(
+            secrets=[resources.Secret(name="{}/secrets/s{}".format(PARENT, i))],
+            next_page_token="t{}".format(i + 1) if i + 1 < count else "",
+        )
+        for i in range(count)
+    ]
+
+
+class _Fetcher:
+    """Serves pages by token and records the tokens requested."""
+
+    def __init__(self, pages, fail_at=None):
+        self.pages = {"t{}".format(i): page for i, page in enumerate(pages)}
+        self.tokens = []
+        self.fail_at = fail_at
+        self.fetched = threading.Condition()
+
+    def __call__(self, token):
+        if token == self.fail_at:
+            raise core_exceptions.NotFound("gone")
+        with self.fetched:
+            self.tokens.append(token)
+            self.fetched.notify_all()
+        return self.pages[token]
+
+    def wait_for(self, count):
+        with self.fetched:
+            assert self.fetched.wait_for(lambda: len(self.tokens) >= count, 5)
+
+
+def test_prefetched_pages_yields_all_pages_in_order():
+    pages = _pages(5)
+    fetch = _Fetcher(pages)
+
+    assert list(prefetched_pages(pages[0], fetch, 2)) == pages
+    assert fetch.tokens == ["t1", "t2", "t3", "t4"]
+
+
+def test_prefetched_pages_single_page():
+    pages = _pages(1)
+    fetch = _Fetcher(pages)
+
+    assert list(prefetched_pages(pages[0], fetch, 2)) == pages
+    assert fetch.tokens == []
+
+
+def test_prefetched_pages_fetches_ahead_up_to_depth():
+    pages = _pages(10)
+    fetch = _Fetcher(pages)
+    iterator = prefetched_pages(pages[0], fetch, 2)
+
+    assert next(iterator) is pages[0]
+    assert next(iterator) is pages[1]
+    # Two pages are buffered, and one more is fetched but blocked on the
+    # full buffer.
+    fetch.wait_for(4)
+    threading.Event().wait(0.05)
+    assert fetch.tokens == ["t1", "t2", "t3", "t4"]
+    iterator.close()
+
+
+def test_prefetched_pages_raises_after_earlier_pages():
+    pages = _pages(4)
+    fetch = _Fetcher(pages, fail_at="t2")
+    iterator = prefetched_pages(pages[0], fetch, 3)
+
+    assert next(iterator) is pages[0]
+    assert next(iterator) is pages[1]
+    with pytest.raises(core_exceptions.NotFound):
+        next(iterator)
+
+
+def test_prefetched_pages_stops_thread_when_closed():
+    pages = _pages(10)
+    fetch = _Fetcher(pages)
+    iterator = prefetched_pages(pages[0], fetch, 1)
+    next(iterator)
+    next(iterator)
+    fetch.wait_for(3)
+
+    iterator.close()
+
+    threads = [t for t in threading.enumerate() if t.name.endswith("page-prefetch")]
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+    assert len(fetch.tokens) <= 4
+
+
+def test_prefetched_pages_rejects_bad_depth():
+    with pytest.raises(ValueError):
+        next(prefetched_pages(_pages(1)[0], _Fetcher([]), 0))
+
+
+@pytest.mark.asyncio
+async def test_async_prefetched_pages_yields_all_pages_in_order():
+    pages = _pages(5)
+    tokens = []
+
+    async def fetch(token):
+        tokens.append(token)
+        return pages[int(token[1:])]
+
+    assert [p async for p in async_prefetched_pages(pages[0], fetch, 2)] == pages
+    assert tokens == ["t1", "t2", "t3", "t4"]
+
+
+@pytest.mark.asyncio
+async def test_async_prefetched_pages_fetches_ahead_and_cancels():
+    pages = _pages(10)
+    tokens = []
+
+    async def fetch(token):
+        tokens.append(token)
+        return pages[int(token[1:])]
+
+    iterator = async_prefetched_pages(pages[0], fetch, 2)
+    assert await iterator.__anext__() is pages[0]
+    assert await iterator.__anext__() is pages[1]
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert tokens == ["t1", "t2", "t3", "t4"]
+
+    await iterator.aclose()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert tokens == ["t1", "t2", "t3", "t4"]
+
+
+@pytest.mark.asyncio
+async def test_async_prefetched_pages_close_waits_for_task():
+    pages = _pages(4)
+    blocked = asyncio.Event()
+
+    async def fetch(token):
+        if token == "t2":
+            blocked.set()
+            await asyncio.sleep(60)
+        return pages[int(token[1:])]
+
+    iterator = async_prefetched_pages(pages[0], fetch, 2)
+    assert await iterator.__anext__() is pages[0]
+    assert await iterator.__anext__() is pages[1]
+    await blocked.wait()
+
+    await iterator.aclose()
+    others = [
+        task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+    ]
+    assert all(task.done() for task in others)
+
+
+@pytest.mark.asyncio
+async def test_async_prefetched_pages_raises_after_earlier_pages():
+    pages = _pages(4)
+
+    async def fetch(token):
+        if token == "t2":
+            raise core_exceptions.NotFound("gone")
+        return pages[int(token[1:])]
+
+    seen = []
+    with pytest.raises(core_exceptions.NotFound):
+        async for page in async_prefetched_pages(pages[0], fetch, 3):
+            seen.append(page)
+    assert seen == pages[:2]
+
+
+def test_pager_rejects_negative_prefetch():
+    with pytest.raises(ValueError):
+        pagers.ListSecretsPager(
+            mock.Mock(),
+            service.ListSecretsRequest(),
+            service.ListSecretsResponse(),
+            prefetch_pages=-1,
+        )
+
+
+def test_list_secrets_prefetch():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    pages = _pages(4)
+
+    tokens = []
+
+    def list_secrets(request, **kwargs):
+        tokens.append(request.page_token)
+        return pages[len(tokens) - 1]
+
+    with mock.patch.object(type(client.transport.list_secrets), "__call__") as call:
+        call.side_effect = list_secrets
+        pager = client.list_secrets(parent=PARENT, prefetch_pages=2)
+        results = list(pager)
+
+    assert [s.name for s in results] == [p.secrets[0].name for p in pages]
+    assert tokens == ["", "t1", "t2", "t3"]
+    assert pager.next_page_token == ""
+
+
+def test_list_secret_versions_prefetch():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    pages = [
+        service.ListSecretVersionsResponse(
+            versions=[resources.SecretVersion(name="v1")], next_page_token="abc"
+        ),
+        service.ListSecretVersionsResponse(
+            versions=[resources.SecretVersion(name="v2")]
+        ),
+    ]
+
+    with mock.patch.object(
+        type(client.transport.list_secret_versions), "__call__"
+    ) as call:
+        call.side_effect = pages
+        pager = client.list_secret_versions(
+            parent=PARENT + "/secrets/s", prefetch_pages=1
+        )
+        results = [v.name for v in pager]
+
+    assert results == ["v1", "v2"]
+
+
+@pytest.mark.asyncio
+async def test_list_secrets_async_prefetch():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    pages = _pages(4)
+
+    with mock.patch.object(
+        type(client.transport.list_secrets), "__call__", new_callable=mock.AsyncMock
+    ) as call:
+        call.side_effect = pages
+        pager = await client.list_secrets(parent=PARENT, prefetch_pages=2)
+        results = [s.name async for s in pager]
+
+    assert results == [p.secrets[0].name for p in pages]
+    assert call.call_count == 4
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from google.auth import credentials as ga_credentials
+from google.protobuf import duration_pb2, timestamp_pb2
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.projection import (
+    project,
+    projection_type,
+)
+from google.cloud.secretmanager_v1.types import resources, service
+
+PARENT = "projects/my-project"
+SECRET_DESCRIPTOR = resources.Secret.pb().DESCRIPTOR
+
+
+def _secret(i):
+    return resources.Secret(
+        name="{}/secrets/s{}".format(PARENT, i),
+        labels={"team": "t{}".format(i)},
+        topics=[resources.Topic(name="projects/p/topics/t")],
+        create_time=timestamp_pb2.Timestamp(seconds=i),
+        ttl=duration_pb2.Duration(seconds=60),
+        version_aliases={"current": i},
+    )
+
+
+def _pages():
+    return [
+        service.ListSecretsResponse(
+            secrets=[_secret(0), _secret(1)], next_page_token="abc"
+        ),
+        service.ListSecretsResponse(secrets=[_secret(2)]),
+    ]
+
+
+def test_projection_type_is_cached_and_slotted():
+    record = projection_type(SECRET_DESCRIPTOR, ("name", "labels"))
+
+    assert record is projection_type(SECRET_DESCRIPTOR, ("name", "labels"))
+    assert record._fields == ("name", "labels")
+    assert record.__slots__ == ()
+
+
+@pytest.mark.parametrize("fields", [(), ("name", "nope")])
+def test_projection_type_rejects_bad_fields(fields):
+    with pytest.raises(ValueError):
+        projection_type(SECRET_DESCRIPTOR, fields)
+
+
+def test_project_detaches_values():
+    messages = [resources.Secret.pb(_secret(3))]
+
+    (record,) = project(
+        messages,
+        ["name", "labels", "topics", "create_time", "version_aliases"],
+        SECRET_DESCRIPTOR,
+    )
+
+    assert record.name == PARENT + "/secrets/s3"
+    assert record.labels == {"team": "t3"}
+    assert record.version_aliases == {"current": 3}
+    assert [t.name for t in record.topics] == ["projects/p/topics/t"]
+    assert record.create_time.seconds == 3
+    messages[0].create_time.seconds = 99
+    assert record.create_time.seconds == 3
+
+
+def test_project_without_fields_returns_raw_messages():
+    messages = [resources.Secret.pb(_secret(0))]
+
+    assert list(project(messages, None, SECRET_DESCRIPTOR)) == messages
+
+
+def test_project_accepts_single_field_name():
+    messages = [resources.Secret.pb(_secret(0))]
+
+    (record,) = project(messages, "name", SECRET_DESCRIPTOR)
+
+    assert record == (PARENT + "/secrets/s0",)
+
+
+def test_list_secrets_project():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(type(client.transport.list_secrets), "__call__") as call:
+        call.side_effect = _pages()
+        pager = client.list_secrets(parent=PARENT)
+        records = list(pager.project(["name", "labels"]))
+
+    assert [r.name for r in records] == [
+        PARENT + "/secrets/s" + str(i) for i in range(3)
+    ]
+    assert records[2].labels == {"team": "t2"}
+
+
+def test_list_secrets_project_raw():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(type(client.transport.list_secrets), "__call__") as call:
+        call.side_effect = _pages()
+        pager = client.list_secrets(parent=PARENT)
+        secrets = list(pager.project())
+
+    assert all(isinstance(s, resources.Secret.pb()) for s in secrets)
+    assert len(secrets) == 3
+
+
+def test_list_secrets_project_checks_fields_eagerly():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(type(client.transport.list_secrets), "__call__") as call:
+        call.side_effect = _pages()
+        pager = client.list_secrets(parent=PARENT)
+        with pytest.raises(ValueError):
+            pager.project(["payload"])
+        assert call.call_count == 1
+
+
+def test_list_secret_versions_project():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    response = service.ListSecretVersionsResponse(
+        versions=[
+            resources.SecretVersion(
+                name="v1", state=resources.SecretVersion.State.ENABLED
+            ),
+        ],
+    )
+
+    with mock.patch.object(
+        type(client.transport.list_secret_versions), "__call__"
+    ) as call:
+        call.return_value = response
+        pager = client.list_secret_versions(parent=PARENT + "/secrets/s")
+        records = list(pager.project(["name", "state"]))
+
+    assert records == [("v1", resources.SecretVersion.State.ENABLED)]
+
+
+@pytest.mark.asyncio
+async def test_list_secrets_async_project():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(
+        type(client.transport.list_secrets), "__call__", new_callable=mock.AsyncMock
+    ) as call:
+        call.side_effect = _pages()
+        pager = await client.list_secrets(parent=PARENT)
+        names = [r.name async for r in pager.project(["name"])]
+
+    assert names == [PARENT + "/secrets/s" + str(i) for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_list_secret_versions_async_project_raw():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    response = service.ListSecretVersionsResponse(
+        versions=[resources.SecretVersion(name="v1")],
+    )
+
+    with mock.patch.object(
+        type(client.transport.list_secret_versions),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.return_value = response
+        pager = await client.list_secret_versions(parent=PARENT + "/secrets/s")
+        versions = [v async for v in pager.project()]
+
+    assert [v.name for v in versions] == ["v1"]
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from concurrent import futures
+import time
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import retry as retries
+from google.api_core import retry_async
+from google.iam.v1 import iam_policy_pb2  # type: ignore
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    metrics,
+    ratelimit,
+)
+from google.cloud.secretmanager_v1.types import service
+
+_SECRET = "projects/p/secrets/s"
+_PREDICATE = retries.if_exception_type(core_exceptions.ResourceExhausted)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock, **kwargs):
+    return ratelimit.AdaptiveRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_request_project():
+    assert ratelimit.request_project(service.GetSecretRequest(name=_SECRET)) == "p"
+    assert (
+        ratelimit.request_project(service.ListSecretsRequest(parent="projects/123"))
+        == "123"
+    )
+    request = iam_policy_pb2.GetIamPolicyRequest(resource=_SECRET)
+    assert ratelimit.request_project(request) == "p"
+    assert ratelimit.request_project(service.GetSecretRequest()) == ""
+
+
+def test_reserve_waits_for_tokens():
+    clock = FakeClock()
+    limiter = _limiter(clock, rate=10.0, project_rate=100.0, max_wait=0.25)
+    waits = [limiter.reserve("get_secret", "p") for _ in range(12)]
+    assert waits[:10] == [0.0] * 10
+    assert waits[10:] == pytest.approx([0.1, 0.2])
+
+    with pytest.raises(core_exceptions.ResourceExhausted):
+        limiter.reserve("get_secret", "p")
+    with pytest.raises(core_exceptions.ResourceExhausted):
+        limiter.reserve("get_secret", "p", timeout=0.1)
+    # Other projects and methods have their own budgets.
+    assert limiter.reserve("get_secret", "q") == 0.0
+    assert limiter.reserve("list_secrets", "p") == 0.0
+
+    clock.now += 1.2
+    assert limiter.reserve("get_secret", "p") == 0.0
+    assert limiter.stats() == ratelimit.RateLimiterStats(
+        waits=2, wait_seconds=pytest.approx(0.3), rejections=2, decreases=0
+    )
+
+
+def test_methods_share_the_project_budget():
+    clock = FakeClock()
+    limiter = _limiter(clock, rate=10.0, project_rate=15.0, max_wait=0.25)
+    assert [limiter.reserve("get_secret", "p") for _ in range(10)] == [0.0] * 10
+    # The project has 5 tokens left, whichever method takes them.
+    waits = [limiter.reserve("list_secrets", "p") for _ in range(7)]
+    assert waits[:5] == [0.0] * 5
+    assert waits[5:] == pytest.approx([1 / 15, 2 / 15])
+    assert limiter.reserve("list_secrets", "q") == 0.0
+
+    # A rejection by the server lowers the rate of every method.
+    limiter.throttled("get_secret", "p")
+    assert limiter.rate("get_secret", "p") == 5.0
+    assert limiter.rate("list_secrets", "p") == 7.5
+    assert limiter.rate("list_secrets", "q") == 10.0
+
+    with pytest.raises(ValueError):
+        ratelimit.AdaptiveRateLimiter(project_rate=0)
+
+
+def test_method_rates():
+    clock = FakeClock()
+    limiter = _limiter(clock, rate=100.0, method_rates={"add_secret_version": 2.0})
+    assert limiter.rate("add_secret_version", "p") == 2.0
+    assert limiter.rate("get_secret", "p") == 100.0
+    assert [limiter.reserve("add_secret_version", "p") for _ in range(3)] == [
+        0.0,
+        0.0,
+        0.5,
+    ]
+
+    with pytest.raises(ValueError):
+        ratelimit.AdaptiveRateLimiter(rate=0)
+    with pytest.raises(ValueError):
+        ratelimit.AdaptiveRateLimiter(decrease=1.0)
+
+
+def test_aimd():
+    clock = FakeClock()
+    limiter = _limiter(clock, rate=100.0, increase=10.0, cooldown=1.0)
+    limiter.throttled("get_secret", "p")
+    assert limiter.rate("get_secret", "p") == 50.0
+    # Rejections of attempts already in flight are ignored.
+    clock.now += 0.5
+    limiter.throttled("get_secret", "p")
+    assert limiter.rate("get_secret", "p") == 50.0
+    clock.now += 0.5
+    limiter.throttled("get_secret", "p")
+    assert limiter.rate("get_secret", "p") == 25.0
+    # The rate does not grow during the cooldown, then grows linearly.
+    clock.now += 1.0
+    assert limiter.rate("get_secret", "p") == 25.0
+    clock.now += 2.0
+    assert limiter.rate("get_secret", "p") == pytest.approx(45.0)
+    clock.now += 60.0
+    assert limiter.rate("get_secret", "p") == 100.0
+    assert limiter.rate("get_secret", "q") == 100.0
+    assert limiter.stats().decreases == 2
+
+
+def test_client_paces_and_adapts(make_fake):
+    clock = FakeClock()
+    limiter = _limiter(clock, rate=2.0)
+    fake = make_fake()
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"rate_limiter": limiter}
+    )
+    for _ in range(4):
+        client.get_secret(name=_SECRET)
+    assert clock.sleeps == pytest.approx([0.5, 0.5])
+
+    fake.inject_error(
+        "access_secret_version", core_exceptions.ResourceExhausted("quota"), times=1
+    )
+    response = client.access_secret_version(
+        name=_SECRET + "/versions/1",
+        retry=retries.Retry(initial=0.001, predicate=_PREDICATE, deadline=5.0),
+    )
+    assert response.payload.data == b"x"
+    assert limiter.rate("access_secret_version", "p") == 1.0
+    assert fake.calls["access_secret_version"] == 2
+
+
+def test_client_rejects_when_over_budget(make_fake):
+    clock = FakeClock()
+    limiter = _limiter(clock, rate=1.0, max_wait=0.1)
+    fake = make_fake()
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"rate_limiter": limiter}
+    )
+    client.get_secret(name=_SECRET)
+    with pytest.raises(core_exceptions.ResourceExhausted):
+        client.get_secret(name=_SECRET)
+    assert fake.calls["get_secret"] == 1
+    # Local rejections do not lower the rate.
+    assert limiter.rate("get_secret", "p") == 1.0
+
+
+def test_futures_are_sent_when_due():
+    def sleep(seconds):
+        raise AssertionError("futures must not block the caller")
+
+    sent = []
+
+    class Stub:
+        def __call__(self, request, **kwargs):
+            raise NotImplementedError()
+
+        def future(self, request, **kwargs):
+            sent.append(time.monotonic())
+            future = futures.Future()
+            future.set_result(request)
+            return future
+
+    limiter = ratelimit.AdaptiveRateLimiter(rate=20.0, burst_seconds=0.05, sleep=sleep)
+    stub = ratelimit._LimitedStub("get_secret", Stub(), limiter)
+    request = service.GetSecretRequest(name=_SECRET)
+    assert stub.future(request).result() is request
+
+    start = time.monotonic()
+    future = stub.future(request)
+    assert len(sent) == 1
+    assert future.result(timeout=1.0) is request
+    assert sent[1] - start >= 0.04
+
+    # An attempt cancelled while it waits for its token is never sent.
+    future = stub.future(request)
+    assert future.cancel()
+    time.sleep(0.15)
+    assert len(sent) == 2
+
+
+def test_keeps_metrics(make_fake):
+    recorder = metrics.MetricsRecorder()
+    limiter = ratelimit.AdaptiveRateLimiter()
+    transport = make_fake().transport()
+    client = SecretManagerServiceClient(
+        transport=transport,
+        client_options={"metrics": recorder, "rate_limiter": limiter},
+    )
+    client.get_secret(name=_SECRET)
+    assert recorder.snapshot()["get_secret"].calls == {"OK": 1}
+    assert recorder.snapshot()["get_secret"].attempts == {"OK": 1}
+
+    ratelimit.limit_transport(transport, limiter)
+    with pytest.raises(ValueError):
+        ratelimit.limit_transport(transport, ratelimit.AdaptiveRateLimiter())
+    with pytest.raises(ValueError):
+        metrics.instrument_transport(_limited(make_fake()), recorder)
+
+
+def _limited(fake):
+    transport = fake.transport()
+    ratelimit.limit_transport(transport, ratelimit.AdaptiveRateLimiter())
+    return transport
+
+
+@pytest.mark.asyncio
+async def test_async_client(make_fake):
+    limiter = ratelimit.AdaptiveRateLimiter(rate=100.0, burst_seconds=0.01)
+    fake = make_fake()
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(), client_options={"rate_limiter": limiter}
+    )
+    fake.inject_error(
+        "access_secret_version", core_exceptions.ResourceExhausted("quota"), times=1
+    )
+    await client.access_secret_version(
+        name=_SECRET + "/versions/1",
+        retry=retry_async.AsyncRetry(initial=0.001, predicate=_PREDICATE, deadline=5.0),
+    )
+    assert limiter.rate("access_secret_version", "p") == pytest.approx(50.0, rel=0.1)
+    await client.get_secret(name=_SECRET)
+    await client.get_secret(name=_SECRET)
+    assert limiter.stats().waits >= 1
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import datetime
+
+from google.api_core import exceptions as core_exceptions
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+    reconcile,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+    FakeSecretManagerService,
+)
+
+_PROJECT = "projects/p"
+_AUTOMATIC = {"automatic": {}}
+_TOPICS = [{"name": "projects/p/topics/t1"}, {"name": "projects/p/topics/t2"}]
+
+
+def _name(secret_id):
+    return "{}/secrets/{}".format(_PROJECT, secret_id)
+
+
+def _fake(**secrets):
+    fake = FakeSecretManagerService()
+    for secret_id, secret in secrets.items():
+        fake.create_secret(
+            {
+                "parent": _PROJECT,
+                "secret_id": secret_id,
+                "secret": dict(secret, replication=_AUTOMATIC),
+            }
+        )
+    return fake
+
+
+def _labels(fake, secret_id):
+    return dict(fake.get_secret({"name": _name(secret_id)}).labels)
+
+
+def _reconciler(fake, **kwargs):
+    client = SecretManagerServiceClient(transport=fake.transport())
+    return reconcile.SecretReconciler(client, _PROJECT, **kwargs)
+
+
+def test_secret_update_mask():
+    current = {"labels": {"a": "1"}, "topics": _TOPICS}
+    assert reconcile.secret_update_mask(current, current) == ()
+    assert reconcile.secret_update_mask(
+        current, {"labels": {"a": "2"}, "topics": _TOPICS[::-1]}
+    ) == ("labels",)
+    # Fields the desired secret does not set are cleared.
+    assert reconcile.secret_update_mask(current, {"labels": {"a": "1"}}) == ("topics",)
+    assert (
+        reconcile.secret_update_mask(
+            current, {"labels": {"a": "1"}}, fields=("labels",)
+        )
+        == ()
+    )
+
+    expiring = dict(current, expire_time=datetime.datetime(2030, 1, 1))
+    ttl = dict(current, ttl=datetime.timedelta(days=1))
+    # A TTL is only set on secrets which do not expire.
+    assert reconcile.secret_update_mask(current, ttl) == ("ttl",)
+    assert reconcile.secret_update_mask(expiring, ttl) == ()
+    assert reconcile.secret_update_mask(expiring, current) == ("expire_time",)
+
+    period = datetime.timedelta(days=30)
+    rotation = {"rotation_period": period}
+    scheduled = dict(rotation, next_rotation_time=datetime.datetime(2030, 1, 1))
+    advanced = dict(rotation, next_rotation_time=datetime.datetime(2030, 2, 1))
+    # The service advances the next rotation time; that is not a change.
+    assert (
+        reconcile.secret_update_mask({"rotation": advanced}, {"rotation": scheduled})
+        == ()
+    )
+    assert reconcile.secret_update_mask(
+        {"rotation": rotation}, {"rotation": scheduled}
+    ) == ("rotation",)
+    assert reconcile.secret_update_mask(
+        {"rotation": advanced},
+        {"rotation": dict(scheduled, rotation_period=period * 2)},
+    ) == ("rotation",)
+
+
+def test_plan_and_apply():
+    fake = _fake(
+        same={"labels": {"team": "a"}},
+        drifted={"labels": {"team": "a"}, "topics": _TOPICS},
+        unmanaged={},
+    )
+    reconciler = _reconciler(fake, max_concurrency=4)
+    manifest = {
+        "same": {"labels": {"team": "a"}},
+        "drifted": {"labels": {"team": "b"}, "topics": _TOPICS},
+        "new": {"replication": _AUTOMATIC, "labels": {"team": "c"}},
+    }
+
+    plan = reconciler.plan(manifest)
+
+    assert [(c.name, c.action, c.update_mask) for c in plan] == [
+        (_name("drifted"), reconcile.UPDATE, ("labels",)),
+        (_name("new"), reconcile.CREATE, ()),
+    ]
+    assert plan.unchanged == 1
+    assert plan.unmanaged == [_name("unmanaged")]
+    assert plan.listed == 3
+    assert "update_secret" not in fake.calls and "create_secret" not in fake.calls
+    assert "+ {}".format(_name("new")) in plan.summary()
+
+    report = reconciler.apply(plan)
+
+    assert not report.failed
+    assert [result.attempts for result in report] == [1, 1]
+    assert _labels(fake, "drifted") == {"team": "b"}
+    assert _labels(fake, "new") == {"team": "c"}
+    assert len(fake.get_secret({"name": _name("drifted")}).topics) == 2
+    assert "Applied 2 of 2 changes" in report.summary()
+    assert not reconciler.plan(manifest).changes
+
+
+def test_update_rereads_changed_secret():
+    fake = _fake(one={"labels": {"v": "0"}}, two={"labels": {"v": "0"}})
+    reconciler = _reconciler(fake)
+    plan = reconciler.plan(
+        {"one": {"labels": {"v": "1"}}, "two": {"labels": {"v": "1"}}}
+    )
+    # Someone else changes both secrets; the second to its desired state.
+    for secret_id, value in (("one", "x"), ("two", "1")):
+        fake.update_secret(
+            {
+                "secret": {"name": _name(secret_id), "labels": {"v": value}},
+                "update_mask": {"paths": ["labels"]},
+            }
+        )
+
+    one, two = reconciler.apply(plan)
+
+    assert one.ok and one.attempts == 2
+    assert two.ok and two.attempts == 1
+    assert two.secret.labels["v"] == "1"
+    assert _labels(fake, "one") == {"v": "1"}
+    assert fake.calls["update_secret"] == 3
+
+
+def test_create_of_existing_secret_becomes_update():
+    fake = _fake(hidden={"labels": {"v": "0"}})
+    reconciler = _reconciler(fake)
+    manifest = {"hidden": {"replication": _AUTOMATIC, "labels": {"v": "1"}}}
+
+    plan = reconciler.plan(manifest, filter="labels.v=none")
+    assert [change.action for change in plan] == [reconcile.CREATE]
+    (result,) = reconciler.apply(plan)
+
+    assert result.ok and result.attempts == 2
+    assert _labels(fake, "hidden") == {"v": "1"}
+
+
+def test_errors_are_reported():
+    fake = _fake(one={"labels": {"v": "0"}})
+    fake.inject_error("update_secret", core_exceptions.Aborted("busy"), times=1)
+    reconciler = _reconciler(fake, retry=None)
+    manifest = {"one": {"labels": {"v": "1"}}, "bad": {"labels": {"v": "1"}}}
+
+    report = reconciler.apply(reconciler.plan(manifest))
+
+    one, bad = report
+    # The secret had not changed, so the error was not a conflict.
+    assert isinstance(one.error, core_exceptions.Aborted)
+    assert one.attempts == 1
+    assert isinstance(bad.error, core_exceptions.InvalidArgument)
+    assert len(report.failed) == 2
+
+
+def test_other_errors_are_reported():
+    fake = _fake(one={"labels": {"v": "0"}})
+    fake.inject_error("update_secret", RuntimeError("broken"))
+    reconciler = _reconciler(fake, retry=None)
+    manifest = {"one": {"labels": {"v": "1"}}, "new": {"replication": _AUTOMATIC}}
+
+    report = reconciler.apply(reconciler.plan(manifest))
+
+    # The error of one change does not lose the others.
+    one, new = report
+    assert isinstance(one.error, RuntimeError)
+    assert new.ok
+    assert len(report.failed) == 1
+
+
+def test_invalid_fields():
+    with pytest.raises(ValueError):
+        _reconciler(_fake(), fields=("labels", "replication"))
+
+
+@pytest.mark.asyncio
+async def test_async_reconciler():
+    fake = _fake(drifted={"labels": {"v": "0"}})
+    client = SecretManagerServiceAsyncClient(transport=fake.async_transport())
+    reconciler = reconcile.AsyncSecretReconciler(client, _PROJECT)
+    manifest = {
+        "drifted": {"labels": {"v": "1"}},
+        "new": {"replication": _AUTOMATIC},
+    }
+
+    report = await reconciler.reconcile(manifest)
+
+    assert [result.change.action for result in report] == [
+        reconcile.UPDATE,
+        reconcile.CREATE,
+    ]
+    assert not report.failed
+    assert _labels(fake, "drifted") == {"v": "1"}
+    assert not (await reconciler.plan(manifest)).changes
+
+
+@pytest.mark.asyncio
+async def test_async_other_errors_are_reported():
+    fake = _fake(one={"labels": {"v": "0"}})
+    fake.inject_error("update_secret", RuntimeError("broken"))
+    client = SecretManagerServiceAsyncClient(transport=fake.async_transport())
+    reconciler = reconcile.AsyncSecretReconciler(client, _PROJECT, retry=None)
+    manifest = {"one": {"labels": {"v": "1"}}, "new": {"replication": _AUTOMATIC}}
+
+    report = await reconciler.apply(await reconciler.plan(manifest))
+
+    one, new = report
+    assert isinstance(one.error, RuntimeError)
+    assert new.ok
+    assert len(report.failed) == 1
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import itertools
+import time
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import grpc_helpers_async
+from google.auth import credentials as ga_credentials
+from google.protobuf import timestamp_pb2
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.cache import (
+    SecretCache,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.checksum import (
+    PayloadChecksumError,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.refresh import (
+    DEFAULT_REFRESH_INTERVAL,
+    AsyncSecretRefresher,
+    SecretRefresher,
+)
+from google.cloud.secretmanager_v1.types import resources, service
+
+SECRET = "projects/p/secrets/s"
+LATEST = SECRET + "/versions/latest"
+
+
+def versions():
+    counter = itertools.count(1)
+
+    def fake_access(request, **kwargs):
+        assert request.name == LATEST
+        return service.AccessSecretVersionResponse(
+            name="%s/versions/%d" % (SECRET, next(counter))
+        )
+
+    return fake_access
+
+
+def make_client(**options):
+    return SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options=options,
+    )
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_default_refresh_interval():
+    assert SecretRefresher(make_client()).refresh_interval == DEFAULT_REFRESH_INTERVAL
+    cache = SecretCache(alias_ttl=10.0)
+    refresher = SecretRefresher(make_client(secret_cache=cache))
+    assert refresher.refresh_interval == pytest.approx(8.0)
+
+
+@pytest.mark.parametrize("kwargs", [{"refresh_interval": 0}, {"jitter": 1.0}])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        SecretRefresher(make_client(), **kwargs)
+
+
+def test_subscribe_and_refresh_updates_cache():
+    cache = SecretCache()
+    client = make_client(secret_cache=cache)
+    refresher = SecretRefresher(client, track_rotation=False)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = versions()
+        assert refresher.subscribe(SECRET).name == SECRET + "/versions/1"
+        assert refresher.get(SECRET).name == SECRET + "/versions/1"
+        assert cache.get(LATEST).name == SECRET + "/versions/1"
+
+        # The refresh bypasses the cache entry it replaces.
+        refresher.refresh(SECRET)
+        assert refresher.get(SECRET).name == SECRET + "/versions/2"
+        assert cache.get(LATEST).name == SECRET + "/versions/2"
+
+        # Requests from the client are answered by the refreshed entry.
+        assert client.access_secret_version(name=LATEST).name.endswith("/2")
+
+    assert call.call_count == 2
+
+
+def test_failed_refresh_serves_previous_value():
+    client = make_client()
+    refresher = SecretRefresher(client, track_rotation=False)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = versions()
+        refresher.subscribe(SECRET)
+        call.side_effect = core_exceptions.NotFound("gone")
+        refresher.refresh(SECRET)
+
+    assert refresher.get(SECRET).name == SECRET + "/versions/1"
+    assert isinstance(refresher.last_error(SECRET), core_exceptions.NotFound)
+
+
+def corrupted(request, **kwargs):
+    return service.AccessSecretVersionResponse(
+        name=SECRET + "/versions/2", payload={"data": b"a", "data_crc32c": 1}
+    )
+
+
+def test_corrupted_refresh_is_not_cached():
+    cache = SecretCache()
+    client = make_client(secret_cache=cache, payload_checksums=True)
+    refresher = SecretRefresher(client, track_rotation=False)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = versions()
+        refresher.subscribe(SECRET)
+        call.side_effect = corrupted
+        refresher.refresh(SECRET)
+
+    assert refresher.get(SECRET).name == SECRET + "/versions/1"
+    assert cache.get(LATEST).name == SECRET + "/versions/1"
+    assert isinstance(refresher.last_error(SECRET), PayloadChecksumError)
+
+
+def test_rotation_schedules_earlier_refresh():
+    client = make_client()
+    now = 1000.0
+    refresher = SecretRefresher(
+        client,
+        refresh_interval=3600.0,
+        jitter=0.0,
+        rotation_spread=0.0,
+        clock=lambda: now,
+        wall_clock=lambda: now,
+    )
+    rotation = timestamp_pb2.Timestamp(seconds=int(now) + 60)
+    fake_access = versions()
+
+    def fake_call(request, **kwargs):
+        # All stubs share a callable type, so dispatch on the request.
+        if isinstance(request, service.GetSecretRequest):
+            return resources.Secret(
+                name=SECRET,
+                rotation=resources.Rotation(next_rotation_time=rotation),
+            )
+        return fake_access(request)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_call
+        refresher.subscribe(SECRET)
+
+    assert refresher._schedule.time_until_next() == pytest.approx(60.0)
+
+
+def test_rotation_lookup_errors_are_ignored():
+    client = make_client()
+    refresher = SecretRefresher(client, jitter=0.0, clock=lambda: 0.0)
+    fake_access = versions()
+
+    def fake_call(request, **kwargs):
+        if isinstance(request, service.GetSecretRequest):
+            raise core_exceptions.PermissionDenied("denied")
+        return fake_access(request)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_call
+        refresher.subscribe(SECRET)
+
+    assert refresher._schedule.time_until_next() == DEFAULT_REFRESH_INTERVAL
+
+
+def test_background_thread_refreshes():
+    client = make_client()
+    refresher = SecretRefresher(client, refresh_interval=0.01, track_rotation=False)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = versions()
+        with refresher:
+            refresher.subscribe(SECRET)
+            wait_for(lambda: call.call_count >= 3)
+        count = call.call_count
+
+    assert refresher.get(SECRET).name == "%s/versions/%d" % (SECRET, count)
+
+
+def test_unexpected_errors_keep_thread_running():
+    client = make_client()
+    refresher = SecretRefresher(client, refresh_interval=0.01, track_rotation=False)
+    fake_access = versions()
+    errors = []
+    failed = []
+
+    def fake_call(request, **kwargs):
+        if errors:
+            raise errors.pop()
+        failed.append(isinstance(refresher.last_error(SECRET), RuntimeError))
+        return fake_access(request)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_call
+        refresher.subscribe(SECRET)
+        errors.append(RuntimeError("boom"))
+        with refresher:
+            # The subscription was rescheduled and later refreshes succeed.
+            wait_for(lambda: call.call_count >= 4)
+            assert refresher._thread.is_alive()
+
+    assert any(failed)
+    assert refresher.last_error(SECRET) is None
+    assert refresher.get(SECRET).name != SECRET + "/versions/1"
+
+
+def test_rotation_lookup_retry_errors_are_ignored():
+    client = make_client()
+    refresher = SecretRefresher(client, jitter=0.0, clock=lambda: 0.0)
+    fake_access = versions()
+
+    def fake_call(request, **kwargs):
+        if isinstance(request, service.GetSecretRequest):
+            raise core_exceptions.RetryError("deadline exceeded", None)
+        return fake_access(request)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_call
+        assert refresher.subscribe(SECRET).name == SECRET + "/versions/1"
+
+    assert refresher._schedule.time_until_next() == DEFAULT_REFRESH_INTERVAL
+
+
+def test_unsubscribe_stops_refreshing():
+    client = make_client()
+    refresher = SecretRefresher(client, track_rotation=False)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = versions()
+        refresher.subscribe(SECRET)
+        refresher.unsubscribe(SECRET)
+
+    assert refresher._schedule.time_until_next() is None
+    assert refresher.last_error(SECRET) is None
+
+
+@pytest.mark.asyncio
+async def test_async_refresher():
+    cache = SecretCache()
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options={"secret_cache": cache},
+    )
+    refresher = AsyncSecretRefresher(
+        client, refresh_interval=0.01, track_rotation=False
+    )
+    fake_access = versions()
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = lambda request, **kw: grpc_helpers_async.FakeUnaryUnaryCall(
+            fake_access(request)
+        )
+        async with refresher:
+            first = await refresher.get(SECRET)
+            assert first.name == SECRET + "/versions/1"
+            for _ in range(500):
+                if call.call_count >= 3:
+                    break
+                await asyncio.sleep(0.01)
+
+    assert call.call_count >= 3
+    assert cache.get(LATEST).name == (await refresher.get(SECRET)).name
+
+
+@pytest.mark.asyncio
+async def test_async_failed_refresh_serves_previous_value():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    refresher = AsyncSecretRefresher(client, track_rotation=False)
+    fake_access = versions()
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = lambda request, **kw: grpc_helpers_async.FakeUnaryUnaryCall(
+            fake_access(request)
+        )
+        await refresher.subscribe(SECRET)
+        call.side_effect = core_exceptions.NotFound("gone")
+        await refresher.refresh(SECRET)
+
+    assert (await refresher.get(SECRET)).name == SECRET + "/versions/1"
+    assert isinstance(refresher.last_error(SECRET), core_exceptions.NotFound)
+
+
+@pytest.mark.asyncio
+async def test_async_corrupted_refresh_is_not_cached():
+    cache = SecretCache()
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options={"secret_cache": cache, "payload_checksums": True},
+    )
+    refresher = AsyncSecretRefresher(client, track_rotation=False)
+    fake_access = versions()
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = lambda request, **kw: grpc_helpers_async.FakeUnaryUnaryCall(
+            fake_access(request)
+        )
+        await refresher.subscribe(SECRET)
+        call.side_effect = lambda request, **kw: grpc_helpers_async.FakeUnaryUnaryCall(
+            corrupted(request)
+        )
+        await refresher.refresh(SECRET)
+
+    assert (await refresher.get(SECRET)).name == SECRET + "/versions/1"
+    assert cache.get(LATEST).name == SECRET + "/versions/1"
+    assert isinstance(refresher.last_error(SECRET), PayloadChecksumError)
+
+
+@pytest.mark.asyncio
+async def test_async_unexpected_errors_keep_task_running():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    refresher = AsyncSecretRefresher(
+        client, refresh_interval=0.01, track_rotation=False
+    )
+    fake_access = versions()
+    errors = []
+
+    def fake_call(request, **kwargs):
+        if errors:
+            raise errors.pop()
+        return grpc_helpers_async.FakeUnaryUnaryCall(fake_access(request))
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_call
+        await refresher.subscribe(SECRET)
+        errors.append(RuntimeError("boom"))
+        async with refresher:
+            failed = False
+            for _ in range(500):
+                failed = failed or isinstance(
+                    refresher.last_error(SECRET), RuntimeError
+                )
+                if failed and call.call_count >= 4:
+                    break
+                await asyncio.sleep(0.01)
+            assert failed
+            # The subscription was rescheduled and later refreshes succeed.
+            assert call.call_count >= 4
+            assert not refresher._task.done()
+
+    assert refresher.last_error(SECRET) is None
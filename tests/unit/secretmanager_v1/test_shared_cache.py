@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import multiprocessing
+import os
+import signal
+import time
+
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.fake import (
+    FakeSecretManagerService,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.shared_cache import (
+    _SEQUENCE,
+    SharedSecretCache,
+)
+from google.cloud.secretmanager_v1.types import service
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="SharedSecretCache requires a POSIX system"
+)
+
+SECRET = "projects/p/secrets/s"
+
+# Seconds a child process may run before the test fails.
+_CHILD_TIMEOUT = 30.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(version, data):
+    return service.AccessSecretVersionResponse(
+        name="{}/versions/{}".format(SECRET, version), payload={"data": data}
+    )
+
+
+def _in_child(func):
+    """Runs ``func`` in a forked process and returns its exit status.
+
+    The child only uses the cache: building a client after a fork of this
+    multithreaded process may hang, so those tests use :func:`_spawn`.
+    """
+    pid = os.fork()
+    if pid == 0:  # pragma: NO COVER
+        try:
+            func()
+            code = 0
+        except BaseException:
+            code = 1
+        os._exit(code)
+    deadline = time.monotonic() + _CHILD_TIMEOUT
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.waitstatus_to_exitcode(status)
+        if time.monotonic() > deadline:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            pytest.fail("The forked child did not finish")
+        time.sleep(0.01)
+
+
+def _spawn(target, *args):
+    """Starts ``target`` in a new interpreter."""
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args)
+    process.start()
+    return process
+
+
+def _join(process):
+    """Waits for a process from :func:`_spawn` and returns its exit code."""
+    process.join(_CHILD_TIMEOUT)
+    if process.is_alive():
+        process.kill()
+        process.join()
+        pytest.fail("The child process did not finish")
+    return process.exitcode
+
+
+def test_get_put_and_expiry():
+    clock = FakeClock()
+    cache = SharedSecretCache(alias_ttl=10, clock=clock)
+    latest = SECRET + "/versions/latest"
+    pinned = SECRET + "/versions/1"
+    assert cache.get(latest) is None
+
+    cache.put(latest, _response(1, b"a"))
+    cache.put(pinned, _response(1, b"a"))
+    assert cache.get(latest).payload.data == b"a"
+    # Unchanged entries are decoded once per process.
+    assert cache.get(latest) is cache.get(latest)
+    assert len(cache) == 2 and latest in cache
+
+    cache.put(latest, _response(2, b"b"))
+    assert cache.get(latest).payload.data == b"b"
+
+    clock.now += 11
+    assert cache.get(latest) is None
+    assert cache.get(pinned) is not None
+    assert cache.stats.hits == 5
+    assert cache.stats.misses == 2
+    assert cache.stats.entries == 1
+
+    cache.put(latest, _response(1, b"a"), ttl=0)
+    assert cache.get(latest) is None
+
+
+def test_invalidate_and_clear():
+    cache = SharedSecretCache(max_entries=4)
+    names = [SECRET + "/versions/{}".format(i) for i in range(1, 4)]
+    for name in names:
+        cache.put(name, _response(1, b"x"))
+    cache.put("projects/p/secrets/other/versions/1", _response(1, b"y"))
+
+    cache.invalidate(names[0])
+    assert names[0] not in cache and names[1] in cache
+    cache.invalidate_secret(SECRET)
+    assert not any(name in cache for name in names)
+    assert "projects/p/secrets/other/versions/1" in cache
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_writes_after_a_writer_died_mid_write():
+    cache = SharedSecretCache()
+    latest = SECRET + "/versions/latest"
+    cache.put(latest, _response(1, b"a"))
+    ((index, header),) = cache._used_slots()
+    # A writer died after marking the slot as being written.
+    _SEQUENCE.pack_into(cache._map, cache._offset(index), header[0] + 1)
+    assert cache.get(latest) is None
+
+    cache.put(latest, _response(2, b"b"))
+    assert cache._header(index)[0] % 2 == 0
+    assert cache.get(latest).payload.data == b"b"
+
+
+def test_eviction_and_oversized_responses():
+    cache = SharedSecretCache(max_entries=2, slot_size=1024)
+    for i in range(5):
+        cache.put(SECRET + "/versions/{}".format(i), _response(i, b"x"))
+    assert len(cache) == 2
+    assert cache.stats.evictions == 3
+    assert SECRET + "/versions/4" in cache
+
+    cache.put(SECRET + "/versions/9", _response(9, b"x" * 2000))
+    assert SECRET + "/versions/9" not in cache
+
+
+def test_shared_with_forked_processes():
+    cache = SharedSecretCache()
+    name = SECRET + "/versions/1"
+
+    def child():
+        cache.put(name, _response(1, b"from child"))
+
+    assert _in_child(child) == 0
+    assert cache.get(name).payload.data == b"from child"
+
+    cache.put(name, _response(1, b"from parent"))
+
+    def child_reads():
+        assert cache.get(name).payload.data == b"from parent"
+
+    assert _in_child(child_reads) == 0
+
+
+def test_shared_by_path(tmp_path):
+    path = str(tmp_path / "cache")
+    first = SharedSecretCache(path, max_entries=16)
+    second = SharedSecretCache(path, max_entries=16)
+    assert os.stat(path).st_mode & 0o077 == 0
+    name = SECRET + "/versions/latest"
+
+    first.put(name, _response(1, b"a"))
+    assert second.get(name).payload.data == b"a"
+    first.put(name, _response(2, b"b"))
+    assert second.get(name).payload.data == b"b"
+    second.invalidate(name)
+    assert first.get(name) is None
+
+    with pytest.raises(ValueError):
+        SharedSecretCache(path, max_entries=32)
+    first.close()
+    second.close()
+
+
+def test_path_uses_the_wall_clock(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache")
+    name = SECRET + "/versions/latest"
+    SharedSecretCache(path).put(name, _response(1, b"a"))
+    # After a reboot the monotonic clock starts again from zero, while
+    # the file keeps the expiry times written before it.
+    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
+    cache = SharedSecretCache(path)
+    ((_, header),) = cache._used_slots()
+    assert time.time() < header[4] <= time.time() + cache.alias_ttl
+    assert cache.get(name).payload.data == b"a"
+    monkeypatch.setattr(time, "time", lambda: header[4])
+    assert SharedSecretCache(path).get(name) is None
+    assert SharedSecretCache()._clock is time.monotonic
+
+
+_TORN_NAME = SECRET + "/versions/latest"
+_TORN_VALUES = [bytes([i]) * 4096 for i in range(1, 5)]
+
+
+def _write_many(path):  # pragma: NO COVER
+    cache = SharedSecretCache(path, max_entries=4)
+    for i in range(2000):
+        cache.put(_TORN_NAME, _response(1, _TORN_VALUES[i % len(_TORN_VALUES)]))
+
+
+def test_readers_never_see_torn_writes(tmp_path):
+    path = str(tmp_path / "cache")
+    cache = SharedSecretCache(path, max_entries=4)
+    cache.put(_TORN_NAME, _response(1, _TORN_VALUES[0]))
+
+    writer = _spawn(_write_many, path)
+    deadline = time.monotonic() + _CHILD_TIMEOUT
+    seen = set()
+    while writer.is_alive() and time.monotonic() < deadline:
+        response = cache.get(_TORN_NAME)
+        if response is not None:
+            assert response.payload.data in _TORN_VALUES
+            seen.add(response.payload.data)
+    assert _join(writer) == 0
+    assert seen
+
+
+def _fetch(path, make_fake):  # pragma: NO COVER
+    client = SecretManagerServiceClient(
+        transport=make_fake(b"value").transport(),
+        client_options={"secret_cache": SharedSecretCache(path)},
+    )
+    assert client.access_secret_version(name=SECRET + "/versions/1").payload.data
+
+
+def test_one_worker_fetches_for_all(tmp_path, make_fake):
+    path = str(tmp_path / "cache")
+    cache = SharedSecretCache(path)
+    fake = make_fake(b"value")
+    name = SECRET + "/versions/1"
+
+    assert _join(_spawn(_fetch, path, make_fake)) == 0
+    # The fake lives in the child's memory; no RPC is made here.
+    client = SecretManagerServiceClient(
+        transport=FakeSecretManagerService().transport(),
+        client_options={"secret_cache": cache},
+    )
+    assert client.access_secret_version(name=name).payload.data == b"value"
+
+    # Disabling a version through any client drops it for every process.
+    client = SecretManagerServiceClient(
+        transport=fake.transport(), client_options={"secret_cache": cache}
+    )
+    client.disable_secret_version(name=name)
+    assert name not in cache
+
+
+@pytest.mark.asyncio
+async def test_async_client(make_fake):
+    cache = SharedSecretCache()
+    fake = make_fake(b"value")
+    name = SECRET + "/versions/1"
+    client = SecretManagerServiceAsyncClient(
+        transport=fake.async_transport(), client_options={"secret_cache": cache}
+    )
+    await client.access_secret_version(name=name)
+    await client.access_secret_version(name=name)
+    assert fake.calls["access_secret_version"] == 1
+    assert cache.get(name).payload.data == b"value"
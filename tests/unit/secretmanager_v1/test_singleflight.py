@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import threading
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from google.api_core import exceptions as core_exceptions
+from google.api_core import grpc_helpers_async
+from google.auth import credentials as ga_credentials
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+    SecretManagerServiceClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service.singleflight import (
+    AsyncSingleFlight,
+    SingleFlight,
+    request_key,
+)
+from google.cloud.secretmanager_v1.types import service
+
+NAME = "projects/p/secrets/s/versions/latest"
+
+
+def test_request_key_includes_metadata():
+    assert request_key(NAME, [("a", "b")]) == request_key(NAME, (("a", "b"),))
+    assert request_key(NAME, [("a", "b")]) != request_key(NAME, [("a", "c")])
+
+
+def run_concurrently(flight, key, func, count):
+    results = []
+    errors = []
+
+    def target():
+        try:
+            results.append(flight.do(key, func))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_single_flight_shares_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    threads, results, errors = run_concurrently(flight, "key", func, 8)
+    # Wait until every follower has joined the in-flight call.
+    for _ in range(500):
+        if flight.shared == 7:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 8
+    assert errors == []
+    assert len(flight) == 0
+
+
+def test_single_flight_shares_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def func():
+        release.wait(5)
+        raise core_exceptions.ResourceExhausted("quota")
+
+    threads, results, errors = run_concurrently(flight, "key", func, 4)
+    for _ in range(500):
+        if flight.shared == 3:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == []
+    assert len(errors) == 4
+    assert all(isinstance(e, core_exceptions.ResourceExhausted) for e in errors)
+
+
+def test_single_flight_interrupted_leader():
+    flight = SingleFlight()
+    followers = []
+
+    def func():
+        followers.extend(run_concurrently(flight, "key", mock.Mock(), 3))
+        for _ in range(500):
+            if flight.shared == 3:
+                break
+            threading.Event().wait(0.01)
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        flight.do("key", func)
+    threads, results, errors = followers
+    for thread in threads:
+        thread.join()
+
+    # The followers do not mistake the interrupted call for a success.
+    assert results == []
+    assert len(errors) == 3
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert all(isinstance(e.__cause__, KeyboardInterrupt) for e in errors)
+
+
+def test_single_flight_sequential_calls_are_not_shared():
+    flight = SingleFlight()
+    func = mock.Mock(return_value=1)
+    flight.do("key", func)
+    flight.do("key", func)
+    assert func.call_count == 2
+    assert flight.shared == 0
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_shares_result():
+    flight = AsyncSingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def func():
+        calls.append(1)
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.ensure_future(flight.do("key", func)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+    assert flight.shared == 4
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_cancelled_waiter_does_not_cancel_call():
+    flight = AsyncSingleFlight()
+    release = asyncio.Event()
+
+    async def func():
+        await release.wait()
+        return "value"
+
+    first = asyncio.ensure_future(flight.do("key", func))
+    second = asyncio.ensure_future(flight.do("key", func))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "value"
+
+
+def test_client_coalesces_access_secret_version():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options={"coalesce_requests": True},
+    )
+    release = threading.Event()
+
+    def fake_call(request, **kwargs):
+        release.wait(5)
+        return service.AccessSecretVersionResponse(name=request.name)
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.side_effect = fake_call
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(client.access_secret_version(name=NAME))
+            )
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for _ in range(500):
+            if client._access_flight.shared == 5:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert call.call_count == 1
+    assert len(results) == 6
+    assert all(r.name == NAME for r in results)
+
+
+def test_client_does_not_coalesce_by_default():
+    client = SecretManagerServiceClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+    assert client._access_flight is None
+
+
+@pytest.mark.asyncio
+async def test_async_client_coalesces_access_secret_version():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+        client_options={"coalesce_requests": True},
+    )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            service.AccessSecretVersionResponse(name=NAME)
+        )
+        results = await asyncio.gather(
+            *[client.access_secret_version(name=NAME) for _ in range(5)]
+        )
+
+    assert call.call_count == 1
+    assert [r.name for r in results] == [NAME] * 5
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# try/except added for compatibility with python < 3.8
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from google.api_core import gapic_v1, grpc_helpers_async
+from google.auth import credentials as ga_credentials
+import pytest
+
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    SecretManagerServiceAsyncClient,
+)
+from google.cloud.secretmanager_v1.services.secret_manager_service import (
+    transports,
+)
+from google.cloud.secretmanager_v1.types import service
+from google.cloud.secretmanager_v1beta1.services.secret_manager_service import (
+    transports as transports_v1beta1,
+)
+
+
+@pytest.mark.parametrize(
+    "transport_class",
+    [
+        transports.SecretManagerServiceGrpcAsyncIOTransport,
+        transports_v1beta1.SecretManagerServiceGrpcAsyncIOTransport,
+    ],
+)
+def test_asyncio_transport_precomputes_async_wrappers(transport_class):
+    with mock.patch.object(
+        gapic_v1.method_async, "wrap_method", side_effect=lambda func, **kw: func
+    ) as wrap:
+        transport = transport_class(credentials=ga_credentials.AnonymousCredentials())
+
+    assert set(transport._wrapped_methods) == {
+        getattr(transport, name)
+        for name in (
+            "list_secrets",
+            "create_secret",
+            "add_secret_version",
+            "get_secret",
+            "update_secret",
+            "delete_secret",
+            "list_secret_versions",
+            "get_secret_version",
+            "access_secret_version",
+            "disable_secret_version",
+            "enable_secret_version",
+            "destroy_secret_version",
+            "set_iam_policy",
+            "get_iam_policy",
+            "test_iam_permissions",
+        )
+    }
+    assert wrap.call_count == len(transport._wrapped_methods)
+
+
+@pytest.mark.asyncio
+async def test_async_client_does_not_wrap_per_call():
+    client = SecretManagerServiceAsyncClient(
+        credentials=ga_credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(
+        type(client.transport.access_secret_version), "__call__"
+    ) as call, mock.patch.object(gapic_v1.method_async, "wrap_method") as wrap:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            service.AccessSecretVersionResponse(name="name_value")
+        )
+        response = await client.access_secret_version(name="name_value")
+
+    wrap.assert_not_called()
+    assert response.name == "name_value"
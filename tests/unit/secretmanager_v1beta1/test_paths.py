@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from google.cloud.secretmanager_v1beta1.services.secret_manager_service import (
+    SecretManagerServiceClient,
+    paths,
+)
+
+
+def test_client_helpers_use_templates():
+    client = SecretManagerServiceClient
+    path = client.secret_version_path("p", "s", "1")
+    assert path == "projects/p/secrets/s/versions/1"
+    assert client.parse_secret_version_path(path) == {
+        "project": "p",
+        "secret": "s",
+        "secret_version": "1",
+    }
+    assert client.parse_secret_path("projects/a/b/secrets/c") == {
+        "project": "a/b",
+        "secret": "c",
+    }
+    assert client.common_project_path("p") == "projects/p"
+
+
+def test_bulk_parse_and_format():
+    names = paths.SECRET.format_columns(["p", "q"], ["s", "t"])
+    assert names == ["projects/p/secrets/s", "projects/q/secrets/t"]
+    assert list(paths.SECRET.parse_many(names + ["bad"])) == [
+        ("p", "s"),
+        ("q", "t"),
+        None,
+    ]
+    assert paths.SECRET.parse_columns(names) == {
+        "project": ["p", "q"],
+        "secret": ["s", "t"],
+    }